@@ -0,0 +1,60 @@
+# benchmarks/compare.py
+# Compares two benchmark result files written by benchmarks/run_benchmarks.py
+# Usage: python -m benchmarks.compare BASELINE.json CANDIDATE.json [--threshold 10]
+
+import argparse
+import json
+import sys
+
+
+def _key(result: dict) -> tuple:
+    return result["group"], result["name"], result["regime"], result["bars"]
+
+
+def load_results(path: str) -> dict:
+    """ Successful results of a run keyed by (group, name, regime, bars). """
+    with open(path, "r", encoding="utf-8") as f: report = json.load(f)
+    return {_key(result): result for result in report["results"] if not result.get("error")}
+
+
+def compare(baseline: dict, candidate: dict, threshold_pct: float = 10.0) -> list[dict]:
+    """
+    Pairs up cases present in both runs.
+
+    Returns:
+        list[dict]: Per case: key, old/new seconds, speedup (old / new, > 1 = faster), memory change
+                    and status "faster" / "slower" / "same" (within threshold_pct).
+    """
+    rows = []
+    for key in sorted(baseline.keys() & candidate.keys(), key=str):
+        old, new = baseline[key], candidate[key]
+        speedup = old["seconds"] / new["seconds"] if new["seconds"] > 0 else float("inf")
+        limit = 1.0 + threshold_pct / 100.0
+        status = "faster" if speedup > limit else ("slower" if speedup < 1.0 / limit else "same")
+        memory_change = new["peak_mb"] - old["peak_mb"] if old.get("peak_mb") is not None and new.get("peak_mb") is not None else None
+        rows.append({"key": key, "old_seconds": old["seconds"], "new_seconds": new["seconds"], "speedup": speedup,
+                     "memory_change_mb": memory_change, "status": status})
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare", description="Compare two benchmark result files.")
+    parser.add_argument("baseline"); parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Percent change treated as noise (default 10)")
+    args = parser.parse_args(argv)
+    baseline, candidate = load_results(args.baseline), load_results(args.candidate)
+    rows = compare(baseline, candidate, args.threshold)
+    print(f"{'group':<15} {'case':<30} {'regime':<15} {'bars':>9} {'old s':>9} {'new s':>9} {'speedup':>8} {'mem MB':>8}  status")
+    for row in rows:
+        group, name, regime, bars = row["key"]
+        memory = f"{row['memory_change_mb']:+8.1f}" if row["memory_change_mb"] is not None else f"{'-':>8}"
+        print(f"{group:<15} {name:<30} {regime:<15} {bars:>9} {row['old_seconds']:9.4f} {row['new_seconds']:9.4f} {row['speedup']:7.2f}x {memory}  {row['status']}")
+    only_old = len(baseline.keys() - candidate.keys()); only_new = len(candidate.keys() - baseline.keys())
+    slower = sum(1 for row in rows if row["status"] == "slower")
+    print(f"{len(rows)} cases compared, {sum(1 for r in rows if r['status'] == 'faster')} faster, {slower} slower"
+          + (f"; {only_old} only in baseline, {only_new} only in candidate" if only_old or only_new else ""))
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
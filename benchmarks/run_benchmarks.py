@@ -0,0 +1,212 @@
+# benchmarks/run_benchmarks.py
+# Offline benchmark suite: times every registered strategy through run_backtest (and the vector engine),
+# the recommendation calculation and the indicator functions on synthetic OHLCV data, then writes
+# bars/sec and peak memory per case to JSON for comparison between versions (benchmarks/compare.py)
+# Usage: python -m benchmarks.run_benchmarks [--bars 1000 10000] [--regimes trending gapped] [--groups strategies indicators]
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from trading.synthetic_data import synthetic_ohlcv, REGIMES, default_freq
+from config import DEFAULT_CASH, DEFAULT_COMMISSION
+from trading.strategy_registry import STRATEGY_LOADERS, PARAM_CONFIG, get_strategy_class, strategy_class_name, trade_size_fraction, get_talib
+from trading.indicator_cache import INDICATOR_CACHE
+from trading.calendar_features import calendar_features, clear_calendar_cache
+
+GROUPS = ("strategies", "vector", "recommendation", "indicators")
+DEFAULT_BARS = (1_000, 10_000)
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def _default_params(strategy_name: str) -> dict:
+    params = dict(PARAM_CONFIG.get(strategy_name, []))
+    params["trade_size_percent"] = trade_size_fraction(params.get("trade_size_percent"))
+    return params
+
+
+def _strategy_cases(strategy_names) -> list:
+    from trading.backtester import run_backtest
+    cases = []
+    for strategy_name in strategy_names:
+        strategy_class = get_strategy_class(strategy_name); params = _default_params(strategy_name)
+        def run(data, strategy_class=strategy_class, params=params):
+            stats, _ = run_backtest(strategy_class, data, cash=DEFAULT_CASH, commission=DEFAULT_COMMISSION, **params)
+            if stats is None: raise RuntimeError("run_backtest returned no stats")
+        cases.append(("strategies", strategy_name, run))
+    return cases
+
+
+def _vector_cases(strategy_names) -> list:
+    from trading.vector_backtester import supports, vector_backtest
+    cases = []
+    for strategy_name in strategy_names:
+        class_name = strategy_class_name(strategy_name)
+        if not supports(class_name): continue
+        def run(data, class_name=class_name, params=_default_params(strategy_name)):
+            if vector_backtest(class_name, data, cash=DEFAULT_CASH, commission=DEFAULT_COMMISSION, **params) is None:
+                raise RuntimeError("vector_backtest failed")
+        cases.append(("vector", strategy_name, run))
+    return cases
+
+
+def _recommendation_cases() -> list:
+    from trading.recommendation import compute_recommendation, RecommendationState
+    talib_module = get_talib()
+    return [("recommendation", "compute_recommendation", lambda data: compute_recommendation(data, talib_module)),
+            ("recommendation", "RecommendationState (seed)", RecommendationState)]
+
+
+def _indicator_cases() -> list:
+    from trading import indicators, ta_numpy
+    talib_module = get_talib()
+    backends = [(talib_module.__name__.rsplit(".", 1)[-1], talib_module)]
+    if talib_module is not ta_numpy: backends.append(("ta_numpy", ta_numpy))  # Also time the fallback when TA-Lib is the default
+    close = lambda data: data["close"].to_numpy(dtype=float)
+    hlc = lambda data: (data["high"].to_numpy(dtype=float), data["low"].to_numpy(dtype=float), close(data))
+    cases = []
+    for label, ta in backends:
+        cases += [
+            ("indicators", f"{label}.SMA(20)", lambda data, ta=ta: ta.SMA(close(data), timeperiod=20)),
+            ("indicators", f"{label}.EMA(20)", lambda data, ta=ta: ta.EMA(close(data), timeperiod=20)),
+            ("indicators", f"{label}.RSI(14)", lambda data, ta=ta: ta.RSI(close(data), timeperiod=14)),
+            ("indicators", f"{label}.MACD(12,26,9)", lambda data, ta=ta: ta.MACD(close(data), fastperiod=12, slowperiod=26, signalperiod=9)),
+            ("indicators", f"{label}.BBANDS(20,2)", lambda data, ta=ta: ta.BBANDS(close(data), timeperiod=20, nbdevup=2.0, nbdevdn=2.0, matype=0)),
+            ("indicators", f"{label}.ATR(14)", lambda data, ta=ta: ta.ATR(*hlc(data), timeperiod=14)),
+            ("indicators", f"{label}.ADX(14)", lambda data, ta=ta: ta.ADX(*hlc(data), timeperiod=14)),
+        ]
+    cases += [
+        ("indicators", "rolling_mean(20)", lambda data: indicators.rolling_mean(close(data), 20)),
+        ("indicators", "rolling_max(20)", lambda data: indicators.rolling_max(data["high"].to_numpy(dtype=float), 20)),
+        ("indicators", "channel_midpoints(9,26,52)", lambda data: indicators.channel_midpoints(data["high"].to_numpy(dtype=float), data["low"].to_numpy(dtype=float), (9, 26, 52))),
+        ("indicators", "calendar_features", lambda data: calendar_features(data.index)),
+    ]
+    return cases
+
+
+def build_cases(groups, strategy_names) -> list:
+    """ (group, name, function(data)) for every benchmark in the selected groups. """
+    cases = []
+    if "strategies" in groups: cases += _strategy_cases(strategy_names)
+    if "vector" in groups: cases += _vector_cases(strategy_names)
+    if "recommendation" in groups: cases += _recommendation_cases()
+    if "indicators" in groups: cases += _indicator_cases()
+    return cases
+
+
+def _clear_caches():
+    """ Every timed run starts cold: indicator and calendar caches would otherwise turn repeats into lookups. """
+    INDICATOR_CACHE.clear(); clear_calendar_cache()
+
+
+def measure(func, data, repeat: int = 3, memory: bool = True) -> dict:
+    """
+    Times func(data) repeat times (caches cleared before each run, library output discarded) and,
+    if memory is set, runs it once more under tracemalloc to record the peak Python/NumPy allocation.
+
+    Returns:
+        dict: seconds (best run), median_seconds, runs, bars_per_sec, peak_mb (None without memory).
+    """
+    runs = []
+    for _ in range(max(1, repeat)):
+        _clear_caches()
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter(); func(data); runs.append(time.perf_counter() - started)
+    peak_mb = None
+    if memory:
+        _clear_caches(); tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()): func(data)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        finally: tracemalloc.stop()
+    best = min(runs)
+    return {"seconds": best, "median_seconds": statistics.median(runs), "runs": runs,
+            "bars_per_sec": len(data) / best if best > 0 else None, "peak_mb": peak_mb}
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        return result.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError): return None
+
+
+def environment_info() -> dict:
+    """ Versions and machine details stored with the results, so runs from different setups are recognisable. """
+    import backtesting
+    return {"created": datetime.now().isoformat(timespec="seconds"), "git_commit": _git_commit(),
+            "python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count(),
+            "numpy": np.__version__, "pandas": pd.__version__, "backtesting": getattr(backtesting, "__version__", None),
+            "indicator_backend": get_talib().__name__}
+
+
+def run_suite(bars=DEFAULT_BARS, regimes=REGIMES, groups=GROUPS, strategy_names=None, repeat: int = 3,
+              memory: bool = True, seed: int = 0, log=print) -> dict:
+    """
+    Runs every selected case on every (bars, regime) dataset.
+
+    Returns:
+        dict: {"environment": ..., "settings": ..., "results": [one dict per case and dataset]}
+    """
+    strategy_names = list(strategy_names or STRATEGY_LOADERS)
+    cases = build_cases(groups, strategy_names)
+    results = []
+    log(f"{'group':<15} {'case':<30} {'regime':<15} {'bars':>9} {'seconds':>9} {'bars/sec':>12} {'peak MB':>8}")
+    for n_bars in bars:
+        for regime in regimes:
+            data = synthetic_ohlcv(n_bars, regime, seed=seed)
+            for group, name, func in cases:
+                result = {"group": group, "name": name, "regime": regime, "bars": int(n_bars), "freq": default_freq(n_bars), "error": None}
+                try: result.update(measure(func, data, repeat=repeat, memory=memory))
+                except Exception as e: result["error"] = f"{type(e).__name__}: {e}"
+                results.append(result)
+                if result["error"]: log(f"{group:<15} {name:<30} {regime:<15} {n_bars:>9} ERROR {result['error']}")
+                else:
+                    peak = f"{result['peak_mb']:8.1f}" if result["peak_mb"] is not None else f"{'-':>8}"
+                    log(f"{group:<15} {name:<30} {regime:<15} {n_bars:>9} {result['seconds']:9.4f} {result['bars_per_sec']:12,.0f} {peak}")
+    settings = {"bars": [int(b) for b in bars], "regimes": list(regimes), "groups": list(groups), "strategies": strategy_names,
+                "repeat": repeat, "memory": memory, "seed": seed, "cash": DEFAULT_CASH, "commission": DEFAULT_COMMISSION}
+    return {"environment": environment_info(), "settings": settings, "results": results}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run_benchmarks", description="Time strategies, the backtester and indicators on synthetic data.")
+    parser.add_argument("--bars", type=int, nargs="+", default=list(DEFAULT_BARS), help=f"Dataset sizes (default {' '.join(map(str, DEFAULT_BARS))}; up to 1000000)")
+    parser.add_argument("--regimes", nargs="+", choices=REGIMES, default=list(REGIMES), help="Price regimes (default: all)")
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=list(GROUPS), help="Benchmark groups (default: all)")
+    parser.add_argument("--strategies", nargs="+", metavar="NAME", help="Strategy display names (default: every STRATEGY_LOADERS entry)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the best is reported (default 3)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the extra tracemalloc run per case")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed (default 0)")
+    parser.add_argument("--output", help="JSON file to write (default benchmarks/results/<timestamp>.json)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.strategies or [] if name not in STRATEGY_LOADERS]
+    if unknown: parser.error(f"unknown strategies: {', '.join(unknown)} (choose from: {', '.join(STRATEGY_LOADERS)})")
+
+    warnings.simplefilter("ignore")  # backtesting.py warns about open trades etc. on every run
+    report = run_suite(args.bars, args.regimes, args.groups, args.strategies, repeat=args.repeat, memory=not args.no_memory, seed=args.seed)
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d_%H%M%S") + ".json")
+    directory = os.path.dirname(output)
+    if directory: os.makedirs(directory, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f: json.dump(report, f, indent=1)
+    failed = sum(1 for result in report["results"] if result["error"])
+    print(f"Wrote {len(report['results'])} results to {output}" + (f" ({failed} failed)" if failed else ""))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
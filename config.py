@@ -11,11 +11,61 @@ DEFAULT_DATA_PERIOD = "5y" # Fetch a longer period initially
 # Default interval for data (e.g., "1d", "1wk", "1h")
 DEFAULT_DATA_INTERVAL = "1d"
 
+# --- Local Data Cache ---
+# Fetched history is stored on disk per (symbol, interval); later loads only download new bars
+DATA_CACHE_ENABLED = True
+DATA_CACHE_DIR = "data_cache" # Relative to the working directory
+DATA_CACHE_MAX_AGE_SECONDS = 900 # Cached data younger than this is used without contacting the provider
+
 # --- Backtesting Defaults ---
 DEFAULT_CASH = 10000
 DEFAULT_COMMISSION = 0.001 # 0.1% commission per trade
 DEFAULT_TRADE_SIZE_PERCENT = 95 # Default trade size as percentage (e.g., 95 for 95%)
 
+# --- Portfolio Backtest ---
+# One strategy over several symbols sharing DEFAULT_CASH (trading/portfolio.py)
+PORTFOLIO_ALLOCATION = "equal_weight" # "equal_weight" (equity / number of symbols per position) or "capped_percent"
+PORTFOLIO_MAX_POSITION_PERCENT = 25 # Largest position in percent of equity with "capped_percent"
+
+# --- Adaptive Parameter Search ---
+# Successive halving (trading/adaptive_search.py): random candidates are backtested on the most recent slice
+# of the history, the best 1/ADAPTIVE_SEARCH_ETA move on to a slice ADAPTIVE_SEARCH_ETA times longer, and so on
+ADAPTIVE_SEARCH_THRESHOLD = 500 # The GUI's Optimize uses adaptive search for grids with more combinations than this
+ADAPTIVE_SEARCH_CANDIDATES = 81 # Candidates drawn for the first (shortest) slice
+ADAPTIVE_SEARCH_ETA = 3 # Keep the best 1/ETA of the candidates at each step
+ADAPTIVE_SEARCH_MIN_BARS = 250 # Shortest slice (indicators need history to warm up)
+
+# --- Walk-Forward Optimization ---
+# Train/test splits of the loaded history for trading/walk_forward.py: parameters are optimized on each
+# train window and scored on the test window that follows it
+WALK_FORWARD_FOLDS = 5 # Number of consecutive test windows
+WALK_FORWARD_TRAIN_FRACTION = 0.5 # Share of the history in the (first) train window; the rest is split into the test windows
+WALK_FORWARD_ANCHORED = False # True: every train window starts at the first bar; False: fixed-length rolling windows
+
+# --- Backtest Profiling ---
+# Per-phase timing (data prep, engine setup, indicators, bar loop, stats) and next() latency percentiles
+# for backtests started from the GUI; the summary is printed to the console and stored as stats['_profile']
+BACKTEST_PROFILE = False
+BACKTEST_PROFILE_ALLOCATIONS = False # Also record memory allocated per phase (tracemalloc; slows the run down several times)
+
+# --- Results Store ---
+# Finished backtests are kept in a SQLite file keyed by the data's content and the run configuration;
+# rerunning an identical backtest returns the stored result instead of recomputing it
+RESULTS_STORE_ENABLED = True
+RESULTS_STORE_PATH = "data_cache/backtest_results.sqlite" # Relative to the working directory
+
+# --- Indicator Cache ---
+# Indicator arrays (RSI, MACD, rolling means, ...) are memoized in memory per (data, indicator, parameters)
+# and shared by strategies, the vector engine and the recommendation engine
+INDICATOR_CACHE_ENABLED = True
+INDICATOR_CACHE_MAX_ENTRIES = 512 # Least recently used indicators are evicted beyond this count
+INDICATOR_CACHE_MAX_MB = 128 # ... or beyond this much memory
+
+# --- Technical Indicator Backend ---
+# "auto" uses TA-Lib when installed and the pure-NumPy drop-in (trading/ta_numpy.py) otherwise;
+# "talib" or "numpy" forces one of them
+TA_BACKEND = "auto"
+
 # --- Recommendation Engine Parameters ---
 REC_SMA_SHORT = 20
 REC_SMA_LONG = 50
@@ -29,12 +79,17 @@ REC_BBANDS_PERIOD = 20
 REC_BBANDS_STDDEV = 2.0
 REC_ADX_PERIOD = 14
 REC_ADX_THRESHOLD = 25
+# While a symbol is loaded, its price is re-fetched this often and the recommendation re-scored from
+# streaming indicator state (trading/streaming_indicators.py) instead of recomputing the history; 0 disables
+LIVE_PRICE_REFRESH_MS = 60000
 
 # --- Location for Astronomical Calculations (Ephem) ---
 # Used for RealMoonStrategy - Coordinates for Apple Valley, MN
 OBSERVER_LAT = '44.73' # Latitude
 OBSERVER_LON = '-93.22' # Longitude
 OBSERVER_ELEV = 280 # Elevation in meters (approx)
+# New/full moon times do not depend on the observer; they are computed once per date range and kept here
+MOON_PHASE_TABLE_FILE = "data_cache/moon_phases.json" # Relative to the working directory
 
 # --- Theme Colors (Miami Vice / Retro Fallout Inspired) ---
 # Using hex codes for more control
@@ -91,3 +146,14 @@ FONT_SIZE_TEXTBOX = 14 # Added specific font size for the output textbox
 FONT_SIZE_LED = 10 # Smaller font for LED labels
 # FONT_SIZE_RECOMMENDATION = 18 # No longer needed for label
 
+# --- Animation (LED / dot matrix flicker) ---
+# All flicker is driven by one shared frame clock owned by the main window
+ANIMATION_FPS = 12 # Normal frame rate
+ANIMATION_LOW_POWER_FPS = 3 # Frame rate in low-power mode (battery, remote desktop); toggle with F9
+ANIMATION_LOW_POWER = False # Start in low-power mode
+ANIMATION_PAUSED = False # Start with animation frozen; toggle with F8
+
+# --- Startup ---
+# The window is shown first; pandas, matplotlib, yfinance and backtesting.py are imported afterwards
+STARTUP_WARMUP = True # Import the heavy modules on a background thread right after the window appears (otherwise on first use)
+STARTUP_TIMING_REPORT = True # Print a table of import / construction / warm-up times to the terminal once warm-up is done
@@ -1,22 +1,38 @@
 # data/data_fetcher.py
 # Handles fetching financial data
+# yfinance is imported on the first download, so cache-only use and startup do not pay for it
 
-import yfinance as yf
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 
+from config import DATA_CACHE_ENABLED, DATA_CACHE_DIR, DATA_CACHE_MAX_AGE_SECONDS
+from data.ohlcv_cache import OHLCVCache, period_start
+
+
+def _yfinance():
+    """Returns the yfinance module, importing it on first use (it is the slowest import of the data layer)."""
+    import yfinance
+    return yfinance
+
 
 class DataFetcher:
     """
     Class responsible for fetching historical stock data using yfinance.
     """
 
-    def __init__(self):
-        """Initializes the DataFetcher."""
+    def __init__(self, use_cache: bool = DATA_CACHE_ENABLED):
+        """
+        Initializes the DataFetcher.
+
+        Args:
+            use_cache (bool): Keep fetched history in the local OHLCV cache and only
+                              download new bars on subsequent loads.
+        """
         # Could add initialization for other data sources here later
-        pass
+        self.cache = OHLCVCache(DATA_CACHE_DIR, max_age_seconds=DATA_CACHE_MAX_AGE_SECONDS) if use_cache else None
 
-    def get_historical_data(self, symbol: str, period: str = "5y", interval: str = "1d") -> pd.DataFrame | None:
+    def get_historical_data(self, symbol: str, period: str = "5y", interval: str = "1d", trim: bool = True) -> pd.DataFrame | None:
         """
         Fetches historical stock data for a given symbol.
 
@@ -26,49 +42,30 @@ class DataFetcher:
                           (e.g., "1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max").
             interval (str): The data interval
                             (e.g., "1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h", "1d", "5d", "1wk", "1mo", "3mo").
+            trim (bool): Trim cached history to the period. With False, every cached bar is returned
+                         (at least the period), so the first bar does not move forward from day to day.
 
         Returns:
             pd.DataFrame | None: A pandas DataFrame containing the OHLCV data,
                                  or None if fetching fails.
+
+        When the local cache is enabled, previously fetched bars are read from disk and
+        only the bars after the last cached timestamp are downloaded.
         """
+        if self.cache is not None:
+            return self._get_cached_history(symbol, period, interval, trim)
+
         print(f"Fetching data for {symbol} | Period: {period} | Interval: {interval}")
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = _yfinance().Ticker(symbol)
             # Download historical data
             # Note: yfinance might adjust start/end dates based on interval and period
             history = ticker.history(period=period, interval=interval)
-
-            if history.empty:
+            history = self._normalize_history(history, symbol)
+            if history is None:
                 print(f"Warning: No data returned for {symbol} with period={period}, interval={interval}")
                 return None
 
-            # Basic data cleaning (yfinance usually provides clean data)
-            history.dropna(inplace=True)
-
-            # Ensure standard column names (lowercase OHLCV)
-            history.columns = history.columns.str.lower()
-
-            # Rename 'adj close' to 'close' if 'close' isn't present - needed for plotting
-            # Backtesting libraries often prefer adjusted close, but we need 'close' for plotting standard price
-            # If 'adj close' exists, let's keep it, but ensure 'close' is also present.
-            # yfinance usually provides both 'Close' and 'Adj Close'.
-            if 'close' not in history.columns and 'adj close' in history.columns:
-                history.rename(columns={'adj close': 'close'}, inplace=True)
-            elif 'close' not in history.columns:
-                print(f"Warning: 'close' column missing and could not be derived for {symbol}.")
-                # Decide handling: return None or try to proceed without 'close' if possible?
-                # Returning None is safer if 'close' is essential downstream.
-                # return None
-                # For now, let's proceed but be aware plotting might fail.
-
-            # Ensure required columns are present for many backtesting libraries
-            required_cols = ['open', 'high', 'low', 'close', 'volume']
-            if not all(col in history.columns for col in required_cols):
-                print(
-                    f"Warning: Missing required OHLCV columns in data for {symbol}. Found: {history.columns.tolist()}")
-                # Decide how to handle: return None, fill missing, or raise error
-                # For now, let's return what we have but log the warning.
-
             print(f"Successfully fetched {len(history)} data points for {symbol}")
             return history
 
@@ -76,6 +73,242 @@ class DataFetcher:
             print(f"Error fetching data for {symbol}: {e}")
             return None
 
+    def _get_cached_history(self, symbol: str, period: str, interval: str, trim: bool = True) -> pd.DataFrame | None:
+        """
+        Serves history from the local OHLCV cache, downloading only the bars that are
+        missing since the last cached timestamp. Falls back to a full download when
+        nothing usable is cached, the cache does not reach back far enough, or the new
+        bars bring a stock split or dividend (which re-adjusts all earlier prices).
+        """
+        cached, meta = self.cache.load(symbol, interval)
+        tz = cached.index.tz if cached is not None else None
+        required_start = period_start(period, tz=tz)
+
+        if cached is not None and self.cache.covers(meta, required_start):
+            if self.cache.is_fresh(meta):
+                print(f"Loaded {symbol} ({interval}) from cache")
+                return self._slice_to_period(cached, period, trim)
+            last_timestamp = cached.index.max()
+            print(f"Refreshing {symbol} ({interval}) from {last_timestamp.strftime('%Y-%m-%d %H:%M')}")
+            try:
+                # Re-request the last cached bar too, it may have been a partial (intraday) bar
+                fresh = _yfinance().Ticker(symbol).history(start=last_timestamp.strftime('%Y-%m-%d'), interval=interval)
+                fresh = self._normalize_history(fresh, symbol)
+            except Exception as e:
+                print(f"Warning: Incremental refresh failed for {symbol}: {e}")
+                fresh = None
+            if fresh is None:
+                # The request includes the last cached bar, so no data means the refresh failed; the cache is
+                # not saved, so it stays stale and the next load tries again
+                print(f"Using cached data for {symbol} (not refreshed)")
+                return self._slice_to_period(cached, period, trim)
+            if not self._has_new_actions(cached, fresh):
+                return self._slice_to_period(self._store_tail(symbol, interval, cached, meta, fresh), period, trim)
+            # Prices are split/dividend adjusted, so every cached bar before the event is now out of date
+            print(f"{symbol} has a new stock split or dividend, re-downloading its history")
+            cached = None
+
+        print(f"Fetching data for {symbol} | Period: {period} | Interval: {interval}")
+        try:
+            history = _yfinance().Ticker(symbol).history(period=period, interval=interval)
+            history = self._normalize_history(history, symbol)
+        except Exception as e:
+            print(f"Error fetching data for {symbol}: {e}")
+            return None
+        if history is None:
+            print(f"Warning: No data returned for {symbol} with period={period}, interval={interval}")
+            return None
+        history = self._store_full(symbol, period, interval, history, cached)
+        print(f"Successfully fetched {len(history)} data points for {symbol}")
+        return self._slice_to_period(history, period, trim)
+
+    def _store_full(self, symbol: str, period: str, interval: str, history: pd.DataFrame,
+                    cached: pd.DataFrame | None) -> pd.DataFrame:
+        """Saves a full-period download to the cache, keeping any older cached bars."""
+        if cached is not None:
+            history = self.cache.merge(cached, history)
+        required_start = period_start(period, tz=history.index.tz)
+        coverage_start = required_start.isoformat() if required_start is not None else "max"
+        self.cache.save(symbol, interval, history, coverage_start)
+        return history
+
+    def _store_tail(self, symbol: str, interval: str, cached: pd.DataFrame, meta: dict,
+                    fresh: pd.DataFrame | None) -> pd.DataFrame:
+        """Merges freshly downloaded tail bars into the cached history and saves it."""
+        history = self.cache.merge(cached, fresh)
+        print(f"Cache updated with {len(history) - len(cached)} new bar(s) for {symbol}")
+        self.cache.save(symbol, interval, history, meta["coverage_start"])
+        return history
+
+    @staticmethod
+    def _has_new_actions(cached: pd.DataFrame, fresh: pd.DataFrame) -> bool:
+        """True if the refreshed tail has a stock split or dividend that the cached bars do not have yet."""
+        columns = [col for col in ('stock splits', 'dividends') if col in fresh.columns]
+        if not columns:
+            return False
+        actions = fresh[columns].fillna(0)
+        known = cached.reindex(index=actions.index, columns=columns).fillna(0)  # The re-requested last cached bar
+        return bool((actions.ne(0) & actions.ne(known)).to_numpy().any())
+
+    @staticmethod
+    def _slice_to_period(history: pd.DataFrame, period: str, trim: bool = True) -> pd.DataFrame | None:
+        """Trims (possibly longer) cached history to the requested period (unless trim is False)."""
+        required_start = period_start(period, tz=history.index.tz) if trim else None
+        if required_start is not None:
+            history = history[history.index >= required_start]
+        return history if not history.empty else None
+
+    def get_historical_data_many(self, symbols: list[str], period: str = "5y", interval: str = "1d",
+                                 max_workers: int = 8, trim: bool = True) -> dict[str, pd.DataFrame | None]:
+        """
+        Fetches historical data for many symbols at once.
+
+        Symbols missing from the cache are downloaded in one bulk yfinance request, and
+        stale cached symbols share a second bulk request for their missing tails. Any
+        symbol the bulk requests could not deliver is retried on its own through a
+        bounded thread pool, so one bad ticker never fails the whole batch.
+
+        Args:
+            symbols (list[str]): Ticker symbols (e.g., config.SYMBOLS).
+            period (str): The period for which to fetch data (see get_historical_data).
+            interval (str): The data interval (see get_historical_data).
+            max_workers (int): Maximum concurrent per-symbol fallback downloads.
+            trim (bool): Trim cached history to the period (see get_historical_data).
+
+        Returns:
+            dict[str, pd.DataFrame | None]: Normalized OHLCV data per symbol, in the order given,
+                                            with None for symbols that could not be fetched.
+        """
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+        results: dict[str, pd.DataFrame | None] = {symbol: None for symbol in symbols}
+        if not symbols:
+            return results
+
+        full_symbols = []  # Need the whole period
+        stale = {}  # symbol -> (cached, meta), need only the tail
+        if self.cache is not None:
+            for symbol in symbols:
+                cached, meta = self.cache.load(symbol, interval)
+                required_start = period_start(period, tz=cached.index.tz if cached is not None else None)
+                if cached is not None and self.cache.covers(meta, required_start):
+                    if self.cache.is_fresh(meta): results[symbol] = self._slice_to_period(cached, period, trim)
+                    else: stale[symbol] = (cached, meta)
+                else:
+                    full_symbols.append(symbol)
+        else:
+            full_symbols = list(symbols)
+
+        cached_count = sum(1 for data in results.values() if data is not None)
+        print(f"Fetching {len(symbols)} symbols | Period: {period} | Interval: {interval} "
+              f"({cached_count} cached, {len(stale)} to refresh, {len(full_symbols)} to download)")
+
+        retry = []
+        if full_symbols:
+            bulk = self._download_bulk(full_symbols, interval=interval, period=period)
+            for symbol in full_symbols:
+                history = self._normalize_history(bulk.get(symbol), symbol)
+                if history is None:
+                    retry.append(symbol)
+                    continue
+                if self.cache is not None:
+                    history = self._store_full(symbol, period, interval, history, None)
+                results[symbol] = self._slice_to_period(history, period, trim)
+
+        if stale:
+            earliest = min(cached.index.max() for cached, _ in stale.values())
+            bulk = self._download_bulk(list(stale), interval=interval, start=earliest.strftime('%Y-%m-%d'))
+            for symbol, (cached, meta) in stale.items():
+                fresh = self._normalize_history(bulk.get(symbol), symbol)
+                if fresh is None or self._has_new_actions(cached, fresh):
+                    retry.append(symbol)  # A new split or dividend makes the single-symbol path re-download it
+                    continue
+                history = self._store_tail(symbol, interval, cached, meta, fresh)
+                results[symbol] = self._slice_to_period(history, period, trim)
+
+        if retry:
+            print(f"Fetching individually (bulk download incomplete or history re-adjusted): {', '.join(retry)}")
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(retry)))) as executor:
+                futures = {executor.submit(self.get_historical_data, symbol, period, interval, trim): symbol for symbol in retry}
+                for future in as_completed(futures):
+                    symbol = futures[future]
+                    try:
+                        results[symbol] = future.result()
+                    except Exception as e:
+                        print(f"Error fetching data for {symbol}: {e}")
+                        results[symbol] = None
+
+        loaded = sum(1 for data in results.values() if data is not None)
+        print(f"Successfully loaded {loaded}/{len(symbols)} symbols")
+        return results
+
+    def _download_bulk(self, symbols: list[str], interval: str, **range_kwargs) -> dict[str, pd.DataFrame]:
+        """
+        Downloads several symbols in a single yfinance request.
+
+        Returns:
+            dict[str, pd.DataFrame]: Raw (un-normalized) history per symbol that came back.
+                                     Symbols that failed are simply absent.
+        """
+        try:
+            # actions/auto_adjust/ignore_tz mirror Ticker.history() so cached and bulk frames line up
+            raw = _yfinance().download(symbols, interval=interval, group_by='ticker', auto_adjust=True, actions=True,
+                              ignore_tz=False, threads=True, progress=False, **range_kwargs)
+        except Exception as e:
+            print(f"Error during bulk download of {len(symbols)} symbols: {e}")
+            return {}
+        if raw is None or raw.empty:
+            return {}
+
+        frames = {}
+        if isinstance(raw.columns, pd.MultiIndex):
+            available = raw.columns.get_level_values(0)
+            for symbol in symbols:
+                if symbol in available:
+                    # Rows only exist for other symbols' trading days (e.g. different exchanges)
+                    frames[symbol] = raw[symbol].dropna(how='all')
+        elif len(symbols) == 1:
+            frames[symbols[0]] = raw.dropna(how='all')
+        return frames
+
+    def _normalize_history(self, history: pd.DataFrame, symbol: str) -> pd.DataFrame | None:
+        """
+        Cleans a raw yfinance history frame: drops incomplete rows and lowercases columns.
+        Returns None if there is nothing left.
+        """
+        if history is None or history.empty:
+            return None
+
+        # Basic data cleaning (yfinance usually provides clean data)
+        history = history.dropna()
+        if history.empty:
+            return None
+
+        # Ensure standard column names (lowercase OHLCV)
+        history.columns = history.columns.str.lower()
+
+        # Rename 'adj close' to 'close' if 'close' isn't present - needed for plotting
+        # Backtesting libraries often prefer adjusted close, but we need 'close' for plotting standard price
+        # If 'adj close' exists, let's keep it, but ensure 'close' is also present.
+        # yfinance usually provides both 'Close' and 'Adj Close'.
+        if 'close' not in history.columns and 'adj close' in history.columns:
+            history = history.rename(columns={'adj close': 'close'})
+        elif 'close' not in history.columns:
+            print(f"Warning: 'close' column missing and could not be derived for {symbol}.")
+            # Decide handling: return None or try to proceed without 'close' if possible?
+            # Returning None is safer if 'close' is essential downstream.
+            # return None
+            # For now, let's proceed but be aware plotting might fail.
+
+        # Ensure required columns are present for many backtesting libraries
+        required_cols = ['open', 'high', 'low', 'close', 'volume']
+        if not all(col in history.columns for col in required_cols):
+            print(
+                f"Warning: Missing required OHLCV columns in data for {symbol}. Found: {history.columns.tolist()}")
+            # Decide how to handle: return None, fill missing, or raise error
+            # For now, let's return what we have but log the warning.
+
+        return history
+
     def get_current_price(self, symbol: str) -> float | None:
         """
         Fetches the last known price for a symbol.
@@ -88,7 +321,7 @@ class DataFetcher:
             float | None: The current price, or None if fetching fails.
         """
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = _yfinance().Ticker(symbol)
             # Use 'day_high' and 'day_low' to get recent info, or 'fast_info'
             # 'regularMarketPrice' often gives a good recent price
             data = ticker.fast_info
@@ -0,0 +1,159 @@
+# data/ohlcv_cache.py
+# On-disk columnar store for OHLCV history, keyed by (symbol, interval)
+
+import importlib.util
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+import pandas as pd
+
+
+def _parquet_available() -> bool:
+    """Returns True if pandas has a Parquet engine (pyarrow or fastparquet) to use."""
+    return any(importlib.util.find_spec(engine) is not None for engine in ("pyarrow", "fastparquet"))
+
+
+class OHLCVCache:
+    """
+    Persistent cache of normalized OHLCV DataFrames.
+
+    Each (symbol, interval) pair is stored as one Parquet file (pickle if no Parquet
+    engine is installed) plus a small JSON sidecar recording how far back the cached
+    history reaches and when it was last refreshed.
+    """
+
+    def __init__(self, cache_dir: str, max_age_seconds: int = 900):
+        """
+        Initializes the cache.
+
+        Args:
+            cache_dir (str): Directory holding the cached files (created on first write).
+            max_age_seconds (int): Cached data younger than this is returned without
+                                   asking the provider for new bars.
+        """
+        self.cache_dir = cache_dir
+        self.max_age_seconds = max_age_seconds
+        self.use_parquet = _parquet_available()
+
+    # --- Paths ---
+    def _base_path(self, symbol: str, interval: str) -> str:
+        safe_symbol = re.sub(r"[^A-Za-z0-9_.-]", "_", symbol.upper())
+        return os.path.join(self.cache_dir, f"{safe_symbol}_{interval}")
+
+    def _data_path(self, symbol: str, interval: str) -> str:
+        return self._base_path(symbol, interval) + (".parquet" if self.use_parquet else ".pkl")
+
+    def _meta_path(self, symbol: str, interval: str) -> str:
+        return self._base_path(symbol, interval) + ".json"
+
+    # --- Read / Write ---
+    def load(self, symbol: str, interval: str) -> tuple[pd.DataFrame | None, dict]:
+        """
+        Loads cached history and its metadata.
+
+        Returns:
+            tuple: (DataFrame or None if nothing usable is cached, metadata dict)
+        """
+        data_path = self._data_path(symbol, interval)
+        meta_path = self._meta_path(symbol, interval)
+        if not os.path.exists(data_path) or not os.path.exists(meta_path):
+            return None, {}
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            data = pd.read_parquet(data_path) if self.use_parquet else pd.read_pickle(data_path)
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable cache for {symbol} ({interval}): {e}")
+            return None, {}
+        if data.empty:
+            return None, {}
+        return data, meta
+
+    def save(self, symbol: str, interval: str, data: pd.DataFrame, coverage_start: str):
+        """
+        Writes history and metadata for a symbol/interval, replacing what was there.
+
+        Args:
+            coverage_start (str): ISO timestamp the history is known to cover back to,
+                                  or "max" if the full provider history was fetched.
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            data_path = self._data_path(symbol, interval)
+            tmp_path = data_path + ".tmp"
+            if self.use_parquet: data.to_parquet(tmp_path)
+            else: data.to_pickle(tmp_path)
+            os.replace(tmp_path, data_path)  # Atomic swap so readers never see a half-written file
+            meta = {
+                "symbol": symbol.upper(),
+                "interval": interval,
+                "coverage_start": coverage_start,
+                "updated": datetime.now(timezone.utc).isoformat(),
+                "rows": len(data),
+            }
+            with open(self._meta_path(symbol, interval), "w", encoding="utf-8") as f:
+                json.dump(meta, f, indent=2)
+        except Exception as e:
+            print(f"Warning: Could not write cache for {symbol} ({interval}): {e}")
+
+    # --- Helpers ---
+    def is_fresh(self, meta: dict) -> bool:
+        """Returns True if the cached data was refreshed within max_age_seconds."""
+        try:
+            updated = datetime.fromisoformat(meta["updated"])
+        except (KeyError, TypeError, ValueError):
+            return False
+        return (datetime.now(timezone.utc) - updated).total_seconds() < self.max_age_seconds
+
+    @staticmethod
+    def covers(meta: dict, required_start: pd.Timestamp | None) -> bool:
+        """
+        Returns True if the cached history reaches back to required_start.
+        A required_start of None means the full ("max") history is needed.
+        """
+        coverage = meta.get("coverage_start")
+        if coverage is None: return False
+        if coverage == "max": return True
+        if required_start is None: return False
+        try:
+            coverage_ts = pd.Timestamp(coverage)
+        except ValueError:
+            return False
+        if coverage_ts.tzinfo is None and required_start.tzinfo is not None:
+            coverage_ts = coverage_ts.tz_localize(required_start.tzinfo)
+        elif coverage_ts.tzinfo is not None and required_start.tzinfo is None:
+            coverage_ts = coverage_ts.tz_localize(None)
+        return coverage_ts <= required_start
+
+    @staticmethod
+    def merge(cached: pd.DataFrame, fresh: pd.DataFrame | None) -> pd.DataFrame:
+        """Appends fresh bars to cached ones; fresh rows win on duplicate timestamps."""
+        if fresh is None or fresh.empty:
+            return cached
+        if cached.index.tz is not None:
+            fresh = fresh.tz_localize(cached.index.tz) if fresh.index.tz is None else fresh.tz_convert(cached.index.tz)
+        elif fresh.index.tz is not None:
+            fresh = fresh.tz_localize(None)
+        merged = pd.concat([cached, fresh.reindex(columns=cached.columns.union(fresh.columns, sort=False))])
+        merged = merged[~merged.index.duplicated(keep="last")]
+        return merged.sort_index()
+
+
+def period_start(period: str, tz=None) -> pd.Timestamp | None:
+    """
+    Converts a yfinance-style period ("5d", "6mo", "5y", "ytd", ...) into the
+    earliest timestamp it asks for. Returns None for "max" or unknown periods.
+    """
+    now = pd.Timestamp.now(tz=tz).normalize()
+    period = period.strip().lower()
+    if period == "ytd":
+        return now.replace(month=1, day=1)
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if not match:
+        return None
+    amount, unit = int(match.group(1)), match.group(2)
+    offsets = {"d": pd.DateOffset(days=amount), "wk": pd.DateOffset(weeks=amount),
+               "mo": pd.DateOffset(months=amount), "y": pd.DateOffset(years=amount)}
+    return now - offsets[unit]
@@ -4,19 +4,24 @@
 # Added alternating Matrix display (Price/Rec) with color coding
 # Moved Matrix Display to top center (Row 2)
 # Changed initial matrix display to blank
+# Data loading and backtests run on a background TaskRunner so the window stays responsive
+# LED and matrix flicker share one AnimationScheduler (F8 pauses, F9 toggles low-power frame rate)
+# Strategy catalogue lives in trading/strategy_registry.py; "Optimize" grid-searches parameter ranges
+# Indicators use TA-Lib when installed, otherwise the NumPy drop-in in trading/ta_numpy.py
+# pandas, matplotlib, yfinance and backtesting.py are imported on first use; the chart is built after the
+# window's first paint while those imports warm up in the background (timings: gui/startup.py)
+
+from __future__ import annotations
 
 import customtkinter as ctk
 from tkinter import font as tkfont, ttk
 import tkinter as tk # For TclError handling
 from config import (SYMBOLS, DEFAULT_DATA_PERIOD, DEFAULT_DATA_INTERVAL,
                    DEFAULT_CASH, DEFAULT_COMMISSION, DEFAULT_TRADE_SIZE_PERCENT,
-                   # Recommendation Params
-                   REC_SMA_SHORT, REC_SMA_LONG, REC_RSI_PERIOD, REC_RSI_BUY, REC_RSI_SELL,
-                   REC_MACD_FAST, REC_MACD_SLOW, REC_MACD_SIG,
-                   REC_BBANDS_PERIOD, REC_BBANDS_STDDEV,
-                   REC_ADX_PERIOD, REC_ADX_THRESHOLD,
-                   # Observer Location
-                   OBSERVER_LAT, OBSERVER_LON, OBSERVER_ELEV,
+                   BACKTEST_PROFILE, BACKTEST_PROFILE_ALLOCATIONS, PORTFOLIO_ALLOCATION,
+                   ADAPTIVE_SEARCH_THRESHOLD, ADAPTIVE_SEARCH_CANDIDATES, ADAPTIVE_SEARCH_ETA,
+                   WALK_FORWARD_FOLDS, WALK_FORWARD_TRAIN_FRACTION, WALK_FORWARD_ANCHORED,
+                   LIVE_PRICE_REFRESH_MS,
                    # Colors - Import main background color
                    COLOR_BACKGROUND, COLOR_FOREGROUND, COLOR_BUTTON, COLOR_BUTTON_HOVER,
                    COLOR_DROPDOWN_FG, COLOR_DROPDOWN_BG, COLOR_DROPDOWN_BUTTON, COLOR_DROPDOWN_BUTTON_HOVER,
@@ -29,64 +34,57 @@ from config import (SYMBOLS, DEFAULT_DATA_PERIOD, DEFAULT_DATA_INTERVAL,
                    COLOR_LED_PWR_ON, COLOR_LED_CPU_ON, COLOR_LED_DATA_ON, COLOR_LED_COM_ON,
                    # Recommendation Colors
                    COLOR_REC_SELL, COLOR_REC_WEAK_SELL, COLOR_REC_HOLD,
-                   COLOR_REC_WEAK_BUY, COLOR_REC_BUY, COLOR_REC_DEFAULT
+                   COLOR_REC_WEAK_BUY, COLOR_REC_BUY, COLOR_REC_DEFAULT,
+                   # Animation
+                   ANIMATION_FPS, ANIMATION_LOW_POWER_FPS, ANIMATION_LOW_POWER, ANIMATION_PAUSED,
+                   # Startup
+                   STARTUP_WARMUP, STARTUP_TIMING_REPORT
                    )
-from data.data_fetcher import DataFetcher
+from gui.startup import STARTUP_TIMER, warm_up
+from gui.task_runner import TaskRunner, TaskCancelled
 # --- Import the indicator widgets ---
+from gui.widgets.animation_scheduler import AnimationScheduler
 from gui.widgets.vintage_indicators import WornLED
 from gui.widgets.dot_matrix import MatrixText # Import the new MatrixText
 
-import pandas as pd
-import importlib
 import datetime
 import random
-import traceback
-
-# Matplotlib imports
-import matplotlib
-matplotlib.use('TkAgg')
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.dates as mdates
-
-# Backtesting imports
-from trading.backtester import run_backtest
-# --- Strategy Imports ---
-from trading.strategies.sma_cross import SmaCross
-from trading.strategies.fake_moon_strategy import FakeMoonStrategy
-from trading.strategies.ichimoku_strategy import IchimokuStrategy
-from trading.strategies.donchian_channel_strategy import DonchianChannelStrategy
-from trading.strategies.day_of_week_strategy import DayOfWeekStrategy
-
-# Define strategies, using strings for classes that need dynamic loading
-STRATEGY_LOADERS = { # (Remains the same)
-    "SMA Crossover": SmaCross,
-    "Ichimoku Cloud": IchimokuStrategy,
-    "Donchian Channel": DonchianChannelStrategy,
-    "Day of Week Effect": DayOfWeekStrategy,
-    "Fake Moon (Day of Month)": FakeMoonStrategy,
-    "RSI Oscillator": "trading.strategies.rsi_oscillator.RsiOscillator",
-    "Volatility Breakout": "trading.strategies.volatility_breakout.VolatilityBreakout",
-    "MACD": "trading.strategies.macd_strategy.MacdStrategy",
-    "Bollinger Bands": "trading.strategies.bollinger_bands_strategy.BollingerBandsStrategy",
-    "Real Moon (Ephem)": "trading.strategies.real_moon_strategy.RealMoonStrategy"
-}
+import threading
+import time
+import typing
 
-# --- Strategy Parameter Definitions ---
-PARAM_CONFIG = { # (Remains the same)
-    "SMA Crossover": [("n1", 10), ("n2", 30)],
-    "Ichimoku Cloud": [("tenkan_period", 9), ("kijun_period", 26), ("senkou_b_period", 52), ("chikou_period", 26), ("senkou_displacement", 26)],
-    "Donchian Channel": [("n_high", 20), ("n_low", 20)],
-    "Day of Week Effect": [("buy_day", 0), ("sell_day", 4)],
-    "Fake Moon (Day of Month)": [("buy_day_start", 1), ("buy_day_end", 5), ("sell_day_start", 14), ("sell_day_end", 18)],
-    "RSI Oscillator": [("rsi_period", 14), ("upper_bound", 70), ("lower_bound", 30)],
-    "Volatility Breakout": [("atr_period", 14), ("ma_period", 20), ("atr_multiplier", 2.0)],
-    "MACD": [("fast_period", 12), ("slow_period", 26), ("signal_period", 9)],
-    "Bollinger Bands": [("bb_period", 20), ("bb_std_dev", 2.0)],
-    "Real Moon (Ephem)": [("days_after_new_moon_buy", 2), ("buy_window_days", 3), ("days_after_full_moon_sell", 2), ("sell_window_days", 3)],
-}
-for params in PARAM_CONFIG.values():
-     params.insert(0, ("trade_size_percent", DEFAULT_TRADE_SIZE_PERCENT))
+# Strategy catalogue (no strategy modules or backtesting.py are imported until a strategy is loaded)
+from trading.strategy_registry import STRATEGY_LOADERS, PARAM_CONFIG, PARAM_CONSTRAINTS, load_strategy_class, get_talib
+
+if typing.TYPE_CHECKING: import pandas as pd
+
+_matplotlib_lock = threading.Lock()
+_matplotlib_modules = None
+
+def load_matplotlib():
+    """ Imports matplotlib with the TkAgg backend on first call (any thread) and returns (pyplot, dates, FigureCanvasTkAgg). """
+    global _matplotlib_modules
+    with _matplotlib_lock:
+        if _matplotlib_modules is None:
+            import matplotlib
+            matplotlib.use('TkAgg')
+            import matplotlib.pyplot as plt
+            import matplotlib.dates as mdates
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            _matplotlib_modules = (plt, mdates, FigureCanvasTkAgg)
+    return _matplotlib_modules
+
+def _import_backtesting():
+    import trading.backtester, trading.recommendation, trading.optimizer
+
+# Imported by App's background warm-up after the first paint, in this order (the chart needs matplotlib first)
+WARMUP_STEPS = [
+    ("matplotlib (TkAgg)", load_matplotlib),
+    ("pandas + OHLCV cache", lambda: __import__("data.data_fetcher")),
+    ("yfinance", lambda: __import__("yfinance")),
+    ("backtesting.py + optimizer", _import_backtesting),
+    ("indicator backend", get_talib),
+]
 
 # --- Strategy Descriptions ---
 STRATEGY_DESCRIPTIONS = { # (Remains the same)
@@ -132,10 +130,11 @@ MATRIX_BG = "#050505"
 class App(ctk.CTk):
     """ Main application window """
     def __init__(self, *args, **kwargs):
+        lap = time.perf_counter() # Construction steps are timed for the startup report (gui/startup.py)
         super().__init__(*args, **kwargs)
+        lap = STARTUP_TIMER.lap("App: create Tk root", lap)
 
         self.talib_module = None
-        self.ephem_module = None
         self.plotted_data = None
         self.current_symbol = ""
         self.param_entries = {}
@@ -144,6 +143,8 @@ class App(ctk.CTk):
         self.matrix_shows_price = False
         self.latest_recommendation = " " * MATRIX_COLS # Initialize with spaces
         self.latest_price = None
+        self.recommendation_state = None # Streaming indicators of the loaded symbol, re-scored on live prices
+        self.price_refresh_job = None
 
         self.title("Retro Trading Console")
         self.geometry("1100x850")
@@ -163,8 +164,19 @@ class App(ctk.CTk):
         self.font_textbox = ctk.CTkFont(family=self.mono_font_family, size=FONT_SIZE_TEXTBOX)
         self.font_led = ctk.CTkFont(family=self.mono_font_family, size=FONT_SIZE_LED)
 
-        self.data_fetcher = DataFetcher()
+        self._data_fetcher = None # Created on first use (imports yfinance), see the data_fetcher property
+        self._data_fetcher_lock = threading.Lock()
         self.current_data = None
+        self.fig = self.ax = self.chart_canvas = None # Built after the first paint, see _build_chart
+
+        # --- Background work (fetches/backtests run off the Tk main loop) ---
+        self.task_runner = TaskRunner(self)
+        self.active_task = None
+
+        # --- Shared frame clock for all LED / matrix flicker ---
+        self.animation_scheduler = AnimationScheduler(self, fps=ANIMATION_FPS, low_power_fps=ANIMATION_LOW_POWER_FPS)
+        self.animation_scheduler.set_low_power(ANIMATION_LOW_POWER); self.animation_scheduler.set_paused(ANIMATION_PAUSED)
+        lap = STARTUP_TIMER.lap("App: layout, fonts, task runner", lap)
 
         # --- Header / Data Controls Frame (Row 0) ---
         self.controls_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -184,26 +196,24 @@ class App(ctk.CTk):
         for period in lookback_periods:
             btn = ctk.CTkButton( self.chart_controls_frame, text=period, command=lambda p=period: self.update_chart_lookback(p), font=self.font_normal, width=40, height=24, text_color=COLOR_FOREGROUND, fg_color=COLOR_SECONDARY_BUTTON, hover_color=COLOR_SECONDARY_BUTTON_HOVER ); btn.pack(side="left", padx=(0, 5))
 
+        lap = STARTUP_TIMER.lap("App: data + chart period controls", lap)
+
         # --- Dot Matrix Recommendation Display (Row 2) ---
         self.recommendation_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.recommendation_frame.grid(row=2, column=0, columnspan=2, padx=20, pady=(10, 10), sticky="")
-        self.recommendation_display = MatrixText(self.recommendation_frame, rows=MATRIX_ROWS, cols=MATRIX_TOTAL_COLS, pixel_size=MATRIX_PIXEL_SIZE, char_spacing=MATRIX_SPACING, bg_color=MATRIX_BG)
+        self.recommendation_display = MatrixText(self.recommendation_frame, rows=MATRIX_ROWS, cols=MATRIX_TOTAL_COLS, pixel_size=MATRIX_PIXEL_SIZE, char_spacing=MATRIX_SPACING, bg_color=MATRIX_BG, scheduler=self.animation_scheduler)
         self.recommendation_display.get_frame().pack()
         # --- Initialize with blank spaces ---
         self.recommendation_display.display_text(" " * MATRIX_COLS)
+        lap = STARTUP_TIMER.lap("App: dot matrix display", lap)
 
         # --- Chart Area (Row 3) ---
         self.chart_frame = ctk.CTkFrame(self, fg_color=COLOR_CHART_BG, border_color=COLOR_BUTTON, border_width=1)
         self.chart_frame.grid(row=3, column=0, columnspan=1, padx=(20, 10), pady=5, sticky="nsew")
         self.chart_frame.grid_rowconfigure(0, weight=1); self.chart_frame.grid_columnconfigure(0, weight=1)
-        self.fig, self.ax = plt.subplots(); self.fig.set_facecolor(COLOR_CHART_BG); self.ax.set_facecolor(COLOR_CHART_BG)
-        self.ax.tick_params(axis='x', colors=COLOR_CHART_AXES); self.ax.tick_params(axis='y', colors=COLOR_CHART_AXES)
-        self.ax.yaxis.label.set_color(COLOR_CHART_AXES); self.ax.xaxis.label.set_color(COLOR_CHART_AXES); self.ax.title.set_color(COLOR_CHART_AXES)
-        self.ax.spines['bottom'].set_color(COLOR_CHART_AXES); self.ax.spines['top'].set_color(COLOR_CHART_AXES); self.ax.spines['right'].set_color(COLOR_CHART_AXES); self.ax.spines['left'].set_color(COLOR_CHART_AXES)
-        self.ax.text(0.5, 0.5, 'Select symbol and click Load Data', horizontalalignment='center', verticalalignment='center', transform=self.ax.transAxes, color=COLOR_CHART_AXES, fontsize=self.font_large.cget('size'))
-        self.chart_canvas = FigureCanvasTkAgg(self.fig, master=self.chart_frame)
-        self.chart_canvas_widget = self.chart_canvas.get_tk_widget(); self.chart_canvas_widget.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
-        self.chart_canvas.draw(); self.chart_canvas.mpl_connect('motion_notify_event', self.on_chart_motion)
+        # Plain label until matplotlib is loaded; _build_chart replaces it with the figure canvas
+        self.chart_placeholder = ctk.CTkLabel(self.chart_frame, text='Select symbol and click Load Data', font=self.font_large, text_color=COLOR_CHART_AXES, fg_color=COLOR_CHART_BG)
+        self.chart_placeholder.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
 
         # --- Display Area (Console Output) (Row 3) ---
         self.output_textbox = ctk.CTkTextbox( self, font=self.font_textbox, text_color=COLOR_TEXTBOX_FG, fg_color=COLOR_TEXTBOX_BG, border_color=COLOR_BUTTON, border_width=1, activate_scrollbars=True )
@@ -213,6 +223,7 @@ class App(ctk.CTk):
         # --- Chart Info Label (Row 4) ---
         self.chart_info_label = ctk.CTkLabel(self, text="", font=self.font_normal, text_color=COLOR_FOREGROUND, anchor="w");
         self.chart_info_label.grid(row=4, column=0, columnspan=2, padx=20, pady=(0, 5), sticky="ew")
+        lap = STARTUP_TIMER.lap("App: chart placeholder + console", lap)
 
         # --- Backtesting Controls Frame (Row 5) ---
         self.backtest_controls_frame = ctk.CTkFrame(self, fg_color="transparent");
@@ -221,12 +232,22 @@ class App(ctk.CTk):
         self.strategy_var = ctk.StringVar(value=list(STRATEGY_LOADERS.keys())[0])
         self.strategy_dropdown = ctk.CTkComboBox( self.backtest_controls_frame, values=list(STRATEGY_LOADERS.keys()), variable=self.strategy_var, font=self.font_normal, text_color=COLOR_DROPDOWN_FG, fg_color=COLOR_DROPDOWN_BG, dropdown_fg_color=COLOR_DROPDOWN_BG, button_color=COLOR_DROPDOWN_BUTTON, button_hover_color=COLOR_DROPDOWN_BUTTON_HOVER, border_color=COLOR_BUTTON, border_width=1, command=self.update_param_widgets ); self.strategy_dropdown.pack(side="left", padx=(0, 15))
         self.info_button = ctk.CTkButton( self.backtest_controls_frame, text="Info", command=self.show_strategy_info, font=self.font_button, text_color=COLOR_FOREGROUND, fg_color=COLOR_SECONDARY_BUTTON, hover_color=COLOR_SECONDARY_BUTTON_HOVER, width=50 ); self.info_button.pack(side="left", padx=(0,15))
+        self.constraint_label = ctk.CTkLabel(self.backtest_controls_frame, text="Constraint:", font=self.font_normal, text_color=COLOR_FOREGROUND); self.constraint_label.pack(side="left", padx=(0, 5))
+        self.constraint_var = ctk.StringVar(value="")
+        self.constraint_entry = ctk.CTkEntry( self.backtest_controls_frame, textvariable=self.constraint_var, width=170, font=self.font_normal, text_color=COLOR_DROPDOWN_FG, fg_color=COLOR_DROPDOWN_BG, border_color=COLOR_BUTTON, border_width=1 ); self.constraint_entry.pack(side="left", padx=(0, 15))
         self.run_backtest_button = ctk.CTkButton( self.backtest_controls_frame, text="Run Backtest", command=self.run_selected_backtest, font=self.font_button, text_color=COLOR_BACKGROUND, fg_color=COLOR_ACCENT, hover_color=COLOR_BUTTON_HOVER ); self.run_backtest_button.pack(side="right", padx=(15, 0))
+        self.optimize_button = ctk.CTkButton( self.backtest_controls_frame, text="Optimize", command=self.run_optimization, font=self.font_button, text_color=COLOR_FOREGROUND, fg_color=COLOR_SECONDARY_BUTTON, hover_color=COLOR_SECONDARY_BUTTON_HOVER, width=90 ); self.optimize_button.pack(side="right", padx=(15, 0))
+        self.run_all_button = ctk.CTkButton( self.backtest_controls_frame, text="Run All", command=self.run_all_strategies, font=self.font_button, text_color=COLOR_FOREGROUND, fg_color=COLOR_SECONDARY_BUTTON, hover_color=COLOR_SECONDARY_BUTTON_HOVER, width=80 ); self.run_all_button.pack(side="right", padx=(15, 0))
+        self.walk_forward_button = ctk.CTkButton( self.backtest_controls_frame, text="Walk-Fwd", command=self.run_walk_forward, font=self.font_button, text_color=COLOR_FOREGROUND, fg_color=COLOR_SECONDARY_BUTTON, hover_color=COLOR_SECONDARY_BUTTON_HOVER, width=90 ); self.walk_forward_button.pack(side="right", padx=(15, 0))
+        self.portfolio_button = ctk.CTkButton( self.backtest_controls_frame, text="Portfolio", command=self.run_portfolio_backtest, font=self.font_button, text_color=COLOR_FOREGROUND, fg_color=COLOR_SECONDARY_BUTTON, hover_color=COLOR_SECONDARY_BUTTON_HOVER, width=90 ); self.portfolio_button.pack(side="right", padx=(15, 0))
+        self.matrix_button = ctk.CTkButton( self.backtest_controls_frame, text="Matrix", command=self.run_strategy_matrix, font=self.font_button, text_color=COLOR_FOREGROUND, fg_color=COLOR_SECONDARY_BUTTON, hover_color=COLOR_SECONDARY_BUTTON_HOVER, width=70 ); self.matrix_button.pack(side="right", padx=(15, 0))
+        self.cancel_button = ctk.CTkButton( self.backtest_controls_frame, text="Cancel", command=self.cancel_active_task, font=self.font_button, text_color=COLOR_FOREGROUND, fg_color=COLOR_SECONDARY_BUTTON, hover_color=COLOR_SECONDARY_BUTTON_HOVER, width=70, state="disabled" ); self.cancel_button.pack(side="right", padx=(15, 0))
 
         # --- Parameter Frame (Row 6) ---
         self.param_frame = ctk.CTkFrame(self, fg_color="transparent");
         self.param_frame.grid(row=6, column=0, columnspan=2, padx=20, pady=(0, 10), sticky="ew")
         self.update_param_widgets(self.strategy_var.get())
+        lap = STARTUP_TIMER.lap("App: strategy controls + parameters", lap)
 
         # --- LED Frame (Row 7) ---
         self.led_frame = ctk.CTkFrame(self, fg_color="transparent");
@@ -237,17 +258,68 @@ class App(ctk.CTk):
         for name, on_color in led_configs:
              led_container = ctk.CTkFrame(self.led_frame, fg_color="transparent"); led_container.pack(side="left", padx=10)
              led_label = ctk.CTkLabel(led_container, text=name, font=self.font_led, text_color=COLOR_FOREGROUND); led_label.pack(side="top")
-             led_indicator = WornLED( led_container, color=on_color, size=20, explicit_canvas_bg=app_bg_color ); led_indicator.pack(side="top", pady=(2,0))
+             led_indicator = WornLED( led_container, color=on_color, size=20, explicit_canvas_bg=app_bg_color, scheduler=self.animation_scheduler ); led_indicator.pack(side="top", pady=(2,0))
              led_indicator.set_wear_level(0.7); self.leds[name] = led_indicator
              if name == "PWR": led_indicator.bind("<Button-1>", self.show_easter_egg); led_label.bind("<Button-1>", self.show_easter_egg)
 
         # --- Initialize LED States and start loops ---
         self.initialize_leds()
 
+        # --- Animation controls ---
+        self.bind("<F8>", self.toggle_animation_paused); self.bind("<F9>", self.toggle_low_power_animation)
+
         # --- Graceful Shutdown ---
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        STARTUP_TIMER.lap("App: LEDs + animation loops", lap)
+
+        # --- Deferred startup: runs once the main loop has drawn the window ---
+        self.warmup_task = None
+        self.after_idle(lambda: self.after(0, self._on_first_paint))
 
     # --- Methods ---
+    # --- Deferred startup ---
+    def _on_first_paint(self):
+        """ Main thread, once the window has been drawn: starts importing the heavy modules in the background. """
+        if not self.winfo_exists(): return
+        STARTUP_TIMER.mark("window painted"); self._painted_at = STARTUP_TIMER.elapsed()
+        if not STARTUP_WARMUP: self._on_warmup_done([]); return # Modules load on first use instead
+        self.warmup_task = self.task_runner.submit(
+            "startup warm-up", warm_up, WARMUP_STEPS,
+            on_progress=self._on_warmup_step, on_success=self._on_warmup_done, on_finally=self._clear_warmup_task)
+
+    def _on_warmup_step(self, label: str):
+        """ Main thread: a warm-up step finished; the chart is built as soon as matplotlib is loaded. """
+        if label == WARMUP_STEPS[0][0]: self._build_chart()
+
+    def _on_warmup_done(self, failed: list[str]):
+        if failed: print(f"Warning: not preloaded: {', '.join(failed)} (will be retried on first use)")
+        if not STARTUP_TIMING_REPORT: return
+        print(STARTUP_TIMER.report())
+        self.log_message(f"Startup: window shown after {self._painted_at:.2f}s, background loading done after {STARTUP_TIMER.elapsed():.2f}s (timings in terminal).")
+
+    def _clear_warmup_task(self):
+        self.warmup_task = None
+
+    @property
+    def data_fetcher(self):
+        """ The DataFetcher, created on first use (importing yfinance) from whichever thread needs it first. """
+        with self._data_fetcher_lock:
+            if self._data_fetcher is None:
+                from data.data_fetcher import DataFetcher
+                self._data_fetcher = DataFetcher()
+        return self._data_fetcher
+
+    def _build_chart(self):
+        """ Main thread: replaces the placeholder label with the matplotlib chart (importing matplotlib if still needed). """
+        if self.fig is not None: return
+        plt, _, FigureCanvasTkAgg = load_matplotlib()
+        with STARTUP_TIMER.phase("App: build chart"):
+            self.fig, self.ax = plt.subplots(); self.fig.set_facecolor(COLOR_CHART_BG)
+            self.chart_canvas = FigureCanvasTkAgg(self.fig, master=self.chart_frame)
+            self.chart_canvas_widget = self.chart_canvas.get_tk_widget(); self.chart_canvas_widget.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
+            self.chart_canvas.mpl_connect('motion_notify_event', self.on_chart_motion)
+            self._draw_chart_placeholder(self.chart_placeholder.cget('text')); self.chart_placeholder.destroy()
+
     def initialize_leds(self):
         for name, led_widget in self.leds.items():
             if led_widget.winfo_exists():
@@ -300,6 +372,19 @@ class App(ctk.CTk):
         if self.winfo_exists(): self.matrix_update_job = self.after(delay, self._update_matrix_display)
         else: self.matrix_update_job = None
 
+    def toggle_animation_paused(self, event=None):
+        """ Freezes or resumes all LED and matrix flicker. """
+        paused = not self.animation_scheduler.paused
+        self.animation_scheduler.set_paused(paused)
+        self.log_message(f"Animation {'paused' if paused else 'resumed'} (F8 to toggle).")
+
+    def toggle_low_power_animation(self, event=None):
+        """ Switches the flicker frame rate between normal and low-power. """
+        low_power = not self.animation_scheduler.low_power
+        self.animation_scheduler.set_low_power(low_power)
+        fps = ANIMATION_LOW_POWER_FPS if low_power else ANIMATION_FPS
+        self.log_message(f"Low-power animation {'on' if low_power else 'off'} ({fps} fps, F9 to toggle).")
+
     def set_led_state(self, name: str, state: str, flicker: bool | None = None):
         if name in self.leds:
             led_widget = self.leds[name]
@@ -313,6 +398,7 @@ class App(ctk.CTk):
     def update_param_widgets(self, strategy_name: str):
          for widget in self.param_frame.winfo_children(): widget.destroy()
          self.param_entries.clear(); params = PARAM_CONFIG.get(strategy_name, [])
+         self.constraint_var.set(PARAM_CONSTRAINTS.get(strategy_name, ""))
          if not params:
               no_param_label = ctk.CTkLabel(self.param_frame, text="No parameters for this strategy.", font=self.font_normal, text_color=COLOR_FOREGROUND); no_param_label.pack(anchor="w"); return
          for param_name, default_value in params:
@@ -324,9 +410,13 @@ class App(ctk.CTk):
 
     def on_closing(self):
         print("Closing application gracefully...")
-        try: plt.close(self.fig); print("Matplotlib figure closed.")
+        self.task_runner.shutdown()
+        try:
+            if self.fig is not None: plt, _, _ = load_matplotlib(); plt.close(self.fig); print("Matplotlib figure closed.")
         except Exception as e: print(f"Error closing matplotlib figure: {e}")
         print("Stopping LED flickering...")
+        self.animation_scheduler.stop()
+        self._stop_price_refresh()
         if self.activity_led_job:
             try: self.after_cancel(self.activity_led_job)
             except tk.TclError as e: print(f"Ignoring TclError during activity_led_job cancel: {e}")
@@ -360,13 +450,8 @@ class App(ctk.CTk):
 
     # --- MODIFIED: clear_display updates matrix state ---
     def clear_display(self):
-        self.ax.clear(); self.ax.set_facecolor(COLOR_CHART_BG)
-        self.ax.tick_params(axis='x', colors=COLOR_CHART_AXES); self.ax.tick_params(axis='y', colors=COLOR_CHART_AXES)
-        self.ax.yaxis.label.set_color(COLOR_CHART_AXES); self.ax.xaxis.label.set_color(COLOR_CHART_AXES); self.ax.title.set_color(COLOR_CHART_AXES)
-        self.ax.spines['bottom'].set_color(COLOR_CHART_AXES); self.ax.spines['top'].set_color(COLOR_CHART_AXES); self.ax.spines['right'].set_color(COLOR_CHART_AXES); self.ax.spines['left'].set_color(COLOR_CHART_AXES)
         placeholder = 'Loading data...' if hasattr(self, '_loading_data') and self._loading_data else 'Select symbol and click Load Data'
-        self.ax.text(0.5, 0.5, placeholder, horizontalalignment='center', verticalalignment='center', transform=self.ax.transAxes, color=COLOR_CHART_AXES, fontsize=self.font_large.cget('size'))
-        self.chart_canvas.draw(); self.chart_info_label.configure(text="")
+        self._draw_chart_placeholder(placeholder); self.chart_info_label.configure(text="")
         # Update latest recommendation to trigger blank display in loop
         self.latest_recommendation = " " * MATRIX_COLS
         # Update matrix display immediately if possible
@@ -374,11 +459,22 @@ class App(ctk.CTk):
              self.recommendation_display.display_text(self.latest_recommendation)
         self.plotted_data = None
 
+    def _draw_chart_placeholder(self, text: str):
+        """ Empty styled axes with a centred message (just the label's text while the chart is not built yet). """
+        if self.ax is None: self.chart_placeholder.configure(text=text); return
+        self.ax.clear(); self.ax.set_facecolor(COLOR_CHART_BG)
+        self.ax.tick_params(axis='x', colors=COLOR_CHART_AXES); self.ax.tick_params(axis='y', colors=COLOR_CHART_AXES)
+        self.ax.yaxis.label.set_color(COLOR_CHART_AXES); self.ax.xaxis.label.set_color(COLOR_CHART_AXES); self.ax.title.set_color(COLOR_CHART_AXES)
+        self.ax.spines['bottom'].set_color(COLOR_CHART_AXES); self.ax.spines['top'].set_color(COLOR_CHART_AXES); self.ax.spines['right'].set_color(COLOR_CHART_AXES); self.ax.spines['left'].set_color(COLOR_CHART_AXES)
+        self.ax.text(0.5, 0.5, text, horizontalalignment='center', verticalalignment='center', transform=self.ax.transAxes, color=COLOR_CHART_AXES, fontsize=self.font_large.cget('size'))
+        self.chart_canvas.draw()
+
     # --- MODIFIED: on_symbol_change updates matrix state ---
     def on_symbol_change(self, selected_symbol: str):
+        if self.active_task is not None: self.active_task.cancel()  # Results for the old symbol are no longer wanted
         self.custom_symbol_entry.delete(0, 'end'); self.clear_display() # clear_display now handles matrix placeholder
         self.log_message(f"Symbol changed to: {selected_symbol}. Click 'Load Data'.", clear_first=True)
-        self.current_data = None; self.plotted_data = None; self.latest_price = None
+        self.current_data = None; self.plotted_data = None; self.latest_price = None; self._stop_price_refresh()
         # Update recommendation state so matrix shows placeholder
         self.latest_recommendation = " " * MATRIX_COLS
         # Trigger immediate matrix update if possible
@@ -387,7 +483,34 @@ class App(ctk.CTk):
         self.update_param_widgets(self.strategy_var.get())
         self.set_led_state("CPU", "off"); self.set_led_state("ERR", "off")
 
+    # --- Background task helpers ---
+    def _set_busy(self, task):
+        """Tracks the running background task and toggles buttons/CPU LED accordingly."""
+        self.active_task = task
+        busy = task is not None
+        self.fetch_button.configure(state="disabled" if busy else "normal")
+        self.run_backtest_button.configure(state="disabled" if busy else "normal")
+        self.optimize_button.configure(state="disabled" if busy else "normal")
+        self.run_all_button.configure(state="disabled" if busy else "normal")
+        self.matrix_button.configure(state="disabled" if busy else "normal")
+        self.portfolio_button.configure(state="disabled" if busy else "normal")
+        self.walk_forward_button.configure(state="disabled" if busy else "normal")
+        self.cancel_button.configure(state="normal" if busy else "disabled")
+        self.set_led_state("CPU", "on" if busy else "off", flicker=busy)
+
+    def cancel_active_task(self):
+        if self.active_task is None: return
+        self.log_message(f"Cancelling {self.active_task.name}...")
+        self.active_task.cancel()
+
+    def _on_task_progress(self, message: str):
+        """Logs a progress message from a worker and blinks the CPU LED."""
+        self.log_message(message)
+        self.set_led_state("CPU", "off")
+        self.after(80, lambda: self.set_led_state("CPU", "on", flicker=True) if self.active_task is not None else None)
+
     def plot_data(self, data_to_plot: pd.DataFrame | None, title_suffix: str = ""):
+        self._build_chart(); _, mdates, _ = load_matplotlib()
         self.ax.clear(); self.plotted_data = None
         if data_to_plot is None or data_to_plot.empty: self.ax.text(0.5, 0.5, f"No data to plot for {self.current_symbol}", color=COLOR_CHART_AXES, ha='center', va='center', transform=self.ax.transAxes)
         elif 'close' not in data_to_plot.columns: self.log_message("Error: 'close' column not found in data. Cannot plot chart."); self.ax.text(0.5, 0.5, "Error plotting data", color=COLOR_ACCENT, ha='center', va='center', transform=self.ax.transAxes)
@@ -402,41 +525,74 @@ class App(ctk.CTk):
         self.ax.spines['bottom'].set_color(COLOR_CHART_AXES); self.ax.spines['top'].set_color(COLOR_CHART_AXES); self.ax.spines['right'].set_color(COLOR_CHART_AXES); self.ax.spines['left'].set_color(COLOR_CHART_AXES)
         self.chart_canvas.draw()
 
-    # --- MODIFIED: fetch_and_display_data updates matrix state ---
+    # --- MODIFIED: fetch_and_display_data runs the fetch on a worker thread ---
     def fetch_and_display_data(self):
+        if self.active_task is not None: self.log_message("Busy: wait for the current task or press Cancel."); return
         custom_symbol = self.custom_symbol_entry.get().strip().upper(); selected_symbol = custom_symbol if custom_symbol else self.symbol_var.get()
         self.current_symbol = selected_symbol
         if not selected_symbol: self.log_message("Error: No symbol selected or entered.", clear_first=True); return
         self._loading_data = True; self.clear_display(); self.log_message(f"--- Loading data for {selected_symbol} ---", clear_first=True)
-        self.set_led_state("CPU", "on", flicker=False); self.update_idletasks()
-        self.latest_price = None; self.latest_recommendation = "LOADING..."
-        try:
-            self.current_data = self.data_fetcher.get_historical_data( selected_symbol, period=DEFAULT_DATA_PERIOD, interval=DEFAULT_DATA_INTERVAL )
-            if self.current_data is not None and not self.current_data.empty:
-                self.log_message(f"Successfully loaded {len(self.current_data)} data points.")
-                self.log_message(f"Data range: {self.current_data.index.min().strftime('%Y-%m-%d')} to {self.current_data.index.max().strftime('%Y-%m-%d')}")
-                self.plot_data(self.current_data, title_suffix=f" ({DEFAULT_DATA_PERIOD})"); self.log_message("Chart updated.")
-                current_price = self.data_fetcher.get_current_price(selected_symbol)
-                self.latest_price = current_price
-                self.log_message(f"\n--- Approx. Current Price ---")
-                if current_price: self.log_message(f"{selected_symbol}: {current_price:.2f}")
-                else: self.log_message(f"Could not retrieve current price for {selected_symbol}.")
-                self.generate_recommendation() # Updates self.latest_recommendation
-            else:
-                self.log_message(f"Failed to load data or no data available for {selected_symbol}.")
-                self.plot_data(None); self.current_data = None; self.latest_recommendation = "N/A"
-        except Exception as e:
-            self.log_message(f"An error occurred during data fetch/display: {e}")
-            self.plot_data(None); self.current_data = None; self.latest_recommendation = "ERROR"
-        finally:
-            self._loading_data = False; self.set_led_state("CPU", "off")
-            if self.matrix_update_job:
-                 try: self.after_cancel(self.matrix_update_job)
-                 except tk.TclError: pass
-            if self.winfo_exists(): self._update_matrix_display()
+        self.latest_price = None; self.latest_recommendation = "LOADING..."; self._stop_price_refresh()
+        task = self.task_runner.submit(
+            f"data load for {selected_symbol}", self._load_data_job, selected_symbol,
+            on_success=lambda result: self._on_data_loaded(selected_symbol, result),
+            on_error=self._on_data_load_error, on_progress=self._on_task_progress,
+            on_cancel=self._on_data_load_cancelled, on_finally=self._on_data_load_finished)
+        self._set_busy(task)
+
+    def _load_data_job(self, task, symbol: str) -> dict:
+        """Worker thread: fetches history and current price and computes the recommendation. Must not touch widgets."""
+        task.report(f"Fetching {DEFAULT_DATA_PERIOD} history...")
+        data = self.data_fetcher.get_historical_data( symbol, period=DEFAULT_DATA_PERIOD, interval=DEFAULT_DATA_INTERVAL )
+        task.check_cancelled()
+        if data is None or data.empty: return {"data": None}
+        task.report("Fetching current price...")
+        current_price = self.data_fetcher.get_current_price(symbol)
+        task.check_cancelled()
+        task.report("Generating recommendation..."); print("DEBUG: Generating recommendation...")
+        recommendation, details = self._compute_recommendation(task, data)
+        from trading.recommendation import RecommendationState
+        return {"data": data, "price": current_price, "recommendation": recommendation, "details": details, "state": RecommendationState(data)}
+
+    def _on_data_loaded(self, selected_symbol: str, result: dict):
+        self.current_data = result["data"]
+        if self.current_data is not None and not self.current_data.empty:
+            self.log_message(f"Successfully loaded {len(self.current_data)} data points.")
+            self.log_message(f"Data range: {self.current_data.index.min().strftime('%Y-%m-%d')} to {self.current_data.index.max().strftime('%Y-%m-%d')}")
+            self.plot_data(self.current_data, title_suffix=f" ({DEFAULT_DATA_PERIOD})"); self.log_message("Chart updated.")
+            current_price = result["price"]
+            self.latest_price = current_price
+            self.log_message(f"\n--- Approx. Current Price ---")
+            if current_price: self.log_message(f"{selected_symbol}: {current_price:.2f}")
+            else: self.log_message(f"Could not retrieve current price for {selected_symbol}.")
+            self._apply_recommendation(result["recommendation"], result["details"])
+            self.recommendation_state = result["state"]; self._schedule_price_refresh()
+        else:
+            self.log_message(f"Failed to load data or no data available for {selected_symbol}.")
+            self.plot_data(None); self.current_data = None; self.latest_recommendation = "N/A"
+
+    def _on_data_load_error(self, error: Exception):
+        self.log_message(f"An error occurred during data fetch/display: {error}")
+        self.plot_data(None); self.current_data = None; self.latest_recommendation = "ERROR"
+
+    def _on_data_load_cancelled(self):
+        self.log_message("Data load cancelled.")
+        self.current_data = None; self.latest_recommendation = " " * MATRIX_COLS
+
+    def _on_data_load_finished(self):
+        self._loading_data = False; self._set_busy(None)
+        self._restart_matrix_display()
+
+    def _restart_matrix_display(self):
+        """Shows the latest state on the matrix now and restarts its alternation timer."""
+        if self.matrix_update_job:
+             try: self.after_cancel(self.matrix_update_job)
+             except tk.TclError: pass
+        if self.winfo_exists(): self._update_matrix_display()
 
     def update_chart_lookback(self, period: str):
         if self.current_data is None or self.current_data.empty: self.log_message("No data loaded to filter."); return
+        import pandas as pd
         self.log_message(f"Updating chart view to: {period}"); filtered_data = None; now = datetime.datetime.now().date()
         try:
             if period == "ALL":
@@ -464,7 +620,7 @@ class App(ctk.CTk):
     def on_chart_motion(self, event):
         if event.inaxes != self.ax or event.xdata is None or self.plotted_data is None or self.plotted_data.empty: self.chart_info_label.configure(text=""); return
         try:
-            dt = mdates.num2date(event.xdata).replace(tzinfo=None); nearest_index = self.plotted_data.index.get_indexer([dt], method='nearest')[0]
+            _, mdates, _ = load_matplotlib(); dt = mdates.num2date(event.xdata).replace(tzinfo=None); nearest_index = self.plotted_data.index.get_indexer([dt], method='nearest')[0]
             actual_date = self.plotted_data.index[nearest_index]; close_price = self.plotted_data['close'].iloc[nearest_index]
             date_str = actual_date.strftime('%Y-%m-%d'); info_text = f"Date: {date_str}, Price: {close_price:.2f}"; self.chart_info_label.configure(text=info_text)
         except Exception as e: self.chart_info_label.configure(text="")
@@ -477,53 +633,56 @@ class App(ctk.CTk):
         desc_textbox = ctk.CTkTextbox( info_frame, font=self.font_normal, text_color=COLOR_TEXTBOX_FG, fg_color=COLOR_TEXTBOX_BG, border_width=1, border_color=COLOR_BUTTON, wrap="word" ); desc_textbox.pack(fill="both", expand=True); desc_textbox.insert("1.0", description); desc_textbox.configure(state="disabled")
         close_button = ctk.CTkButton( info_frame, text="Close", command=info_window.destroy, font=self.font_button, text_color=COLOR_BACKGROUND, fg_color=COLOR_BUTTON, hover_color=COLOR_BUTTON_HOVER ); close_button.pack(pady=(10, 0))
 
-    def generate_recommendation(self):
-         """Generates a simple Buy/Sell/Hold recommendation based on indicators, controlling CPU LED and updating internal state."""
-         self.log_message("Generating recommendation..."); print("DEBUG: Generating recommendation...")
-         self.set_led_state("CPU", "on", flicker=True); self.update_idletasks()
-         recommendation = "ERROR"
-         try:
-             if self.current_data is None or self.current_data.empty: recommendation = "N/A"; return
-             if self.talib_module is None:
-                  try: self.talib_module = importlib.import_module("talib"); print("TA-Lib imported.")
-                  except ImportError: self.log_message("TA-Lib not found."); print("ERROR: TA-Lib not found for recommendation."); recommendation = "NO TA-LIB"; return
-             required_length = max(REC_SMA_LONG, REC_MACD_SLOW + REC_MACD_SIG, REC_BBANDS_PERIOD, REC_ADX_PERIOD, REC_RSI_PERIOD)
-             if len(self.current_data) < required_length: recommendation = "NO DATA"; return
-             close_prices = self.current_data['close']; high_prices = self.current_data['high']; low_prices = self.current_data['low']
-             sma_short = self.talib_module.SMA(close_prices, timeperiod=REC_SMA_SHORT); sma_long = self.talib_module.SMA(close_prices, timeperiod=REC_SMA_LONG)
-             rsi = self.talib_module.RSI(close_prices, timeperiod=REC_RSI_PERIOD); macd, macdsignal, macdhist = self.talib_module.MACD(close_prices, fastperiod=REC_MACD_FAST, slowperiod=REC_MACD_SLOW, signalperiod=REC_MACD_SIG)
-             upper, middle, lower = self.talib_module.BBANDS(close_prices, timeperiod=REC_BBANDS_PERIOD, nbdevup=REC_BBANDS_STDDEV, nbdevdn=REC_BBANDS_STDDEV, matype=0)
-             adx = self.talib_module.ADX(high_prices, low_prices, close_prices, timeperiod=REC_ADX_PERIOD)
-             latest_close = close_prices.iloc[-1]; latest_sma_short = sma_short.iloc[-1]; latest_sma_long = sma_long.iloc[-1]; latest_rsi = rsi.iloc[-1]
-             latest_macd = macd.iloc[-1]; latest_macdsignal = macdsignal.iloc[-1]; latest_middleband = middle.iloc[-1]; latest_adx = adx.iloc[-1]
-             if pd.isna(latest_sma_short) or pd.isna(latest_sma_long) or pd.isna(latest_rsi) or pd.isna(latest_macd) or pd.isna(latest_macdsignal) or pd.isna(latest_middleband) or pd.isna(latest_adx): recommendation = "CALC..."; return
-             score = 0; trend_score = 0
-             if latest_close > latest_sma_long: trend_score += 0.5
-             if latest_sma_short > latest_sma_long: trend_score += 0.5
-             elif latest_sma_short < latest_sma_long: trend_score -= 0.5
-             if latest_macd > latest_macdsignal: trend_score += 1.0
-             else: trend_score -= 1.0
-             if latest_close > latest_middleband: trend_score += 0.5
-             else: trend_score -= 0.5
-             is_trending = latest_adx > REC_ADX_THRESHOLD
-             if is_trending: score += trend_score * 1.5
-             else: score += trend_score * 0.5
-             if latest_rsi > REC_RSI_BUY: score += 1.0
-             elif latest_rsi < REC_RSI_SELL: score -= 1.0
-             if score >= 2.5: recommendation = "BUY"
-             elif score >= 0.5: recommendation = "WEAK BUY"
-             elif score <= -2.5: recommendation = "SELL"
-             elif score <= -0.5: recommendation = "WEAK SELL"
-             else: recommendation = "HOLD"
-             log_text = f"Recommendation generated: {recommendation} (Score: {score:.1f}, ADX: {latest_adx:.1f})"; self.log_message(log_text); print(log_text)
-         except Exception as e: error_msg = f"Error generating recommendation: {e}"; self.log_message(error_msg); print(error_msg); recommendation = "ERROR"
-         finally:
-             self.latest_recommendation = recommendation.upper()
-             if self.matrix_update_job:
-                  try: self.after_cancel(self.matrix_update_job)
-                  except tk.TclError: pass
-             if self.winfo_exists(): self._update_matrix_display()
-             self.set_led_state("CPU", "off")
+    def _compute_recommendation(self, task, data: pd.DataFrame) -> tuple[str, str | None]:
+        """Worker thread: generates a simple Buy/Sell/Hold recommendation based on indicators."""
+        try:
+            if self.talib_module is None:
+                 try: self.talib_module = get_talib()
+                 except ImportError: task.report("TA-Lib not found."); print("ERROR: TA-Lib not found for recommendation."); return "NO TA-LIB", None
+            from trading.recommendation import compute_recommendation
+            return compute_recommendation(data, self.talib_module)
+        except Exception as e: error_msg = f"Error generating recommendation: {e}"; task.report(error_msg); print(error_msg); return "ERROR", None
+
+    def _apply_recommendation(self, recommendation: str, details: str | None):
+        """Main thread: logs and displays a recommendation computed by a worker."""
+        if details: self.log_message(details); print(details)
+        self.latest_recommendation = recommendation.upper()
+        self._restart_matrix_display()
+
+    def _schedule_price_refresh(self):
+        """Main thread: queues the next live price refresh of the loaded symbol (LIVE_PRICE_REFRESH_MS)."""
+        self.price_refresh_job = None
+        if LIVE_PRICE_REFRESH_MS > 0 and self.recommendation_state is not None and self.winfo_exists():
+            self.price_refresh_job = self.after(LIVE_PRICE_REFRESH_MS, self._refresh_live_price)
+
+    def _stop_price_refresh(self):
+        """Main thread: forgets the loaded symbol's streaming state and stops its live price refreshes."""
+        self.recommendation_state = None
+        if self.price_refresh_job:
+            try: self.after_cancel(self.price_refresh_job)
+            except tk.TclError: pass
+            self.price_refresh_job = None
+
+    def _refresh_live_price(self):
+        """Main thread: fetches the current price on a worker; skipped while another task runs."""
+        self.price_refresh_job = None
+        if self.recommendation_state is None: return
+        if self.active_task is not None: self._schedule_price_refresh(); return
+        symbol, state = self.current_symbol, self.recommendation_state
+        self.task_runner.submit(
+            f"price refresh for {symbol}", lambda task: self.data_fetcher.get_current_price(symbol),
+            on_success=lambda price: self._on_live_price(state, symbol, price),
+            on_error=lambda error: print(f"Price refresh for {symbol} failed: {error}"),
+            on_finally=lambda: self._schedule_price_refresh() if state is self.recommendation_state else None)
+
+    def _on_live_price(self, state, symbol: str, price: float | None):
+        """Main thread: re-scores the recommendation with a live price from the streaming state (constant time); a price from a new session opens the next bar."""
+        if price is None or state is not self.recommendation_state: return  # Failed, or another symbol was loaded meanwhile
+        self.latest_price = price; bars = state.bars
+        recommendation, details = state.tick(price, datetime.datetime.now(datetime.timezone.utc))
+        if state.bars > bars: self.log_message(f"{symbol}: new session, live bar opened {state.timestamp:%Y-%m-%d %H:%M}")
+        if recommendation.upper() != self.latest_recommendation:
+            self.log_message(f"{symbol} live price {price:.2f}"); self._apply_recommendation(recommendation, details)
 
     def show_easter_egg(self, event=None):
         print("DEBUG: show_easter_egg triggered"); egg_window = ctk.CTkToplevel(self); egg_window.title("WOW"); egg_window.geometry("600x400"); egg_window.configure(fg_color=COLOR_BACKGROUND); egg_window.transient(self); egg_window.grab_set()
@@ -532,7 +691,8 @@ class App(ctk.CTk):
         close_button = ctk.CTkButton( egg_frame, text="Much Close", command=egg_window.destroy, font=self.font_button, text_color=COLOR_BACKGROUND, fg_color=COLOR_BUTTON, hover_color=COLOR_BUTTON_HOVER ); close_button.pack(pady=(10, 0))
 
     def run_selected_backtest(self):
-        """Runs the backtest using the selected strategy, data, and GUI parameters, controlling LEDs."""
+        """Starts a backtest of the selected strategy on a worker thread using the GUI parameters."""
+        if self.active_task is not None: self.log_message("Busy: wait for the current task or press Cancel."); return
         selected_strategy_name = self.strategy_var.get(); strategy_loader = STRATEGY_LOADERS.get(selected_strategy_name)
         custom_symbol = self.custom_symbol_entry.get().strip().upper(); symbol_used = custom_symbol if custom_symbol else self.symbol_var.get()
         if strategy_loader is None: self.log_message(f"Error: Strategy loader not found."); return
@@ -554,79 +714,365 @@ class App(ctk.CTk):
 
         self.log_message(f"\n--- Running Backtest: {selected_strategy_name} on {symbol_used} ---", clear_first=True)
         param_log_str = ", ".join([f"{k}={v:.3f}" if k == 'trade_size_percent' else f"{k}={v}" for k,v in strategy_params.items()]); self.log_message(f"Params: {param_log_str}")
-        self.set_led_state("CPU", "on", flicker=True); self.update_idletasks()
-        selected_strategy_class = None; stats = None; bt_results = None
+        task = self.task_runner.submit(
+            f"{selected_strategy_name} backtest", self._backtest_job, strategy_loader, self.current_data, strategy_params, selected_strategy_name, self.current_symbol or symbol_used,
+            on_success=self._display_backtest_results,
+            on_error=lambda error: self._on_backtest_error(selected_strategy_name, error),
+            on_progress=self._on_task_progress, on_cancel=lambda: self.log_message("Backtest cancelled."),
+            on_finally=lambda: self._set_busy(None))
+        self._set_busy(task)
+
+    def _backtest_job(self, task, strategy_loader, data: pd.DataFrame, strategy_params: dict, strategy_name: str, symbol: str):
+        """Worker thread: returns the stored result of an identical earlier run, or loads the strategy and runs the backtest. Must not touch widgets."""
+        import time
+        from trading.backtester import run_backtest, BacktestCancelled
+        from trading.results_store import default_results_store, data_fingerprint, run_key
+        store = default_results_store()
+        if store is not None:
+            fingerprint = data_fingerprint(data); key = run_key(strategy_loader, data, strategy_params, DEFAULT_CASH, DEFAULT_COMMISSION, fingerprint=fingerprint)
+            stored = store.lookup(key) if not BACKTEST_PROFILE else None  # A profiled run has to actually run
+            if stored is not None: task.report(f"Identical run found in results store (from {stored['_stored_at']}); not recomputed."); return stored
+        selected_strategy_class = load_strategy_class(strategy_loader)
+        if selected_strategy_class is None: raise ValueError("Could not load strategy class.")
+        reported_quarters = set()
+        def on_progress(fraction):
+            quarter = int(fraction * 4)
+            if 0 < quarter < 4 and quarter not in reported_quarters: reported_quarters.add(quarter); task.report(f"Backtest progress: {quarter * 25}%")
+        started = time.perf_counter()
         try:
-            if isinstance(strategy_loader, str):
-                module_path, class_name = strategy_loader.rsplit('.', 1)
-                needs_talib = any(s in strategy_loader for s in ["rsi_oscillator", "volatility_breakout", "macd_strategy", "bollinger_bands_strategy"])
-                _talib_local = self.talib_module
-                if needs_talib and _talib_local is None:
-                     try: _talib_local = importlib.import_module("talib"); self.talib_module = _talib_local; print("TA-Lib imported.")
-                     except ImportError: self.log_message("ImportError: Failed to import 'talib'."); raise
-                needs_ephem = "real_moon_strategy" in strategy_loader
-                _ephem_local = self.ephem_module
-                if needs_ephem and _ephem_local is None:
-                     try: _ephem_local = importlib.import_module("ephem"); self.ephem_module = _ephem_local; print("Ephem imported.")
-                     except ImportError: self.log_message("ImportError: Failed to import 'ephem'."); raise
-                strategy_module = importlib.import_module(module_path)
-                if needs_talib: setattr(strategy_module, 'talib', _talib_local)
-                if needs_ephem: setattr(strategy_module, 'ephem', _ephem_local)
-                selected_strategy_class = getattr(strategy_module, class_name)
-                if class_name == "RealMoonStrategy": selected_strategy_class.OBSERVER_LAT = OBSERVER_LAT; selected_strategy_class.OBSERVER_LON = OBSERVER_LON; selected_strategy_class.OBSERVER_ELEV = OBSERVER_ELEV
-            else: selected_strategy_class = strategy_loader
-            if selected_strategy_class is None: raise ValueError("Could not load strategy class.")
-            stats, bt_results = run_backtest( strategy_class=selected_strategy_class, data=self.current_data, cash=DEFAULT_CASH, commission=DEFAULT_COMMISSION, **strategy_params )
-            if stats is not None:
-                self.log_message("--- Backtest Results ---")
-                stats_to_display = stats.drop(index=['_strategy', '_equity_curve', '_trades'], errors='ignore')
-                max_key_len = max(len(idx) for idx in stats_to_display.index) if not stats_to_display.empty else 25; key_width = max(25, max_key_len)
-                self.output_textbox.configure(state="normal")
-                for idx, value in stats_to_display.items():
-                    tag = None; value_str = ""; line = ""
-                    if isinstance(value, pd.Timedelta):
-                         if pd.isna(value): value_str = "NaT"
-                         else: value_str = str(value).split('.')[0]
-                         line = f"{idx:<{key_width}}: {value_str}\n"; tag = None; tags_to_apply = (); self.output_textbox.insert("end", line, tags_to_apply); continue
-                    try:
-                        is_numeric = isinstance(value, (int, float)); numeric_value = float(value) if is_numeric else 0
-                        percent_keys = ["Return", "CAGR", "Alpha", "Volatility", "Drawdown", "Trade [%]", "Expectancy [%]", "Win Rate", "Exposure Time"]
-                        is_percent = any(pk in idx for pk in percent_keys)
-                        positive_good_keys = ["Return", "Equity Final", "Profit Factor", "Ratio", "Alpha", "CAGR", "Expectancy", "SQN", "Best Trade", "Avg. Trade", "Win Rate"]
-                        is_positive_good = any(pgk in idx for pgk in positive_good_keys)
-                        if is_numeric:
-                             if "Drawdown" in idx or "Worst Trade" in idx: tag = "negative" if numeric_value < 0 else None
-                             elif is_positive_good: tag = "positive" if numeric_value > 0 else ("negative" if numeric_value < 0 else None)
-                             elif "Profit Factor" in idx: tag = "positive" if numeric_value > 1 else ("negative" if numeric_value < 1 else None)
-                        if is_percent: value_str = f"{value:>{14}.2f}%"
-                        elif "Equity" in idx or "Commissions" in idx: value_str = f"{value:>{15},.2f}"
-                        elif "Ratio" in idx or "Beta" in idx or "SQN" in idx or "Factor" in idx: value_str = f"{value:>{15}.2f}"
-                        elif isinstance(value, pd.Timestamp): value_str = f"{value.strftime('%Y-%m-%d'):>15}"
-                        elif isinstance(value, (int, float)): value_str = f"{value:>15}"
-                        else: value_str = f"{str(value):>15}"
-                    except Exception as fmt_e: print(f"Error formatting stat '{idx}' (Value: {value}, Type: {type(value)}): {fmt_e}"); value_str = "[FMT_ERR]"; line = f"{idx:<{key_width}}: {value_str}\n"
-                    if not line: line = f"{idx:<{key_width}}: {value_str:>15}\n"
-                    tags_to_apply = (tag,) if tag else (); self.output_textbox.insert("end", line, tags_to_apply)
-                trades = stats.get('_trades')
-                if trades is not None and not trades.empty:
-                     self.output_textbox.insert("end", "\n--- Trades --- \n")
-                     trades_display = trades[['Size', 'EntryTime', 'ExitTime', 'EntryPrice', 'ExitPrice', 'PnL', 'ReturnPct']].copy()
-                     trades_display.rename(columns={'EntryTime': 'Entry', 'ExitTime': 'Exit', 'ReturnPct': 'Return %'}, inplace=True)
-                     trades_display['PnL'] = trades_display['PnL'].map('{:,.2f}'.format); trades_display['Return %'] = trades_display['Return %'].map('{:.2%}'.format)
-                     trades_display['EntryPrice'] = trades_display['EntryPrice'].map('{:.2f}'.format); trades_display['ExitPrice'] = trades_display['ExitPrice'].map('{:.2f}'.format)
-                     trades_display['Entry'] = pd.to_datetime(trades_display['Entry']).dt.strftime('%Y-%m-%d'); trades_display['Exit'] = pd.to_datetime(trades_display['Exit']).dt.strftime('%Y-%m-%d')
-                     pd.set_option('display.width', 1000); trades_str = trades_display.to_string(index=False, justify='right'); self.output_textbox.insert("end", trades_str + "\n"); pd.reset_option('display.width')
-                else: self.output_textbox.insert("end", "\n--- No Trades Executed --- \n")
-                self.output_textbox.configure(state="disabled"); self.output_textbox.see("end")
-            else: self.log_message("Backtest failed to produce results. Check console for errors.")
-        except ImportError as e:
+            stats, bt_results = run_backtest( strategy_class=selected_strategy_class, data=data, cash=DEFAULT_CASH, commission=DEFAULT_COMMISSION, cancel_event=task.cancel_event, progress_callback=on_progress, profile=BACKTEST_PROFILE, profile_allocations=BACKTEST_PROFILE_ALLOCATIONS, **strategy_params )
+        except BacktestCancelled: raise TaskCancelled(task.name)
+        if store is not None and stats is not None:
+            try: store.save(key, stats, strategy_name, strategy_loader, data, strategy_params, DEFAULT_CASH, DEFAULT_COMMISSION, symbol=symbol, interval=DEFAULT_DATA_INTERVAL, run_seconds=time.perf_counter() - started, fingerprint=fingerprint)
+            except Exception as e: print(f"Warning: Could not store backtest result: {e}")
+        return stats
+
+    # --- Strategy tournament (Run All) ---
+    def run_all_strategies(self):
+        """Backtests every strategy on the loaded data on a process pool; the selected strategy uses the values in the parameter fields."""
+        if self.active_task is not None: self.log_message("Busy: wait for the current task or press Cancel."); return
+        if self.current_data is None or self.current_data.empty: self.log_message(f"Error: No data loaded for {self.current_symbol or self.symbol_var.get()}."); return
+        selected_strategy_name = self.strategy_var.get(); overrides = {}
+        if selected_strategy_name in STRATEGY_LOADERS:
+            for param_name, param_var in self.param_entries.items():
+                try: value = float(param_var.get()); overrides.setdefault(selected_strategy_name, {})[param_name] = int(value) if value.is_integer() else value
+                except ValueError: print(f"Warning: Non-numeric param '{param_name}'. Using default.")
+        from trading.tournament import DEFAULT_METRIC
+        self.log_message(f"\n--- Run All: {len(STRATEGY_LOADERS)} strategies on {self.current_symbol} (ranked by {DEFAULT_METRIC}) ---", clear_first=True)
+        if overrides: self.log_message(f"{selected_strategy_name} uses the parameter fields; the others use their defaults.")
+        task = self.task_runner.submit(
+            "Run All", self._tournament_job, self.current_data, overrides, self.current_symbol,
+            on_success=self._display_tournament_results,
+            on_error=lambda error: self._on_backtest_error("Run All", error),
+            on_progress=self._on_task_progress, on_cancel=lambda: self.log_message("Run All cancelled."),
+            on_finally=lambda: self._set_busy(None))
+        self._set_busy(task)
+
+    def _tournament_job(self, task, data: pd.DataFrame, overrides: dict, symbol: str) -> pd.DataFrame:
+        """Worker thread: runs the tournament, reporting each finished strategy. Must not touch widgets."""
+        from trading.tournament import run_tournament, format_result
+        from trading.backtester import BacktestCancelled
+        try:
+            return run_tournament(data, overrides=overrides, cash=DEFAULT_CASH, commission=DEFAULT_COMMISSION, cancel_event=task.cancel_event, symbol=symbol, interval=DEFAULT_DATA_INTERVAL,
+                                  result_callback=lambda row, leaderboard, total: task.report(format_result(row, leaderboard, total)))
+        except BacktestCancelled: raise TaskCancelled(task.name)
+
+    def _display_tournament_results(self, leaderboard: pd.DataFrame):
+        """Main thread: prints the final leaderboard."""
+        from trading.tournament import format_leaderboard
+        failed = int(leaderboard['error'].notna().sum()); stored = int(leaderboard['stored'].sum())
+        self.log_message(f"--- Leaderboard ({len(leaderboard)} strategies" + (f", {stored} from the results store" if stored else "") + ") ---")
+        if failed: self.log_message(f"Warning: {failed} strategy run(s) failed, e.g. {leaderboard['error'].dropna().iloc[0]}")
+        self.log_message(format_leaderboard(leaderboard))
+
+    # --- Strategies x symbols matrix ---
+    def _universe(self) -> list:
+        """Symbols for multi-symbol runs: the comma-separated list in the Custom field, or config.SYMBOLS."""
+        custom = self.custom_symbol_entry.get().strip().upper()
+        return [symbol.strip() for symbol in custom.split(",") if symbol.strip()] if "," in custom else list(SYMBOLS)
+
+    def run_strategy_matrix(self):
+        """Backtests every strategy on every symbol of config.SYMBOLS (or the comma-separated list in the Custom field) and draws a heatmap."""
+        if self.active_task is not None: self.log_message("Busy: wait for the current task or press Cancel."); return
+        universe = self._universe()
+        from trading.tournament import DEFAULT_METRIC
+        self.log_message(f"\n--- Strategy Matrix: {len(STRATEGY_LOADERS)} strategies x {len(universe)} symbols ({', '.join(universe)}) ---", clear_first=True)
+        task = self.task_runner.submit(
+            "Strategy matrix", self._matrix_job, universe,
+            on_success=lambda results: self._display_matrix_results(results, DEFAULT_METRIC),
+            on_error=lambda error: self._on_backtest_error("Strategy matrix", error),
+            on_progress=self._on_task_progress, on_cancel=lambda: self.log_message("Strategy matrix cancelled."),
+            on_finally=lambda: self._set_busy(None))
+        self._set_busy(task)
+
+    def _matrix_job(self, task, universe: list) -> pd.DataFrame:
+        """Worker thread: loads every symbol once (local cache first), then runs the matrix on a process pool. Must not touch widgets."""
+        from trading.cross_section import run_cross_section
+        from trading.backtester import BacktestCancelled
+        task.report(f"Loading data for {len(universe)} symbols...")
+        datasets = self.data_fetcher.get_historical_data_many(universe, period=DEFAULT_DATA_PERIOD, interval=DEFAULT_DATA_INTERVAL)
+        missing = [symbol for symbol, data in datasets.items() if data is None or data.empty]
+        if missing: task.report(f"Warning: No data for {', '.join(missing)}; skipped.")
+        task.check_cancelled()
+        reported_tenths = set()
+        def on_progress(row, completed, total):
+            tenth = int(completed * 10 / total)
+            if 0 < tenth < 10 and tenth not in reported_tenths: reported_tenths.add(tenth); task.report(f"Matrix progress: {completed}/{total} runs")
+        try:
+            return run_cross_section(datasets, cash=DEFAULT_CASH, commission=DEFAULT_COMMISSION, cancel_event=task.cancel_event,
+                                     progress_callback=on_progress, interval=DEFAULT_DATA_INTERVAL)
+        except BacktestCancelled: raise TaskCancelled(task.name)
+
+    def _display_matrix_results(self, results: pd.DataFrame, metric: str):
+        """Main thread: prints the metric grid and draws it as a heatmap."""
+        import pandas as pd
+        from trading.cross_section import metric_grid
+        failed = int(results['error'].notna().sum()); stored = int(results['stored'].sum())
+        grid = metric_grid(results, metric)
+        self.log_message(f"--- {metric} by Strategy and Symbol ({len(results)} runs" + (f", {stored} from the results store" if stored else "") + ") ---")
+        if failed: self.log_message(f"Warning: {failed} run(s) failed, e.g. {results['error'].dropna().iloc[0]}")
+        pd.set_option('display.width', 1000); self.log_message(grid.to_string(float_format=lambda v: f"{v:.2f}")); pd.reset_option('display.width')
+        self._draw_heatmap(grid, f"{metric} by strategy and symbol", "Symbol", "", value_format="{:.2f}")
+        self.log_message("Heatmap: strategies x symbols. Click a Chart Period button to return to the price chart.")
+
+    # --- Portfolio backtest ---
+    def run_portfolio_backtest(self):
+        """Backtests the selected strategy (parameter fields) over config.SYMBOLS (or the Custom list) with one shared cash pool."""
+        if self.active_task is not None: self.log_message("Busy: wait for the current task or press Cancel."); return
+        from trading.portfolio import supports
+        selected_strategy_name = self.strategy_var.get()
+        if not supports(selected_strategy_name): self.log_message(f"Error: {selected_strategy_name} cannot run as a portfolio (only strategies supported by the vector engine can)."); return
+        params = {}
+        for param_name, param_var in self.param_entries.items():
+            try: value = float(param_var.get()); params[param_name] = int(value) if value.is_integer() else value
+            except ValueError: print(f"Warning: Non-numeric param '{param_name}'. Using default.")
+        universe = self._universe()
+        self.log_message(f"\n--- Portfolio Backtest: {selected_strategy_name} on {', '.join(universe)} ({PORTFOLIO_ALLOCATION}, cash {DEFAULT_CASH:,}) ---", clear_first=True)
+        task = self.task_runner.submit(
+            f"{selected_strategy_name} portfolio", self._portfolio_job, selected_strategy_name, universe, params,
+            on_success=lambda stats: self._display_portfolio_results(selected_strategy_name, stats),
+            on_error=lambda error: self._on_backtest_error(selected_strategy_name, error),
+            on_progress=self._on_task_progress, on_cancel=lambda: self.log_message("Portfolio backtest cancelled."),
+            on_finally=lambda: self._set_busy(None))
+        self._set_busy(task)
+
+    def _portfolio_job(self, task, strategy_name: str, universe: list, params: dict):
+        """Worker thread: loads every symbol once (local cache first) and runs the portfolio backtest. Must not touch widgets."""
+        from trading.portfolio import portfolio_backtest
+        task.report(f"Loading data for {len(universe)} symbols...")
+        datasets = self.data_fetcher.get_historical_data_many(universe, period=DEFAULT_DATA_PERIOD, interval=DEFAULT_DATA_INTERVAL)
+        missing = [symbol for symbol, data in datasets.items() if data is None or data.empty]
+        if missing: task.report(f"Warning: No data for {', '.join(missing)}; skipped.")
+        task.check_cancelled()
+        return portfolio_backtest(strategy_name, datasets, params, cash=DEFAULT_CASH, commission=DEFAULT_COMMISSION)
+
+    def _display_portfolio_results(self, strategy_name: str, stats):
+        """Main thread: prints the portfolio stats and trades and plots the combined equity curve."""
+        self._display_backtest_results(stats)
+        self._plot_equity_curve(stats['_equity_curve'], f"{strategy_name} Portfolio Equity ({stats['Symbols']})", "combined portfolio equity")
+
+    def _plot_equity_curve(self, curve: pd.DataFrame, title: str, description: str):
+        """Main thread: draws curve['Equity'] in the chart area in place of the price chart."""
+        self._build_chart(); _, mdates, _ = load_matplotlib()
+        self.ax.clear(); self.plotted_data = None
+        self.ax.plot(curve.index, curve['Equity'], color=COLOR_CHART_LINE, linewidth=1.5)
+        self.ax.set_title(title, color=COLOR_CHART_AXES)
+        self.ax.set_ylabel("Equity (USD)", color=COLOR_CHART_AXES); self.ax.set_xlabel("Date", color=COLOR_CHART_AXES)
+        self.fig.autofmt_xdate(); self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+        self.ax.tick_params(axis='x', colors=COLOR_CHART_AXES, rotation=45); self.ax.tick_params(axis='y', colors=COLOR_CHART_AXES)
+        self.ax.grid(True, color=COLOR_DROPDOWN_BG, linestyle='--', linewidth=0.5); self.ax.set_facecolor(COLOR_CHART_BG)
+        self.ax.spines['bottom'].set_color(COLOR_CHART_AXES); self.ax.spines['top'].set_color(COLOR_CHART_AXES); self.ax.spines['right'].set_color(COLOR_CHART_AXES); self.ax.spines['left'].set_color(COLOR_CHART_AXES)
+        self.chart_canvas.draw(); self.log_message(f"Chart: {description}. Click a Chart Period button to return to the price chart.")
+
+    # --- Parameter optimization (grid search) ---
+    def run_optimization(self):
+        """Grid-searches the selected strategy over the ranges typed into the parameter fields (e.g. n1 = 5-50:5)."""
+        if self.active_task is not None: self.log_message("Busy: wait for the current task or press Cancel."); return
+        selected_strategy_name = self.strategy_var.get()
+        if selected_strategy_name not in STRATEGY_LOADERS: self.log_message("Error: Strategy loader not found."); return
+        if self.current_data is None or self.current_data.empty: self.log_message(f"Error: No data loaded for {self.current_symbol or self.symbol_var.get()}."); return
+        from trading.optimizer import parse_param_range, constraint_from_expression
+        param_ranges = {}
+        try:
+            for param_name, param_var in self.param_entries.items(): param_ranges[param_name] = parse_param_range(param_var.get())
+            constraint = constraint_from_expression(self.constraint_var.get())
+        except ValueError as e: self.log_message(f"Error: Invalid optimization range - {e}. Use e.g. 10, 5-50, 5-50:5 or 2,4,8."); return
+        combinations = 1
+        for values in param_ranges.values(): combinations *= len(values)
+        self.log_message(f"\n--- Optimizing: {selected_strategy_name} on {self.current_symbol} ---", clear_first=True)
+        self.log_message("Ranges: " + ", ".join(f"{k}={v[0]}" if len(v) == 1 else f"{k}={v[0]}..{v[-1]} ({len(v)})" for k, v in param_ranges.items()))
+        self.log_message(f"Combinations: {combinations}" + (f" before constraint '{constraint.expression}'" if constraint else ""))
+        adaptive = combinations > ADAPTIVE_SEARCH_THRESHOLD
+        if adaptive: self.log_message(f"More than {ADAPTIVE_SEARCH_THRESHOLD} combinations: using adaptive search ({ADAPTIVE_SEARCH_CANDIDATES} random candidates, best 1/{ADAPTIVE_SEARCH_ETA} promoted to longer history).")
+        task = self.task_runner.submit(
+            f"{selected_strategy_name} optimization", self._optimize_job, selected_strategy_name, self.current_data, param_ranges, constraint, adaptive,
+            on_success=lambda results: self._display_optimization_results(selected_strategy_name, results),
+            on_error=lambda error: self._on_backtest_error(selected_strategy_name, error),
+            on_progress=self._on_task_progress, on_cancel=lambda: self.log_message("Optimization cancelled."),
+            on_finally=lambda: self._set_busy(None))
+        self._set_busy(task)
+
+    def _optimize_job(self, task, strategy_name: str, data: pd.DataFrame, param_ranges: dict, constraint, adaptive: bool = False) -> pd.DataFrame:
+        """Worker thread: runs the grid search (or, for large grids, the adaptive search) on a process pool. Must not touch widgets."""
+        from trading.optimizer import grid_search, DEFAULT_METRIC
+        from trading.adaptive_search import successive_halving
+        from trading.backtester import BacktestCancelled
+        reported_tenths = set()
+        def on_progress(completed, total):
+            tenth = int(completed * 10 / total)
+            if 0 < tenth < 10 and tenth not in reported_tenths: reported_tenths.add(tenth); task.report(f"Optimization progress: {completed}/{total} runs")
+        try:
+            if adaptive: return successive_halving(strategy_name, data, param_ranges, constraint=constraint, metric=DEFAULT_METRIC, cash=DEFAULT_CASH, commission=DEFAULT_COMMISSION, cancel_event=task.cancel_event, progress_callback=on_progress)
+            return grid_search(strategy_name, data, param_ranges, constraint=constraint, metric=DEFAULT_METRIC, cash=DEFAULT_CASH, commission=DEFAULT_COMMISSION, cancel_event=task.cancel_event, progress_callback=on_progress)
+        except BacktestCancelled: raise TaskCancelled(task.name)
+
+    def _display_optimization_results(self, strategy_name: str, results: pd.DataFrame, top_n: int = 15):
+        """Main thread: prints the ranked table and draws a heatmap of the first two varied parameters (adaptive search: final rung only)."""
+        import pandas as pd
+        from trading.optimizer import varied_params, DEFAULT_METRIC
+        param_names = [name for name, _ in PARAM_CONFIG.get(strategy_name, [])]
+        adaptive = "rung" in results.columns
+        # Adaptive search scores earlier rungs on shorter slices, so only the final rung is comparable across candidates
+        final = results[results["rung"] == results["rung"].max()] if adaptive else results
+        failed = int(results['error'].notna().sum())
+        self.log_message(f"--- Optimization Results ({results.attrs.get('runs', len(results))} runs, ranked by {DEFAULT_METRIC}) ---")
+        if adaptive: self.log_message(f"{len(final)} of {len(results)} candidates reached the final rung ({int(final['bars'].iloc[0])} bars).")
+        if failed: self.log_message(f"Warning: {failed} run(s) failed, e.g. {results['error'].dropna().iloc[0]}")
+        shown_params = varied_params(results, param_names) or param_names
+        table = results.head(top_n)[["rank"] + (["rung", "bars"] if adaptive else []) + shown_params + ["Return [%]", "Sharpe Ratio", "Max. Drawdown [%]", "# Trades"]].copy()
+        table["# Trades"] = table["# Trades"].astype("Int64")
+        pd.set_option('display.width', 1000); self.log_message(table.to_string(index=False, float_format=lambda v: f"{v:.2f}")); pd.reset_option('display.width')
+        best = final.iloc[0]
+        if pd.notna(best[DEFAULT_METRIC]):
+            # Put the best combination into the parameter fields so "Run Backtest" reproduces it
+            for name in param_names:
+                if name in self.param_entries: self.param_entries[name].set(str(best[name]))
+            self.log_message("Best parameters copied into the parameter fields.", tag="positive")
+        heat_params = varied_params(final, param_names)
+        if len(heat_params) >= 2: self.show_optimization_heatmap(final, heat_params[0], heat_params[1], DEFAULT_METRIC)
+
+    # --- Walk-forward optimization ---
+    def run_walk_forward(self):
+        """Walk-forward optimizes the selected strategy over the ranges in the parameter fields (train/test folds from config)."""
+        if self.active_task is not None: self.log_message("Busy: wait for the current task or press Cancel."); return
+        selected_strategy_name = self.strategy_var.get()
+        if selected_strategy_name not in STRATEGY_LOADERS: self.log_message("Error: Strategy loader not found."); return
+        if self.current_data is None or self.current_data.empty: self.log_message(f"Error: No data loaded for {self.current_symbol or self.symbol_var.get()}."); return
+        from trading.optimizer import parse_param_range, constraint_from_expression
+        param_ranges = {}
+        try:
+            for param_name, param_var in self.param_entries.items(): param_ranges[param_name] = parse_param_range(param_var.get())
+            constraint = constraint_from_expression(self.constraint_var.get())
+        except ValueError as e: self.log_message(f"Error: Invalid optimization range - {e}. Use e.g. 10, 5-50, 5-50:5 or 2,4,8."); return
+        mode = "anchored" if WALK_FORWARD_ANCHORED else "rolling"
+        self.log_message(f"\n--- Walk-Forward: {selected_strategy_name} on {self.current_symbol} ({WALK_FORWARD_FOLDS} {mode} folds, {WALK_FORWARD_TRAIN_FRACTION:.0%} train) ---", clear_first=True)
+        task = self.task_runner.submit(
+            f"{selected_strategy_name} walk-forward", self._walk_forward_job, selected_strategy_name, self.current_data, param_ranges, constraint,
+            on_success=lambda stats: self._display_walk_forward_results(selected_strategy_name, stats),
+            on_error=lambda error: self._on_backtest_error(selected_strategy_name, error),
+            on_progress=self._on_task_progress, on_cancel=lambda: self.log_message("Walk-forward optimization cancelled."),
+            on_finally=lambda: self._set_busy(None))
+        self._set_busy(task)
+
+    def _walk_forward_job(self, task, strategy_name: str, data: pd.DataFrame, param_ranges: dict, constraint):
+        """Worker thread: runs the folds on a process pool. Must not touch widgets."""
+        from trading.walk_forward import walk_forward
+        from trading.backtester import BacktestCancelled
+        def on_fold(row, completed, total):
+            task.report(f"[{completed}/{total}] Fold {row['fold']}: " + (f"failed - {row['error']}" if row['error'] else f"OOS return {row['OOS Return [%]']:.2f}%"))
+        try:
+            return walk_forward(strategy_name, data, param_ranges, constraint=constraint, cash=DEFAULT_CASH, commission=DEFAULT_COMMISSION, cancel_event=task.cancel_event, progress_callback=on_fold)
+        except BacktestCancelled: raise TaskCancelled(task.name)
+
+    def _display_walk_forward_results(self, strategy_name: str, stats):
+        """Main thread: prints the out-of-sample report and plots the stitched out-of-sample equity."""
+        from trading.walk_forward import format_walk_forward
+        self.log_message(format_walk_forward(stats))
+        self._plot_equity_curve(stats['_equity_curve'], f"{strategy_name} Walk-Forward Equity (out of sample, {stats['Folds']} folds)", "stitched out-of-sample equity")
+
+    def show_optimization_heatmap(self, results: pd.DataFrame, x_param: str, y_param: str, metric: str | None = None):
+        """Draws metric (default: the optimizer's DEFAULT_METRIC) over two parameters in the chart area (best value over any other parameters)."""
+        from trading.optimizer import heatmap_table, DEFAULT_METRIC
+        metric = metric or DEFAULT_METRIC
+        grid = heatmap_table(results, x_param, y_param, metric)
+        self._draw_heatmap(grid, f"{self.current_symbol} {metric}: {y_param} vs {x_param}", x_param, y_param, origin="lower")
+        self.log_message(f"Heatmap: {metric} by {x_param} and {y_param}. Click a Chart Period button to return to the price chart.")
+
+    def _draw_heatmap(self, grid: pd.DataFrame, title: str, x_label: str, y_label: str, value_format: str = "{:.0f}", origin: str = "upper"):
+        """Draws a grid (index = rows, columns = columns) as a heatmap in the chart area, with values written into cells for small grids."""
+        import pandas as pd
+        self._build_chart()
+        self.ax.clear(); self.plotted_data = None
+        image = self.ax.imshow(grid.values.astype(float), origin=origin, aspect="auto", cmap="magma", interpolation="nearest")
+        self.ax.set_xticks(range(len(grid.columns))); self.ax.set_xticklabels([str(v) for v in grid.columns], rotation=45)
+        self.ax.set_yticks(range(len(grid.index))); self.ax.set_yticklabels([str(v) for v in grid.index])
+        if grid.size <= 144:
+            for row in range(grid.shape[0]):
+                for col in range(grid.shape[1]):
+                    value = grid.values[row, col]
+                    if pd.notna(value): self.ax.text(col, row, value_format.format(value), ha="center", va="center", fontsize=7, color=COLOR_CHART_AXES)
+        low, high = image.get_clim()
+        self.ax.set_title(f"{title} ({low:.1f} to {high:.1f})", color=COLOR_CHART_AXES)
+        self.ax.set_xlabel(x_label, color=COLOR_CHART_AXES); self.ax.set_ylabel(y_label, color=COLOR_CHART_AXES)
+        self.ax.tick_params(axis='x', colors=COLOR_CHART_AXES); self.ax.tick_params(axis='y', colors=COLOR_CHART_AXES)
+        self.ax.spines['bottom'].set_color(COLOR_CHART_AXES); self.ax.spines['top'].set_color(COLOR_CHART_AXES); self.ax.spines['right'].set_color(COLOR_CHART_AXES); self.ax.spines['left'].set_color(COLOR_CHART_AXES)
+        self.chart_canvas.draw()
+
+    def _on_backtest_error(self, selected_strategy_name: str, e: Exception):
+        if isinstance(e, ImportError):
              self.log_message(f"ImportError: {e}. Required library might be missing for {selected_strategy_name}.")
              if 'talib' in str(e).lower(): self.log_message("Please ensure TA-Lib is correctly installed (C library + Python wrapper).")
              elif 'ephem' in str(e).lower(): self.log_message("Please ensure Ephem is installed: pip install ephem")
-        except Exception as e:
+        else:
             self.log_message(f"An error occurred during backtesting: {type(e).__name__} - {e}")
-            print("\n--- Backtesting Error Traceback ---"); traceback.print_exc(); print("--- End Traceback ---\n")
-        finally:
-            # --- This block ensures CPU LED turns off even if errors occur ---
-            self.set_led_state("CPU", "off")
+
+    def _display_backtest_results(self, stats):
+        """Main thread: writes backtest statistics and the trade list to the console."""
+        import pandas as pd
+        if stats is not None:
+            self.log_message("--- Backtest Results ---")
+            stats_to_display = stats.drop(index=['_strategy', '_equity_curve', '_trades', '_profile', '_stored_at'], errors='ignore')
+            max_key_len = max(len(idx) for idx in stats_to_display.index) if not stats_to_display.empty else 25; key_width = max(25, max_key_len)
+            self.output_textbox.configure(state="normal")
+            for idx, value in stats_to_display.items():
+                tag = None; value_str = ""; line = ""
+                if isinstance(value, pd.Timedelta):
+                     if pd.isna(value): value_str = "NaT"
+                     else: value_str = str(value).split('.')[0]
+                     line = f"{idx:<{key_width}}: {value_str}\n"; tag = None; tags_to_apply = (); self.output_textbox.insert("end", line, tags_to_apply); continue
+                try:
+                    is_numeric = isinstance(value, (int, float)); numeric_value = float(value) if is_numeric else 0
+                    percent_keys = ["Return", "CAGR", "Alpha", "Volatility", "Drawdown", "Trade [%]", "Expectancy [%]", "Win Rate", "Exposure Time"]
+                    is_percent = any(pk in idx for pk in percent_keys)
+                    positive_good_keys = ["Return", "Equity Final", "Profit Factor", "Ratio", "Alpha", "CAGR", "Expectancy", "SQN", "Best Trade", "Avg. Trade", "Win Rate"]
+                    is_positive_good = any(pgk in idx for pgk in positive_good_keys)
+                    if is_numeric:
+                         if "Drawdown" in idx or "Worst Trade" in idx: tag = "negative" if numeric_value < 0 else None
+                         elif is_positive_good: tag = "positive" if numeric_value > 0 else ("negative" if numeric_value < 0 else None)
+                         elif "Profit Factor" in idx: tag = "positive" if numeric_value > 1 else ("negative" if numeric_value < 1 else None)
+                    if is_percent: value_str = f"{value:>{14}.2f}%"
+                    elif "Equity" in idx or "Commissions" in idx: value_str = f"{value:>{15},.2f}"
+                    elif "Ratio" in idx or "Beta" in idx or "SQN" in idx or "Factor" in idx: value_str = f"{value:>{15}.2f}"
+                    elif isinstance(value, pd.Timestamp): value_str = f"{value.strftime('%Y-%m-%d'):>15}"
+                    elif isinstance(value, (int, float)): value_str = f"{value:>15}"
+                    else: value_str = f"{str(value):>15}"
+                except Exception as fmt_e: print(f"Error formatting stat '{idx}' (Value: {value}, Type: {type(value)}): {fmt_e}"); value_str = "[FMT_ERR]"; line = f"{idx:<{key_width}}: {value_str}\n"
+                if not line: line = f"{idx:<{key_width}}: {value_str:>15}\n"
+                tags_to_apply = (tag,) if tag else (); self.output_textbox.insert("end", line, tags_to_apply)
+            trades = stats.get('_trades')
+            if trades is not None and not trades.empty:
+                 self.output_textbox.insert("end", "\n--- Trades --- \n")
+                 trades_display = trades[(['Symbol'] if 'Symbol' in trades.columns else []) + ['Size', 'EntryTime', 'ExitTime', 'EntryPrice', 'ExitPrice', 'PnL', 'ReturnPct']].copy()
+                 trades_display.rename(columns={'EntryTime': 'Entry', 'ExitTime': 'Exit', 'ReturnPct': 'Return %'}, inplace=True)
+                 trades_display['PnL'] = trades_display['PnL'].map('{:,.2f}'.format); trades_display['Return %'] = trades_display['Return %'].map('{:.2%}'.format)
+                 trades_display['EntryPrice'] = trades_display['EntryPrice'].map('{:.2f}'.format); trades_display['ExitPrice'] = trades_display['ExitPrice'].map('{:.2f}'.format)
+                 trades_display['Entry'] = pd.to_datetime(trades_display['Entry']).dt.strftime('%Y-%m-%d'); trades_display['Exit'] = pd.to_datetime(trades_display['Exit']).dt.strftime('%Y-%m-%d')
+                 pd.set_option('display.width', 1000); trades_str = trades_display.to_string(index=False, justify='right'); self.output_textbox.insert("end", trades_str + "\n"); pd.reset_option('display.width')
+            else: self.output_textbox.insert("end", "\n--- No Trades Executed --- \n")
+            profile = stats.get('_profile')
+            if profile:
+                 from trading.profiling import format_profile
+                 self.output_textbox.insert("end", "\n" + format_profile(profile) + "\n")
+            self.output_textbox.configure(state="disabled"); self.output_textbox.see("end")
+        else: self.log_message("Backtest failed to produce results. Check console for errors.")
 
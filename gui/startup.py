@@ -0,0 +1,85 @@
+# gui/startup.py
+# Startup timing for the GUI: main.py and App record how long each import and construction step
+# takes, background warm-up steps add their own timings, and report() lays them out on one timeline
+# Importing this module starts the clock, so main.py imports it before anything else
+
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """
+    Collects named startup phases as (label, thread, start offset, duration) in seconds,
+    relative to the moment the timer was created. Safe to use from worker threads.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+        self._lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        """ Seconds since the timer was created. """
+        return time.perf_counter() - self.started
+
+    def record(self, label: str, begin: float, end: float):
+        """ Adds a phase that ran from begin to end (time.perf_counter() values) on the current thread. """
+        thread = "main" if threading.current_thread() is threading.main_thread() else "background"
+        with self._lock: self.phases.append((label, thread, begin - self.started, end - begin))
+
+    @contextmanager
+    def phase(self, label: str):
+        """ Times the enclosed block as one phase. """
+        begin = time.perf_counter()
+        try: yield
+        finally: self.record(label, begin, time.perf_counter())
+
+    def lap(self, label: str, since: float | None = None) -> float:
+        """
+        Records the time from since (a perf_counter() value, e.g. the previous lap's return value)
+        to now as one phase, so consecutive blocks of code can be timed without nesting them.
+
+        Returns:
+            float: Now, to pass as since to the next lap.
+        """
+        now = time.perf_counter(); self.record(label, self.started if since is None else since, now)
+        return now
+
+    def mark(self, label: str):
+        """ Records a milestone (zero-length phase), e.g. the window's first paint. """
+        now = time.perf_counter(); self.record(label, now, now)
+
+    def report(self) -> str:
+        """ Phases in start order as an aligned text table, with main-thread and background totals. """
+        with self._lock: phases = sorted(self.phases, key=lambda phase: phase[2])
+        lines = ["--- Startup timing (seconds since launch) ---", f"{'start':>7} {'took':>7}  {'thread':<10} step"]
+        for label, thread, offset, duration in phases:
+            lines.append(f"{offset:7.3f} {duration:7.3f}  {thread:<10} {label}" if duration else f"{offset:7.3f} {'':>7}  {thread:<10} * {label}")
+        totals = {thread: sum(p[3] for p in phases if p[1] == thread) for thread in ("main", "background")}
+        lines.append(f"Main thread busy {totals['main']:.3f}s, background warm-up {totals['background']:.3f}s")
+        return "\n".join(lines)
+
+
+STARTUP_TIMER = StartupTimer()
+
+
+def warm_up(task, steps, timer: StartupTimer = STARTUP_TIMER) -> list[str]:
+    """
+    TaskRunner job: runs each (label, function) step in order on the worker thread, timing it,
+    so the imports it triggers are done before the user first needs them. Each finished step's
+    label is sent through task.report(); a failing step is logged and skipped (the feature that
+    needs it reports the error on first use).
+
+    Returns:
+        list[str]: Labels of the steps that failed.
+    """
+    failed = []
+    for label, step in steps:
+        task.check_cancelled()
+        try:
+            with timer.phase(f"warm-up: {label}"): step()
+            task.report(label)
+        except Exception:
+            print(f"Warning: background warm-up of {label} failed:"); traceback.print_exc(); failed.append(label)
+    return failed
@@ -0,0 +1,151 @@
+# gui/task_runner.py
+# Runs slow work (data fetches, backtests) on background threads and hands
+# results back to the Tk main loop through a thread-safe queue polled via after()
+
+import queue
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task function when its BackgroundTask has been cancelled."""
+
+
+class BackgroundTask:
+    """
+    Handle for one unit of background work.
+    The task function receives it as its first argument to report progress and poll for cancellation.
+    """
+    def __init__(self, name: str, result_queue: queue.Queue):
+        self.name = name
+        self.cancel_event = threading.Event()
+        self.future = None
+        self._queue = result_queue
+
+    @property
+    def cancelled(self) -> bool:
+        """ True once cancel() has been called. """
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        """ Requests cancellation. The task's result (if any) will be discarded. """
+        self.cancel_event.set()
+        # If the work never started it will never report back, so report the cancellation here
+        if self.future is not None and self.future.cancel(): self._queue.put(("cancelled", self, None))
+
+    def check_cancelled(self):
+        """ Raises TaskCancelled if cancellation was requested. Call between steps of long work. """
+        if self.cancel_event.is_set(): raise TaskCancelled(self.name)
+
+    def report(self, message: str):
+        """ Sends a progress message to the main thread (safe to call from the worker). """
+        self._queue.put(("progress", self, message))
+
+
+class TaskRunner:
+    """
+    Executes functions on a small thread pool and delivers their outcome to callbacks
+    on the Tk main thread. Callbacks are never invoked from worker threads, so they may
+    freely touch widgets.
+    """
+    def __init__(self, root, max_workers: int = 2, poll_interval_ms: int = 50):
+        """
+        Args:
+            root: Any Tk widget; its after() is used to poll the result queue.
+            max_workers (int): Size of the worker thread pool.
+            poll_interval_ms (int): How often the queue is drained while tasks are active.
+        """
+        self.root = root
+        self.poll_interval_ms = poll_interval_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task-runner")
+        self._queue = queue.Queue()
+        self._callbacks = {}  # BackgroundTask -> dict of callbacks
+        self._poll_job = None
+
+    @property
+    def active_tasks(self) -> list[BackgroundTask]:
+        """ Tasks submitted whose outcome has not been delivered yet. """
+        return list(self._callbacks)
+
+    def submit(self, name: str, func, *args, on_success=None, on_error=None, on_progress=None,
+               on_cancel=None, on_finally=None, **kwargs) -> BackgroundTask:
+        """
+        Runs func(task, *args, **kwargs) on a worker thread.
+
+        Args:
+            name (str): Label used in logs.
+            on_success: Called with the function's return value.
+            on_error: Called with the exception the function raised.
+            on_progress: Called with each message passed to task.report().
+            on_cancel: Called instead of on_success/on_error if the task was cancelled.
+            on_finally: Called last, whatever the outcome.
+
+        Returns:
+            BackgroundTask: Handle that can be used to cancel the work.
+        """
+        task = BackgroundTask(name, self._queue)
+        self._callbacks[task] = {"success": on_success, "error": on_error, "progress": on_progress,
+                                 "cancel": on_cancel, "finally": on_finally}
+        task.future = self._executor.submit(self._run, task, func, args, kwargs)
+        self._ensure_polling()
+        return task
+
+    def cancel_all(self):
+        """ Requests cancellation of every active task. """
+        for task in self.active_tasks: task.cancel()
+
+    def shutdown(self):
+        """ Cancels outstanding work and stops polling. Call before destroying the root window. """
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._poll_job:
+            try: self.root.after_cancel(self._poll_job)
+            except Exception: pass
+            self._poll_job = None
+        self._callbacks.clear()
+
+    # --- Worker side ---
+    def _run(self, task: BackgroundTask, func, args, kwargs):
+        try:
+            task.check_cancelled()
+            result = func(task, *args, **kwargs)
+            self._queue.put(("done", task, result))
+        except TaskCancelled:
+            self._queue.put(("cancelled", task, None))
+        except BaseException as e:
+            if task.cancelled: self._queue.put(("cancelled", task, None)); return  # Failure caused by the cancellation
+            print(f"\n--- Background task '{task.name}' failed ---"); traceback.print_exc()
+            self._queue.put(("error", task, e))
+
+    # --- Main thread side ---
+    def _ensure_polling(self):
+        if self._poll_job is None:
+            self._poll_job = self.root.after(self.poll_interval_ms, self._poll)
+
+    def _poll(self):
+        self._poll_job = None
+        while True:
+            try: kind, task, payload = self._queue.get_nowait()
+            except queue.Empty: break
+            callbacks = self._callbacks.get(task)
+            if callbacks is None: continue  # Runner was shut down or task already delivered
+            if kind == "progress":
+                if not task.cancelled: self._invoke(callbacks["progress"], payload)
+                continue
+            del self._callbacks[task]
+            if task.cancelled or kind == "cancelled": self._invoke(callbacks["cancel"])
+            elif kind == "done": self._invoke(callbacks["success"], payload)
+            else: self._invoke(callbacks["error"], payload)
+            self._invoke(callbacks["finally"])
+        # Keep polling only while there is something to wait for, so an idle app costs nothing
+        if self._callbacks:
+            try:
+                if self.root.winfo_exists(): self._ensure_polling()
+            except Exception: pass
+
+    @staticmethod
+    def _invoke(callback, *args):
+        if callback is None: return
+        try: callback(*args)
+        except Exception: print("\n--- Error in task callback ---"); traceback.print_exc()
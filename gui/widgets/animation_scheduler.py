@@ -0,0 +1,89 @@
+# gui/widgets/animation_scheduler.py
+# Single frame clock for all animated widgets (LED/neon/matrix flicker)
+
+import time
+import traceback
+
+
+class AnimationScheduler:
+    """
+    Drives every registered animated widget from one Tk after() loop at a fixed frame rate,
+    instead of each widget (or each matrix pixel) keeping its own random timer.
+
+    A registered widget must provide animate(now_ms), which is called once per frame and
+    decides for itself whether anything is due. The loop only runs while at least one widget
+    is registered and the scheduler is not paused, so a dark display costs no timers at all.
+    """
+    def __init__(self, root, fps: float = 12, low_power_fps: float = 3):
+        """
+        Args:
+            root: Any Tk widget; its after() drives the frame loop.
+            fps (float): Normal frame rate.
+            low_power_fps (float): Frame rate used while low-power mode is on
+                                   (e.g. on battery or over remote desktop).
+        """
+        self.root = root
+        self.fps = fps
+        self.low_power_fps = low_power_fps
+        self.low_power = False
+        self.paused = False
+        self._widgets = {}  # Insertion-ordered set of registered widgets
+        self._frame_job = None
+
+    @staticmethod
+    def now_ms() -> float:
+        """ Monotonic clock (milliseconds) shared with the widgets' animate() calls. """
+        return time.monotonic() * 1000.0
+
+    @property
+    def frame_interval_ms(self) -> int:
+        """ Delay between frames at the current frame rate. """
+        fps = self.low_power_fps if self.low_power else self.fps
+        return max(1, int(1000 / max(fps, 0.1)))
+
+    def register(self, widget):
+        """ Adds a widget to the frame loop (no-op if already registered). """
+        self._widgets[widget] = None
+        self._ensure_running()
+
+    def unregister(self, widget):
+        """ Removes a widget from the frame loop. """
+        self._widgets.pop(widget, None)
+
+    def set_paused(self, paused: bool):
+        """ Freezes (True) or resumes (False) all animation. """
+        self.paused = bool(paused)
+        if self.paused: self._cancel_frame()
+        else: self._ensure_running()
+
+    def set_low_power(self, enabled: bool):
+        """ Switches between the normal and the low-power frame rate. """
+        self.low_power = bool(enabled)
+
+    def stop(self):
+        """ Stops the loop and forgets all widgets. Call before destroying the root window. """
+        self._cancel_frame()
+        self._widgets.clear()
+
+    # --- Frame loop ---
+    def _ensure_running(self):
+        if self._frame_job is None and self._widgets and not self.paused:
+            try: self._frame_job = self.root.after(self.frame_interval_ms, self._frame)
+            except Exception: self._frame_job = None
+
+    def _cancel_frame(self):
+        if self._frame_job is not None:
+            try: self.root.after_cancel(self._frame_job)
+            except Exception: pass
+            self._frame_job = None
+
+    def _frame(self):
+        self._frame_job = None
+        now = self.now_ms()
+        for widget in list(self._widgets):
+            try: widget.animate(now)
+            except Exception:
+                # A broken or destroyed widget must not stop the other animations
+                print(f"Animation error in {type(widget).__name__}, unregistering it:"); traceback.print_exc()
+                self.unregister(widget)
+        self._ensure_running()
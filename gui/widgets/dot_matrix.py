@@ -1,6 +1,9 @@
 # gui/widgets/dot_matrix.py
 # Dot Matrix display widgets adapted from provided code.
 # Added dynamic color support and flicker enabling.
+# MatrixText renders the whole matrix on a single canvas (MatrixPixel remains as a standalone widget).
+# Flicker can be driven by a shared AnimationScheduler; MatrixText flickers a fixed-size batch of lit pixels per frame.
+# Glyphs are precompiled to row bitmasks; display_text only updates pixels that differ from the current frame.
 
 import customtkinter as ctk
 import math
@@ -33,7 +36,7 @@ def lighten_color(hex_color, factor=0.5):
 class MatrixPixel(ctk.CTkFrame):
     """Simulates a single pixel in a dot matrix display."""
     # --- Modified: Store base_color ---
-    def __init__(self, master, color="#00ff00", size=8, explicit_canvas_bg="#050505", **kwargs):
+    def __init__(self, master, color="#00ff00", size=8, explicit_canvas_bg="#050505", scheduler=None, **kwargs):
         super().__init__(master, width=size, height=size, fg_color="transparent", **kwargs)
 
         self.size = size
@@ -42,6 +45,8 @@ class MatrixPixel(ctk.CTkFrame):
         self.burn_in_level = 0.0
         self.flicker_enabled = False
         self.flicker_job = None
+        self.scheduler = scheduler # Shared AnimationScheduler; None -> own after() timer
+        self._next_flicker_ms = 0.0
         self.pixel_obj = None
 
         self._update_colors() # Calculate initial on/off colors
@@ -84,27 +89,42 @@ class MatrixPixel(ctk.CTkFrame):
             self.canvas.lift(self.pixel_obj)
         # Manage flicker state after drawing
         if self.state == 'on' and self.flicker_enabled: self._start_flicker()
-        elif self.state == 'off' and self.flicker_job:
-            if self.flicker_job: self.after_cancel(self.flicker_job); self.flicker_job = None
+        elif self.state == 'off': self._stop_flicker()
 
     def _start_flicker(self):
         """Handles pixel flickering."""
         if self.flicker_job: self.after_cancel(self.flicker_job); self.flicker_job = None
-        if not self.flicker_enabled or self.state != "on" or not self.pixel_obj or not self.canvas.winfo_exists(): return
-        intensity = random.uniform(0.75, 1.0)
-        flicker_color = darken_color(self.on_color, intensity) # Flicker the calculated on_color
-        try:
-            if self.pixel_obj in self.canvas.find_all(): self.canvas.itemconfig(self.pixel_obj, fill=flicker_color)
-            else: self.flicker_job = None; return
-        except tk.TclError: self.flicker_job = None; return
-        except Exception: self.flicker_job = None; return
+        if not self.flicker_enabled or self.state != "on" or not self.pixel_obj or not self.canvas.winfo_exists(): self._stop_flicker(); return
+        if not self._flicker_step(): self._stop_flicker(); return
         delay = random.randint(100, 600)
-        if self.flicker_enabled and self.state == "on":
+        if self.scheduler is not None:
+            self._next_flicker_ms = self.scheduler.now_ms() + delay; self.scheduler.register(self)
+        elif self.flicker_enabled and self.state == "on":
             try:
                 if self.winfo_exists(): self.flicker_job = self.after(delay, self._start_flicker)
                 else: self.flicker_job = None
             except Exception: self.flicker_job = None
 
+    def _flicker_step(self):
+        """Applies one random flicker intensity. Returns False if the pixel item is gone."""
+        intensity = random.uniform(0.75, 1.0)
+        flicker_color = darken_color(self.on_color, intensity) # Flicker the calculated on_color
+        try:
+            if self.pixel_obj in self.canvas.find_all(): self.canvas.itemconfig(self.pixel_obj, fill=flicker_color); return True
+        except Exception: pass
+        return False
+
+    def _stop_flicker(self):
+        """Cancels any pending flicker timer and leaves the scheduler."""
+        if self.flicker_job: self.after_cancel(self.flicker_job); self.flicker_job = None
+        if self.scheduler is not None: self.scheduler.unregister(self)
+
+    def animate(self, now_ms):
+        """Frame callback from the AnimationScheduler."""
+        if now_ms < self._next_flicker_ms: return
+        if not self.flicker_enabled or self.state != "on" or not self.winfo_exists() or not self._flicker_step(): self._stop_flicker(); return
+        self._next_flicker_ms = now_ms + random.randint(100, 600)
+
     def set_state(self, state):
         """Sets the pixel state ('on' or 'off')."""
         new_state = "on" if state == "on" else "off"
@@ -135,9 +155,7 @@ class MatrixPixel(ctk.CTkFrame):
             if self.flicker_enabled and self.state == "on":
                 self._start_flicker()
             elif not self.flicker_enabled:
-                if self.flicker_job:
-                    self.after_cancel(self.flicker_job)
-                    self.flicker_job = None
+                self._stop_flicker()
                 # If turning flicker off while pixel is on, redraw to show steady color
                 if self.state == 'on' and self.winfo_exists():
                     self.draw()
@@ -145,11 +163,21 @@ class MatrixPixel(ctk.CTkFrame):
 
 # --- MatrixText Class ---
 class MatrixText:
-    """Helper class for creating text displays using matrix pixels."""
+    """
+    Text display that simulates a dot matrix panel.
+    All pixels are pre-created items on one shared canvas (a filled square plus a hidden
+    glow outline each), so updates are plain itemconfig calls instead of per-pixel widgets.
+    Each animation frame re-dims a fixed-size random batch of lit pixels, so the flicker cost
+    per frame does not grow with the amount of lit text.
+    Each matrix row is also tracked as an integer bitmask (bit c = column c lit), so a new frame
+    is diffed against the current one with a few integer operations per row.
+    """
+    FLICKER_TICK_MS = 100 # Frame interval when no scheduler is given
+    FLICKER_BATCH_SIZE = 32 # Lit pixels re-dimmed per frame
+
     # --- Modified: Store default color ---
-    def __init__(self, parent, rows=7, cols=60, pixel_size=4, char_spacing=1, bg_color="#050505", default_on_color="#00ff00"):
+    def __init__(self, parent, rows=7, cols=60, pixel_size=4, char_spacing=1, bg_color="#050505", default_on_color="#00ff00", scheduler=None):
         self.frame = ctk.CTkFrame(parent, fg_color=bg_color)
-        self.pixels = []
         self.rows = rows
         self.cols = cols
         self.pixel_size = pixel_size
@@ -157,21 +185,138 @@ class MatrixText:
         self.bg_color = bg_color
         self.default_on_color = default_on_color
         self.current_color = default_on_color # Track the current color for the text
+        self.flicker_job = None
+        self.scheduler = scheduler # Shared AnimationScheduler; None -> own after() timer
 
         self._char_map = self._create_char_map()
+        self._glyphs = self._compile_glyphs(self._char_map)
+        self._default_glyph = (0b11111,) * 7 # Unknown characters show as a solid block
+        self._col_mask = (1 << cols) - 1
+        self._frame_key = None # (text, color) last passed to display_text
+
+        self.canvas = tk.Canvas(self.frame, width=cols * pixel_size, height=rows * pixel_size,
+                                highlightthickness=0, borderwidth=0, bg=bg_color)
+        self.canvas.pack(padx=0, pady=0)
+
+        # Per-pixel state, indexed [row][col]
+        self.burn_in = [[random.uniform(0.1, 0.7) for _ in range(cols)] for _ in range(rows)]
+        self.lit = [[False] * cols for _ in range(rows)]
+        self.row_bits = [0] * rows # Lit pixels of each row as a bitmask
+        self.pixel_colors = [[default_on_color] * cols for _ in range(rows)] # Base color each pixel was lit with
+        self._lit_list = [] # Lit (row, col) positions, for O(1) random batch sampling
+        self._lit_index = {} # (row, col) -> index into _lit_list
+        self._palettes = {} # base color -> per-pixel (on, off, glow) colors
 
-        for r in range(rows):
-            pixel_row = []
-            row_frame = ctk.CTkFrame(self.frame, fg_color=bg_color)
-            row_frame.pack(pady=0, fill="x", expand=False)
-            for c in range(cols):
-                burn_in = random.uniform(0.1, 0.7)
-                # Pass explicit bg and default on color
-                pixel = MatrixPixel(row_frame, color=self.default_on_color, size=pixel_size, explicit_canvas_bg=self.bg_color)
-                pixel.pack(side="left", padx=0, pady=0)
-                pixel.set_burn_in(burn_in)
-                pixel_row.append(pixel)
-            self.pixels.append(pixel_row)
+        # Glow outlines are created first so every pixel square sits above all glows
+        inset = 1
+        self.glow_items = [[self.canvas.create_rectangle(c * pixel_size + inset - 1, r * pixel_size + inset - 1,
+                                                          (c + 1) * pixel_size - inset + 1, (r + 1) * pixel_size - inset + 1,
+                                                          fill="", outline="", width=1, stipple="gray25", state="hidden")
+                            for c in range(cols)] for r in range(rows)]
+        palette = self._palette(default_on_color)
+        self.pixel_items = [[self.canvas.create_rectangle(c * pixel_size + inset, r * pixel_size + inset,
+                                                           (c + 1) * pixel_size - inset, (r + 1) * pixel_size - inset,
+                                                           fill=palette[r][c][1], outline="")
+                             for c in range(cols)] for r in range(rows)]
+
+    def _palette(self, base_color):
+        """Returns (cached) per-pixel (on, off, glow) colors for a base color, applying each pixel's burn-in."""
+        palette = self._palettes.get(base_color)
+        if palette is None:
+            base_off_color = darken_color(base_color, 0.05)
+            palette = []
+            for burn_row in self.burn_in:
+                row = []
+                for burn_in_level in burn_row:
+                    on_color = darken_color(base_color, 1.0 - (burn_in_level * 0.3))
+                    off_color = lighten_color(base_off_color, burn_in_level * 0.15)
+                    row.append((on_color, off_color, lighten_color(on_color, 0.4)))
+                palette.append(row)
+            self._palettes[base_color] = palette
+        return palette
+
+    def set_pixel(self, row, col, on, color=None):
+        """Turns a single pixel on (in the given color) or off."""
+        color = color or self.current_color
+        on_color, off_color, glow_color = self._palette(color)[row][col]
+        if on:
+            self.canvas.itemconfig(self.pixel_items[row][col], fill=on_color)
+            self.canvas.itemconfig(self.glow_items[row][col], outline=glow_color, state="normal")
+            self._track_lit((row, col), True)
+        else:
+            self.canvas.itemconfig(self.pixel_items[row][col], fill=off_color)
+            self.canvas.itemconfig(self.glow_items[row][col], state="hidden")
+            self._track_lit((row, col), False)
+        self.lit[row][col] = bool(on)
+        if on: self.row_bits[row] |= 1 << col
+        else: self.row_bits[row] &= ~(1 << col)
+        self.pixel_colors[row][col] = color
+        self._frame_key = None # Frame no longer matches the last display_text call
+        if on: self._ensure_flicker()
+
+    def _track_lit(self, pos, on):
+        """Adds/removes a position in the lit list (swap-remove keeps both operations O(1))."""
+        index = self._lit_index.get(pos)
+        if on:
+            if index is None: self._lit_index[pos] = len(self._lit_list); self._lit_list.append(pos)
+        elif index is not None:
+            last = self._lit_list.pop()
+            if last != pos: self._lit_list[index] = last; self._lit_index[last] = index
+            del self._lit_index[pos]
+
+    def _ensure_flicker(self):
+        if not self._lit_list: return
+        if self.scheduler is not None: self.scheduler.register(self)
+        elif self.flicker_job is None: self.flicker_job = self.canvas.after(self.FLICKER_TICK_MS, self._flicker_tick)
+
+    def _flicker_tick(self):
+        """Own-timer fallback used when no scheduler is attached."""
+        self.flicker_job = None
+        try:
+            if not self.canvas.winfo_exists(): return
+            self._flicker_batch()
+        except tk.TclError: return
+        self._ensure_flicker()
+
+    def animate(self, now_ms):
+        """Frame callback from the AnimationScheduler."""
+        if not self._lit_list or not self.canvas.winfo_exists(): self.scheduler.unregister(self); return
+        self._flicker_batch()
+
+    def _flicker_batch(self):
+        """Dims a random batch of lit pixels to a random intensity each."""
+        lit = self._lit_list
+        batch = lit if len(lit) <= self.FLICKER_BATCH_SIZE else random.sample(lit, self.FLICKER_BATCH_SIZE)
+        for row, col in batch:
+            on_color = self._palette(self.pixel_colors[row][col])[row][col][0]
+            self.canvas.itemconfig(self.pixel_items[row][col], fill=darken_color(on_color, random.uniform(0.75, 1.0)))
+
+    @staticmethod
+    def _compile_glyphs(char_map):
+        """Converts the 5x7 character map into per-row bitmasks (bit i = glyph column i)."""
+        return {char: tuple(sum(1 << i for i, is_on in enumerate(row) if is_on) for row in pattern)
+                for char, pattern in char_map.items()}
+
+    def _glyph(self, char):
+        return self._glyphs.get(char.upper(), self._default_glyph)
+
+    def _apply_rows(self, target_rows, color, region=None):
+        """
+        Moves the display to the given row bitmasks, lighting pixels in one color.
+        Only pixels that change state, or stay lit but change color, are touched.
+        region (column bitmask) limits the update to those columns; None means the whole row.
+        """
+        region = self._col_mask if region is None else region
+        for row, target in enumerate(target_rows):
+            current = self.row_bits[row] & region; target &= region
+            changed = current ^ target
+            staying_lit = current & target # Recolor these only if their color differs
+            while staying_lit:
+                low = staying_lit & -staying_lit; staying_lit ^= low; col = low.bit_length() - 1
+                if self.pixel_colors[row][col] != color: changed |= low
+            while changed:
+                low = changed & -changed; changed ^= low; col = low.bit_length() - 1
+                self.set_pixel(row, col, bool(target & low), color if target & low else self.pixel_colors[row][col])
 
     def _create_char_map(self): # (remains the same as previous version)
         """Creates the 5x7 character map."""
@@ -223,52 +368,45 @@ class MatrixText:
 
     # --- Modified: display_text accepts color ---
     def display_text(self, text, color=None):
-        """Displays text on the matrix, optionally setting the color."""
-        self.clear()
+        """
+        Displays text on the matrix, optionally setting the color.
+        The new frame is built as row bitmasks and diffed against the current one, so only
+        pixels that actually change are updated (nothing at all if the text and color are unchanged).
+        """
         # Update current color, fallback to default if None
         self.current_color = color if color is not None else self.default_on_color
+        frame_key = (text, self.current_color)
+        if frame_key == self._frame_key: return
 
         char_width_total = 5 + self.char_spacing
         current_col = 0
         line = text.split('\n')[0] # Process first line only
+        target_rows = [0] * self.rows
 
         for char in line:
             if current_col + 5 <= self.cols:
-                self.display_char(char, current_col) # display_char now uses self.current_color
+                for r_idx, row_mask in enumerate(self._glyph(char)[:self.rows]):
+                    target_rows[r_idx] |= row_mask << current_col
                 current_col += char_width_total
             else: break
 
+        self._apply_rows(target_rows, self.current_color)
+        self._frame_key = frame_key
+
     # --- Modified: display_char uses current_color and enables flicker ---
     def display_char(self, char, start_col):
-        """Displays a single character pattern at the specified column."""
-        default_pattern = [[1]*5]*7
-        pattern = self._char_map.get(char.upper(), default_pattern)
-
-        for r_idx, row_pattern in enumerate(pattern):
-            if r_idx < self.rows:
-                for c_idx, is_on in enumerate(row_pattern):
-                    target_col = start_col + c_idx
-                    if target_col < self.cols:
-                        if r_idx < len(self.pixels) and target_col < len(self.pixels[r_idx]):
-                            pixel = self.pixels[r_idx][target_col]
-                            if pixel.winfo_exists():
-                                # Set the base color for the pixel first
-                                pixel.set_base_color(self.current_color)
-                                # Set the state (this will draw with updated on/off colors)
-                                pixel.set_state("on" if is_on else "off")
-                                # Enable flicker only for 'on' pixels
-                                pixel.enable_flicker(is_on)
+        """Displays a single character pattern at the specified column (other columns are left as they are)."""
+        target_rows = [0] * self.rows
+        for r_idx, row_mask in enumerate(self._glyph(char)[:self.rows]):
+            target_rows[r_idx] = row_mask << start_col # Lit pixels flicker until turned off again
+        self._apply_rows(target_rows, self.current_color, region=(0b11111 << start_col) & self._col_mask)
 
     # --- Modified: clear also disables flicker ---
     def clear(self):
-        """Turns off all pixels and disables their flicker."""
-        for row in self.pixels:
-            for pixel in row:
-                 if pixel.winfo_exists():
-                    pixel.enable_flicker(False) # Disable flicker first
-                    pixel.set_state("off")     # Then turn off
+        """Turns off all lit pixels, which also stops their flicker."""
+        for row, col in list(self._lit_list): self.set_pixel(row, col, False, self.pixel_colors[row][col])
 
     def get_frame(self):
-        """Returns the main frame containing the pixels."""
+        """Returns the main frame containing the matrix canvas."""
         return self.frame
 
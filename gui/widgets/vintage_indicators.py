@@ -1,5 +1,6 @@
 # gui/widgets/vintage_indicators.py
 # Contains custom vintage-style indicator widgets like WornLED and NeonLight
+# Flicker can be driven by a shared AnimationScheduler instead of per-widget after() timers
 
 import customtkinter as ctk
 import math
@@ -12,7 +13,7 @@ class WornLED(ctk.CTkFrame):
     """
     A CustomTkinter widget simulating a worn, flickering LED indicator.
     """
-    def __init__(self, master, color="#ff0000", size=30, explicit_canvas_bg=None, **kwargs):
+    def __init__(self, master, color="#ff0000", size=30, explicit_canvas_bg=None, scheduler=None, **kwargs):
         """
         Initializes the WornLED widget.
 
@@ -22,6 +23,8 @@ class WornLED(ctk.CTkFrame):
             size (int): The diameter of the LED widget.
             explicit_canvas_bg (str | None): Explicit hex color for the canvas background.
                                             If None, uses theme default.
+            scheduler (AnimationScheduler | None): Shared frame clock driving the flicker.
+                                                   If None, the LED uses its own after() timer.
             **kwargs: Additional arguments for the CTkFrame.
         """
         super().__init__(master, width=size, height=size, fg_color="transparent", **kwargs)
@@ -33,6 +36,8 @@ class WornLED(ctk.CTkFrame):
         self.wear_level = 0.7
         self.flicker_enabled = False
         self.flicker_job = None
+        self.scheduler = scheduler
+        self._next_flicker_ms = 0.0
         self.led_obj = None
 
         if explicit_canvas_bg is not None:
@@ -122,9 +127,7 @@ class WornLED(ctk.CTkFrame):
             dark_color = self._darken_color(self.color, 0.3)
             self.led_obj = self.canvas.create_oval(x0, y0, x1, y1, fill=dark_color, outline="")
             self.canvas.create_oval(x0 + 1, y0 + 1, x1 - 1, y1 - 1, fill="", outline=off_indent_outline, width=1)
-            if self.flicker_job:
-                self.after_cancel(self.flicker_job)
-                self.flicker_job = None
+            self._stop_flicker()
 
     def _add_led_texture(self, x0, y0, x1, y1):
         """ Adds small specks inside the lit LED area to simulate dust/imperfections. """
@@ -157,19 +160,38 @@ class WornLED(ctk.CTkFrame):
         """ Initiates the flickering effect if the LED is 'on'. """
         if self.flicker_job: self.after_cancel(self.flicker_job); self.flicker_job = None
         if self._state != "on" or not self.flicker_enabled:
+            self._stop_flicker()
             if self.led_obj and self.canvas.winfo_exists():
                  try:
                      current_fill = self.canvas.itemcget(self.led_obj, "fill")
                      if current_fill != self.color: self.canvas.itemconfig(self.led_obj, fill=self.color)
                  except tk.TclError: pass
             return
+        delay = self._flicker_step()
+        if self.scheduler is not None:
+            self._next_flicker_ms = self.scheduler.now_ms() + delay; self.scheduler.register(self)
+        elif self.winfo_exists(): self.flicker_job = self.after(delay, self._start_flicker)
+        else: self.flicker_job = None
+
+    def _flicker_step(self) -> int:
+        """ Applies one random flicker intensity and returns the delay (ms) until the next one. """
         intensity = random.uniform(0.75, 1.0); flicker_color = self._darken_color(self.color, intensity)
         if self.led_obj and self.canvas.winfo_exists():
             try: self.canvas.itemconfig(self.led_obj, fill=flicker_color)
             except tk.TclError: pass
-        base_delay = 400 if random.random() < 0.8 else 100; jitter = random.randint(0, 500); delay = base_delay + jitter
-        if self.winfo_exists(): self.flicker_job = self.after(delay, self._start_flicker)
-        else: self.flicker_job = None
+        base_delay = 400 if random.random() < 0.8 else 100; jitter = random.randint(0, 500)
+        return base_delay + jitter
+
+    def _stop_flicker(self):
+        """ Cancels any pending flicker timer and leaves the scheduler. """
+        if self.flicker_job: self.after_cancel(self.flicker_job); self.flicker_job = None
+        if self.scheduler is not None: self.scheduler.unregister(self)
+
+    def animate(self, now_ms: float):
+        """ Frame callback from the AnimationScheduler; flickers once the current delay has elapsed. """
+        if now_ms < self._next_flicker_ms: return
+        if self._state != "on" or not self.flicker_enabled or not self.winfo_exists(): self._stop_flicker(); return
+        self._next_flicker_ms = now_ms + self._flicker_step()
 
     def set_state(self, state: str):
         """ Sets the state of the LED ('on' or 'off'). """
@@ -199,7 +221,7 @@ class WornLED(ctk.CTkFrame):
         if flicker_state_changed or self._state == "on":
             if enabled and self._state == "on": self._start_flicker()
             elif not enabled:
-                if self.flicker_job: self.after_cancel(self.flicker_job); self.flicker_job = None
+                self._stop_flicker()
                 self.draw()
 
 # --- NeonLight Class (Remains the same as previous version) ---
@@ -208,11 +230,12 @@ class NeonLight(ctk.CTkFrame):
     A CustomTkinter widget simulating a flickering neon tube light.
     (Provided by user, not integrated into the main trading app currently)
     """
-    def __init__(self, master, color="#ff00ff", width=100, height=30, explicit_canvas_bg=None, **kwargs):
+    def __init__(self, master, color="#ff00ff", width=100, height=30, explicit_canvas_bg=None, scheduler=None, **kwargs):
         super().__init__(master, width=width, height=height, fg_color="transparent", **kwargs)
         self.width = width; self.height = height; self.original_color = color; self.color = color
         self._state = "off"; self.wear_level = 0.7; self.flicker_enabled = False
         self.flicker_job = None; self.tube_obj = None
+        self.scheduler = scheduler; self._next_flicker_ms = 0.0
         if explicit_canvas_bg is not None: canvas_bg_color = explicit_canvas_bg
         else:
             default_bg_color = ctk.ThemeManager.theme["CTkFrame"]["fg_color"]
@@ -264,7 +287,7 @@ class NeonLight(ctk.CTkFrame):
             self.tube_obj = self.canvas.create_rectangle(tube_left, tube_top, tube_right, tube_bottom, fill=dark_color, outline=self._apply_appearance_mode("#222222"))
             reflection_color = self._apply_appearance_mode("#AAAAAA")
             self.canvas.create_rectangle(tube_left + tube_width*0.1, tube_top + tube_height*0.1, tube_right - tube_width*0.1, tube_top + tube_height * 0.4, fill=reflection_color, outline="", stipple="gray50")
-            if self.flicker_job: self.after_cancel(self.flicker_job); self.flicker_job = None
+            self._stop_flicker()
     def _add_wear_marks(self):
         speck_colors = [self._apply_appearance_mode(c) for c in ["#444444", "#555555", "#666666"]]
         for _ in range(int(15 * self.wear_level)):
@@ -278,12 +301,19 @@ class NeonLight(ctk.CTkFrame):
     def _start_flicker(self):
         if self.flicker_job: self.after_cancel(self.flicker_job); self.flicker_job = None
         if self._state != "on" or not self.flicker_enabled:
+            self._stop_flicker()
             if self.tube_obj and self.canvas.winfo_exists():
                  try:
                      current_fill = self.canvas.itemcget(self.tube_obj, "fill")
                      if current_fill != self.color: self.canvas.itemconfig(self.tube_obj, fill=self.color)
                  except tk.TclError: pass
             return
+        delay = self._flicker_step()
+        if self.scheduler is not None:
+            self._next_flicker_ms = self.scheduler.now_ms() + delay; self.scheduler.register(self)
+        elif self.winfo_exists(): self.flicker_job = self.after(delay, self._start_flicker)
+        else: self.flicker_job = None
+    def _flicker_step(self) -> int:
         flicker_type = random.choices(["minor", "major", "off", "normal"], weights=[0.6, 0.25, 0.1, 0.05], k=1)[0]
         flicker_color = self.color
         if flicker_type == "minor": intensity = random.uniform(0.75, 0.9); flicker_color = self._darken_color(self.color, intensity)
@@ -292,10 +322,16 @@ class NeonLight(ctk.CTkFrame):
         if self.tube_obj and self.canvas.winfo_exists():
             try: self.canvas.itemconfig(self.tube_obj, fill=flicker_color)
             except tk.TclError: pass
-        if flicker_type in ["major", "off"]: delay = random.randint(40, 120)
-        else: base = 800 if random.random() < 0.6 else 250; jitter = random.randint(0, 600); delay = base + jitter
-        if self.winfo_exists(): self.flicker_job = self.after(delay, self._start_flicker)
-        else: self.flicker_job = None
+        if flicker_type in ["major", "off"]: return random.randint(40, 120)
+        base = 800 if random.random() < 0.6 else 250; jitter = random.randint(0, 600)
+        return base + jitter
+    def _stop_flicker(self):
+        if self.flicker_job: self.after_cancel(self.flicker_job); self.flicker_job = None
+        if self.scheduler is not None: self.scheduler.unregister(self)
+    def animate(self, now_ms: float):
+        if now_ms < self._next_flicker_ms: return
+        if self._state != "on" or not self.flicker_enabled or not self.winfo_exists(): self._stop_flicker(); return
+        self._next_flicker_ms = now_ms + self._flicker_step()
     def set_state(self, state: str):
         new_state = state.lower();
         if new_state not in ["on", "off"]: return
@@ -309,7 +345,7 @@ class NeonLight(ctk.CTkFrame):
         if flicker_state_changed or self._state == "on":
             if enabled and self._state == "on": self._start_flicker()
             elif not enabled:
-                if self.flicker_job: self.after_cancel(self.flicker_job); self.flicker_job = None
+                self._stop_flicker()
                 self.draw()
 
 # --- Example Usage (Remains the same) ---
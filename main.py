@@ -1,8 +1,13 @@
 # main.py
 # Entry point for the application
+# Heavy libraries are imported after the window appears; gui/startup.py times each step
 
-import customtkinter as ctk
-from gui.app import App
+from gui.startup import STARTUP_TIMER # Imported first: starts the startup clock
+
+with STARTUP_TIMER.phase("import customtkinter"):
+    import customtkinter as ctk
+with STARTUP_TIMER.phase("import gui.app"):
+    from gui.app import App
 import os
 from dotenv import load_dotenv
 
@@ -22,4 +27,4 @@ if __name__ == "__main__":
     # Initialize the main application window
     app = App()
     # Start the Tkinter event loop
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
@@ -0,0 +1,108 @@
+# tests/test_incremental.py
+# Resumed incremental backtests must equal a full rerun on the longer history (synthetic data, every strategy
+# the vector engine supports), and must refuse to resume when the history no longer extends the snapshot's
+
+import pickle
+import zlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading import vector_backtester
+from trading.incremental import snapshot_backtest, resume_backtest, supports
+from trading.strategy_registry import STRATEGY_LOADERS
+from trading.synthetic_data import synthetic_ohlcv
+from trading.vector_backtester import FAST_METRICS
+
+STRATEGIES = [name for name in STRATEGY_LOADERS if supports(name)]
+REGIMES = ("trending", "gapped")
+CUTS = (0.1, 0.5, 0.9)
+
+
+@pytest.fixture(scope="module", params=REGIMES)
+def data(request) -> pd.DataFrame:
+    return synthetic_ohlcv(1500, regime=request.param, seed=11)
+
+
+def assert_same_metrics(full: dict, resumed: dict):
+    """ Trades, equity and the ratios from them are exact; Sharpe and SQN come from running sums. """
+    for key in FAST_METRICS:
+        assert np.isclose(full[key], resumed[key], rtol=1e-9, atol=1e-12, equal_nan=True), f"{key}: {full[key]} != {resumed[key]}"
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+@pytest.mark.parametrize("cut", CUTS)
+@pytest.mark.parametrize("appended", (1, 5, 60))
+def test_resume_after_appended_bars_matches_full_run(data, strategy, cut, appended):
+    prefix = int(len(data) * cut); target = data.iloc[:prefix + appended]
+    _, snapshot = snapshot_backtest(strategy, data.iloc[:prefix])
+    resumed = resume_backtest(snapshot, target)
+    full, _ = snapshot_backtest(strategy, target)
+    if snapshot["state"]["start"] >= prefix: assert resumed is None; return  # Still warming up: must rerun
+    assert resumed is not None
+    assert_same_metrics(full, resumed[0])
+    assert resumed[1]["bars"] == len(target) and resumed[1]["last_bar"] == target.index[-1]
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_chained_single_bar_resumes_match_full_run(data, strategy):
+    """ A daily refresh resumes each night from the previous night's snapshot. """
+    prefix = len(data) // 2; end = prefix + 60
+    _, snapshot = snapshot_backtest(strategy, data.iloc[:prefix])
+    for bars in range(prefix + 1, end + 1):
+        result = resume_backtest(snapshot, data.iloc[:bars])
+        assert result is not None
+        snapshot = result[1]
+    full, full_snapshot = snapshot_backtest(strategy, data.iloc[:end])
+    assert_same_metrics(full, result[0])
+    assert snapshot["state"]["loop"]["open_trade"] == full_snapshot["state"]["loop"]["open_trade"]
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_window_resumes_from_untrimmed_history(data, strategy):
+    """ A period window drops its oldest bar every day: it resumes from the untrimmed history, never from the trimmed window. """
+    first, prefix = 75, 750
+    _, snapshot = snapshot_backtest(strategy, data.iloc[first:prefix])
+    resumed = resume_backtest(snapshot, data.iloc[:prefix + 1])
+    full, _ = snapshot_backtest(strategy, data.iloc[first:prefix + 1])
+    assert resumed is not None
+    assert_same_metrics(full, resumed[0])
+    assert resume_backtest(snapshot, data.iloc[first + 1:prefix + 1]) is None
+
+
+@pytest.mark.parametrize("position", (-1, -30))
+def test_changed_recent_history_is_not_resumed(data, position):
+    _, snapshot = snapshot_backtest("SMA Crossover", data.iloc[:1000])
+    revised = data.iloc[:1010].copy(); revised.iloc[1000 + position, revised.columns.get_loc("close")] *= 1.01
+    assert resume_backtest(snapshot, revised) is None
+
+
+def test_shorter_history_or_other_version_is_not_resumed(data):
+    _, snapshot = snapshot_backtest("SMA Crossover", data.iloc[:1000])
+    assert resume_backtest(snapshot, data.iloc[:999]) is None
+    assert resume_backtest({**snapshot, "version": snapshot["version"] - 1}, data.iloc[:1010]) is None
+
+
+def test_snapshot_size_does_not_grow_with_history():
+    data = synthetic_ohlcv(20_000, seed=3)
+    sizes = []
+    for bars in (1_000, 20_000):
+        _, snapshot = snapshot_backtest("RSI Oscillator", data.iloc[:bars - 1])
+        _, snapshot = resume_backtest(snapshot, data.iloc[:bars])
+        sizes.append(len(zlib.compress(pickle.dumps(snapshot))))
+    assert sizes[1] < 1.2 * sizes[0]
+
+
+@pytest.mark.parametrize("freq", ("B", "D", "h", "W-FRI", "ME"))
+def test_metric_totals_match_fast_metrics(freq):
+    """ Totals fed in chunks give fast_metrics on the whole run, whatever period the Sharpe ratio samples. """
+    data = synthetic_ohlcv(3000, seed=5, freq=freq)
+    stats, _ = snapshot_backtest("SMA Crossover", data)
+    equity = stats["_equity_curve"]["Equity"].to_numpy(); trades = stats["_trades"]
+    trade_dicts = [{"pnl": row.PnL, "entry_bar": row.EntryBar, "exit_bar": row.ExitBar} for row in trades.itertuples()]
+    totals = None
+    for start, end in ((0, 500), (500, 501), (501, 2000), (2000, len(data))):
+        closed = [t for t in trade_dicts if start <= t["exit_bar"] < end]
+        totals = vector_backtester.update_metric_totals(totals, equity[start:end], closed, data.index[start:end])
+    assert_same_metrics({key: stats[key] for key in FAST_METRICS}, vector_backtester.metrics_from_totals(totals))
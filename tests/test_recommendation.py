@@ -0,0 +1,70 @@
+# tests/test_recommendation.py
+# RecommendationState must score closed bars and live prices as compute_recommendation does on the
+# whole history, and open a new forming bar only when a price belongs to a later session
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trading.recommendation import RecommendationState, compute_recommendation
+from trading.strategy_registry import get_talib
+from trading.synthetic_data import synthetic_ohlcv
+
+
+@pytest.fixture(scope="module")
+def talib_module():
+    return get_talib()
+
+
+def test_live_prices_match_full_recalculation(talib_module):
+    rng = np.random.default_rng(5)
+    data = synthetic_ohlcv(500, seed=5); high, low, close = (data.columns.get_loc(col) for col in ("high", "low", "close"))
+    state = RecommendationState(data.iloc[:100])
+    for end in range(101, len(data) + 1):
+        assert state.add_bar(*data.iloc[end - 1, [high, low, close]]) == compute_recommendation(data.iloc[:end], talib_module)
+        for _ in range(3):  # Live prices revise the forming bar, here and in the batch input
+            price = float(data.iloc[end - 1, close] * (1 + rng.normal(0, 0.01)))
+            data.iloc[end - 1, [high, low, close]] = [max(data.iloc[end - 1, high], price), min(data.iloc[end - 1, low], price), price]
+            assert state.tick(price) == compute_recommendation(data.iloc[:end], talib_module)
+
+
+def test_empty_and_short_history():
+    assert RecommendationState(None).tick(100.0) == ("N/A", None)
+    assert RecommendationState(synthetic_ohlcv(10, seed=1)).score() == ("NO DATA", None)
+
+
+@pytest.fixture
+def daily() -> pd.DataFrame:
+    data = synthetic_ohlcv(300, seed=2, start="2026-01-02")
+    data.index = data.index.tz_localize("America/New_York")
+    return data
+
+
+def test_price_in_the_forming_session_revises_the_last_bar(daily):
+    state = RecommendationState(daily); last = daily.index[-1]
+    state.tick(123.0, (last + pd.Timedelta(hours=15)).tz_convert("UTC"))
+    assert state.bars == len(daily) and state.timestamp == last
+
+
+def test_price_in_a_new_session_opens_a_bar(daily, talib_module):
+    state = RecommendationState(daily); last = daily.index[-1]
+    next_session = (last + pd.offsets.BDay(1)).normalize() + pd.Timedelta(hours=10)
+    result = state.tick(123.0, next_session.tz_convert("UTC"))
+    assert state.bars == len(daily) + 1 and state.timestamp == next_session.normalize()
+    opened = pd.DataFrame({"open": 123.0, "high": 123.0, "low": 123.0, "close": 123.0, "volume": 0.0}, index=[state.timestamp])
+    assert result == compute_recommendation(pd.concat([daily, opened]), talib_module)
+
+
+def test_weekend_price_opens_no_bar(daily):
+    state = RecommendationState(daily)
+    saturday = daily.index[-1] + pd.offsets.Week(weekday=5)
+    assert state.next_bar_start(saturday) is None
+    state.tick(123.0, saturday); assert state.bars == len(daily)
+
+
+def test_intraday_bars_open_on_the_bar_grid():
+    data = synthetic_ohlcv(200, seed=4, freq="h")
+    state = RecommendationState(data); last = data.index[-1]
+    assert state.next_bar_start(last + pd.Timedelta(minutes=30)) is None
+    if (last + pd.Timedelta(hours=2, minutes=15)).dayofweek < 5:
+        assert state.next_bar_start(last + pd.Timedelta(hours=2, minutes=15)) == last + pd.Timedelta(hours=2)
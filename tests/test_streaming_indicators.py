@@ -0,0 +1,65 @@
+# tests/test_streaming_indicators.py
+# The streaming indicators must give the batch functions' values bar by bar (ta_numpy, and TA-Lib when it is
+# installed), NaN layout included, and peek() must return what the next update() does
+
+import numpy as np
+import pytest
+
+from trading import ta_numpy
+from trading.streaming_indicators import StreamingSMA, StreamingEMA, StreamingRSI, StreamingMACD, StreamingBBANDS, StreamingADX
+
+try: import talib
+except ImportError: talib = None
+
+BACKENDS = [pytest.param(ta_numpy, id="ta_numpy"),
+            pytest.param(talib, id="talib", marks=pytest.mark.skipif(talib is None, reason="TA-Lib is not installed"))]
+CASES = [pytest.param("SMA", lambda: StreamingSMA(20), ("close",), {"timeperiod": 20}, id="SMA"),
+         pytest.param("SMA", lambda: StreamingSMA(1), ("close",), {"timeperiod": 1}, id="SMA-1"),
+         pytest.param("EMA", lambda: StreamingEMA(20), ("close",), {"timeperiod": 20}, id="EMA"),
+         pytest.param("RSI", lambda: StreamingRSI(14), ("close",), {"timeperiod": 14}, id="RSI"),
+         pytest.param("MACD", lambda: StreamingMACD(12, 26, 9), ("close",), {"fastperiod": 12, "slowperiod": 26, "signalperiod": 9}, id="MACD"),
+         pytest.param("BBANDS", lambda: StreamingBBANDS(20, 2.0, 2.0), ("close",), {"timeperiod": 20, "nbdevup": 2.0, "nbdevdn": 2.0, "matype": 0}, id="BBANDS"),
+         pytest.param("ADX", lambda: StreamingADX(14), ("high", "low", "close"), {"timeperiod": 14}, id="ADX")]
+
+
+@pytest.fixture(scope="module")
+def prices() -> dict:
+    rng = np.random.default_rng(11); n = 5000
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n)))
+    return {"close": close, "high": close * (1 + np.abs(rng.normal(0, 0.01, n))), "low": close * (1 - np.abs(rng.normal(0, 0.01, n)))}
+
+
+def _columns(values: list) -> tuple:
+    return tuple(np.array(column) for column in zip(*values)) if isinstance(values[0], tuple) else (np.array(values),)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name, make, inputs, kwargs", CASES)
+def test_streaming_matches_batch(prices, backend, name, make, inputs, kwargs):
+    args = [prices[column] for column in inputs]
+    indicator = make(); streamed = _columns([indicator.update(*bar) for bar in zip(*(column.tolist() for column in args))])
+    expected = getattr(backend, name)(*args, **kwargs); expected = expected if isinstance(expected, tuple) else (expected,)
+    for batch, stream in zip(expected, streamed):
+        np.testing.assert_array_equal(np.isnan(stream), np.isnan(batch))
+        np.testing.assert_allclose(stream, batch, rtol=1e-9, atol=1e-9)
+    assert indicator.count == len(args[0]) and indicator.ready
+
+
+@pytest.mark.parametrize("name, make, inputs, kwargs", CASES)
+def test_peek_equals_update(prices, name, make, inputs, kwargs):
+    indicator = make()
+    for bar in zip(*(prices[column][:300].tolist() for column in inputs)):
+        peeked = indicator.peek(*bar); peeked_again = indicator.peek(*bar)
+        np.testing.assert_array_equal(np.atleast_1d(peeked), np.atleast_1d(indicator.update(*bar)))
+        np.testing.assert_array_equal(np.atleast_1d(peeked), np.atleast_1d(peeked_again))
+
+
+def test_seed_equals_updates(prices):
+    seeded = StreamingADX(14).seed(prices["high"][:500], prices["low"][:500], prices["close"][:500])
+    updated = StreamingADX(14)
+    for bar in zip(prices["high"][:500], prices["low"][:500], prices["close"][:500]): updated.update(*bar)
+    assert seeded.value == updated.value and seeded.count == updated.count == 500
+
+
+def test_adx_needs_two_bars():
+    with pytest.raises(ValueError): StreamingADX(1)
@@ -0,0 +1,246 @@
+# trading/adaptive_search.py
+# Adaptive parameter search by successive halving: draws random candidates from the parameter ranges,
+# backtests them all on a short, recent slice of the history, keeps the best 1/eta and promotes them to
+# a slice eta times longer, until the survivors run on the full history
+# Finds near-optimal parameters for large grids (e.g. Ichimoku's five periods) with a fraction of the
+# backtests an exhaustive grid_search needs; can also stop on a time or evaluation budget
+# Vector-engine strategies run their rungs in-process; backtesting.py strategies share one process pool across rungs
+# Usage: python -m trading.adaptive_search STRATEGY (--symbol SYM | --data FILE) [-r NAME=RANGE ...] [--budget-seconds 60]
+
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+import pandas as pd
+
+from config import (DEFAULT_DATA_PERIOD, DEFAULT_DATA_INTERVAL, DEFAULT_CASH, DEFAULT_COMMISSION,
+                    ADAPTIVE_SEARCH_CANDIDATES, ADAPTIVE_SEARCH_ETA, ADAPTIVE_SEARCH_MIN_BARS)
+from trading.backtester import BacktestCancelled
+from trading.optimizer import (RESULT_METRICS, DEFAULT_METRIC, ENGINES, resolve_param_ranges, build_param_grid,
+                               constraint_from_expression, evaluate_params, rank_results, parse_param_range)
+from trading.strategy_registry import STRATEGY_LOADERS, get_strategy_class
+from trading.tournament import _uses_vector
+from trading import vector_backtester
+
+
+def grid_size(param_ranges: dict) -> int:
+    """ Number of combinations in {name: [values]} before any constraint. """
+    return math.prod(len(values) for values in param_ranges.values())
+
+
+def sample_candidates(param_ranges: dict, count: int, constraint=None, seed: int | None = 0) -> list[dict]:
+    """
+    Up to count distinct combinations of {name: [values]} that satisfy constraint: the whole grid when
+    it is that small, otherwise uniform random draws (fewer if the constraint rejects most of them).
+    """
+    if grid_size(param_ranges) <= count: return build_param_grid(param_ranges, constraint)
+    rng = np.random.default_rng(seed); names = list(param_ranges)
+    candidates = {}
+    for _ in range(50 * count):
+        params = {name: param_ranges[name][rng.integers(len(param_ranges[name]))] for name in names}
+        key = tuple(params.values())
+        if key not in candidates and (constraint is None or constraint(params)): candidates[key] = params
+        if len(candidates) == count: break
+    return list(candidates.values())
+
+
+def rung_schedule(n_bars: int, n_candidates: int, eta: int = ADAPTIVE_SEARCH_ETA, min_bars: int = ADAPTIVE_SEARCH_MIN_BARS) -> list[tuple[int, int]]:
+    """
+    Successive halving rungs as (candidates, bars) pairs: each rung keeps ceil(1/eta) of the previous one's
+    candidates on eta times as many bars, and the last rung uses all n_bars. There are as many rungs as
+    both the candidates (down to one) and the history (down to min_bars for the first slice) allow.
+    """
+    rungs = 1
+    while eta ** rungs <= n_candidates and n_bars / eta ** rungs >= min_bars: rungs += 1
+    schedule = []; candidates = n_candidates
+    for rung in range(rungs):
+        schedule.append((candidates, n_bars if rung == rungs - 1 else int(n_bars / eta ** (rungs - 1 - rung))))
+        candidates = max(1, math.ceil(candidates / eta))
+    return schedule
+
+
+# --- Worker process side ---
+_worker_state = {}
+
+
+def _init_worker(data: pd.DataFrame, strategy_name: str, cash, commission, quiet: bool):
+    """ Runs once per worker process: keeps the full history so tasks only carry parameters and a slice start. """
+    if quiet: sys.stdout = open(os.devnull, "w")  # Per-run logging would flood the console
+    _worker_state.update(data=data, strategy_class=get_strategy_class(strategy_name), cash=cash, commission=commission)
+
+
+def _run_candidate(params: dict, start: int) -> dict:
+    """ Backtests one candidate on the history from bar start in a worker process. """
+    return evaluate_params(_worker_state["strategy_class"], _worker_state["data"].iloc[start:], params,
+                           cash=_worker_state["cash"], commission=_worker_state["commission"])
+
+
+# --- Main side ---
+def successive_halving(strategy_name: str, data: pd.DataFrame, param_ranges: dict, constraint=None,
+                       metric: str = DEFAULT_METRIC, n_candidates: int = ADAPTIVE_SEARCH_CANDIDATES,
+                       eta: int = ADAPTIVE_SEARCH_ETA, min_bars: int = ADAPTIVE_SEARCH_MIN_BARS,
+                       budget_seconds: float | None = None, max_evaluations: int | None = None, seed: int | None = 0,
+                       cash=DEFAULT_CASH, commission=DEFAULT_COMMISSION, max_workers: int | None = None,
+                       engine: str = "auto", cancel_event=None, progress_callback=None, quiet: bool = True) -> pd.DataFrame:
+    """
+    Adaptive search over the same ranges grid_search takes.
+
+    Slices are the most recent bars, so every rung is scored on the period the full run ends with. With
+    the vector engine the runs happen in this process, otherwise on a process pool (as in grid_search).
+
+    Args:
+        strategy_name (str): Key into STRATEGY_LOADERS / PARAM_CONFIG.
+        data (pd.DataFrame): OHLCV data with lowercase columns.
+        param_ranges (dict): Parameter name -> value or list of values; missing parameters keep their default.
+        constraint (callable | str | None): Filter on combinations, e.g. "n1 < n2".
+        metric (str): Stat that decides which candidates survive (descending).
+        n_candidates (int): Candidates drawn for the first rung.
+        eta (int): Keep the best 1/eta at each rung; slices grow eta times.
+        min_bars (int): Shortest slice.
+        budget_seconds (float | None): Stop after this long; the best candidates of the highest rung reached are returned.
+        max_evaluations (int | None): Draw fewer candidates so the planned backtests stay within this count.
+        seed (int | None): Seed for drawing candidates (None = different every run).
+        max_workers (int | None): Worker processes for backtesting.py strategies (default: CPU count).
+        engine (str): One of ENGINES.
+        cancel_event (threading.Event | None): Stops the search when set (BacktestCancelled is raised).
+        progress_callback (callable | None): Called with (completed, planned) as runs finish.
+        quiet (bool): Silence per-run console output in the workers.
+
+    Returns:
+        pd.DataFrame: One row per candidate at the highest rung it reached (parameters, RESULT_METRICS, 'error',
+                      'rung', 'bars'), candidates of the last rung first and ranked by metric, with a 'rank' column;
+                      attrs["runs"] holds the number of backtests run.
+
+    Raises:
+        ValueError: If the metric or engine is unknown, the engine cannot run the strategy, or no
+                    combination satisfies the constraint.
+    """
+    if metric not in RESULT_METRICS: raise ValueError(f"Unknown metric '{metric}' (expected one of {RESULT_METRICS})")
+    if engine not in ENGINES: raise ValueError(f"Unknown engine '{engine}' (expected one of {ENGINES})")
+    use_vector = _uses_vector(strategy_name, engine)
+    if engine == "vector" and not use_vector: raise ValueError(f"{strategy_name} is not supported by the vector engine")
+    if isinstance(constraint, str): constraint = constraint_from_expression(constraint)
+    ranges = resolve_param_ranges(strategy_name, param_ranges)
+    if max_evaluations is not None:
+        while n_candidates > 1 and sum(count for count, _ in rung_schedule(len(data), n_candidates, eta, min_bars)) > max_evaluations: n_candidates -= 1
+    candidates = sample_candidates(ranges, n_candidates, constraint, seed)
+    if not candidates: raise ValueError("No parameter combinations satisfy the constraint.")
+    schedule = rung_schedule(len(data), len(candidates), eta, min_bars)
+    planned = sum(count for count, _ in schedule)
+    print(f"Adaptive search: {strategy_name}, {len(candidates)} of {grid_size(ranges)} combinations, "
+          f"rungs {' -> '.join(f'{count}x{bars} bars' for count, bars in schedule)} ({planned} runs)")
+
+    deadline = time.perf_counter() + budget_seconds if budget_seconds else None
+    strategy_class = get_strategy_class(strategy_name)
+    executor = None if use_vector else ProcessPoolExecutor(max_workers=max(1, min(max_workers or os.cpu_count() or 1, len(candidates))),
+                                                           initializer=_init_worker, initargs=(data, strategy_name, cash, commission, quiet))
+    latest = {}; completed = 0
+    try:
+        for rung, (_, bars) in enumerate(schedule, start=1):
+            start = len(data) - bars
+            if use_vector: rows = _vector_rung(strategy_class, data.iloc[start:], candidates, cash, commission, cancel_event, deadline)
+            else: rows = _pool_rung(executor, candidates, start, cancel_event, deadline)
+            for row in rows: row.update(rung=rung, bars=bars); latest[tuple(row[name] for name in ranges)] = row
+            completed += len(rows)
+            if progress_callback is not None: progress_callback(completed, planned)
+            if len(rows) < len(candidates):
+                print(f"Adaptive search: budget of {budget_seconds}s used up in rung {rung}/{len(schedule)}"); break
+            if rung == len(schedule): break
+            ranked = rank_results(pd.DataFrame(rows), metric)
+            candidates = [{name: row[name] for name in ranges} for row in ranked.head(schedule[rung][0]).to_dict("records")]
+    finally:
+        if executor is not None: executor.shutdown(wait=True, cancel_futures=True)
+    results = pd.DataFrame(list(latest.values()))
+    results = results.sort_values(["rung", metric], ascending=False, na_position="last", kind="mergesort").reset_index(drop=True)
+    results.insert(0, "rank", range(1, len(results) + 1))
+    results.attrs["runs"] = completed  # Backtests run over all rungs (a candidate appears once, at its highest rung)
+    return results
+
+
+def _vector_rung(strategy_class, data, candidates, cash, commission, cancel_event, deadline) -> list[dict]:
+    """ Runs one rung in-process with vector_backtest; stops early (fewer rows) when the deadline passes. """
+    bars = vector_backtester.prepare_bars(data); rows = []
+    for params in candidates:
+        if cancel_event is not None and cancel_event.is_set(): raise BacktestCancelled("Adaptive search cancelled")
+        if deadline is not None and time.perf_counter() > deadline: break
+        rows.append(evaluate_params(strategy_class, bars, params, cash=cash, commission=commission, vector=True))
+    return rows
+
+
+def _pool_rung(executor, candidates, start, cancel_event, deadline) -> list[dict]:
+    """ Runs one rung on the process pool; cancels the rest (fewer rows) when the deadline passes. """
+    rows = []
+    pending = {executor.submit(_run_candidate, params, start) for params in candidates}
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+            if cancel_event is not None and cancel_event.is_set(): raise BacktestCancelled("Adaptive search cancelled")
+            for future in done: rows.append(future.result())
+            if deadline is not None and time.perf_counter() > deadline: break
+    finally:
+        for future in pending: future.cancel()
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m trading.adaptive_search", description="Successive-halving parameter search.")
+    parser.add_argument("strategy", help="Strategy display name or class name")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--symbol", help="Ticker to load through DataFetcher")
+    source.add_argument("--data", metavar="FILE", help="Local OHLCV file (.csv, .parquet or .pkl)")
+    parser.add_argument("--period", default=DEFAULT_DATA_PERIOD, help=f"History period for --symbol (default {DEFAULT_DATA_PERIOD})")
+    parser.add_argument("--interval", default=DEFAULT_DATA_INTERVAL, help=f"Bar interval for --symbol (default {DEFAULT_DATA_INTERVAL})")
+    parser.add_argument("-r", "--range", dest="ranges", action="append", default=[], metavar="NAME=RANGE",
+                        help="Parameter range to search, e.g. n1=5-50 (repeatable; others keep their default)")
+    parser.add_argument("--constraint", help='Combination filter, e.g. "n1 < n2"')
+    parser.add_argument("--metric", choices=RESULT_METRICS, default=DEFAULT_METRIC, help=f"Ranking (default {DEFAULT_METRIC})".replace("%", "%%"))
+    parser.add_argument("--candidates", type=int, default=ADAPTIVE_SEARCH_CANDIDATES, help=f"Candidates in the first rung (default {ADAPTIVE_SEARCH_CANDIDATES})")
+    parser.add_argument("--eta", type=int, default=ADAPTIVE_SEARCH_ETA, help=f"Keep 1/ETA per rung (default {ADAPTIVE_SEARCH_ETA})")
+    parser.add_argument("--budget-seconds", type=float, help="Stop after this many seconds")
+    parser.add_argument("--max-evals", type=int, help="Plan at most this many backtests")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the candidates (default 0)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--engine", choices=ENGINES, default="auto", help="Backtest engine (default auto)")
+    parser.add_argument("--compare-grid", action="store_true", help="Also run the exhaustive grid and report how close the result is")
+    args = parser.parse_args(argv)
+    from trading.runner import resolve_strategy_name, load_data_file, load_symbol
+    try: strategy_name = resolve_strategy_name(args.strategy)
+    except KeyError: parser.error(f"unknown strategy '{args.strategy}' (choose from: {', '.join(STRATEGY_LOADERS)})")
+    if args.eta < 2: parser.error("--eta must be at least 2")
+    param_ranges = {}
+    for text in args.ranges:
+        name, sep, spec = text.partition("=")
+        if not sep or not name.strip(): parser.error(f"range '{text}' is not in NAME=RANGE form")
+        try: param_ranges[name.strip()] = parse_param_range(spec)
+        except ValueError as e: parser.error(f"invalid range '{text}': {e}")
+
+    data = load_data_file(args.data) if args.data else load_symbol(args.symbol, args.period, args.interval)
+    started = time.perf_counter()
+    try:
+        results = successive_halving(strategy_name, data, param_ranges, constraint=args.constraint, metric=args.metric,
+                                     n_candidates=args.candidates, eta=args.eta, budget_seconds=args.budget_seconds,
+                                     max_evaluations=args.max_evals, seed=args.seed, max_workers=args.workers, engine=args.engine)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr); return 1
+    elapsed = time.perf_counter() - started
+    shown = [name for name in resolve_param_ranges(strategy_name, param_ranges) if results[name].nunique() > 1] or list(param_ranges)
+    with pd.option_context("display.width", 1000):
+        print(results.head(10)[["rank", "rung", "bars"] + shown + [args.metric, "# Trades"]].to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    print(f"{len(results)} candidates, {results.attrs['runs']} runs, {elapsed:.2f}s")
+    if args.compare_grid:
+        from trading.optimizer import grid_search
+        started = time.perf_counter()
+        grid = grid_search(strategy_name, data, param_ranges, constraint=args.constraint, metric=args.metric,
+                           max_workers=args.workers, engine=args.engine)
+        best, found = grid.iloc[0][args.metric], results.iloc[0][args.metric]
+        print(f"Exhaustive grid: {len(grid)} runs, {time.perf_counter() - started:.2f}s, best {args.metric} {best:.2f}; "
+              f"adaptive best {found:.2f} ranks #{int((grid[args.metric] > found).sum()) + 1} of {len(grid)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,8 @@
 from backtesting import Backtest
 import pandas as pd
 
+from trading.profiling import BacktestProfiler, profiled_strategy, format_profile
+
 # Dictionary mapping column names expected by backtesting.py to potential lowercase versions
 COLUMN_MAPPING = {
     'Open': 'open',
@@ -15,8 +17,33 @@ COLUMN_MAPPING = {
 }
 
 
+class BacktestCancelled(Exception):
+    """Raised out of run_backtest when its cancel_event is set mid-run."""
+
+
+def _with_run_hooks(strategy_class, total_bars: int, cancel_event=None, progress_callback=None):
+    """
+    Returns a subclass of strategy_class whose next() first checks for cancellation and
+    reports progress. The subclass keeps the original name so stats read the same.
+    """
+    original_next = strategy_class.next
+    progress_step = max(1, total_bars // 20)  # Report roughly every 5%
+
+    def next(self):
+        bar = len(self.data)
+        if cancel_event is not None and cancel_event.is_set():
+            raise BacktestCancelled(f"{strategy_class.__name__} cancelled at bar {bar}/{total_bars}")
+        if progress_callback is not None and (bar % progress_step == 0 or bar == total_bars):
+            progress_callback(bar / total_bars)
+        original_next(self)
+
+    return type(strategy_class.__name__, (strategy_class,), {"next": next, "__module__": strategy_class.__module__})
+
+
 # Accept **strategy_params again
-def run_backtest(strategy_class, data: pd.DataFrame, cash: int = 10000, commission: float = 0.001, **strategy_params):
+def run_backtest(strategy_class, data: pd.DataFrame, cash: int = 10000, commission: float = 0.001,
+                 cancel_event=None, progress_callback=None, profile: bool = False, profile_allocations: bool = False,
+                 **strategy_params):
     """
     Runs a backtest for a given strategy and data.
     Strategy-specific parameters are passed via **strategy_params to bt.run().
@@ -26,13 +53,22 @@ def run_backtest(strategy_class, data: pd.DataFrame, cash: int = 10000, commissi
         data (pd.DataFrame): DataFrame with historical OHLCV data (lowercase columns).
         cash (int): Initial cash for the backtest.
         commission (float): Commission rate per trade (e.g., 0.001 for 0.1%).
+        cancel_event (threading.Event | None): If set while the backtest is running,
+                                               BacktestCancelled is raised at the next bar.
+        progress_callback (callable | None): Called with the fraction of bars processed (0-1).
+        profile (bool): Record wall time per phase and next() latencies (see trading/profiling.py);
+                        the summary dict is attached as stats['_profile'] and printed.
+        profile_allocations (bool): With profile, also record allocations per phase (tracemalloc).
         **strategy_params: Keyword arguments (parameters) to pass to the strategy for this run.
 
     Returns:
         tuple: (stats, backtest_object)
-               stats (pd.Series): Backtesting statistics including '_trades'.
+               stats (pd.Series): Backtesting statistics including '_trades' (and '_profile' if profiling).
                backtest_object (Backtest): The Backtest instance for potential plotting.
                Returns (None, None) if backtest fails.
+
+    Raises:
+        BacktestCancelled: If cancel_event was set during the run.
     """
     if data is None or data.empty:
         print("Error: Cannot run backtest with empty data.")
@@ -42,6 +78,8 @@ def run_backtest(strategy_class, data: pd.DataFrame, cash: int = 10000, commissi
         print(
             f"Error: Data missing required columns for backtesting. Need: {required_lowercase}, Found: {data.columns.tolist()}")
         return None, None
+    profiler = BacktestProfiler(profile_allocations) if profile else None
+    if profiler: profiler.switch("prepare data")
     backtest_data = data.copy()
     rename_dict = {v: k for k, v in COLUMN_MAPPING.items()}
     backtest_data.rename(columns=rename_dict, inplace=True)
@@ -59,7 +97,13 @@ def run_backtest(strategy_class, data: pd.DataFrame, cash: int = 10000, commissi
 
     try:
         # Initialize Backtest WITHOUT passing strategy_params to constructor
-        bt = Backtest(backtest_data, strategy_class, cash=cash, commission=commission)
+        if profiler: profiler.switch("engine setup")
+        run_class = strategy_class
+        if profiler:
+            run_class = profiled_strategy(run_class, profiler, len(backtest_data))
+        if cancel_event is not None or progress_callback is not None:
+            run_class = _with_run_hooks(run_class, len(backtest_data), cancel_event, progress_callback)
+        bt = Backtest(backtest_data, run_class, cash=cash, commission=commission)
 
         # Run backtest WITH strategy_params BUT WITHOUT return_trades argument
         stats = bt.run(**strategy_params)
@@ -75,10 +119,18 @@ def run_backtest(strategy_class, data: pd.DataFrame, cash: int = 10000, commissi
             # Ensure the '_trades' key exists even if empty
             stats['_trades'] = pd.DataFrame()
 
+        if profiler:
+            stats['_profile'] = profiler.finish()
+            print(format_profile(stats['_profile']))
         print("--- Backtest Complete ---")
         return stats, bt
+    except BacktestCancelled as e:
+        print(f"--- Backtest Cancelled: {e} ---")
+        raise
     except Exception as e:
         print(f"Error during backtest execution: {e}")
         # import traceback # Uncomment for full traceback
         # traceback.print_exc()
-        return None, None
\ No newline at end of file
+        return None, None
+    finally:
+        if profiler: profiler.finish()  # No-op after a successful run; stops tracemalloc after a failure
\ No newline at end of file
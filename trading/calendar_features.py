@@ -0,0 +1,63 @@
+# trading/calendar_features.py
+# Calendar feature arrays (day of week, day of month, month, trading day of month) derived once
+# per DatetimeIndex and cached, so calendar strategies index arrays instead of inspecting timestamps
+# The cache is per process and lock-guarded, so GUI worker threads share it and each worker process builds its own
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from trading.indicator_cache import fingerprint
+
+CALENDAR_FEATURES = ("day_of_week", "day_of_month", "month", "trading_day_of_month")
+_MAX_CACHED_INDEXES = 16
+
+_cache = OrderedDict()  # (index fingerprint, tz) -> features dict, least recently used first
+_cache_lock = threading.Lock()
+
+
+def _compute_features(index: pd.DatetimeIndex) -> dict:
+    month_key = index.year.to_numpy() * 12 + index.month.to_numpy()
+    positions = np.arange(len(index))
+    month_starts = np.r_[True, month_key[1:] != month_key[:-1]] if len(index) else np.array([], dtype=bool)
+    first_bar_of_month = np.maximum.accumulate(np.where(month_starts, positions, 0))
+    features = {
+        "day_of_week": index.dayofweek.to_numpy(),  # Monday = 0 ... Sunday = 6
+        "day_of_month": index.day.to_numpy(),
+        "month": index.month.to_numpy(),
+        "trading_day_of_month": positions - first_bar_of_month + 1,  # 1 = first bar of the month in the data
+    }
+    for name, values in features.items():
+        values = values.astype(np.int16); values.setflags(write=False); features[name] = values
+    return features
+
+
+def calendar_features(index) -> dict | None:
+    """
+    Returns the CALENDAR_FEATURES arrays for index (one int16 value per bar, read-only),
+    computing them only the first time a given index is seen.
+
+    Args:
+        index: The data's index (e.g. self.data.index inside a strategy).
+
+    Returns:
+        dict | None: Feature name -> array, or None if index is not a DatetimeIndex.
+    """
+    if not isinstance(index, pd.DatetimeIndex): return None
+    key = (fingerprint(index.asi8), str(index.tz))
+    with _cache_lock:
+        features = _cache.get(key)
+        if features is not None:
+            _cache.move_to_end(key); return features
+    features = _compute_features(index)
+    with _cache_lock:
+        _cache[key] = features
+        while len(_cache) > _MAX_CACHED_INDEXES: _cache.popitem(last=False)
+    return features
+
+
+def clear_calendar_cache():
+    """ Drops every cached feature set (the next calendar_features() call per index recomputes). """
+    with _cache_lock: _cache.clear()
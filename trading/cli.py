@@ -0,0 +1,131 @@
+# trading/cli.py
+# Headless batch runner: python -m trading.cli STRATEGY (--symbol SYM | --data FILE) [-p name=value ...]
+# Argument parsing and output only: the run itself (data loading, engine choice, results store) is
+# trading.runner; stats are written as JSON and trades / equity as Parquet, CSV or JSON
+# Never imports GUI modules
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import sys
+import time
+
+from config import DEFAULT_DATA_PERIOD, DEFAULT_DATA_INTERVAL, DEFAULT_CASH, DEFAULT_COMMISSION
+from trading.strategy_registry import STRATEGY_LOADERS, PARAM_CONFIG, strategy_class_name
+from trading.runner import ENGINES, resolve_strategy_name, load_data_file, load_symbol, run_strategy
+
+
+def parse_param(text: str) -> tuple[str, int | float]:
+    """ Parses "name=value" into (name, int or float). Raises ValueError on malformed input. """
+    name, sep, value = text.partition("=")
+    if not sep or not name.strip(): raise ValueError(f"Parameter '{text}' is not in name=value form")
+    value = value.strip(); number = float(value)
+    return name.strip(), int(number) if number.is_integer() and "." not in value else number
+
+
+def _json_value(value):
+    """ Converts numpy/pandas scalars to JSON-safe values (NaN/inf -> null, times -> ISO strings). """
+    if value is None or isinstance(value, (bool, str)): return value
+    if hasattr(value, "isoformat"): return value.isoformat()
+    if type(value).__name__ == "Timedelta": return str(value)
+    if hasattr(value, "item"): value = value.item()
+    if isinstance(value, float): return value if math.isfinite(value) else None
+    if isinstance(value, int): return value
+    return str(value)
+
+
+def stats_to_dict(stats) -> dict:
+    """ Scalar stats (no '_trades' / '_equity_curve' / '_strategy' entries) as a JSON-safe dict. """
+    return {str(key): _json_value(value) for key, value in stats.items() if not str(key).startswith("_")}
+
+
+def write_table(frame, path: str):
+    """ Writes a DataFrame as .parquet, .csv or .json (records) depending on the extension. """
+    extension = os.path.splitext(path)[1].lower()
+    directory = os.path.dirname(path)
+    if directory: os.makedirs(directory, exist_ok=True)
+    if extension == ".parquet": frame.to_parquet(path)
+    elif extension == ".csv": frame.to_csv(path)
+    elif extension == ".json": frame.reset_index().to_json(path, orient="records", date_format="iso", indent=1)
+    else: raise ValueError(f"Unsupported output type '{extension}' (use .parquet, .csv or .json)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m trading.cli", description="Run a Stocker strategy backtest without the GUI.")
+    parser.add_argument("strategy", nargs="?", help='Strategy display name or class name, e.g. "SMA Crossover" or SmaCross')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--symbol", help="Ticker to load through DataFetcher (uses the local OHLCV cache)")
+    source.add_argument("--data", help="Local OHLCV file (.csv, .parquet or .pkl)")
+    parser.add_argument("--period", default=DEFAULT_DATA_PERIOD, help=f"History period for --symbol (default {DEFAULT_DATA_PERIOD})")
+    parser.add_argument("--interval", default=DEFAULT_DATA_INTERVAL, help=f"Bar interval for --symbol (default {DEFAULT_DATA_INTERVAL})")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the local OHLCV cache for --symbol")
+    parser.add_argument("-p", "--param", action="append", default=[], metavar="NAME=VALUE", help="Strategy parameter (repeatable)")
+    parser.add_argument("--cash", type=float, default=DEFAULT_CASH, help=f"Initial cash (default {DEFAULT_CASH})")
+    parser.add_argument("--commission", type=float, default=DEFAULT_COMMISSION, help=f"Commission per trade side (default {DEFAULT_COMMISSION})")
+    parser.add_argument("--engine", choices=ENGINES, default="auto", help="Backtest engine (default auto)")
+    parser.add_argument("--full-stats", action="store_true", help="Complete backtesting.py stats on the vector engine too")
+    parser.add_argument("--profile", action="store_true", help="Add per-phase timing and next() latencies to the output (runs the backtesting engine)")
+    parser.add_argument("--no-store", action="store_true", help="Neither reuse nor record results in the results store")
+    parser.add_argument("--out", help="Write stats JSON here instead of stdout")
+    parser.add_argument("--trades", help="Write the trade list (.parquet, .csv or .json)")
+    parser.add_argument("--equity", help="Write the equity curve (.parquet, .csv or .json)")
+    parser.add_argument("--list", action="store_true", help="List strategies and their parameters, then exit")
+    return parser
+
+
+def main(argv=None) -> int:
+    """ CLI entry point; returns the process exit code (0 = success, 1 = run failed, 2 = bad arguments). """
+    started = time.perf_counter()
+    parser = build_parser(); args = parser.parse_args(argv)
+    if args.list:
+        for name in STRATEGY_LOADERS:
+            params = ", ".join(f"{p}={v}" for p, v in PARAM_CONFIG.get(name, []))
+            print(f"{name} ({strategy_class_name(name)}): {params}")
+        return 0
+    if not args.strategy or not (args.symbol or args.data):
+        parser.print_usage(sys.stderr); print("error: a strategy and --symbol or --data are required", file=sys.stderr); return 2
+    try:
+        strategy_name = resolve_strategy_name(args.strategy)
+        params = dict(parse_param(text) for text in args.param)
+        if args.profile and args.engine == "vector": raise ValueError("--profile needs the backtesting engine (use --engine auto or backtesting)")
+    except (KeyError, ValueError) as e:
+        print(f"error: {e.args[0] if e.args else e}", file=sys.stderr); return 2
+
+    try:
+        # Library/strategy logging goes to stderr so stdout only carries the stats JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            data = load_data_file(args.data) if args.data else load_symbol(args.symbol, args.period, args.interval, not args.no_cache)
+            if data is None or data.empty: raise ValueError("No data loaded")
+            loaded = time.perf_counter()
+            from trading.results_store import default_results_store
+            store = None if args.no_store else default_results_store()
+            stats, engine = run_strategy(strategy_name, data, params, cash=args.cash, commission=args.commission,
+                                         engine=args.engine, full_stats=args.full_stats, profile=args.profile, store=store,
+                                         symbol=args.symbol.upper() if args.symbol else os.path.basename(args.data),
+                                         interval=args.interval if args.symbol else None)
+            if args.trades: write_table(stats["_trades"], args.trades)
+            if args.equity: write_table(stats["_equity_curve"], args.equity)
+    except Exception as e:
+        print(f"error: {type(e).__name__}: {e}", file=sys.stderr); return 1
+
+    finished = time.perf_counter()
+    result = {"strategy": strategy_name, "engine": engine, "source": args.data or args.symbol, "bars": len(data),
+              "stored_at": stats.get("_stored_at"),
+              "start": _json_value(data.index[0]), "end": _json_value(data.index[-1]), "params": params,
+              "timing_seconds": {"startup_and_load": round(loaded - started, 4), "backtest": round(finished - loaded, 4)},
+              "stats": stats_to_dict(stats)}
+    if args.profile: result["profile"] = stats.get("_profile")
+    text = json.dumps(result, indent=2)
+    if args.out:
+        directory = os.path.dirname(args.out)
+        if directory: os.makedirs(directory, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f: f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+# trading/cross_section.py
+# Strategies x symbols matrix: backtests every strategy on every symbol of a universe (config.SYMBOLS by
+# default) on a process pool and pivots one metric into a grid for a heatmap
+# Each symbol's OHLCV data is written once into a shared memory block that the workers map read-only,
+# so tasks only carry (symbol, strategy) and no worker receives a pickled copy of the universe
+# Usage: python -m trading.cross_section [--symbols AAPL MSFT ...] [--data a.csv b.parquet ...] [--metric "Sharpe Ratio"]
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from config import SYMBOLS, DEFAULT_DATA_PERIOD, DEFAULT_DATA_INTERVAL, DEFAULT_CASH, DEFAULT_COMMISSION
+from trading.backtester import BacktestCancelled
+from trading.optimizer import ENGINES
+from trading.strategy_registry import STRATEGY_LOADERS
+from trading.tournament import LEADERBOARD_METRICS, DEFAULT_METRIC, evaluate_strategy, _uses_vector
+
+SHARED_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+class SharedOHLCV:
+    """
+    OHLCV data of several symbols in one shared memory block: per symbol the index (int64 ticks) followed
+    by a (5, bars) float64 block. The picklable manifest is all a worker needs to map it with attach().
+    Use as a context manager (or call close()) so the block is released.
+    """
+    def __init__(self, datasets: dict):
+        """
+        Args:
+            datasets (dict): Symbol -> OHLCV DataFrame (lowercase columns, DatetimeIndex).
+
+        Raises:
+            ValueError: If a dataset is empty, lacks OHLCV columns or has no DatetimeIndex.
+        """
+        layout, offset = [], 0
+        for symbol, data in datasets.items():
+            if data is None or data.empty or not isinstance(data.index, pd.DatetimeIndex):
+                raise ValueError(f"{symbol}: need non-empty OHLCV data with a DatetimeIndex")
+            missing = [col for col in SHARED_COLUMNS if col not in data.columns]
+            if missing: raise ValueError(f"{symbol}: missing column(s) {', '.join(missing)}")
+            layout.append((symbol, offset, len(data), data.index.unit, str(data.index.tz) if data.index.tz else None, data.index.name))
+            offset += len(data) * 8 * (1 + len(SHARED_COLUMNS))
+        self._shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self.manifest = {"name": self._shm.name, "symbols": layout}
+        for (symbol, start, bars, _, _, _), data in zip(layout, datasets.values()):
+            index, block = _views(self._shm.buf, start, bars)
+            index[:] = data.index.asi8; block[:] = data[list(SHARED_COLUMNS)].to_numpy(dtype=float).T
+
+    def close(self):
+        """ Releases the block (workers must be done with it). """
+        if self._shm is None: return
+        self._shm.close(); self._shm.unlink(); self._shm = None
+
+    def __enter__(self): return self
+
+    def __exit__(self, *exc_info): self.close()
+
+
+def _views(buffer, offset: int, bars: int) -> tuple[np.ndarray, np.ndarray]:
+    index = np.ndarray((bars,), dtype=np.int64, buffer=buffer, offset=offset)
+    block = np.ndarray((len(SHARED_COLUMNS), bars), dtype=np.float64, buffer=buffer, offset=offset + bars * 8)
+    return index, block
+
+
+def attach(manifest: dict) -> tuple[shared_memory.SharedMemory, dict]:
+    """
+    Maps a SharedOHLCV block created by another process.
+
+    Returns:
+        tuple: (SharedMemory handle - keep it alive while the frames are used,
+                {symbol: read-only OHLCV DataFrame backed by the shared block})
+    """
+    shm = shared_memory.SharedMemory(name=manifest["name"])
+    frames = {}
+    for symbol, offset, bars, unit, tz, name in manifest["symbols"]:
+        ticks, block = _views(shm.buf, offset, bars)
+        ticks.setflags(write=False); block.setflags(write=False)
+        index = pd.DatetimeIndex(ticks.view(f"M8[{unit}]"), name=name)
+        if tz: index = index.tz_localize("UTC").tz_convert(tz)
+        frames[symbol] = pd.DataFrame(block.T, index=index, columns=list(SHARED_COLUMNS), copy=False)
+    return shm, frames
+
+
+# --- Worker process side ---
+_worker_state = {}
+
+
+def _init_worker(manifest: dict, cash, commission, quiet: bool, use_store: bool, interval):
+    """ Runs once per worker process: maps the shared data instead of receiving a copy. """
+    if quiet: sys.stdout = open(os.devnull, "w")  # Per-run logging would flood the console
+    shm, frames = attach(manifest)
+    _worker_state.update(shm=shm, frames=frames, cash=cash, commission=commission, use_store=use_store, interval=interval)
+
+
+def _run_cell(symbol: str, strategy_name: str, engine: str) -> dict:
+    """ Backtests one (symbol, strategy) pair in a worker process and returns its row. """
+    row = evaluate_strategy(strategy_name, _worker_state["frames"][symbol], cash=_worker_state["cash"], commission=_worker_state["commission"],
+                            engine=engine, use_store=_worker_state["use_store"], symbol=symbol, interval=_worker_state["interval"])
+    return {"symbol": symbol, **row}
+
+
+# --- Main side ---
+def run_cross_section(datasets: dict, strategy_names=None, cash=DEFAULT_CASH, commission=DEFAULT_COMMISSION,
+                      max_workers: int | None = None, engine: str = "auto", cancel_event=None, progress_callback=None,
+                      quiet: bool = True, use_store: bool = True, interval: str | None = None) -> pd.DataFrame:
+    """
+    Backtests every strategy on every symbol on a process pool (default parameters).
+
+    Args:
+        datasets (dict): Symbol -> OHLCV DataFrame; symbols without data (None / empty) are skipped.
+        strategy_names (list | None): STRATEGY_LOADERS keys (default: all of them).
+        max_workers (int | None): Worker processes (default: CPU count, capped by the number of runs).
+        engine (str): One of ENGINES, applied to every run.
+        cancel_event (threading.Event | None): Stops the runs when set (BacktestCancelled is raised).
+        progress_callback (callable | None): Called with (row, completed, total) after each run.
+        quiet (bool): Silence per-run console output in the workers.
+        use_store (bool): Reuse / record results in the results store.
+        interval (str | None): Bar interval of the data, recorded with stored results.
+
+    Returns:
+        pd.DataFrame: One row per run (symbol, strategy, LEADERBOARD_METRICS, engine, seconds, stored, error), in
+                      completion order; attrs["symbols"] holds the symbols in input order.
+
+    Raises:
+        ValueError: If no symbol has data, or a strategy name or the engine is unknown.
+    """
+    datasets = {symbol: data for symbol, data in datasets.items() if data is not None and not data.empty}
+    if not datasets: raise ValueError("No symbol has data to backtest.")
+    strategy_names = list(strategy_names or STRATEGY_LOADERS)
+    unknown = [name for name in strategy_names if name not in STRATEGY_LOADERS]
+    if unknown: raise ValueError(f"Unknown strategies: {', '.join(unknown)}")
+    if engine not in ENGINES: raise ValueError(f"Unknown engine '{engine}' (expected one of {ENGINES})")
+    if engine == "vector": strategy_names = [name for name in strategy_names if _uses_vector(name, engine)]
+    strategy_names.sort(key=lambda name: _uses_vector(name, engine))  # Slow (backtesting.py) runs first
+    cells = [(symbol, name) for name in strategy_names for symbol in datasets]
+    total = len(cells)
+    workers = max(1, min(max_workers or os.cpu_count() or 1, total))
+    print(f"Cross-section: {len(strategy_names)} strategies x {len(datasets)} symbols = {total} runs on {workers} worker process(es)")
+
+    rows = []
+    with SharedOHLCV(datasets) as shared, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(shared.manifest, cash, commission, quiet, use_store, interval)) as executor:
+        pending = {executor.submit(_run_cell, symbol, name, engine) for symbol, name in cells}
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+                if cancel_event is not None and cancel_event.is_set():
+                    raise BacktestCancelled(f"Cross-section cancelled after {len(rows)}/{total} runs")
+                for future in done:
+                    rows.append(future.result())
+                    if progress_callback is not None: progress_callback(rows[-1], len(rows), total)
+        except BaseException:
+            for future in pending: future.cancel()
+            raise
+    results = pd.DataFrame(rows)
+    results.attrs["symbols"] = list(datasets)  # Rows arrive in completion order; the grid keeps the input order
+    return results
+
+
+def metric_grid(results: pd.DataFrame, metric: str = DEFAULT_METRIC, symbols=None) -> pd.DataFrame:
+    """
+    Pivots run results into a strategies (rows, best average first) x symbols (columns) grid of metric.
+    Columns follow symbols, by default the input order run_cross_section records in results.attrs["symbols"]
+    (order of appearance in results when absent).
+    """
+    grid = results.pivot_table(index="strategy", columns="symbol", values=metric, aggfunc="first", dropna=False)
+    grid = grid.reindex(columns=list(symbols or results.attrs.get("symbols") or dict.fromkeys(results["symbol"])))
+    return grid.loc[grid.mean(axis=1).sort_values(ascending=False, na_position="last").index]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m trading.cross_section", description="Backtest every strategy on every symbol.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--symbols", nargs="+", help=f"Tickers to load through DataFetcher (default: config.SYMBOLS = {' '.join(SYMBOLS)})")
+    source.add_argument("--data", nargs="+", metavar="FILE", help="Local OHLCV files (.csv, .parquet or .pkl); the file name is the symbol")
+    parser.add_argument("--period", default=DEFAULT_DATA_PERIOD, help=f"History period for --symbols (default {DEFAULT_DATA_PERIOD})")
+    parser.add_argument("--interval", default=DEFAULT_DATA_INTERVAL, help=f"Bar interval for --symbols (default {DEFAULT_DATA_INTERVAL})")
+    parser.add_argument("--strategies", nargs="+", metavar="NAME", help="Strategy display names (default: all)")
+    parser.add_argument("--metric", choices=LEADERBOARD_METRICS, default=DEFAULT_METRIC, help=f"Metric shown in the grid (default {DEFAULT_METRIC})")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--engine", choices=ENGINES, default="auto", help="Backtest engine (default auto)")
+    parser.add_argument("--no-store", action="store_true", help="Neither reuse nor record results in the results store")
+    parser.add_argument("--out", help="Also write the grid as CSV")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.strategies or [] if name not in STRATEGY_LOADERS]
+    if unknown: parser.error(f"unknown strategies: {', '.join(unknown)} (choose from: {', '.join(STRATEGY_LOADERS)})")
+
+    if args.data:
+        from trading.runner import load_data_file
+        datasets = {os.path.splitext(os.path.basename(path))[0]: load_data_file(path) for path in args.data}; interval = None
+    else:
+        from data.data_fetcher import DataFetcher
+        datasets = DataFetcher().get_historical_data_many(args.symbols or SYMBOLS, period=args.period, interval=args.interval); interval = args.interval
+    try:
+        results = run_cross_section(datasets, args.strategies, max_workers=args.workers, engine=args.engine,
+                                    use_store=not args.no_store, interval=interval,
+                                    progress_callback=lambda row, completed, total: print(f"[{completed}/{total}] {row['symbol']} {row['strategy']}"
+                                                                                        + (f": failed - {row['error']}" if row["error"] else f": {args.metric} {row[args.metric]:.2f}")))
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr); return 1
+    grid = metric_grid(results, args.metric)
+    print(f"\n{args.metric} by strategy and symbol")
+    with pd.option_context("display.width", 1000): print(grid.to_string(float_format=lambda v: f"{v:.2f}"))
+    if args.out: grid.to_csv(args.out)
+    return 1 if results["error"].notna().any() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+# trading/incremental.py
+# Incremental backtests: a vector-engine run is saved as a snapshot of its terminal state (cash, open trade,
+# where the trade loop stopped, running metric totals), and when new bars are appended to the same history
+# the run resumes from it instead of replaying every bar
+# A resume costs about as much as the new bars: signals are rebuilt on a warm-up-sized tail (recursive
+# indicators are checked against the values the snapshot recorded), only a short tail is fingerprinted, and
+# the snapshot stays the same size however long the run gets. Resumed stats are FAST_METRICS only (no equity
+# curve or trade list); they equal a full rerun's, with the Sharpe ratio and SQN to floating-point rounding
+# History that changed (e.g. revised / re-adjusted prices) or a different configuration means a full run
+# A run stays anchored at its first bar: the nightly refresh loads the untrimmed cached history, since a
+# period window ("5y") drops its oldest bar every day and could never be resumed
+# Usage: python -m trading.incremental [--symbols AAPL MSFT ...] [--strategies "SMA Crossover" ...]   (nightly refresh)
+
+import argparse
+import hashlib
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import SYMBOLS, DEFAULT_DATA_PERIOD, DEFAULT_DATA_INTERVAL, DEFAULT_CASH, DEFAULT_COMMISSION
+from trading.results_store import data_fingerprint, run_key, snapshot_key
+from trading.strategy_registry import STRATEGY_LOADERS, PARAM_CONFIG, strategy_class_name, trade_size_fraction
+from trading import vector_backtester
+
+SNAPSHOT_VERSION = 3
+FINGERPRINT_BARS = 64  # Bars up to the snapshot's last one that must be unchanged (re-adjusted prices change all of them)
+TAIL_WARMUPS = 32  # Signals are rebuilt on this many warm-up periods before the new bars (EMA / Wilder averages converge well within it)
+
+
+def supports(strategy_name: str) -> bool:
+    """ True if runs of the strategy can be snapshotted and resumed (it runs on the vector engine). """
+    return strategy_name in STRATEGY_LOADERS and vector_backtester.supports(strategy_class_name(strategy_name))
+
+
+def _run_params(strategy_name: str, params: dict | None) -> dict:
+    """ PARAM_CONFIG defaults overridden by params, trade_size_percent converted to a fraction (as in run_strategy). """
+    run_params = dict(PARAM_CONFIG.get(strategy_name, [])); run_params.update(params or {})
+    run_params["trade_size_percent"] = trade_size_fraction(run_params.get("trade_size_percent"))
+    return run_params
+
+
+class _NotResumable(Exception):
+    pass
+
+
+def _signals(strategy_name: str, data: pd.DataFrame, run_params: dict, metrics: bool = True) -> tuple[dict, np.ndarray, np.ndarray, list]:
+    bars = vector_backtester.prepare_bars(data, metrics)
+    builder, _ = vector_backtester.SIGNAL_BUILDERS[strategy_class_name(strategy_name)]
+    return (bars, *builder(bars, run_params))
+
+
+def _values_at(indicators: list, position: int) -> list:
+    """ Every indicator's value(s) on one bar, recorded so a resume can check the signals it rebuilds on a tail. """
+    return [np.asarray(indicator, dtype=float)[..., position].copy() for indicator in indicators]
+
+
+def _full_run(strategy_name: str, data: pd.DataFrame, run_params: dict, cash, commission) -> tuple[dict, dict]:
+    """ Simulates the vector engine on all of data; returns (stats with '_trades' and '_equity_curve', state). """
+    bars, entry, exit, indicators = _signals(strategy_name, data, run_params)
+    start = 1 + vector_backtester.warmup_bars(indicators)
+    equity, trades, _, loop = vector_backtester.simulate(bars, entry, exit, start, cash, commission, run_params["trade_size_percent"])
+    vector_backtester.trade_returns(trades)
+    state = {"start": start, "loop": loop, "totals": vector_backtester.update_metric_totals(None, equity, trades, data.index),
+             "indicators": _values_at(indicators, -1)}
+    return vector_backtester.fast_stats(equity, bars, trades, with_trades=True), state
+
+
+def _resume_run(strategy_name: str, data: pd.DataFrame, done: int, run_params: dict, cash, commission, state: dict) -> tuple[dict, dict]:
+    """
+    Continues state (a run on data[:done]) over the bars after done; returns (FAST_METRICS, new state).
+    The trade loop stopped before any signal it has not acted on, and that can only be on bar done - 1,
+    so signals are needed from there on: they are rebuilt on a tail that also covers TAIL_WARMUPS warm-up
+    periods, or on all of data if the tail's indicators disagree with the ones recorded on bar done - 1.
+    """
+    offset = max(0, done - 1 - max(100, TAIL_WARMUPS * state["start"]))
+    while True:
+        bars, entry, exit, indicators = _signals(strategy_name, data.iloc[offset:], run_params, metrics=False)
+        recorded = _values_at(indicators, done - 1 - offset)
+        if all(np.allclose(a, b, rtol=1e-9, atol=1e-12, equal_nan=True) for a, b in zip(recorded, state["indicators"])): break
+        if offset == 0: raise _NotResumable("indicators changed")
+        offset = 0
+    equity, trades, _, loop = vector_backtester.simulate(bars, entry, exit, done - 1, cash, commission, run_params["trade_size_percent"],
+                                                         state=state["loop"], offset=offset)
+    vector_backtester.trade_returns(trades)
+    try: totals = vector_backtester.update_metric_totals(state["totals"], equity, trades, data.index[done:])
+    except ValueError as e: raise _NotResumable(str(e))
+    new_state = {"start": state["start"], "loop": loop, "totals": totals, "indicators": _values_at(indicators, -1)}
+    return vector_backtester.metrics_from_totals(totals), new_state
+
+
+def snapshot_backtest(strategy_name: str, data: pd.DataFrame, params: dict | None = None, cash=DEFAULT_CASH,
+                      commission=DEFAULT_COMMISSION) -> tuple[dict, dict]:
+    """
+    Full vector-engine backtest that also returns a snapshot to resume from.
+
+    Args:
+        strategy_name (str): STRATEGY_LOADERS key of a strategy the vector engine supports.
+        data (pd.DataFrame): OHLCV data with lowercase columns.
+        params (dict | None): Strategy parameters; missing ones use their PARAM_CONFIG default.
+                              trade_size_percent is in percent, as in the GUI.
+
+    Returns:
+        tuple: (stats: FAST_METRICS with '_trades' and '_equity_curve', as vector_backtest(with_trades=True),
+                snapshot dict for resume_backtest)
+
+    Raises:
+        ValueError: If the strategy is not supported by the vector engine.
+    """
+    if not supports(strategy_name): raise ValueError(f"{strategy_name} cannot be resumed (not supported by the vector engine)")
+    run_params = _run_params(strategy_name, params)
+    stats, state = _full_run(strategy_name, data, run_params, cash, commission)
+    return stats, _snapshot(strategy_name, data, run_params, cash, commission, state, data_fingerprint(data))
+
+
+def _snapshot(strategy_name, data, run_params, cash, commission, state, series_fingerprint) -> dict:
+    return {"version": SNAPSHOT_VERSION, "strategy": strategy_name, "params": run_params, "cash": float(cash),
+            "commission": commission, "bars": len(data), "first_bar": data.index[0], "last_bar": data.index[-1],
+            "fingerprint": data_fingerprint(data.iloc[-FINGERPRINT_BARS:]), "series_fingerprint": series_fingerprint, "state": state}
+
+
+def _from_first_bar(snapshot: dict, data: pd.DataFrame) -> pd.DataFrame | None:
+    """ data from the snapshot's first bar on (history before it, e.g. older cached bars, is not part of the run), or None without it. """
+    position = data.index.searchsorted(snapshot["first_bar"])
+    return data.iloc[position:] if position < len(data) and data.index[position] == snapshot["first_bar"] else None
+
+
+def resume_backtest(snapshot: dict, data: pd.DataFrame) -> tuple[dict, dict] | None:
+    """
+    Continues a snapshotted run over data, which must be the snapshot's history with bars appended;
+    bars before the snapshot's first bar are ignored, so data may be longer (untrimmed) history.
+
+    Returns:
+        tuple | None: (FAST_METRICS of snapshot_backtest on data from the snapshot's first bar, new snapshot),
+                      or None if the run cannot be resumed (recent history changed, shorter or without the
+                      first bar, warm-up not finished, other version).
+    """
+    if snapshot.get("version") != SNAPSHOT_VERSION: return None
+    data = _from_first_bar(snapshot, data); done = snapshot["bars"]
+    if data is None or len(data) < done or data.index[done - 1] != snapshot["last_bar"]: return None
+    if data_fingerprint(data.iloc[max(0, done - FINGERPRINT_BARS):done]) != snapshot["fingerprint"]: return None
+    state = snapshot["state"]
+    if state["start"] >= done: return None  # Still warming up: the back-filled equity is not final yet
+    try:
+        stats, new_state = _resume_run(snapshot["strategy"], data, done, snapshot["params"], snapshot["cash"], snapshot["commission"], state)
+    except _NotResumable:
+        return None
+    # The full series is never hashed again: the run is identified by its snapshot's series plus the new bars
+    series_fingerprint = hashlib.blake2b((snapshot["series_fingerprint"] + data_fingerprint(data.iloc[done:])).encode(), digest_size=16).hexdigest()
+    return stats, _snapshot(snapshot["strategy"], data, snapshot["params"], snapshot["cash"], snapshot["commission"], new_state, series_fingerprint)
+
+
+def incremental_backtest(strategy_name: str, data: pd.DataFrame, params: dict | None = None, cash=DEFAULT_CASH,
+                         commission=DEFAULT_COMMISSION, store=None, symbol: str | None = None,
+                         interval: str | None = None, period: str | None = None) -> tuple[dict, str]:
+    """
+    Backtests using the stored snapshot of the same configuration on symbol when there is a usable one,
+    then stores the new snapshot and the result. A full run is stored as run_strategy with the vector engine
+    would store it; a resumed one has no equity curve or trades and is keyed by its chained series fingerprint.
+
+    Args:
+        data (pd.DataFrame): OHLCV history; pass it untrimmed (DataFetcher trim=False) so a resumed run
+                             still finds its first bar.
+        store (ResultsStore | None): Where snapshots and results are kept; without it (or a symbol) every run is full.
+        symbol (str | None), interval (str | None): Identify the series the snapshot belongs to.
+        period (str | None): Window of a full run (e.g. "5y"); a resumed run keeps the first bar of its snapshot.
+
+    Returns:
+        tuple: (stats as snapshot_backtest (FAST_METRICS only when resumed), how it ran: "resumed +N bars" or "full")
+
+    Raises:
+        ValueError: If the strategy is not supported by the vector engine.
+    """
+    if not supports(strategy_name): raise ValueError(f"{strategy_name} cannot be resumed (not supported by the vector engine)")
+    run_params = _run_params(strategy_name, params)
+    started = time.perf_counter()
+    key = snapshot_key(STRATEGY_LOADERS[strategy_name], run_params, cash, commission, symbol, interval) if store is not None and symbol else None
+    snapshot = store.load_snapshot(key) if key else None
+    resumed = resume_backtest(snapshot, data) if snapshot is not None else None
+    if resumed is not None:
+        data = _from_first_bar(snapshot, data)
+        (stats, new_snapshot), mode = resumed, f"resumed +{len(data) - snapshot['bars']} bars"
+    else:
+        if period:
+            from data.ohlcv_cache import period_start
+            start = period_start(period, tz=data.index.tz)
+            if start is not None: data = data[data.index >= start]
+        (stats, new_snapshot), mode = snapshot_backtest(strategy_name, data, params, cash, commission), "full"
+    if key:
+        store.save_snapshot(key, new_snapshot, strategy_name, symbol, interval)
+        fingerprint = new_snapshot["series_fingerprint"]
+        store.save(run_key(STRATEGY_LOADERS[strategy_name], data, run_params, cash, commission, engine="vector", fingerprint=fingerprint),
+                   stats, strategy_name, STRATEGY_LOADERS[strategy_name], data, run_params, cash, commission, engine="vector",
+                   symbol=symbol, interval=interval, run_seconds=time.perf_counter() - started, fingerprint=fingerprint)
+    return stats, mode
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m trading.incremental", description="Resume backtests from stored snapshots when new bars arrive.")
+    parser.add_argument("--symbols", nargs="+", help=f"Tickers to refresh (default: config.SYMBOLS = {' '.join(SYMBOLS)})")
+    parser.add_argument("--strategies", nargs="+", metavar="NAME", help="Strategy display names (default: all the vector engine supports)")
+    parser.add_argument("--period", default=DEFAULT_DATA_PERIOD, help=f"History period (default {DEFAULT_DATA_PERIOD})")
+    parser.add_argument("--interval", default=DEFAULT_DATA_INTERVAL, help=f"Bar interval (default {DEFAULT_DATA_INTERVAL})")
+    args = parser.parse_args(argv)
+    strategy_names = args.strategies or [name for name in STRATEGY_LOADERS if supports(name)]
+    unsupported = [name for name in strategy_names if not supports(name)]
+    if unsupported: parser.error(f"cannot resume: {', '.join(unsupported)} (choose from: {', '.join(name for name in STRATEGY_LOADERS if supports(name))})")
+    from data.data_fetcher import DataFetcher
+    from trading.results_store import default_results_store
+    store = default_results_store()
+    if store is None: print("error: the results store is disabled (RESULTS_STORE_ENABLED) or unavailable", file=sys.stderr); return 1
+    # Untrimmed: a period window starts one bar later every day, so snapshots could never be resumed on it
+    datasets = DataFetcher().get_historical_data_many(args.symbols or SYMBOLS, period=args.period, interval=args.interval, trim=False)
+    started = time.perf_counter(); modes = []
+    for symbol, data in datasets.items():
+        if data is None or data.empty: print(f"{symbol}: no data, skipped"); continue
+        for name in strategy_names:
+            stats, mode = incremental_backtest(name, data, store=store, symbol=symbol, interval=args.interval, period=args.period); modes.append(mode)
+            print(f"{symbol} {name}: {mode}, Return {stats['Return [%]']:.2f}%, Sharpe {stats['Sharpe Ratio']:.2f}")
+    resumed = sum(mode != "full" for mode in modes)
+    print(f"{len(modes)} runs ({resumed} resumed, {len(modes) - resumed} full) in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+# trading/indicator_cache.py
+# In-memory memoization of indicator arrays shared by strategies, the vector engine and the
+# recommendation engine, keyed by (data fingerprint, indicator name, parameters)
+# The cache is per process and lock-guarded, so GUI worker threads share it and each worker process builds its own
+
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from config import INDICATOR_CACHE_ENABLED, INDICATOR_CACHE_MAX_ENTRIES, INDICATOR_CACHE_MAX_MB
+
+
+def fingerprint(values) -> tuple:
+    """ Content hash of an array/Series (dtype, shape and bytes), used in place of the data in cache keys. """
+    array = np.ascontiguousarray(values.to_numpy() if isinstance(values, (pd.Series, pd.Index)) else values)
+    return ("array", array.dtype.str, array.shape, hashlib.blake2b(array.view(np.uint8).reshape(-1), digest_size=16).digest())
+
+
+def _key_part(value):
+    if isinstance(value, (np.ndarray, pd.Series, pd.Index)): return fingerprint(value)
+    if isinstance(value, float) and value.is_integer(): return int(value)  # 14 and 14.0 give the same indicator
+    return value
+
+
+def _freeze(result):
+    """ Converts an indicator result into read-only ndarrays (a tuple for multi-output indicators). """
+    if isinstance(result, (tuple, list)): return tuple(_freeze(part) for part in result)
+    array = np.array(result.to_numpy() if isinstance(result, (pd.Series, pd.DataFrame)) else result, dtype=float)
+    array.setflags(write=False)
+    return array
+
+
+def _nbytes(result) -> int:
+    return sum(part.nbytes for part in result) if isinstance(result, tuple) else result.nbytes
+
+
+class IndicatorCache:
+    """
+    Thread-safe LRU cache of indicator arrays with an entry limit and a memory budget.
+
+    Cached arrays are read-only so that one consumer cannot alter what another one gets back.
+    """
+    def __init__(self, max_entries: int = 512, max_bytes: int = 128 * 1024 * 1024):
+        """
+        Args:
+            max_entries (int): Maximum number of cached indicators.
+            max_bytes (int): Maximum total size of the cached arrays.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> result, least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, name: str, func, args: tuple = (), kwargs: dict | None = None):
+        """
+        Returns the cached result of func(*args, **kwargs), computing and storing it on a miss.
+
+        Args:
+            name (str): Identifies the indicator function (part of the key).
+            func (callable): Indicator function.
+            args (tuple): Positional arguments; arrays/Series are keyed by their content.
+            kwargs (dict | None): Keyword arguments (indicator parameters).
+
+        Returns:
+            np.ndarray | tuple[np.ndarray, ...]: Read-only float array(s).
+        """
+        kwargs = kwargs or {}
+        key = (name, tuple(_key_part(a) for a in args), tuple(sorted((k, _key_part(v)) for k, v in kwargs.items())))
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key); self.hits += 1
+                return result
+            self.misses += 1
+        result = _freeze(func(*args, **kwargs))  # Computed outside the lock; a concurrent miss just computes twice
+        size = _nbytes(result)
+        if size > self.max_bytes: return result
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = result; self._bytes += size
+                while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False); self._bytes -= _nbytes(evicted)
+        return result
+
+    def clear(self):
+        """ Drops every cached indicator and resets the hit/miss counters. """
+        with self._lock:
+            self._entries.clear(); self._bytes = 0; self.hits = 0; self.misses = 0
+
+    def stats(self) -> dict:
+        """ Returns entry count, memory use (bytes) and hit/miss counters. """
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+INDICATOR_CACHE = IndicatorCache(INDICATOR_CACHE_MAX_ENTRIES, INDICATOR_CACHE_MAX_MB * 1024 * 1024)
+
+
+def cached(func, name: str | None = None):
+    """
+    Wraps an indicator function so its results come from INDICATOR_CACHE.
+    The wrapper keeps func's name, so backtesting.py labels self.I(cached(talib.RSI), ...) as before.
+
+    Args:
+        func (callable): Indicator function (talib function or a named function; not a lambda).
+        name (str | None): Cache name; defaults to the function's module and qualified name.
+
+    Returns:
+        callable: Function returning read-only float array(s) instead of func's own result type.
+
+    Raises:
+        ValueError: If func is a lambda and no name is given (all lambdas share one name).
+    """
+    if name is None:
+        qualname = getattr(func, "__qualname__", getattr(func, "__name__", repr(func)))
+        if "<lambda>" in qualname: raise ValueError("cached() needs an explicit name for lambdas")
+        name = f"{getattr(func, '__module__', None) or ''}.{qualname}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not INDICATOR_CACHE_ENABLED: return _freeze(func(*args, **kwargs))
+        return INDICATOR_CACHE.get_or_compute(name, func, args, kwargs)
+    return wrapper
@@ -0,0 +1,78 @@
+# trading/indicators.py
+# Named indicator functions used by the strategies and the vector engine
+# (named rather than lambdas so their results can be memoized by trading.indicator_cache)
+# Rolling max/min use an O(n) block kernel (van Herk / Gil-Werman) shared by Donchian and Ichimoku
+
+import numpy as np
+import pandas as pd
+
+_EXTREMA = {"max": np.maximum, "min": np.minimum}
+
+
+def rolling_mean(values, window: int):
+    """ Simple moving average over window bars (NaN until the window is full). """
+    return pd.Series(values).rolling(int(window)).mean()
+
+
+def shift_forward(values, periods: int) -> np.ndarray:
+    """ values moved periods bars later, NaN-filled at the start (pandas Series.shift for float arrays). """
+    values = np.asarray(values, dtype=float); periods = int(periods)
+    if periods < 0: raise ValueError(f"periods must be >= 0, got {periods}")
+    shifted = np.full(len(values), np.nan)
+    if periods == 0: shifted[:] = values
+    elif periods < len(values): shifted[periods:] = values[:-periods]
+    return shifted
+
+
+def _rolling_extreme(values: np.ndarray, window: int, op) -> np.ndarray:
+    """
+    Rolling max/min in O(n) independent of window: split the array into blocks of window bars,
+    take running extremes forward (prefix) and backward (suffix) inside each block, then every
+    window is op(suffix at its start, prefix at its end). NaNs propagate like pandas' rolling
+    with min_periods=window (a window containing NaN gives NaN).
+    """
+    n = len(values); result = np.full(n, np.nan)
+    if window < 1: raise ValueError(f"window must be >= 1, got {window}")
+    if window > n: return result
+    if window == 1: return values.copy()
+    blocks = np.concatenate([values, np.full(-n % window, np.nan)]).reshape(-1, window)
+    prefix = op.accumulate(blocks, axis=1).ravel()
+    suffix = op.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    result[window - 1:] = op(suffix[:n - window + 1], prefix[window - 1:n])
+    return result
+
+
+def rolling_extrema(values, windows, kind: str = "max") -> tuple:
+    """
+    Rolling maxima (kind="max") or minima (kind="min") of values for several window lengths,
+    sharing one float conversion of the input.
+
+    Returns:
+        tuple[np.ndarray, ...]: One array per window, in the order given (NaN until each window is full).
+    """
+    values = np.asarray(values, dtype=float)
+    return tuple(_rolling_extreme(values, int(window), _EXTREMA[kind]) for window in windows)
+
+
+def rolling_max(values, window: int, shift: int = 0) -> np.ndarray:
+    """ Highest value of the last window bars, optionally shifted forward by shift bars. """
+    result, = rolling_extrema(values, (window,), "max")
+    return shift_forward(result, shift) if shift else result
+
+
+def rolling_min(values, window: int, shift: int = 0) -> np.ndarray:
+    """ Lowest value of the last window bars, optionally shifted forward by shift bars. """
+    result, = rolling_extrema(values, (window,), "min")
+    return shift_forward(result, shift) if shift else result
+
+
+def channel_midpoints(high, low, windows) -> tuple:
+    """
+    (highest high + lowest low) / 2 over each window length: Ichimoku's Tenkan, Kijun and
+    Senkou B base lines, computed together from one pass setup per series.
+
+    Returns:
+        tuple[np.ndarray, ...]: One midpoint array per window, in the order given.
+    """
+    highs = rolling_extrema(high, windows, "max"); lows = rolling_extrema(low, windows, "min")
+    return tuple((h + l) / 2 for h, l in zip(highs, lows))
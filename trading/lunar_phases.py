@@ -0,0 +1,125 @@
+# trading/lunar_phases.py
+# New/full moon event table for RealMoonStrategy: computed with ephem once per date range,
+# persisted as a small JSON file and turned into per-bar "days since new/full moon" arrays
+# Moon phases are geocentric events, so one table serves every run and every observer location
+
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config import MOON_PHASE_TABLE_FILE
+
+_MARGIN_DAYS = 40  # Computed range starts this far before the first bar, so it always has a previous event
+
+
+class LunarPhaseTable:
+    """
+    Cached new/full moon times (UTC) covering a contiguous date range.
+
+    The table only grows: a request outside the covered range recomputes the union of both
+    ranges and rewrites the file (a few milliseconds per decade of data).
+    """
+    def __init__(self, path: str = MOON_PHASE_TABLE_FILE):
+        """
+        Args:
+            path (str): JSON file holding the table (created on first use; None keeps it in memory only).
+        """
+        self.path = path
+        self.covered_from = None; self.covered_to = None  # pd.Timestamp (UTC, naive)
+        self.new_moons = np.array([], dtype="datetime64[s]"); self.full_moons = np.array([], dtype="datetime64[s]")
+        self._lock = threading.Lock()
+        self._load()
+
+    # --- Persistence ---
+    def _load(self):
+        if not self.path or not os.path.exists(self.path): return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                table = json.load(f)
+            self.covered_from = pd.Timestamp(table["covered_from"]); self.covered_to = pd.Timestamp(table["covered_to"])
+            self.new_moons = np.array(table["new_moons"], dtype="datetime64[s]"); self.full_moons = np.array(table["full_moons"], dtype="datetime64[s]")
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable moon phase table {self.path}: {e}")
+            self.covered_from = self.covered_to = None
+
+    def _save(self):
+        if not self.path: return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory: os.makedirs(directory, exist_ok=True)
+            table = {"covered_from": self.covered_from.isoformat(), "covered_to": self.covered_to.isoformat(),
+                     "new_moons": [str(t) for t in self.new_moons], "full_moons": [str(t) for t in self.full_moons]}
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(table, f)
+            os.replace(tmp_path, self.path)  # Atomic swap so readers never see a half-written file
+        except Exception as e:
+            print(f"Warning: Could not write moon phase table {self.path}: {e}")
+
+    # --- Computation ---
+    @staticmethod
+    def _compute_events(ephem_module, next_event, start: pd.Timestamp, end: pd.Timestamp) -> np.ndarray:
+        """ All events from next_event (e.g. ephem.next_new_moon) between start and end, as UTC datetime64[s]. """
+        times = []; current = ephem_module.Date(start.to_pydatetime()); stop = ephem_module.Date(end.to_pydatetime())
+        while True:
+            event = next_event(current)
+            if event > stop: break
+            times.append(np.datetime64(event.datetime().replace(microsecond=0), "s")); current = ephem_module.Date(event + 1)
+        return np.array(times, dtype="datetime64[s]")
+
+    def ensure_covers(self, start: pd.Timestamp, end: pd.Timestamp, ephem_module):
+        """
+        Makes sure the table holds every new/full moon between start - margin and end.
+
+        Args:
+            start, end (pd.Timestamp): Naive UTC timestamps of the first and last bar.
+            ephem_module: The imported ephem module.
+        """
+        start = (start - pd.Timedelta(days=_MARGIN_DAYS)).normalize(); end = end.normalize() + pd.Timedelta(days=1)
+        with self._lock:
+            if self.covered_from is not None and self.covered_from <= start and end <= self.covered_to: return
+            if self.covered_from is not None: start = min(start, self.covered_from); end = max(end, self.covered_to)
+            self.new_moons = self._compute_events(ephem_module, ephem_module.next_new_moon, start, end)
+            self.full_moons = self._compute_events(ephem_module, ephem_module.next_full_moon, start, end)
+            self.covered_from, self.covered_to = start, end
+            print(f"Moon phase table computed for {start.date()} to {end.date()} ({len(self.new_moons)} new / {len(self.full_moons)} full moons)")
+            self._save()
+
+    def days_since(self, index: pd.DatetimeIndex, ephem_module) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Whole days from the most recent new and full moon to each bar's date.
+
+        A bar's date counts from its midnight UTC, and the day count is between calendar dates,
+        matching a per-bar ephem.previous_new_moon(date) lookup.
+
+        Returns:
+            tuple: (days_since_new, days_since_full) integer arrays, one value per bar.
+        """
+        dates = index.tz_localize(None) if index.tz is not None else index  # Bar's own calendar date, as the strategy always used
+        bar_days = dates.normalize().to_numpy().astype("datetime64[s]")
+        self.ensure_covers(pd.Timestamp(bar_days[0]), pd.Timestamp(bar_days[-1]), ephem_module)
+        with self._lock: new_moons, full_moons = self.new_moons, self.full_moons
+        def days_since_event(events):
+            previous = events[np.searchsorted(events, bar_days, side="right") - 1]
+            return (bar_days.astype("datetime64[D]") - previous.astype("datetime64[D]")).astype(int)
+        return days_since_event(new_moons), days_since_event(full_moons)
+
+
+_tables = {}  # path -> LunarPhaseTable, shared by every run in this process
+_tables_lock = threading.Lock()
+
+
+def get_phase_table(path: str = MOON_PHASE_TABLE_FILE) -> LunarPhaseTable:
+    """ Returns the process-wide table for path, loading it from disk on first use. """
+    with _tables_lock:
+        table = _tables.get(path)
+        if table is None: table = _tables[path] = LunarPhaseTable(path)
+        return table
+
+
+def moon_phase_days(index: pd.DatetimeIndex, ephem_module) -> tuple[np.ndarray, np.ndarray]:
+    """ Shortcut for get_phase_table().days_since(index, ephem_module). """
+    return get_phase_table().days_since(index, ephem_module)
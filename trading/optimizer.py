@@ -0,0 +1,259 @@
+# trading/optimizer.py
+# Grid-search parameter optimization: runs every combination of parameter ranges
+# through run_backtest on a process pool and ranks the results
+# Strategies supported by the vector engine are swept in-process with vector_backtest instead
+
+import itertools
+import math
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+import pandas as pd
+
+from trading.backtester import run_backtest, BacktestCancelled
+from trading.strategy_registry import PARAM_CONFIG, get_strategy_class, trade_size_fraction
+from trading import vector_backtester
+
+# Stats copied from each run into the results table
+RESULT_METRICS = ["Return [%]", "Sharpe Ratio", "Max. Drawdown [%]", "Win Rate [%]", "# Trades", "Equity Final [$]", "SQN"]
+DEFAULT_METRIC = "Return [%]"  # All RESULT_METRICS rank "larger is better" (drawdowns are negative percentages)
+
+ENGINES = ("auto", "vector", "backtesting")  # "auto" = vector engine when the strategy supports it
+
+_RANGE_PATTERN = re.compile(r"^\s*(-?[\d.]+)\s*-\s*(-?[\d.]+)\s*(?::\s*([\d.]+))?\s*$")
+
+
+def _number(text: str):
+    value = float(text)
+    return int(value) if value.is_integer() and "." not in text else value
+
+
+def parse_param_range(spec) -> list:
+    """
+    Parses a parameter range typed by the user.
+
+    Accepted forms:
+        "10"          -> [10]
+        "5-50"        -> [5, 6, ..., 50]           (step 1 for integers)
+        "5-50:5"      -> [5, 10, ..., 50]
+        "1.5-3:0.5"   -> [1.5, 2.0, 2.5, 3.0]
+        "0,2,4"       -> [0, 2, 4]
+    Float ranges without a step are split into 10 intervals.
+
+    Raises:
+        ValueError: If the text is not a valid range.
+    """
+    if isinstance(spec, (int, float)): return [spec]
+    spec = str(spec).strip()
+    if not spec: raise ValueError("empty range")
+    if "," in spec: return [_number(part.strip()) for part in spec.split(",") if part.strip()]
+    match = _RANGE_PATTERN.match(spec)
+    if not match: return [_number(spec)]
+    start, stop = _number(match.group(1)), _number(match.group(2))
+    if stop < start: raise ValueError(f"range end {stop} is below start {start}")
+    if match.group(3) is not None: step = _number(match.group(3))
+    elif isinstance(start, int) and isinstance(stop, int): step = 1
+    else: step = (stop - start) / 10 or 1
+    if step <= 0: raise ValueError("range step must be positive")
+    count = int(math.floor((stop - start) / step + 1e-9)) + 1
+    values = [start + i * step for i in range(count)]
+    if all(isinstance(v, int) for v in (start, stop, step)): return values
+    return [round(v, 10) for v in values]
+
+
+def constraint_from_expression(expression: str | None):
+    """
+    Turns an expression such as "n1 < n2" into a constraint function params -> bool.
+    The expression can use the parameter names and basic arithmetic/comparison only.
+    Returns None for an empty expression.
+
+    Raises:
+        ValueError: If the expression does not compile.
+    """
+    if expression is None or not expression.strip(): return None
+    try: code = compile(expression, "<constraint>", "eval")
+    except SyntaxError as e: raise ValueError(f"Invalid constraint '{expression}': {e.msg}") from e
+    safe_builtins = {"abs": abs, "min": min, "max": max, "round": round}
+    def constraint(params: dict) -> bool:
+        return bool(eval(code, {"__builtins__": safe_builtins}, dict(params)))
+    constraint.expression = expression
+    return constraint
+
+
+def build_param_grid(param_ranges: dict, constraint=None) -> list[dict]:
+    """
+    Expands {name: [values]} into the list of parameter combinations that satisfy the constraint.
+
+    Args:
+        param_ranges (dict): Parameter name -> list of candidate values.
+        constraint (callable | None): Called with each combination dict; combinations for which
+                                      it returns False are skipped.
+
+    Returns:
+        list[dict]: One dict per combination, in itertools.product order.
+    """
+    names = list(param_ranges)
+    grid = [dict(zip(names, values)) for values in itertools.product(*(param_ranges[n] for n in names))]
+    if constraint is not None: grid = [params for params in grid if constraint(params)]
+    return grid
+
+
+def resolve_param_ranges(strategy_name: str, param_ranges: dict) -> dict:
+    """ {name: [values]} for every PARAM_CONFIG parameter of the strategy: param_ranges entries (value or list of values) over the defaults. """
+    ranges = {name: [default] for name, default in PARAM_CONFIG.get(strategy_name, [])}
+    for name, values in param_ranges.items():
+        ranges[name] = list(values) if isinstance(values, (list, tuple, range, np.ndarray)) else [values]
+    return ranges
+
+
+def param_grid(strategy_name: str, param_ranges: dict, constraint=None) -> list[dict]:
+    """
+    Combinations for one strategy: param_ranges (name -> value or list of values) over its PARAM_CONFIG
+    defaults, filtered by constraint (callable or expression such as "n1 < n2").
+
+    Raises:
+        ValueError: If the constraint does not compile or no combination satisfies it.
+    """
+    if isinstance(constraint, str): constraint = constraint_from_expression(constraint)
+    grid = build_param_grid(resolve_param_ranges(strategy_name, param_ranges), constraint)
+    if not grid: raise ValueError("No parameter combinations satisfy the constraint.")
+    return grid
+
+
+# --- Worker process side ---
+_worker_state = {}
+
+
+def _init_worker(data: pd.DataFrame, strategy_name: str, cash, commission, quiet: bool):
+    """ Runs once per worker process: keeps the data and strategy so tasks only carry parameters. """
+    if quiet:
+        # Per-run logging from run_backtest and the strategies would flood the console
+        sys.stdout = open(os.devnull, "w")
+    _worker_state.update(data=data, strategy_class=get_strategy_class(strategy_name), cash=cash, commission=commission)
+
+
+def _run_combination(params: dict) -> dict:
+    """ Backtests one parameter combination in a worker process and returns its metrics. """
+    return evaluate_params(_worker_state["strategy_class"], _worker_state["data"], params,
+                           cash=_worker_state["cash"], commission=_worker_state["commission"])
+
+
+def evaluate_params(strategy_class, data, params: dict, cash=10000, commission=0.001, vector: bool = False) -> dict:
+    """
+    Runs one backtest and flattens it into a results row (parameters + RESULT_METRICS).
+    trade_size_percent is given in percent, as in the GUI. Failed runs get NaN metrics and an 'error'.
+    With vector=True the run uses vector_backtest (data may then be prepared bars).
+    """
+    run_params = dict(params)
+    if "trade_size_percent" in run_params: run_params["trade_size_percent"] = trade_size_fraction(run_params["trade_size_percent"])
+    row = dict(params)
+    try:
+        if vector: stats = vector_backtester.vector_backtest(strategy_class, data, cash=cash, commission=commission, **run_params)
+        else: stats, _ = run_backtest(strategy_class, data, cash=cash, commission=commission, **run_params)
+        error = None if stats is not None else "backtest failed"
+    except Exception as e:
+        stats, error = None, f"{type(e).__name__}: {e}"
+    for metric in RESULT_METRICS:
+        value = stats.get(metric, np.nan) if stats is not None else np.nan
+        row[metric] = float(value) if isinstance(value, (int, float, np.number)) else np.nan
+    row["error"] = error
+    return row
+
+
+# --- Main side ---
+def grid_search(strategy_name: str, data: pd.DataFrame, param_ranges: dict, constraint=None,
+                metric: str = DEFAULT_METRIC, cash=10000, commission=0.001, max_workers: int | None = None,
+                cancel_event=None, progress_callback=None, quiet: bool = True, engine: str = "auto") -> pd.DataFrame:
+    """
+    Backtests every parameter combination on a process pool and ranks them.
+    With the vector engine the combinations run in this process instead (each run takes about
+    a millisecond, far less than starting worker processes).
+
+    Args:
+        strategy_name (str): Key into STRATEGY_LOADERS / PARAM_CONFIG.
+        data (pd.DataFrame): OHLCV data with lowercase columns (sent to each worker once).
+        param_ranges (dict): Parameter name -> value or list of values. Parameters of the strategy
+                             that are missing use their PARAM_CONFIG default.
+        constraint (callable | str | None): Filter on combinations, e.g. lambda p: p["n1"] < p["n2"]
+                                            or the expression "n1 < n2".
+        metric (str): Stat to rank by (descending).
+        max_workers (int | None): Worker processes (default: CPU count, capped by combinations).
+        cancel_event (threading.Event | None): Stops the search when set (BacktestCancelled is raised).
+        progress_callback (callable | None): Called with (completed, total) as runs finish.
+        quiet (bool): Silence per-run console output in the workers.
+        engine (str): One of ENGINES.
+
+    Returns:
+        pd.DataFrame: One row per combination (parameters, RESULT_METRICS, 'error'), best first,
+                      with a 'rank' column starting at 1.
+
+    Raises:
+        ValueError: If no combination satisfies the constraint, the engine is unknown, or
+                    engine="vector" is requested for a strategy it does not support.
+    """
+    grid = param_grid(strategy_name, param_ranges, constraint)
+    total = len(grid)
+    if engine not in ENGINES: raise ValueError(f"Unknown engine '{engine}' (expected one of {ENGINES})")
+    if engine != "backtesting":
+        strategy_class = get_strategy_class(strategy_name)
+        if vector_backtester.supports(strategy_class):
+            return rank_results(_vector_sweep(strategy_class, data, grid, cash, commission, cancel_event, progress_callback), metric)
+        if engine == "vector": raise ValueError(f"{strategy_name} is not supported by the vector engine")
+    workers = max(1, min(max_workers or os.cpu_count() or 1, total))
+    print(f"Grid search: {strategy_name}, {total} combinations on {workers} worker process(es)")
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(data, strategy_name, cash, commission, quiet)) as executor:
+        pending = {executor.submit(_run_combination, params) for params in grid}
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+                if cancel_event is not None and cancel_event.is_set():
+                    raise BacktestCancelled(f"Grid search cancelled after {len(rows)}/{total} runs")
+                for future in done: rows.append(future.result())
+                if done and progress_callback is not None: progress_callback(len(rows), total)
+        except BaseException:
+            for future in pending: future.cancel()
+            raise
+    return rank_results(pd.DataFrame(rows), metric)
+
+
+def _vector_sweep(strategy_class, data, grid, cash, commission, cancel_event, progress_callback) -> pd.DataFrame:
+    """ Runs the grid in-process with vector_backtest, reporting progress about every 1% of runs. """
+    total = len(grid)
+    print(f"Grid search: {strategy_class.__name__}, {total} combinations on the vector engine")
+    bars = vector_backtester.prepare_bars(data)
+    rows = []; report_every = max(1, total // 100)
+    for params in grid:
+        if cancel_event is not None and cancel_event.is_set():
+            raise BacktestCancelled(f"Grid search cancelled after {len(rows)}/{total} runs")
+        rows.append(evaluate_params(strategy_class, bars, params, cash=cash, commission=commission, vector=True))
+        if progress_callback is not None and (len(rows) % report_every == 0 or len(rows) == total): progress_callback(len(rows), total)
+    return pd.DataFrame(rows)
+
+
+def rank_results(results: pd.DataFrame, metric: str = DEFAULT_METRIC) -> pd.DataFrame:
+    """ Sorts results best-first by metric (NaN last) and adds a 1-based 'rank' column. """
+    ranked = results.sort_values(metric, ascending=False, na_position="last", kind="mergesort").reset_index(drop=True)
+    ranked.insert(0, "rank", range(1, len(ranked) + 1))
+    return ranked
+
+
+def varied_params(results: pd.DataFrame, param_names) -> list[str]:
+    """ Returns the parameters that take more than one value in the results, in the given order. """
+    return [name for name in param_names if name in results.columns and results[name].nunique() > 1]
+
+
+def heatmap_table(results: pd.DataFrame, x_param: str, y_param: str, metric: str = DEFAULT_METRIC,
+                  aggregate: str = "max") -> pd.DataFrame:
+    """
+    Pivots results into a y_param x x_param grid of metric values.
+    Other parameters are collapsed with aggregate ("max" = best result for each cell).
+    """
+    for name in (x_param, y_param):
+        if name not in results.columns: raise KeyError(f"Unknown parameter '{name}'")
+    return results.pivot_table(index=y_param, columns=x_param, values=metric, aggfunc=aggregate).sort_index().sort_index(axis=1)
@@ -0,0 +1,212 @@
+# trading/portfolio.py
+# Multi-symbol portfolio backtest: one strategy over a list of symbols trading from a single cash pool
+# Bars are aligned on the union of the symbols' calendars, per-symbol signals are computed in parallel
+# with the vector engine's signal builders, and entries are sized by an allocation rule
+# Broker rules follow the vector engine: orders fill at the symbol's next bar's open, whole shares,
+# commission on entry and exit, trades still open at the end stay open (marked to market)
+# Usage: python -m trading.portfolio STRATEGY [--symbols AAPL MSFT ...] [--data a.csv ...] [--allocation equal_weight]
+
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config import (SYMBOLS, DEFAULT_DATA_PERIOD, DEFAULT_DATA_INTERVAL, DEFAULT_CASH, DEFAULT_COMMISSION,
+                    PORTFOLIO_ALLOCATION, PORTFOLIO_MAX_POSITION_PERCENT)
+from trading.strategy_registry import STRATEGY_LOADERS, PARAM_CONFIG, strategy_class_name
+from trading import vector_backtester
+
+ALLOCATION_RULES = ("equal_weight", "capped_percent")
+# equal_weight:   each entry is sized to equity / number of symbols
+# capped_percent: each entry is sized to max_position_percent of equity
+# Both are limited by the cash actually available when the order fills
+
+
+def supports(strategy_name: str) -> bool:
+    """ True if the strategy can run as a portfolio (its signals come from the vector engine). """
+    return strategy_name in STRATEGY_LOADERS and vector_backtester.supports(strategy_class_name(strategy_name))
+
+
+def _symbol_signals(data: pd.DataFrame, strategy_name: str, params: dict) -> tuple[np.ndarray, np.ndarray]:
+    """ Entry / exit signals on the symbol's own bars, cleared during its warm-up period. """
+    builder, _ = vector_backtester.SIGNAL_BUILDERS[strategy_class_name(strategy_name)]
+    entry, exit, indicators = builder(vector_backtester.prepare_bars(data), params)
+    start = 1 + vector_backtester.warmup_bars(indicators)
+    entry = entry.copy(); exit = exit & ~entry  # The strategies check the buy condition first (if/elif)
+    entry[:start] = False; exit[:start] = False
+    return entry, exit
+
+
+def align(datasets: dict, signals: dict) -> dict:
+    """
+    Puts every symbol on the union calendar.
+
+    Returns:
+        dict: index, symbols, and (bars x symbols) arrays: open (NaN where a symbol has no bar),
+              close (last close carried forward, NaN before the first bar), entry / exit signals,
+              next_bar (calendar position of the symbol's next bar, -1 if none).
+    """
+    symbols = list(datasets)
+    index = datasets[symbols[0]].index
+    for symbol in symbols[1:]: index = index.union(datasets[symbol].index)
+    n, width = len(index), len(symbols)
+    opens = np.full((n, width), np.nan); closes = np.full((n, width), np.nan)
+    entry = np.zeros((n, width), dtype=bool); exit = np.zeros((n, width), dtype=bool); next_bar = np.full((n, width), -1)
+    for column, symbol in enumerate(symbols):
+        data = datasets[symbol]; rows = index.get_indexer(data.index)
+        opens[rows, column] = data["open"].to_numpy(dtype=float); closes[rows, column] = data["close"].to_numpy(dtype=float)
+        entry[rows, column], exit[rows, column] = signals[symbol]
+        next_bar[rows[:-1], column] = rows[1:]
+    closes = pd.DataFrame(closes).ffill().to_numpy()
+    return {"index": index, "symbols": symbols, "open": opens, "close": closes, "entry": entry, "exit": exit, "next_bar": next_bar}
+
+
+def _simulate(aligned: dict, cash: float, commission: float, allocation: str, max_position_percent: float):
+    """
+    Walks the bars that have a signal or a fill, keeping one cash balance for all symbols.
+    At each fill bar exits are executed before entries, so freed cash can be reused the same bar;
+    entries filling on the same bar are sized in symbol order.
+
+    Returns:
+        tuple: (equity array, cash array, positions array (bars x symbols), list of closed trade dicts)
+    """
+    opens, closes, next_bar = aligned["open"], aligned["close"], aligned["next_bar"]
+    n, width = opens.shape
+    positions = np.zeros((n, width)); cash_delta = np.zeros(n); cash_delta[0] = float(cash)
+    held = {}  # column -> open trade dict
+    pending = {}  # fill bar -> list of (column, "buy" | "sell")
+    trades = []; current_cash = float(cash)
+    signal_bars = np.flatnonzero(aligned["entry"].any(axis=1) | aligned["exit"].any(axis=1)).tolist()
+    events = sorted(set(signal_bars) | {int(b) for b in next_bar[signal_bars][aligned["entry"][signal_bars] | aligned["exit"][signal_bars]] if b >= 0})
+    for t in events:
+        orders = pending.pop(t, [])
+        for column, side in sorted(orders, key=lambda order: order[1] != "sell"):  # Sells first
+            price = opens[t, column]
+            if side == "sell":
+                trade = held.pop(column); exit_fee = trade["size"] * price * commission
+                current_cash += trade["size"] * price - exit_fee; cash_delta[t] += trade["size"] * price - exit_fee
+                positions[t:, column] = 0
+                trade.update(exit_bar=t, exit_price=price, commissions=trade["commissions"] + exit_fee)
+                trade["pnl"] = trade["size"] * (price - trade["entry_price"]) - trade["commissions"]
+                trade["return_pct"] = price / trade["entry_price"] - 1 - trade["commissions"] / (trade["size"] * trade["entry_price"])
+                trades.append(trade)
+            else:
+                marks = np.where(np.isnan(opens[t]), closes[t - 1], opens[t])
+                equity = current_cash + sum(trade["size"] * marks[c] for c, trade in held.items())
+                target = equity / width if allocation == "equal_weight" else equity * max_position_percent / 100.0
+                size = int(min(current_cash, target) // (price * (1 + commission)))
+                if size <= 0: continue  # Not enough cash: the order is cancelled, the symbol stays flat
+                entry_fee = size * price * commission
+                current_cash -= size * price + entry_fee; cash_delta[t] -= size * price + entry_fee
+                positions[t:, column] = size
+                held[column] = {"symbol": aligned["symbols"][column], "size": size, "entry_bar": t, "entry_price": price, "commissions": entry_fee}
+        # Signals on this bar's close become orders for each symbol's next bar
+        for column in np.flatnonzero(aligned["entry"][t] | aligned["exit"][t]):
+            fill = next_bar[t, column]
+            if fill < 0: continue  # Order placed on the symbol's last bar is never filled
+            ordered = any(c == column for c, _ in pending.get(fill, []))
+            if column not in held and aligned["entry"][t, column] and not ordered: pending.setdefault(fill, []).append((column, "buy"))
+            elif column in held and aligned["exit"][t, column] and not ordered: pending.setdefault(fill, []).append((column, "sell"))
+    cash_curve = np.cumsum(cash_delta)
+    equity = cash_curve + np.nansum(positions * closes, axis=1)
+    return equity, cash_curve, positions, trades
+
+
+def portfolio_backtest(strategy_name: str, datasets: dict, params: dict | None = None, cash=DEFAULT_CASH,
+                       commission=DEFAULT_COMMISSION, allocation: str = PORTFOLIO_ALLOCATION,
+                       max_position_percent: float = PORTFOLIO_MAX_POSITION_PERCENT, max_workers: int | None = None) -> pd.Series:
+    """
+    Backtests one strategy over several symbols sharing one cash pool.
+
+    Args:
+        strategy_name (str): STRATEGY_LOADERS key of a strategy the vector engine supports.
+        datasets (dict): Symbol -> OHLCV DataFrame (lowercase columns); symbols without data are skipped.
+        params (dict | None): Strategy parameters; missing ones use their PARAM_CONFIG default.
+                              trade_size_percent is ignored (the allocation rule sizes positions).
+        cash (float): Initial cash of the whole portfolio.
+        commission (float): Commission rate per trade side.
+        allocation (str): One of ALLOCATION_RULES.
+        max_position_percent (float): Position cap in percent of equity for "capped_percent".
+        max_workers (int | None): Threads computing per-symbol signals (default: one per symbol, at most CPU count).
+
+    Returns:
+        pd.Series: Portfolio stats (the vector engine's FAST_METRICS plus portfolio figures) with
+                   '_equity_curve' (Equity, Cash, DrawdownPct and one position value column per symbol)
+                   and '_trades' (trades_frame columns plus Symbol).
+
+    Raises:
+        ValueError: If the strategy is unsupported, the allocation rule unknown, or no symbol has data.
+    """
+    if not supports(strategy_name): raise ValueError(f"{strategy_name} cannot run as a portfolio (it is not supported by the vector engine)")
+    if allocation not in ALLOCATION_RULES: raise ValueError(f"Unknown allocation '{allocation}' (expected one of {ALLOCATION_RULES})")
+    datasets = {symbol: data for symbol, data in datasets.items()
+                if data is not None and not data.empty and all(col in data.columns for col in vector_backtester.OHLCV_COLUMNS)}
+    if not datasets: raise ValueError("No symbol has OHLCV data to backtest.")
+    run_params = dict(PARAM_CONFIG.get(strategy_name, [])); run_params.update(params or {})
+
+    # Indicator kernels are NumPy / TA-Lib code and results go through the shared indicator cache,
+    # so threads avoid copying every symbol's data into worker processes
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(datasets)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {symbol: executor.submit(_symbol_signals, data, strategy_name, run_params) for symbol, data in datasets.items()}
+        signals = {symbol: future.result() for symbol, future in futures.items()}
+    aligned = align(datasets, signals)
+    equity, cash_curve, positions, trades = _simulate(aligned, float(cash), float(commission), allocation, float(max_position_percent))
+
+    index = aligned["index"]
+    stats = vector_backtester.fast_metrics(equity, vector_backtester.index_bars(index), trades)
+    invested = 1 - cash_curve / equity
+    stats = {"Start": index[0], "End": index[-1], "Symbols": ", ".join(aligned["symbols"]), "Allocation": allocation, **stats,
+             "Avg. Invested [%]": float(np.mean(invested)) * 100, "Max. Open Positions": int((positions > 0).sum(axis=1).max())}
+    stats = pd.Series(stats, dtype=object)
+    curve = pd.DataFrame({"Equity": equity, "Cash": cash_curve, "DrawdownPct": 1 - equity / np.maximum.accumulate(equity)}, index=index)
+    for column, symbol in enumerate(aligned["symbols"]): curve[symbol] = np.nan_to_num(positions[:, column] * aligned["close"][:, column])
+    stats['_equity_curve'] = curve
+    trade_frame = vector_backtester.trades_frame(trades, index)
+    trade_frame.insert(0, "Symbol", [t["symbol"] for t in trades])
+    stats['_trades'] = trade_frame
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m trading.portfolio", description="Backtest one strategy over several symbols with shared cash.")
+    parser.add_argument("strategy", help='Strategy display name or class name, e.g. "SMA Crossover" or SmaCross')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--symbols", nargs="+", help=f"Tickers to load through DataFetcher (default: config.SYMBOLS = {' '.join(SYMBOLS)})")
+    source.add_argument("--data", nargs="+", metavar="FILE", help="Local OHLCV files (.csv, .parquet or .pkl); the file name is the symbol")
+    parser.add_argument("--period", default=DEFAULT_DATA_PERIOD, help=f"History period for --symbols (default {DEFAULT_DATA_PERIOD})")
+    parser.add_argument("--interval", default=DEFAULT_DATA_INTERVAL, help=f"Bar interval for --symbols (default {DEFAULT_DATA_INTERVAL})")
+    parser.add_argument("-p", "--param", action="append", default=[], metavar="NAME=VALUE", help="Strategy parameter (repeatable)")
+    parser.add_argument("--allocation", choices=ALLOCATION_RULES, default=PORTFOLIO_ALLOCATION, help=f"Position sizing rule (default {PORTFOLIO_ALLOCATION})")
+    parser.add_argument("--max-position", type=float, default=PORTFOLIO_MAX_POSITION_PERCENT, help=f"Cap in percent of equity for capped_percent (default {PORTFOLIO_MAX_POSITION_PERCENT})")
+    parser.add_argument("--cash", type=float, default=DEFAULT_CASH, help=f"Initial portfolio cash (default {DEFAULT_CASH})")
+    parser.add_argument("--commission", type=float, default=DEFAULT_COMMISSION, help=f"Commission per trade side (default {DEFAULT_COMMISSION})")
+    parser.add_argument("--equity", help="Write the combined equity curve (.parquet, .csv or .json)")
+    parser.add_argument("--trades", help="Write the trade list (.parquet, .csv or .json)")
+    args = parser.parse_args(argv)
+    from trading.cli import parse_param, write_table
+    from trading.runner import resolve_strategy_name, load_data_file
+    try: strategy_name = resolve_strategy_name(args.strategy)
+    except KeyError: parser.error(f"unknown strategy '{args.strategy}' (choose from: {', '.join(name for name in STRATEGY_LOADERS if supports(name))})")
+    try: params = dict(parse_param(text) for text in args.param)
+    except ValueError as e: parser.error(str(e))
+    if args.data: datasets = {os.path.splitext(os.path.basename(path))[0]: load_data_file(path) for path in args.data}
+    else:
+        from data.data_fetcher import DataFetcher
+        datasets = DataFetcher().get_historical_data_many(args.symbols or SYMBOLS, period=args.period, interval=args.interval)
+    try:
+        stats = portfolio_backtest(strategy_name, datasets, params, cash=args.cash, commission=args.commission,
+                                   allocation=args.allocation, max_position_percent=args.max_position)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr); return 1
+    print(stats.drop(['_equity_curve', '_trades']).to_string())
+    if args.equity: write_table(stats['_equity_curve'], args.equity)
+    if args.trades: write_table(stats['_trades'], args.trades)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# trading/profiling.py
+# Opt-in instrumentation for run_backtest: wall time (and optionally tracemalloc allocations) per phase
+# - data preparation, engine setup, Strategy.init() (indicators), the per-bar loop, stats - plus the
+# latency distribution of the strategy's next() calls
+# Costs nothing unless run_backtest(profile=True) asks for it; only then is the strategy class wrapped
+
+import time
+import tracemalloc
+
+import numpy as np
+
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+class BacktestProfiler:
+    """
+    Records consecutive phases of one backtest run. switch(name) ends the current phase and starts
+    the next one, so phases can be delimited from inside backtesting.py's run() via strategy hooks.
+    """
+    def __init__(self, track_allocations: bool = False):
+        """
+        Args:
+            track_allocations (bool): Also record allocated / peak memory per phase with tracemalloc
+                                      (slows the run down noticeably; started here if not already running).
+        """
+        self.track_allocations = track_allocations
+        self.phases = []  # dicts: name, seconds, allocated_mb, peak_mb
+        self.next_ns = []  # Duration of every Strategy.next() call in nanoseconds
+        self._current = None; self._started = None; self._memory_start = 0
+        self._owns_tracemalloc = track_allocations and not tracemalloc.is_tracing()
+        if self._owns_tracemalloc: tracemalloc.start()
+
+    def switch(self, name: str | None):
+        """ Closes the running phase (if any) and starts phase name (None just closes it). """
+        now = time.perf_counter()
+        if self._current is not None:
+            phase = {"name": self._current, "seconds": now - self._started, "allocated_mb": None, "peak_mb": None}
+            if self.track_allocations:
+                current, peak = tracemalloc.get_traced_memory()
+                phase["allocated_mb"] = (current - self._memory_start) / 2**20; phase["peak_mb"] = (peak - self._memory_start) / 2**20
+            self.phases.append(phase)
+        self._current = name
+        if name is not None:
+            if self.track_allocations:
+                tracemalloc.reset_peak(); self._memory_start = tracemalloc.get_traced_memory()[0]
+            self._started = time.perf_counter()
+
+    def finish(self) -> dict:
+        """ Closes the last phase, stops tracemalloc if this profiler started it and returns summary(). """
+        self.switch(None)
+        if self._owns_tracemalloc: tracemalloc.stop(); self._owns_tracemalloc = False
+        return self.summary()
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: {"phases": [...], "total_seconds": float, "next": {"calls", "total_seconds", "mean_us",
+                   "p50_us", "p90_us", "p99_us", "max_us"} or None, "engine_loop_seconds": bar loop time
+                   outside next() (order handling, indicator slicing) or None}
+        """
+        total = sum(phase["seconds"] for phase in self.phases)
+        next_stats = None; engine_loop = None
+        if self.next_ns:
+            latencies_us = np.asarray(self.next_ns, dtype=float) / 1e3
+            next_stats = {"calls": len(latencies_us), "total_seconds": latencies_us.sum() / 1e6, "mean_us": latencies_us.mean(),
+                          "max_us": latencies_us.max()}
+            for pct, value in zip(LATENCY_PERCENTILES, np.percentile(latencies_us, LATENCY_PERCENTILES)): next_stats[f"p{pct}_us"] = value
+            loop = next((phase["seconds"] for phase in self.phases if phase["name"] == "bar loop"), None)
+            if loop is not None: engine_loop = max(0.0, loop - next_stats["total_seconds"])
+        return {"phases": list(self.phases), "total_seconds": total, "next": next_stats, "engine_loop_seconds": engine_loop}
+
+
+def profiled_strategy(strategy_class, profiler: BacktestProfiler, total_bars: int):
+    """
+    Returns a subclass of strategy_class (same name, so stats read the same) whose init() and next()
+    report phase changes to profiler and time every next() call. The "bar loop" phase ends after
+    the last bar's next(); what follows in Backtest.run() (closing trades, compute_stats) is "stats".
+    """
+    original_init = strategy_class.init; original_next = strategy_class.next
+    clock = time.perf_counter_ns; record = profiler.next_ns.append
+
+    def init(self):
+        profiler.switch("init (indicators)")
+        original_init(self)
+        profiler.switch("bar loop")
+
+    def next(self):
+        started = clock(); original_next(self); record(clock() - started)
+        if len(self.data) == total_bars: profiler.switch("stats")
+
+    return type(strategy_class.__name__, (strategy_class,), {"init": init, "next": next, "__module__": strategy_class.__module__})
+
+
+def format_profile(profile: dict) -> str:
+    """ Compact multi-line summary of a summary() dict for logs and the GUI console. """
+    total = profile["total_seconds"] or 1e-12
+    lines = [f"--- Run Profile ({profile['total_seconds'] * 1000:.1f} ms) ---"]
+    for phase in profile["phases"]:
+        memory = f"  alloc {phase['allocated_mb']:+.1f} MB, peak {phase['peak_mb']:.1f} MB" if phase["peak_mb"] is not None else ""
+        lines.append(f"{phase['name']:<18} {phase['seconds'] * 1000:9.1f} ms {phase['seconds'] / total:6.1%}{memory}")
+    next_stats = profile["next"]
+    if next_stats:
+        lines.append(f"next() x{next_stats['calls']}: {next_stats['total_seconds'] * 1000:.1f} ms, mean {next_stats['mean_us']:.1f} us, "
+                     f"p50 {next_stats['p50_us']:.1f} / p90 {next_stats['p90_us']:.1f} / p99 {next_stats['p99_us']:.1f} / max {next_stats['max_us']:.1f} us")
+    if profile["engine_loop_seconds"] is not None:
+        lines.append(f"engine work in bar loop (outside next()): {profile['engine_loop_seconds'] * 1000:.1f} ms")
+    return "\n".join(lines)
@@ -0,0 +1,154 @@
+# trading/recommendation.py
+# Indicator-based Buy/Sell/Hold scoring used for the matrix display
+# Indicators come from the shared indicator cache, so repeated refreshes on unchanged data are free
+# RecommendationState keeps streaming indicators seeded from the history, so a live price re-scores
+# in constant time instead of recomputing every indicator over the whole series
+
+import pandas as pd
+
+from trading.indicator_cache import cached
+from trading.streaming_indicators import StreamingSMA, StreamingRSI, StreamingMACD, StreamingBBANDS, StreamingADX
+
+from config import (REC_SMA_SHORT, REC_SMA_LONG, REC_RSI_PERIOD, REC_RSI_BUY, REC_RSI_SELL,
+                    REC_MACD_FAST, REC_MACD_SLOW, REC_MACD_SIG,
+                    REC_BBANDS_PERIOD, REC_BBANDS_STDDEV,
+                    REC_ADX_PERIOD, REC_ADX_THRESHOLD)
+
+
+def score_recommendation(latest_close, latest_sma_short, latest_sma_long, latest_rsi,
+                         latest_macd, latest_macdsignal, latest_middleband, latest_adx) -> tuple[str, float]:
+    """
+    Scores the latest indicator readings.
+
+    Returns:
+        tuple: (recommendation, score) where recommendation is one of
+               "BUY", "WEAK BUY", "HOLD", "WEAK SELL", "SELL".
+    """
+    score = 0; trend_score = 0
+    if latest_close > latest_sma_long: trend_score += 0.5
+    if latest_sma_short > latest_sma_long: trend_score += 0.5
+    elif latest_sma_short < latest_sma_long: trend_score -= 0.5
+    if latest_macd > latest_macdsignal: trend_score += 1.0
+    else: trend_score -= 1.0
+    if latest_close > latest_middleband: trend_score += 0.5
+    else: trend_score -= 0.5
+    is_trending = latest_adx > REC_ADX_THRESHOLD
+    if is_trending: score += trend_score * 1.5
+    else: score += trend_score * 0.5
+    if latest_rsi > REC_RSI_BUY: score += 1.0
+    elif latest_rsi < REC_RSI_SELL: score -= 1.0
+    if score >= 2.5: recommendation = "BUY"
+    elif score >= 0.5: recommendation = "WEAK BUY"
+    elif score <= -2.5: recommendation = "SELL"
+    elif score <= -0.5: recommendation = "WEAK SELL"
+    else: recommendation = "HOLD"
+    return recommendation, score
+
+
+def compute_recommendation(data: pd.DataFrame | None, talib_module) -> tuple[str, str | None]:
+    """
+    Generates a simple Buy/Sell/Hold recommendation from the latest indicator values.
+
+    Args:
+        data (pd.DataFrame | None): OHLCV data with lowercase columns.
+        talib_module: TA-Lib or its NumPy drop-in (strategy_registry.get_talib()).
+
+    Returns:
+        tuple: (recommendation, details). recommendation is a short upper-case label for the
+               matrix display ("BUY", "HOLD", "NO DATA", "CALC...", ...); details is a log line
+               describing the score, or None if no score was computed.
+    """
+    if data is None or data.empty: return "N/A", None
+    if len(data) < _required_length(): return "NO DATA", None
+    close_prices = data['close']; high_prices = data['high']; low_prices = data['low']
+    close_values = close_prices.to_numpy(dtype=float); high_values = high_prices.to_numpy(dtype=float); low_values = low_prices.to_numpy(dtype=float)
+    sma_short = cached(talib_module.SMA)(close_values, timeperiod=REC_SMA_SHORT); sma_long = cached(talib_module.SMA)(close_values, timeperiod=REC_SMA_LONG)
+    rsi = cached(talib_module.RSI)(close_values, timeperiod=REC_RSI_PERIOD); macd, macdsignal, macdhist = cached(talib_module.MACD)(close_values, fastperiod=REC_MACD_FAST, slowperiod=REC_MACD_SLOW, signalperiod=REC_MACD_SIG)
+    upper, middle, lower = cached(talib_module.BBANDS)(close_values, timeperiod=REC_BBANDS_PERIOD, nbdevup=REC_BBANDS_STDDEV, nbdevdn=REC_BBANDS_STDDEV, matype=0)
+    adx = cached(talib_module.ADX)(high_values, low_values, close_values, timeperiod=REC_ADX_PERIOD)
+    return _recommendation(close_prices.iloc[-1], sma_short[-1], sma_long[-1], rsi[-1], macd[-1], macdsignal[-1], middle[-1], adx[-1])
+
+
+def _required_length() -> int:
+    return max(REC_SMA_LONG, REC_MACD_SLOW + REC_MACD_SIG, REC_BBANDS_PERIOD, REC_ADX_PERIOD, REC_RSI_PERIOD)
+
+
+def _recommendation(latest_close, latest_sma_short, latest_sma_long, latest_rsi,
+                    latest_macd, latest_macdsignal, latest_middleband, latest_adx) -> tuple[str, str | None]:
+    """ (recommendation, details) from the latest indicator readings, "CALC..." while any is undefined. """
+    if pd.isna(latest_sma_short) or pd.isna(latest_sma_long) or pd.isna(latest_rsi) or pd.isna(latest_macd) or pd.isna(latest_macdsignal) or pd.isna(latest_middleband) or pd.isna(latest_adx): return "CALC...", None
+    recommendation, score = score_recommendation(latest_close, latest_sma_short, latest_sma_long, latest_rsi,
+                                                 latest_macd, latest_macdsignal, latest_middleband, latest_adx)
+    return recommendation, f"Recommendation generated: {recommendation} (Score: {score:.1f}, ADX: {latest_adx:.1f})"
+
+
+class RecommendationState:
+    """
+    The indicators behind compute_recommendation as streaming state, seeded once from a history.
+    Every bar but the last is committed; the last one is the forming bar, which tick() revises with a live
+    price and add_bar() closes. Each call costs the same whatever the length of the history, and scores
+    as compute_recommendation would on the history with that bar (TA-Lib's arithmetic, so the readings
+    agree with the batch indicators to floating-point rounding).
+    """
+    def __init__(self, data: pd.DataFrame | None):
+        """
+        Args:
+            data (pd.DataFrame | None): OHLCV data with lowercase columns.
+        """
+        self._sma_short = StreamingSMA(REC_SMA_SHORT); self._sma_long = StreamingSMA(REC_SMA_LONG); self._rsi = StreamingRSI(REC_RSI_PERIOD)
+        self._macd = StreamingMACD(REC_MACD_FAST, REC_MACD_SLOW, REC_MACD_SIG); self._bbands = StreamingBBANDS(REC_BBANDS_PERIOD, REC_BBANDS_STDDEV, REC_BBANDS_STDDEV)
+        self._adx = StreamingADX(REC_ADX_PERIOD)
+        self.bars = 0; self._forming = None  # (high, low, close) of the last bar, not committed yet
+        self.timestamp = None; self.bar_length = None  # Start of the forming bar; typical spacing of the history's bars
+        if data is None or data.empty: return
+        if isinstance(data.index, pd.DatetimeIndex) and len(data) > 1: self.bar_length = pd.Series(data.index[-100:]).diff().median()
+        bars = zip(data['high'].to_numpy(dtype=float).tolist(), data['low'].to_numpy(dtype=float).tolist(), data['close'].to_numpy(dtype=float).tolist())
+        for bar in bars: self.add_bar(*bar)
+        if isinstance(data.index, pd.DatetimeIndex): self.timestamp = data.index[-1]
+
+    def add_bar(self, high: float, low: float, close: float, timestamp=None) -> tuple[str, str | None]:
+        """ Closes the forming bar and starts a new one (starting at timestamp, if given); returns the recommendation with the new bar. """
+        if self._forming is not None:
+            high_, low_, close_ = self._forming
+            for indicator in (self._sma_short, self._sma_long, self._rsi, self._macd, self._bbands): indicator.update(close_)
+            self._adx.update(high_, low_, close_)
+        self._forming = (float(high), float(low), float(close)); self.bars += 1
+        if timestamp is not None: self.timestamp = pd.Timestamp(timestamp)
+        return self.score()
+
+    def tick(self, price: float, timestamp=None) -> tuple[str, str | None]:
+        """
+        Revises the forming bar with a live price (its close, stretching its high / low) and re-scores.
+        With the price's timestamp, a price from a later session than the forming bar closes that bar and
+        opens the next one at the price instead (see next_bar_start).
+        """
+        if self._forming is None: return "N/A", None
+        price = float(price)
+        start = self.next_bar_start(timestamp) if timestamp is not None else None
+        if start is not None: return self.add_bar(price, price, price, timestamp=start)
+        high, low, _ = self._forming
+        self._forming = (max(high, price), min(low, price), price)
+        return self.score()
+
+    def next_bar_start(self, timestamp) -> pd.Timestamp | None:
+        """
+        Start of the bar a price at timestamp belongs to, if that is a later bar than the forming one (None
+        otherwise, and when the history had no timestamps). Bars are bar_length apart; weekend prices
+        belong to no session, so they never open a bar.
+        """
+        if self.timestamp is None or self.bar_length is None or pd.isna(self.bar_length) or self.bar_length <= pd.Timedelta(0): return None
+        timestamp = pd.Timestamp(timestamp); tz = self.timestamp.tz
+        if timestamp.tz is None: timestamp = timestamp.tz_localize(tz) if tz is not None else timestamp
+        else: timestamp = timestamp.tz_convert(tz) if tz is not None else timestamp.tz_convert(None)
+        if timestamp.dayofweek >= 5 or timestamp < self.timestamp + self.bar_length: return None
+        start = self.timestamp + self.bar_length * ((timestamp - self.timestamp) // self.bar_length)
+        return start.normalize() if self.bar_length >= pd.Timedelta(days=1) else start  # Daily bars start at midnight, across DST changes too
+
+    def score(self) -> tuple[str, str | None]:
+        """ The recommendation on the history including the forming bar, as compute_recommendation returns it. """
+        if self._forming is None: return "N/A", None
+        if self.bars < _required_length(): return "NO DATA", None
+        high, low, close = self._forming
+        macd, macdsignal, _ = self._macd.peek(close); _, middle, _ = self._bbands.peek(close)
+        return _recommendation(close, self._sma_short.peek(close), self._sma_long.peek(close), self._rsi.peek(close),
+                               macd, macdsignal, middle, self._adx.peek(high, low, close))
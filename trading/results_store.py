@@ -0,0 +1,351 @@
+# trading/results_store.py
+# Persistent SQLite store of backtest results, keyed by a content fingerprint of the input data plus the
+# run configuration (strategy and its source code, the shared indicator modules and TA backend it computes
+# through, parameters, cash, commission, engine)
+# Holds the summary stats plus the equity curve and trades as compact binary columns, so identical runs
+# return without recomputing, and history can be queried (e.g. best Sharpe per strategy per symbol)
+# Every call opens its own SQLite connection (WAL mode), so GUI threads and worker processes can share one file
+# Usage: python -m trading.results_store [--best "Sharpe Ratio"] [--symbol AAPL] [--strategy "SMA Crossover"]
+
+import argparse
+import functools
+import hashlib
+import importlib.metadata
+import importlib.util
+import io
+import json
+import os
+import pickle
+import sqlite3
+import sys
+import zlib
+from contextlib import closing
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from config import RESULTS_STORE_ENABLED, RESULTS_STORE_PATH
+
+SCHEMA_VERSION = 1  # Part of every key: bump when the stored layout or the meaning of a run changes
+# Modules strategies compute through besides their own; their source is part of every key
+SHARED_MODULES = ("trading.indicators", "trading.indicator_cache", "trading.calendar_features", "trading.lunar_phases")
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+PARQUET_MAGIC = b"PAR1"
+# Stats copied into their own columns so history queries need not unpack the stats blob
+METRIC_COLUMNS = {
+    "Return [%]": "return_pct",
+    "Sharpe Ratio": "sharpe",
+    "Sortino Ratio": "sortino",
+    "Max. Drawdown [%]": "max_drawdown_pct",
+    "Win Rate [%]": "win_rate_pct",
+    "# Trades": "num_trades",
+    "Equity Final [$]": "equity_final",
+    "SQN": "sqn",
+}
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_key TEXT PRIMARY KEY,
+    created TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    strategy_class TEXT NOT NULL,
+    symbol TEXT,
+    interval TEXT,
+    data_fingerprint TEXT NOT NULL,
+    first_bar TEXT,
+    last_bar TEXT,
+    bars INTEGER,
+    params TEXT NOT NULL,
+    cash REAL,
+    commission REAL,
+    engine TEXT NOT NULL,
+    run_seconds REAL,
+    {", ".join(f"{column} REAL" for column in METRIC_COLUMNS.values())},
+    stats BLOB NOT NULL,
+    equity BLOB,
+    trades BLOB
+);
+CREATE INDEX IF NOT EXISTS runs_strategy_symbol ON runs (strategy, symbol);
+CREATE TABLE IF NOT EXISTS snapshots (
+    snapshot_key TEXT PRIMARY KEY,
+    created TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    symbol TEXT,
+    interval TEXT,
+    last_bar TEXT,
+    bars INTEGER,
+    snapshot BLOB NOT NULL
+);
+"""
+
+
+# --- Keys ---
+def data_fingerprint(data: pd.DataFrame) -> str:
+    """ Content hash of the index and OHLCV columns (values, dtypes and order), as hex. """
+    digest = hashlib.blake2b(digest_size=16)
+    index = data.index
+    digest.update(str(index.dtype).encode())
+    digest.update(np.ascontiguousarray(index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy()).view(np.uint8).reshape(-1))
+    for column in OHLCV_COLUMNS:
+        if column not in data.columns: continue
+        digest.update(column.encode()); digest.update(np.ascontiguousarray(data[column].to_numpy(dtype=float)).view(np.uint8).reshape(-1))
+    return digest.hexdigest()
+
+
+def _strategy_path(strategy) -> str:
+    """ "package.module.ClassName" of a strategy class or STRATEGY_LOADERS string. """
+    return strategy if isinstance(strategy, str) else f"{strategy.__module__}.{strategy.__qualname__}"
+
+
+def _source_hash(module_name: str) -> str | None:
+    """ Hash of a module's source file (found without importing it), so edited strategies are rerun. """
+    try:
+        spec = importlib.util.find_spec(module_name)
+        with open(spec.origin, "rb") as f: return hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+    except (ImportError, AttributeError, TypeError, ValueError, OSError): return None
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_version() -> dict:
+    """ Source hashes of SHARED_MODULES and the TA backend in use (get_talib), fixed for the life of the process. """
+    from trading.strategy_registry import get_talib
+    try:
+        talib_module = get_talib()
+        backend = f"ta_numpy {_source_hash('trading.ta_numpy')}" if talib_module.__name__ == "trading.ta_numpy" else f"talib {getattr(talib_module, '__version__', None)}"
+    except ImportError: backend = None
+    return {"modules": {name: _source_hash(name) for name in SHARED_MODULES}, "ta_backend": backend}
+
+
+def _engine_version(engine: str) -> str | None:
+    if engine == "vector": return _source_hash("trading.vector_backtester")
+    try: return importlib.metadata.version("backtesting")
+    except importlib.metadata.PackageNotFoundError: return None
+
+
+def _normalize_params(params: dict) -> dict:
+    """ Sorted, JSON-safe parameters; 14 and 14.0 are the same run. """
+    normalized = {}
+    for name in sorted(params):
+        value = params[name]
+        if isinstance(value, np.generic): value = value.item()
+        if isinstance(value, float) and value.is_integer(): value = int(value)
+        normalized[name] = value
+    return normalized
+
+
+def run_key(strategy, data: pd.DataFrame, params: dict, cash: float, commission: float,
+            engine: str = "backtesting", fingerprint: str | None = None) -> str:
+    """
+    Identifies one backtest run.
+
+    Args:
+        strategy: Strategy class or its "package.module.ClassName" loader string.
+        data (pd.DataFrame): OHLCV data the run uses.
+        params (dict): Strategy parameters as passed to the engine.
+        cash (float): Initial cash.
+        commission (float): Commission rate.
+        engine (str): "backtesting" or "vector" (their stats differ, so they are stored separately).
+        fingerprint (str | None): data_fingerprint(data), if already computed.
+
+    Returns:
+        str: Hex key; equal keys mean equal inputs, strategy and shared module source, TA backend and engine version.
+    """
+    path = _strategy_path(strategy)
+    config = {"schema": SCHEMA_VERSION, "data": fingerprint or data_fingerprint(data), "strategy": path,
+              "source": _source_hash(path.rsplit(".", 1)[0]), "shared": _shared_version(), "params": _normalize_params(params),
+              "cash": float(cash), "commission": float(commission), "engine": engine, "engine_version": _engine_version(engine)}
+    return hashlib.blake2b(json.dumps(config, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+
+def snapshot_key(strategy, params: dict, cash: float, commission: float, symbol: str, interval: str | None,
+                 engine: str = "vector") -> str:
+    """ Identifies the resumable state of one configuration on one symbol's series (run_key without the data). """
+    path = _strategy_path(strategy)
+    config = {"schema": SCHEMA_VERSION, "symbol": symbol, "interval": interval, "strategy": path,
+              "source": _source_hash(path.rsplit(".", 1)[0]), "shared": _shared_version(), "params": _normalize_params(params),
+              "cash": float(cash), "commission": float(commission), "engine": engine, "engine_version": _engine_version(engine)}
+    return hashlib.blake2b(json.dumps(config, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+
+# --- Blobs ---
+def _pack_frame(frame) -> bytes | None:
+    """ DataFrame as Parquet bytes, or zlib-compressed pickle if Parquet cannot hold it / is not installed. """
+    if frame is None: return None
+    try:
+        buffer = io.BytesIO(); frame.to_parquet(buffer, compression="zstd"); return buffer.getvalue()
+    except Exception:
+        return zlib.compress(pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _unpack_frame(blob: bytes | None):
+    if blob is None: return None
+    if blob[:4] == PARQUET_MAGIC: return pd.read_parquet(io.BytesIO(blob))
+    return pickle.loads(zlib.decompress(blob))
+
+
+def _metric_value(value):
+    try:
+        value = float(value)
+        return value if np.isfinite(value) else None
+    except (TypeError, ValueError): return None
+
+
+class ResultsStore:
+    """
+    SQLite file of backtest results. Every call opens its own connection, so one store can be shared
+    by the GUI thread, worker threads and worker processes (WAL mode lets readers and a writer overlap).
+
+    Stored stats and frames are unpickled on lookup; only open store files this application wrote.
+    """
+    def __init__(self, path: str = RESULTS_STORE_PATH):
+        """
+        Args:
+            path (str): Database file (its directory is created if needed).
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory: os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    # --- Read / Write ---
+    def lookup(self, key: str) -> pd.Series | None:
+        """
+        Returns the stored stats for key (with '_equity_curve', '_trades' and '_stored_at' entries), or None.
+        Unreadable rows are treated as missing.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT stats, equity, trades, created FROM runs WHERE run_key = ?", (key,)).fetchone()
+        if row is None: return None
+        try:
+            stats = pd.Series(pickle.loads(zlib.decompress(row[0])), dtype=object)
+            stats['_equity_curve'] = _unpack_frame(row[1]); stats['_trades'] = _unpack_frame(row[2])
+        except Exception as e:
+            print(f"Warning: Ignoring unreadable stored result {key}: {e}"); return None
+        stats['_stored_at'] = row[3]
+        return stats
+
+    def save(self, key: str, stats, strategy: str, strategy_class, data: pd.DataFrame, params: dict,
+             cash: float, commission: float, engine: str = "backtesting", symbol: str | None = None,
+             interval: str | None = None, run_seconds: float | None = None, fingerprint: str | None = None):
+        """
+        Stores (or replaces) the result of one run. Entries starting with '_' other than '_equity_curve'
+        and '_trades' (strategy instance, profile, ...) are not kept.
+
+        Args:
+            key (str): run_key() of the run.
+            stats: Stats Series/dict returned by run_backtest or vector_backtest.
+            strategy (str): Strategy display name (used by history queries).
+            strategy_class: Strategy class or loader string.
+            data (pd.DataFrame): The run's OHLCV data (date range and bar count are recorded).
+            symbol (str | None), interval (str | None): Where the data came from, for history queries.
+            run_seconds (float | None): How long the run took.
+        """
+        scalars = {str(name): value for name, value in stats.items() if not str(name).startswith("_")}
+        metrics = [_metric_value(scalars.get(name)) for name in METRIC_COLUMNS]
+        start, end = (str(data.index[0]), str(data.index[-1])) if len(data) else (None, None)
+        row = [key, datetime.now(timezone.utc).isoformat(timespec="seconds"), strategy, _strategy_path(strategy_class),
+               symbol, interval, fingerprint or data_fingerprint(data), start, end, len(data),
+               json.dumps(_normalize_params(params), default=str), float(cash), float(commission), engine, run_seconds, *metrics,
+               zlib.compress(pickle.dumps(scalars, protocol=pickle.HIGHEST_PROTOCOL)),
+               _pack_frame(stats.get('_equity_curve')), _pack_frame(stats.get('_trades'))]
+        with closing(self._connect()) as conn, conn:
+            conn.execute(f"INSERT OR REPLACE INTO runs VALUES ({', '.join('?' * len(row))})", row)
+
+    # --- Resume snapshots ---
+    def load_snapshot(self, key: str) -> dict | None:
+        """ The snapshot stored under snapshot_key() key, or None (also for unreadable rows). """
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT snapshot FROM snapshots WHERE snapshot_key = ?", (key,)).fetchone()
+        if row is None: return None
+        try: return pickle.loads(zlib.decompress(row[0]))
+        except Exception as e: print(f"Warning: Ignoring unreadable snapshot {key}: {e}"); return None
+
+    def save_snapshot(self, key: str, snapshot: dict, strategy: str, symbol: str | None = None, interval: str | None = None):
+        """ Stores (or replaces) the terminal state of a run (see trading.incremental), one per key. """
+        row = [key, datetime.now(timezone.utc).isoformat(timespec="seconds"), strategy, symbol, interval,
+               str(snapshot.get("last_bar")), snapshot.get("bars"), zlib.compress(pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL))]
+        with closing(self._connect()) as conn, conn:
+            conn.execute(f"INSERT OR REPLACE INTO snapshots VALUES ({', '.join('?' * len(row))})", row)
+
+    # --- History ---
+    def _filters(self, symbol: str | None, strategy: str | None) -> tuple[str, list]:
+        clauses, args = [], []
+        if symbol: clauses.append("symbol = ?"); args.append(symbol)
+        if strategy: clauses.append("strategy = ?"); args.append(strategy)
+        return " AND ".join(clauses), args
+
+    def history(self, symbol: str | None = None, strategy: str | None = None, limit: int | None = 50) -> pd.DataFrame:
+        """ Stored runs (newest first) without the blobs, optionally for one symbol and/or strategy. """
+        where, args = self._filters(symbol, strategy)
+        query = (f"SELECT created, strategy, symbol, interval, first_bar, last_bar, bars, params, engine, {', '.join(METRIC_COLUMNS.values())} "
+                 f"FROM runs {'WHERE ' + where if where else ''} ORDER BY created DESC" + (" LIMIT ?" if limit else ""))
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(query, conn, params=args + ([int(limit)] if limit else []))
+
+    def best_runs(self, metric: str = "Sharpe Ratio", symbol: str | None = None, strategy: str | None = None) -> pd.DataFrame:
+        """
+        Best stored run per (strategy, symbol) by metric, best first.
+
+        Args:
+            metric (str): A METRIC_COLUMNS key (higher is better for all of them, drawdowns being negative).
+
+        Raises:
+            KeyError: If metric is not one of METRIC_COLUMNS.
+        """
+        column = METRIC_COLUMNS[metric]
+        where, args = self._filters(symbol, strategy)
+        query = (f"SELECT strategy, symbol, interval, {column} AS metric, params, first_bar, last_bar, bars, engine, created FROM ("
+                 f"SELECT *, ROW_NUMBER() OVER (PARTITION BY strategy, symbol ORDER BY {column} DESC, created DESC) AS rank "
+                 f"FROM runs WHERE {column} IS NOT NULL {'AND ' + where if where else ''}) WHERE rank = 1 ORDER BY metric DESC")
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(query, conn, params=args).rename(columns={"metric": metric})
+
+    def count(self) -> int:
+        with closing(self._connect()) as conn: return conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def clear(self):
+        """ Deletes every stored run and resume snapshot. """
+        with closing(self._connect()) as conn, conn: conn.execute("DELETE FROM runs"); conn.execute("DELETE FROM snapshots")
+        with closing(self._connect()) as conn: conn.execute("VACUUM")
+
+
+_default_store = None
+
+
+def default_results_store() -> ResultsStore | None:
+    """ The store at RESULTS_STORE_PATH (opened on first use), or None if RESULTS_STORE_ENABLED is off or it cannot be opened. """
+    global _default_store
+    if not RESULTS_STORE_ENABLED: return None
+    if _default_store is None:
+        try: _default_store = ResultsStore(RESULTS_STORE_PATH)
+        except (sqlite3.Error, OSError) as e: print(f"Warning: Results store unavailable ({RESULTS_STORE_PATH}): {e}"); return None
+    return _default_store
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m trading.results_store", description="Query stored backtest results.")
+    parser.add_argument("--best", metavar="METRIC", help=f"Best run per strategy and symbol by METRIC ({', '.join(METRIC_COLUMNS)})".replace("%", "%%"))
+    parser.add_argument("--symbol", help="Only runs on this symbol")
+    parser.add_argument("--strategy", help="Only runs of this strategy (display name)")
+    parser.add_argument("--limit", type=int, default=50, help="Rows of history to show (default 50, 0 = all)")
+    parser.add_argument("--path", default=RESULTS_STORE_PATH, help=f"Store file (default {RESULTS_STORE_PATH})")
+    parser.add_argument("--clear", action="store_true", help="Delete every stored run")
+    args = parser.parse_args(argv)
+    if args.best and args.best not in METRIC_COLUMNS: parser.error(f"unknown metric '{args.best}' (choose from: {', '.join(METRIC_COLUMNS)})")
+    store = ResultsStore(args.path)
+    if args.clear:
+        removed = store.count(); store.clear(); print(f"Deleted {removed} stored runs from {args.path}"); return 0
+    table = store.best_runs(args.best, args.symbol, args.strategy) if args.best else store.history(args.symbol, args.strategy, args.limit or None)
+    if table.empty: print(f"No stored runs in {args.path}" + (" match" if args.symbol or args.strategy else "")); return 0
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.max_colwidth", 60): print(table.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+# trading/runner.py
+# Runs one strategy backtest on one dataset: strategy name lookup, loading OHLCV from a file or
+# through DataFetcher, engine choice (vector engine or backtesting.py) and the results store
+# Shared by the command-line tools (cli, tournament, cross_section, walk_forward, adaptive_search, portfolio);
+# yfinance and backtesting.py are imported only when a run needs them
+
+import os
+import time
+
+from config import DEFAULT_CASH, DEFAULT_COMMISSION
+from trading.strategy_registry import STRATEGY_LOADERS, PARAM_CONFIG, strategy_class_name, trade_size_fraction
+
+ENGINES = ("auto", "vector", "backtesting")  # "auto" = vector engine when the strategy supports it (same results)
+
+
+def resolve_strategy_name(text: str) -> str:
+    """
+    Matches a display name ("SMA Crossover") or class name ("SmaCross"), case-insensitively.
+
+    Raises:
+        KeyError: If no strategy matches.
+    """
+    wanted = text.strip().lower()
+    for name in STRATEGY_LOADERS:
+        if wanted in (name.lower(), strategy_class_name(name).lower()): return name
+    raise KeyError(f"Unknown strategy '{text}' (available: {', '.join(STRATEGY_LOADERS)})")
+
+
+def load_data_file(path: str):
+    """
+    Reads OHLCV history from .csv (first column = dates), .parquet or .pkl and lowercases the columns.
+
+    Raises:
+        ValueError: If the file type is unknown or open/high/low/close/volume are missing.
+    """
+    import pandas as pd
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv": data = pd.read_csv(path, index_col=0, parse_dates=True)
+    elif extension == ".parquet": data = pd.read_parquet(path)
+    elif extension in (".pkl", ".pickle"): data = pd.read_pickle(path)
+    else: raise ValueError(f"Unsupported data file type '{extension}' (use .csv, .parquet or .pkl)")
+    data.columns = [str(col).lower() for col in data.columns]
+    missing = [col for col in ("open", "high", "low", "close", "volume") if col not in data.columns]
+    if missing: raise ValueError(f"{path} is missing column(s): {', '.join(missing)}")
+    return data.sort_index()
+
+
+def load_symbol(symbol: str, period: str, interval: str, use_cache: bool = True):
+    """ Fetches history through DataFetcher (local OHLCV cache + yfinance). """
+    from data.data_fetcher import DataFetcher
+    return DataFetcher(use_cache=use_cache).get_historical_data(symbol, period=period, interval=interval)
+
+
+def run_strategy(strategy_name: str, data, params: dict, cash=DEFAULT_CASH, commission=DEFAULT_COMMISSION,
+                 engine: str = "auto", full_stats: bool = False, profile: bool = False, store=None,
+                 symbol: str | None = None, interval: str | None = None):
+    """
+    Runs one backtest and returns its stats.
+
+    Args:
+        strategy_name (str): STRATEGY_LOADERS key.
+        data (pd.DataFrame): OHLCV data with lowercase columns.
+        params (dict): Strategy parameters; missing ones use their PARAM_CONFIG default.
+                       trade_size_percent is in percent, as in the GUI.
+        engine (str): One of ENGINES.
+        full_stats (bool): With the vector engine, compute backtesting.py's complete stats
+                           (imports backtesting.py) instead of the fast metrics.
+        profile (bool): Per-phase timing of a backtesting.py run, returned as stats['_profile'].
+                        The vector engine has no phases to report, so "auto" runs backtesting.py.
+        store (ResultsStore | None): Return the stored result of an identical earlier run instead of
+                                     recomputing (unless profiling), and store new results.
+        symbol (str | None), interval (str | None): Recorded with stored results for history queries.
+
+    Returns:
+        tuple: (stats (dict-like, with '_trades' and '_equity_curve'; '_stored_at' if it came from the store),
+                engine actually used)
+
+    Raises:
+        ValueError: If the engine is unknown or cannot run the strategy, profile is combined with the
+                    vector engine, or the backtest fails.
+    """
+    if engine not in ENGINES: raise ValueError(f"Unknown engine '{engine}' (expected one of {ENGINES})")
+    if profile and engine == "vector": raise ValueError("Profiling needs the backtesting engine (the vector engine has no phases to report)")
+    run_params = dict(PARAM_CONFIG.get(strategy_name, [])); run_params.update(params)
+    run_params["trade_size_percent"] = trade_size_fraction(run_params.get("trade_size_percent"))
+    class_name = strategy_class_name(strategy_name)
+    from trading import vector_backtester
+    use_vector = engine != "backtesting" and not profile and vector_backtester.supports(class_name)
+    if engine == "vector" and not use_vector: raise ValueError(f"{strategy_name} is not supported by the vector engine")
+    used_engine = "vector" if use_vector else "backtesting"
+    if store is not None:
+        from trading.results_store import data_fingerprint, run_key
+        fingerprint = data_fingerprint(data)
+        stored_as = "vector-full" if use_vector and full_stats else used_engine  # Fast metrics and full stats are different results
+        key = run_key(STRATEGY_LOADERS[strategy_name], data, run_params, cash, commission, engine=stored_as, fingerprint=fingerprint)
+        stats = store.lookup(key) if not profile else None
+        if stats is not None:
+            print(f"Using stored result from {stats['_stored_at']} (identical data and configuration)")
+            return stats, used_engine
+    started = time.perf_counter()
+    if use_vector:
+        stats = vector_backtester.vector_backtest(class_name, data, cash=cash, commission=commission,
+                                                  full_stats=full_stats, with_trades=True, **run_params)
+        if stats is None: raise ValueError("Vector backtest failed (see messages above)")
+    else:
+        from trading.backtester import run_backtest
+        from trading.strategy_registry import get_strategy_class
+        stats, _ = run_backtest(get_strategy_class(strategy_name), data, cash=cash, commission=commission, profile=profile, **run_params)
+        if stats is None: raise ValueError("Backtest failed (see messages above)")
+    if store is not None:
+        store.save(key, stats, strategy_name, STRATEGY_LOADERS[strategy_name], data, run_params, cash, commission, engine=stored_as,
+                   symbol=symbol, interval=interval, run_seconds=time.perf_counter() - started, fingerprint=fingerprint)
+    return stats, used_engine
@@ -1,10 +1,13 @@
 # trading/strategies/bollinger_bands_strategy.py
 # Bollinger Bands Mean Reversion Strategy
 # MODIFIED: Use parameters passed by backtesting.py
+# MODIFIED: Indicators come from the shared indicator cache
 
 from backtesting import Strategy
 import pandas as pd
 
+from trading.indicator_cache import cached
+
 
 # DEFAULT_TRADE_SIZE_PERCENT import removed, passed as param
 # import talib # Injected by gui/app.py into module scope
@@ -29,7 +32,7 @@ class BollingerBandsStrategy(Strategy):
         bb_std_dev_float = float(self.bb_std_dev)
 
         self.upper, self.middle, self.lower = self.I(
-            talib.BBANDS,
+            cached(talib.BBANDS),
             self.data.Close,
             timeperiod=bb_period_int,
             nbdevup=bb_std_dev_float,
@@ -1,9 +1,11 @@
 # trading/strategies/day_of_week_strategy.py
 # Strategy based on simple Day of Week effect
 # MODIFIED: Use parameters passed by backtesting.py
+# MODIFIED: Day of week comes from cached calendar feature arrays
 
 from backtesting import Strategy
-import pandas as pd
+
+from trading.calendar_features import calendar_features
 
 
 # DEFAULT_TRADE_SIZE_PERCENT import removed, passed as param
@@ -19,26 +21,30 @@ class DayOfWeekStrategy(Strategy):
     trade_size_percent = 0.95  # Default trade size as fraction
 
     def init(self):
-        """Initialize the strategy."""
+        """Initialize the strategy and its buy/sell day masks."""
+        # Ensure parameter types once instead of on every bar
+        buy_d = int(self.buy_day)
+        sell_d = int(self.sell_day)
+
+        features = calendar_features(self.data.index)
+        if features is None:
+            print("Warning: Data index is not Timestamp, DayOfWeekStrategy will not trade.")
+            self.buy_signal = self.sell_signal = None
+        else:
+            self.buy_signal = features["day_of_week"] == buy_d
+            self.sell_signal = features["day_of_week"] == sell_d
         print("Initialized DayOfWeekStrategy")
-        # Use self to access parameters
-        print(f"Buy Day: {int(self.buy_day)}, Sell Day: {int(self.sell_day)}")
+        print(f"Buy Day: {buy_d}, Sell Day: {sell_d}")
 
     def next(self):
         """Define trading logic based on the day of the week."""
-        if not isinstance(self.data.index[-1], pd.Timestamp):
-            print("Warning: Data index is not Timestamp, skipping DayOfWeekStrategy logic.")
-            return
-
-            # Use parameters via self, ensure type conversion
-        current_day_of_week = self.data.index[-1].dayofweek
-        buy_d = int(self.buy_day)
-        sell_d = int(self.sell_day)
+        if self.buy_signal is None: return
+        bar = len(self.data) - 1
 
-        if current_day_of_week == buy_d:
+        if self.buy_signal[bar]:
             if self.position.is_short: self.position.close()
             if not self.position.is_long:
                 self.buy(size=self.trade_size_percent)
-        elif current_day_of_week == sell_d:
+        elif self.sell_signal[bar]:
             if self.position.is_long:
-                self.position.close()
\ No newline at end of file
+                self.position.close()
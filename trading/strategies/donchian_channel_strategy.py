@@ -1,10 +1,14 @@
 # trading/strategies/donchian_channel_strategy.py
 # Donchian Channel Breakout Strategy
 # MODIFIED: Use parameters passed by backtesting.py
+# MODIFIED: Indicators come from the shared indicator cache
 
 from backtesting import Strategy
 import pandas as pd
 
+from trading.indicator_cache import cached
+from trading.indicators import rolling_max, rolling_min
+
 
 # DEFAULT_TRADE_SIZE_PERCENT import removed, passed as param
 
@@ -26,8 +30,8 @@ class DonchianChannelStrategy(Strategy):
 
         high = self.data.High;
         low = self.data.Low
-        self.donchian_high = self.I(lambda H=high: pd.Series(H).rolling(n_high_int).max().shift(1), name="DonchianHigh")
-        self.donchian_low = self.I(lambda L=low: pd.Series(L).rolling(n_low_int).min().shift(1), name="DonchianLow")
+        self.donchian_high = self.I(cached(rolling_max), high, n_high_int, shift=1, name="DonchianHigh")
+        self.donchian_low = self.I(cached(rolling_min), low, n_low_int, shift=1, name="DonchianLow")
         print(f"Initialized DonchianChannelStrategy (High: {n_high_int}, Low: {n_low_int})")
 
     def next(self):
@@ -1,9 +1,11 @@
 # trading/strategies/fake_moon_strategy.py
 # Conceptual strategy based on day of the month (placeholder for actual lunar phase)
 # MODIFIED: Use parameters passed by backtesting.py
+# MODIFIED: Day of month comes from cached calendar feature arrays
 
 from backtesting import Strategy
-import pandas as pd
+
+from trading.calendar_features import calendar_features
 
 
 # DEFAULT_TRADE_SIZE_PERCENT import removed, passed as param
@@ -21,30 +23,34 @@ class FakeMoonStrategy(Strategy):
     trade_size_percent = 0.95  # Default trade size as fraction
 
     def init(self):
-        """Initialize the strategy."""
+        """Initialize the strategy and its buy/sell day masks."""
+        # Ensure parameter types once instead of on every bar
+        buy_start = int(self.buy_day_start)
+        buy_end = int(self.buy_day_end)
+        sell_start = int(self.sell_day_start)
+        sell_end = int(self.sell_day_end)
+
+        features = calendar_features(self.data.index)
+        if features is None:
+            print("Warning: Data index is not Timestamp, FakeMoonStrategy will not trade.")
+            self.buy_signal = self.sell_signal = None
+        else:
+            day_of_month = features["day_of_month"]
+            self.buy_signal = (buy_start <= day_of_month) & (day_of_month <= buy_end)
+            self.sell_signal = (sell_start <= day_of_month) & (day_of_month <= sell_end)
         print("Initialized FakeMoonStrategy (Placeholder - Day of Month)")
-        # Use self to access parameters
         print(
-            f"Buy Days: {int(self.buy_day_start)}-{int(self.buy_day_end)}, Sell Days: {int(self.sell_day_start)}-{int(self.sell_day_end)}")
+            f"Buy Days: {buy_start}-{buy_end}, Sell Days: {sell_start}-{sell_end}")
 
     def next(self):
         """Define the trading logic based on the day of the month."""
-        if not isinstance(self.data.index[-1], pd.Timestamp):
-            print("Warning: Data index is not Timestamp, skipping FakeMoonStrategy logic.")
-            return
-        current_date = self.data.index[-1]
-        day_of_month = current_date.day
-
-        # Use parameters via self, ensure type conversion
-        buy_start = int(self.buy_day_start)
-        buy_end = int(self.buy_day_end)
-        sell_start = int(self.sell_day_start)
-        sell_end = int(self.sell_day_end)
+        if self.buy_signal is None: return
+        bar = len(self.data) - 1
 
-        if buy_start <= day_of_month <= buy_end:
+        if self.buy_signal[bar]:
             if self.position.is_short: self.position.close()
             if not self.position.is_long:
                 self.buy(size=self.trade_size_percent)
-        elif sell_start <= day_of_month <= sell_end:
+        elif self.sell_signal[bar]:
             if self.position.is_long:
-                self.position.close()
\ No newline at end of file
+                self.position.close()
@@ -1,10 +1,15 @@
 # trading/strategies/ichimoku_strategy.py
 # Ichimoku Cloud Strategy (using pandas calculations)
 # MODIFIED: Use parameters passed by backtesting.py
+# MODIFIED: Indicators come from the shared indicator cache
+# MODIFIED: Tenkan/Kijun/Senkou B share one rolling-extrema pass; no intermediate indicators
 
 from backtesting import Strategy
 import pandas as pd
 
+from trading.indicator_cache import cached
+from trading.indicators import channel_midpoints, shift_forward
+
 
 # DEFAULT_TRADE_SIZE_PERCENT import removed, passed as param
 
@@ -13,7 +18,7 @@ class IchimokuStrategy(Strategy):
     Trades based on the Ichimoku Kinko Hyo indicator.
     Parameters `tenkan_period`, `kijun_period`, `senkou_b_period`, `chikou_period`,
     `senkou_displacement`, `trade_size_percent` are set via Backtest constructor.
-    Calculations done using pandas.
+    Calculations done with the shared rolling-extrema kernel (trading.indicators).
     """
     # --- Strategy Parameters ---
     tenkan_period = 9
@@ -36,18 +41,11 @@ class IchimokuStrategy(Strategy):
         low = self.data.Low;
         close = self.data.Close
 
-        self.tenkan = self.I(
-            lambda H=high, L=low: (pd.Series(H).rolling(tenkan_p).max() + pd.Series(L).rolling(tenkan_p).min()) / 2,
-            name="Tenkan")
-        self.kijun = self.I(
-            lambda H=high, L=low: (pd.Series(H).rolling(kijun_p).max() + pd.Series(L).rolling(kijun_p).min()) / 2,
-            name="Kijun")
-        senkou_a_intermediate = self.I(lambda: (self.tenkan + self.kijun) / 2, name="SenkouA_Intermediate")
-        self.senkou_a = self.I(lambda: pd.Series(senkou_a_intermediate).shift(senkou_disp), name="SenkouA")
-        senkou_b_intermediate = self.I(
-            lambda H=high, L=low: (pd.Series(H).rolling(senkou_b_p).max() + pd.Series(L).rolling(senkou_b_p).min()) / 2,
-            name="SenkouB_Intermediate")
-        self.senkou_b = self.I(lambda: pd.Series(senkou_b_intermediate).shift(senkou_disp), name="SenkouB")
+        tenkan, kijun, senkou_b_base = cached(channel_midpoints)(high, low, (tenkan_p, kijun_p, senkou_b_p))
+        self.tenkan = self.I(lambda: tenkan, name="Tenkan")
+        self.kijun = self.I(lambda: kijun, name="Kijun")
+        self.senkou_a = self.I(shift_forward, (tenkan + kijun) / 2, senkou_disp, name="SenkouA")
+        self.senkou_b = self.I(shift_forward, senkou_b_base, senkou_disp, name="SenkouB")
 
         print(
             f"Initialized IchimokuStrategy (Periods: T={tenkan_p}, K={kijun_p}, SB={senkou_b_p}, Displacement={senkou_disp})")
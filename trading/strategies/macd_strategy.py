@@ -1,11 +1,14 @@
 # trading/strategies/macd_strategy.py
 # Moving Average Convergence Divergence (MACD) Strategy
 # MODIFIED: Use parameters passed by backtesting.py
+# MODIFIED: Indicators come from the shared indicator cache
 
 from backtesting import Strategy
 from backtesting.lib import crossover
 import pandas as pd
 
+from trading.indicator_cache import cached
+
 
 # DEFAULT_TRADE_SIZE_PERCENT import removed, passed as param
 # import talib # Injected by gui/app.py into module scope
@@ -33,7 +36,7 @@ class MacdStrategy(Strategy):
         signal_period_int = int(self.signal_period)
 
         self.macd, self.macdsignal, self.macdhist = self.I(
-            talib.MACD,
+            cached(talib.MACD),
             self.data.Close,
             fastperiod=fast_period_int,
             slowperiod=slow_period_int,
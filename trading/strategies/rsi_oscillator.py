@@ -1,10 +1,13 @@
 # trading/strategies/rsi_oscillator.py
 # Relative Strength Index (RSI) Oscillator Strategy
 # MODIFIED: Use parameters passed by backtesting.py
+# MODIFIED: Indicators come from the shared indicator cache
 
 from backtesting import Strategy
 import pandas as pd
 
+from trading.indicator_cache import cached
+
 
 # import talib # Injected by gui/app.py into module scope
 
@@ -27,7 +30,7 @@ class RsiOscillator(Strategy):
         # Ensure parameters have correct types
         rsi_period_int = int(self.rsi_period)
 
-        self.rsi = self.I(talib.RSI, self.data.Close, timeperiod=rsi_period_int)
+        self.rsi = self.I(cached(talib.RSI), self.data.Close, timeperiod=rsi_period_int)
         print(
             f"Initialized RsiOscillator Strategy (Period: {rsi_period_int}, Bounds: {self.lower_bound}/{self.upper_bound})")
 
@@ -1,10 +1,13 @@
 # trading/strategies/sma_cross.py
 # Simple Moving Average Crossover Strategy
 # MODIFIED: Use parameters passed by backtesting.py
+# MODIFIED: Moving averages come from the shared indicator cache
 
 from backtesting import Strategy
 from backtesting.lib import crossover
-import pandas as pd
+
+from trading.indicator_cache import cached
+from trading.indicators import rolling_mean
 
 
 # DEFAULT_TRADE_SIZE_PERCENT import removed, passed as param
@@ -27,8 +30,8 @@ class SmaCross(Strategy):
         n1_int = int(self.n1)
         n2_int = int(self.n2)
 
-        self.sma1 = self.I(lambda x: pd.Series(x).rolling(n1_int).mean(), self.data.Close)
-        self.sma2 = self.I(lambda x: pd.Series(x).rolling(n2_int).mean(), self.data.Close)
+        self.sma1 = self.I(cached(rolling_mean), self.data.Close, n1_int, name=f"SMA({n1_int})")
+        self.sma2 = self.I(cached(rolling_mean), self.data.Close, n2_int, name=f"SMA({n2_int})")
         print(f"Initialized SmaCross Strategy (SMA{n1_int}, SMA{n2_int})")
 
     def next(self):
@@ -1,10 +1,13 @@
 # trading/strategies/volatility_breakout.py
 # Volatility Breakout Strategy using ATR
 # MODIFIED: Use parameters passed by backtesting.py
+# MODIFIED: Indicators come from the shared indicator cache
 
 from backtesting import Strategy
 import pandas as pd
 
+from trading.indicator_cache import cached
+
 
 # import talib # Injected by gui/app.py into module scope
 
@@ -33,8 +36,8 @@ class VolatilityBreakout(Strategy):
         high = self.data.High;
         low = self.data.Low
 
-        self.atr = self.I(talib.ATR, high, low, close, timeperiod=atr_period_int)
-        self.ma = self.I(talib.SMA, close, timeperiod=ma_period_int)
+        self.atr = self.I(cached(talib.ATR), high, low, close, timeperiod=atr_period_int)
+        self.ma = self.I(cached(talib.SMA), close, timeperiod=ma_period_int)
         print(
             f"Initialized VolatilityBreakout Strategy (MA{ma_period_int}, ATR{atr_period_int}, Multiplier: {atr_multiplier_float})")
 
@@ -0,0 +1,119 @@
+# trading/strategy_registry.py
+# Strategy catalogue (loaders, parameter defaults, constraints) shared by the GUI and by
+# worker processes, which cannot receive the GUI's strategy objects directly
+# Kept free of GUI code so it can be imported in worker processes
+# Strategy modules (and backtesting.py) are imported only when a strategy is first loaded
+
+import importlib
+
+from config import DEFAULT_TRADE_SIZE_PERCENT, OBSERVER_LAT, OBSERVER_LON, OBSERVER_ELEV, TA_BACKEND
+# Define strategies as "module.ClassName" strings; load_strategy_class imports them on first use
+STRATEGY_LOADERS = {
+    "SMA Crossover": "trading.strategies.sma_cross.SmaCross",
+    "Ichimoku Cloud": "trading.strategies.ichimoku_strategy.IchimokuStrategy",
+    "Donchian Channel": "trading.strategies.donchian_channel_strategy.DonchianChannelStrategy",
+    "Day of Week Effect": "trading.strategies.day_of_week_strategy.DayOfWeekStrategy",
+    "Fake Moon (Day of Month)": "trading.strategies.fake_moon_strategy.FakeMoonStrategy",
+    "RSI Oscillator": "trading.strategies.rsi_oscillator.RsiOscillator",
+    "Volatility Breakout": "trading.strategies.volatility_breakout.VolatilityBreakout",
+    "MACD": "trading.strategies.macd_strategy.MacdStrategy",
+    "Bollinger Bands": "trading.strategies.bollinger_bands_strategy.BollingerBandsStrategy",
+    "Real Moon (Ephem)": "trading.strategies.real_moon_strategy.RealMoonStrategy"
+}
+
+# --- Strategy Parameter Definitions ---
+PARAM_CONFIG = {
+    "SMA Crossover": [("n1", 10), ("n2", 30)],
+    "Ichimoku Cloud": [("tenkan_period", 9), ("kijun_period", 26), ("senkou_b_period", 52), ("chikou_period", 26), ("senkou_displacement", 26)],
+    "Donchian Channel": [("n_high", 20), ("n_low", 20)],
+    "Day of Week Effect": [("buy_day", 0), ("sell_day", 4)],
+    "Fake Moon (Day of Month)": [("buy_day_start", 1), ("buy_day_end", 5), ("sell_day_start", 14), ("sell_day_end", 18)],
+    "RSI Oscillator": [("rsi_period", 14), ("upper_bound", 70), ("lower_bound", 30)],
+    "Volatility Breakout": [("atr_period", 14), ("ma_period", 20), ("atr_multiplier", 2.0)],
+    "MACD": [("fast_period", 12), ("slow_period", 26), ("signal_period", 9)],
+    "Bollinger Bands": [("bb_period", 20), ("bb_std_dev", 2.0)],
+    "Real Moon (Ephem)": [("days_after_new_moon_buy", 2), ("buy_window_days", 3), ("days_after_full_moon_sell", 2), ("sell_window_days", 3)],
+}
+for params in PARAM_CONFIG.values():
+     params.insert(0, ("trade_size_percent", DEFAULT_TRADE_SIZE_PERCENT))
+
+# --- Default optimizer constraints (Python expressions over the parameter names) ---
+PARAM_CONSTRAINTS = {
+    "SMA Crossover": "n1 < n2",
+    "Ichimoku Cloud": "tenkan_period < kijun_period < senkou_b_period",
+    "Fake Moon (Day of Month)": "buy_day_start <= buy_day_end and sell_day_start <= sell_day_end",
+    "RSI Oscillator": "lower_bound < upper_bound",
+    "MACD": "fast_period < slow_period",
+}
+
+_STRATEGY_NEEDS_TALIB = ["rsi_oscillator", "volatility_breakout", "macd_strategy", "bollinger_bands_strategy"]
+_optional_modules = {}  # Module name -> imported module (TA-Lib / Ephem are imported on first use)
+
+
+def _import_optional(module_name: str, label: str):
+    module = _optional_modules.get(module_name)
+    if module is None:
+        module = importlib.import_module(module_name); _optional_modules[module_name] = module
+        print(f"{label} imported.")
+    return module
+
+
+def get_talib():
+    """
+    Returns the module injected into strategies as 'talib': TA-Lib itself, or the pure-NumPy
+    drop-in trading.ta_numpy when TA-Lib is not installed (or TA_BACKEND = "numpy").
+
+    Raises:
+        ImportError: If TA_BACKEND = "talib" and TA-Lib is not installed.
+    """
+    module = _optional_modules.get("talib")
+    if module is not None: return module
+    if TA_BACKEND != "numpy":
+        try: return _import_optional("talib", "TA-Lib")
+        except ImportError:
+            if TA_BACKEND == "talib": raise
+    module = importlib.import_module("trading.ta_numpy"); _optional_modules["talib"] = module
+    print("TA-Lib not used; indicators come from the NumPy implementation (trading.ta_numpy).")
+    return module
+
+
+def load_strategy_class(strategy_loader):
+    """
+    Resolves a STRATEGY_LOADERS entry to a class, injecting TA-Lib (or its NumPy drop-in)/Ephem into its module if needed.
+
+    Args:
+        strategy_loader: A strategy class, or a "package.module.ClassName" string.
+
+    Returns:
+        The strategy class.
+
+    Raises:
+        ImportError: If the strategy needs Ephem (or TA_BACKEND = "talib" and TA-Lib) and it is not installed.
+    """
+    if not isinstance(strategy_loader, str): return strategy_loader
+    module_path, class_name = strategy_loader.rsplit('.', 1)
+    needs_talib = any(s in strategy_loader for s in _STRATEGY_NEEDS_TALIB)
+    needs_ephem = "real_moon_strategy" in strategy_loader
+    strategy_module = importlib.import_module(module_path)
+    if needs_talib: setattr(strategy_module, 'talib', get_talib())
+    if needs_ephem: setattr(strategy_module, 'ephem', _import_optional("ephem", "Ephem"))
+    strategy_class = getattr(strategy_module, class_name)
+    if class_name == "RealMoonStrategy": strategy_class.OBSERVER_LAT = OBSERVER_LAT; strategy_class.OBSERVER_LON = OBSERVER_LON; strategy_class.OBSERVER_ELEV = OBSERVER_ELEV
+    return strategy_class
+
+
+def get_strategy_class(strategy_name: str):
+    """ Looks up a strategy by its display name and loads its class. Raises KeyError if unknown. """
+    return load_strategy_class(STRATEGY_LOADERS[strategy_name])
+
+
+def strategy_class_name(strategy_name: str) -> str:
+    """ Class name of a STRATEGY_LOADERS entry without importing it. Raises KeyError if unknown. """
+    loader = STRATEGY_LOADERS[strategy_name]
+    return loader.rsplit('.', 1)[1] if isinstance(loader, str) else loader.__name__
+
+
+def trade_size_fraction(percent) -> float:
+    """ Converts a trade size given in percent (0-100] to the fraction strategies expect, falling back to the default. """
+    if isinstance(percent, (int, float)) and 0 < percent <= 100: return percent / 100.0
+    return DEFAULT_TRADE_SIZE_PERCENT / 100.0 if DEFAULT_TRADE_SIZE_PERCENT > 1 else DEFAULT_TRADE_SIZE_PERCENT
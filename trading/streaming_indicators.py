@@ -0,0 +1,174 @@
+# trading/streaming_indicators.py
+# Streaming versions of the TA-Lib indicators used by the recommendation engine (SMA, EMA, RSI, MACD,
+# BBANDS, ADX): each object holds the rolling state of one indicator, is seeded from history once and then
+# takes one bar at a time in constant time, giving the same values as the batch functions on the whole series
+# The arithmetic follows TA-Lib's C loops (running sums, Wilder smoothing, seeding and lookback periods)
+# update() appends a bar; peek() returns what update() would without changing the state, so a live price
+# can be scored against the same history as often as it changes
+
+import math
+from collections import deque
+
+import numpy as np
+
+NAN = float("nan")
+
+
+class StreamingIndicator:
+    """
+    Base class. Subclasses implement _next(*bar) -> (state, value), which must not change the object,
+    and _apply(state), which makes that state current. value is the latest output (NaN, or a tuple
+    of NaNs, until the lookback period has passed); count is the number of bars seen.
+    """
+    count = 0
+    value = NAN
+
+    def update(self, *bar):
+        """ Appends one bar and returns the indicator's new value. """
+        state, value = self._next(*bar)
+        self._commit(state, value)
+        return value
+
+    def peek(self, *bar):
+        """ The value update(*bar) would return, leaving the indicator unchanged. """
+        return self._next(*bar)[1]
+
+    def seed(self, *columns):
+        """ Feeds a history (one array per update() argument, oldest first) bar by bar; returns self. """
+        for bar in zip(*(np.asarray(column, dtype=float).tolist() for column in columns)): self.update(*bar)
+        return self
+
+    @property
+    def ready(self) -> bool:
+        """ True once value is defined. """
+        return not any(math.isnan(part) for part in (self.value if isinstance(self.value, tuple) else (self.value,)))
+
+    def _commit(self, state, value):
+        self._apply(state); self.value = value; self.count += 1
+
+    def _next(self, *bar): raise NotImplementedError
+
+    def _apply(self, state): raise NotImplementedError
+
+
+class StreamingSMA(StreamingIndicator):
+    """ Simple moving average: a ring buffer of the last timeperiod - 1 values and their running sum. """
+    def __init__(self, timeperiod: int = 30):
+        self.period = int(timeperiod)
+        self._window = deque(maxlen=self.period - 1); self._total = 0.0
+
+    def _next(self, x):
+        total = self._total + x
+        if self.count < self.period - 1: return (x, total), NAN
+        return (x, total - (self._window[0] if self._window.maxlen else x)), total / self.period
+
+    def _apply(self, state):
+        x, self._total = state
+        if self._window.maxlen: self._window.append(x)
+
+
+class StreamingEMA(StreamingIndicator):
+    """ Exponential moving average (k = 2 / (timeperiod + 1)) seeded with the SMA of the first timeperiod values. """
+    def __init__(self, timeperiod: int = 30):
+        self.period = int(timeperiod); self.k = 2.0 / (self.period + 1)
+        self._total = 0.0  # Sum of the values seen while warming up
+
+    def _next(self, x):
+        if self.count < self.period - 1: return self._total + x, NAN
+        value = (self._total + x) / self.period if self.count == self.period - 1 else (x - self.value) * self.k + self.value
+        return self._total, value
+
+    def _apply(self, state): self._total = state
+
+
+class StreamingRSI(StreamingIndicator):
+    """ Wilder's RSI; first value on bar timeperiod + 1. """
+    def __init__(self, timeperiod: int = 14):
+        self.period = int(timeperiod)
+        self._prev = NAN; self._gain = 0.0; self._loss = 0.0  # Sums while warming up, then Wilder averages
+
+    def _next(self, x):
+        if self.count == 0: return (x, 0.0, 0.0), NAN
+        change = x - self._prev; gain = change if change > 0 else 0.0; loss = -change if change < 0 else 0.0
+        if self.count < self.period: return (x, self._gain + gain, self._loss + loss), NAN
+        if self.count == self.period: avg_gain = (self._gain + gain) / self.period; avg_loss = (self._loss + loss) / self.period
+        else: avg_gain = (self._gain * (self.period - 1) + gain) / self.period; avg_loss = (self._loss * (self.period - 1) + loss) / self.period
+        total = avg_gain + avg_loss
+        return (x, avg_gain, avg_loss), 100.0 * (avg_gain / total) if total != 0 else 0.0
+
+    def _apply(self, state): self._prev, self._gain, self._loss = state
+
+
+class StreamingMACD(StreamingIndicator):
+    """
+    MACD line, signal line and histogram. As in TA-Lib, both EMAs are seeded on bar slowperiod (the fast EMA
+    only sees the fastperiod values ending there) and the outputs start on bar slowperiod + signalperiod - 1.
+    value is a (macd, macdsignal, macdhist) tuple.
+    """
+    def __init__(self, fastperiod: int = 12, slowperiod: int = 26, signalperiod: int = 9):
+        fast, slow = sorted((int(fastperiod), int(slowperiod)))
+        self._fast, self._slow, self._signal = StreamingEMA(fast), StreamingEMA(slow), StreamingEMA(int(signalperiod))
+        self._skip = slow - fast  # Bars the fast EMA ignores so that both EMAs are seeded on the same bar
+        self.value = (NAN, NAN, NAN)
+
+    def _next(self, x):
+        fast = self._fast._next(x) if self.count >= self._skip else None
+        slow = self._slow._next(x)
+        if math.isnan(slow[1]): return (fast, slow, None), (NAN, NAN, NAN)
+        macd = fast[1] - slow[1]; signal = self._signal._next(macd)
+        return (fast, slow, signal), (NAN, NAN, NAN) if math.isnan(signal[1]) else (macd, signal[1], macd - signal[1])
+
+    def _apply(self, state):
+        for ema, step in zip((self._fast, self._slow, self._signal), state):
+            if step is not None: ema._commit(*step)
+
+
+class StreamingBBANDS(StreamingIndicator):
+    """
+    Bollinger Bands around an SMA, using the population standard deviation over timeperiod bars
+    (from running sums of the values and their squares, as TA-Lib computes it).
+    value is an (upperband, middleband, lowerband) tuple.
+    """
+    def __init__(self, timeperiod: int = 5, nbdevup: float = 2.0, nbdevdn: float = 2.0):
+        self.period = int(timeperiod); self.nbdevup = float(nbdevup); self.nbdevdn = float(nbdevdn)
+        self._mean = StreamingSMA(self.period); self._mean_square = StreamingSMA(self.period)
+        self.value = (NAN, NAN, NAN)
+
+    def _next(self, x):
+        mean = self._mean._next(x); mean_square = self._mean_square._next(x * x); middle = mean[1]
+        if math.isnan(middle): return (mean, mean_square), (NAN, NAN, NAN)
+        variance = mean_square[1] - middle * middle; deviation = math.sqrt(variance) if variance > 0 else 0.0
+        return (mean, mean_square), (middle + self.nbdevup * deviation, middle, middle - self.nbdevdn * deviation)
+
+    def _apply(self, state):
+        self._mean._commit(*state[0]); self._mean_square._commit(*state[1])
+
+
+class StreamingADX(StreamingIndicator):
+    """
+    Wilder's average directional index from (high, low, close) bars; first value on bar 2 * timeperiod.
+    Bars whose DX is undefined (no range or no directional movement) leave the ADX unchanged.
+    """
+    def __init__(self, timeperiod: int = 14):
+        self.period = int(timeperiod)
+        if self.period < 2: raise ValueError("ADX needs timeperiod >= 2")
+        self._state = (NAN, NAN, NAN, 0.0, 0.0, 0.0, 0.0)  # prev high, low, close; Wilder sums of +DM, -DM, TR; sum of DX while seeding
+
+    def _next(self, high, low, close):
+        prev_high, prev_low, prev_close, plus_sum, minus_sum, tr_sum, dx_sum = self._state; period = self.period
+        if self.count == 0: return (high, low, close, 0.0, 0.0, 0.0, 0.0), NAN
+        up = high - prev_high; down = prev_low - low
+        plus_dm = up if up > 0 and up > down else 0.0; minus_dm = down if down > 0 and down > up else 0.0
+        tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        if self.count < period: return (high, low, close, plus_sum + plus_dm, minus_sum + minus_dm, tr_sum + tr, 0.0), NAN
+        plus_sum = plus_sum - plus_sum / period + plus_dm; minus_sum = minus_sum - minus_sum / period + minus_dm; tr_sum = tr_sum - tr_sum / period + tr
+        dx = NAN
+        if tr_sum != 0:
+            plus_di = 100.0 * (plus_sum / tr_sum); minus_di = 100.0 * (minus_sum / tr_sum); di_sum = plus_di + minus_di
+            if di_sum != 0: dx = 100.0 * (abs(minus_di - plus_di) / di_sum)
+        state = (high, low, close, plus_sum, minus_sum, tr_sum, dx_sum)
+        if self.count < 2 * period - 1: return state[:-1] + (dx_sum + (0.0 if math.isnan(dx) else dx),), NAN
+        if self.count == 2 * period - 1: return state, (dx_sum + (0.0 if math.isnan(dx) else dx)) / period
+        return state, self.value if math.isnan(dx) else (self.value * (period - 1) + dx) / period
+
+    def _apply(self, state): self._state = state
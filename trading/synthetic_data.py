@@ -0,0 +1,80 @@
+# trading/synthetic_data.py
+# Seeded synthetic OHLCV generator for the benchmark suite and the tests (no network access needed)
+# Regimes: "trending" (drifting random walk with changing drift), "mean_reverting" (Ornstein-Uhlenbeck
+# log price) and "gapped" (random walk with overnight gaps and missing sessions)
+
+import numpy as np
+import pandas as pd
+
+REGIMES = ("trending", "mean_reverting", "gapped")
+DEFAULT_START = "2000-01-03"
+MAX_DAILY_BARS = 50_000  # Business days from 2000 stay inside pandas' Timestamp range (year 2262) up to here
+ANCHOR_PHI = 1 - 5e-4  # Weak pull towards the start price (time constant ~2000 bars), so 1M-bar paths stay in a tradable range
+
+
+def default_freq(n_bars: int) -> str:
+    """ Bar spacing for n_bars: business days while they fit in the Timestamp range, hourly bars beyond that. """
+    return "B" if n_bars <= MAX_DAILY_BARS else "h"
+
+
+def _ar1(shocks: np.ndarray, phi: float) -> np.ndarray:
+    """ x[t] = phi * x[t-1] + shocks[t] (x[0] = shocks[0]), using pandas' ewm kernel instead of a Python loop. """
+    alpha = 1.0 - phi
+    return pd.Series(shocks / alpha).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def _log_prices(regime: str, n: int, rng: np.random.Generator) -> np.ndarray:
+    """ Log price path relative to the start (first value 0). """
+    if regime == "trending":
+        # Drift switches every ~250 bars between up and down trends of different strength
+        segment_drift = rng.choice([-0.0015, -0.0008, 0.0008, 0.0015], size=n // 250 + 1)
+        shocks = np.repeat(segment_drift, 250)[:n] + rng.normal(0.0, 0.012, n)
+        phi = ANCHOR_PHI
+    elif regime == "mean_reverting":
+        shocks = rng.normal(0.0, 0.01, n); phi = 0.97  # Reverts towards the starting level within ~30 bars
+    elif regime == "gapped":
+        shocks = rng.normal(0.0, 0.01, n)
+        gaps = rng.random(n) < 0.05  # About one bar in twenty opens with a gap
+        shocks[gaps] += rng.standard_t(3, gaps.sum()) * 0.03
+        phi = ANCHOR_PHI
+    else:
+        raise ValueError(f"Unknown regime '{regime}' (expected one of {REGIMES})")
+    shocks[0] = 0.0
+    return _ar1(shocks, phi)
+
+
+def synthetic_ohlcv(n_bars: int, regime: str = "trending", seed: int = 0, start: str = DEFAULT_START,
+                    freq: str | None = None, start_price: float = 100.0) -> pd.DataFrame:
+    """
+    Generates reproducible OHLCV bars in the app's format (lowercase columns, DatetimeIndex).
+
+    Args:
+        n_bars (int): Number of rows returned (1k to 1M are typical benchmark sizes).
+        regime (str): One of REGIMES.
+        seed (int): Same seed, regime and size give identical data.
+        start (str): First timestamp.
+        freq (str | None): pandas frequency of the bar grid; default_freq(n_bars) if None.
+                           In the "gapped" regime about 2% of the grid is left out (halts / holidays).
+        start_price (float): Close of the first bar.
+
+    Returns:
+        pd.DataFrame: Columns open, high, low, close, volume with high >= max(open, close) and low <= min(open, close).
+    """
+    if regime not in REGIMES: raise ValueError(f"Unknown regime '{regime}' (expected one of {REGIMES})")
+    n_bars = int(n_bars)
+    if n_bars < 1: raise ValueError(f"n_bars must be >= 1, got {n_bars}")
+    rng = np.random.default_rng([int(seed), REGIMES.index(regime)])
+    grid_size = n_bars + (n_bars // 40 + 1 if regime == "gapped" else 0)
+    index = pd.date_range(start, periods=grid_size, freq=freq or default_freq(grid_size))
+    if grid_size > n_bars: index = index.delete(np.sort(rng.choice(np.arange(1, grid_size), grid_size - n_bars, replace=False)))
+
+    log_price = _log_prices(regime, n_bars, rng)
+    close = start_price * np.exp(log_price); returns = np.diff(log_price, prepend=0.0)
+    # The open carries the overnight part of each bar's move (all of a gap), the rest happens intrabar
+    overnight = returns * 0.3 if regime != "gapped" else np.where(np.abs(returns) > 0.03, returns * 0.9, returns * 0.3)
+    prev_close = np.r_[start_price, close[:-1]]
+    open_ = prev_close * np.exp(overnight)
+    wick = np.abs(rng.normal(0.0, 0.004, (2, n_bars)))
+    high = np.maximum(open_, close) * (1 + wick[0]); low = np.minimum(open_, close) * (1 - wick[1])
+    volume = np.round(rng.lognormal(13.0, 0.4, n_bars) * (1 + 20 * np.abs(returns)))
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume}, index=index)
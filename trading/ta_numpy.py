@@ -0,0 +1,167 @@
+# trading/ta_numpy.py
+# Pure NumPy/pandas implementations of the TA-Lib functions used by the strategies and the
+# recommendation engine (SMA, EMA, RSI, MACD, BBANDS, ATR, ADX), with TA-Lib's signatures,
+# seeding rules and lookback periods, so the module can be injected in place of talib
+# when the C library is not installed (see strategy_registry.get_talib)
+# Recursive smoothing (EMA / Wilder) runs on pandas' ewm kernel; everything else is array math
+# Run `python -m trading.ta_numpy` to compare against TA-Lib (values and speed)
+
+import numpy as np
+import pandas as pd
+
+MA_TYPES = {0: "SMA", 1: "EMA"}  # BBANDS matype values supported here
+
+
+def _as_float(values) -> np.ndarray:
+    return np.asarray(values.to_numpy() if isinstance(values, pd.Series) else values, dtype=float)
+
+
+def _like_input(reference, *outputs):
+    """ Returns Series with reference's index when the input was a Series (as talib does), arrays otherwise. """
+    if isinstance(reference, pd.Series): outputs = tuple(pd.Series(out, index=reference.index) for out in outputs)
+    return outputs if len(outputs) > 1 else outputs[0]
+
+
+def _seeded_ema(values: np.ndarray, start: int, seed: float, alpha: float, ignore_na: bool = False) -> np.ndarray:
+    """
+    out[start] = seed and out[t] = alpha * values[t] + (1 - alpha) * out[t - 1] for t > start; NaN before start.
+    With ignore_na, NaN inputs leave the average unchanged (TA-Lib's ADX skips undefined DX values that way).
+    """
+    out = np.full(len(values), np.nan)
+    if start >= len(values): return out
+    series = values[start:].copy(); series[0] = seed
+    out[start:] = pd.Series(series).ewm(alpha=alpha, adjust=False, ignore_na=ignore_na).mean().to_numpy()
+    return out
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """ True range per bar (NaN on the first bar, which has no previous close). """
+    tr = np.full(len(close), np.nan)
+    if len(close) > 1:
+        prev_close = close[:-1]
+        tr[1:] = np.maximum(high[1:] - low[1:], np.maximum(np.abs(high[1:] - prev_close), np.abs(low[1:] - prev_close)))
+    return tr
+
+
+def SMA(real, timeperiod: int = 30):
+    """ Simple moving average; first value at index timeperiod - 1. """
+    values = _as_float(real); period = int(timeperiod)
+    return _like_input(real, pd.Series(values).rolling(period).mean().to_numpy())
+
+
+def EMA(real, timeperiod: int = 30):
+    """ Exponential moving average (k = 2 / (timeperiod + 1)) seeded with the SMA of the first timeperiod values. """
+    values = _as_float(real); period = int(timeperiod)
+    if len(values) < period: return _like_input(real, np.full(len(values), np.nan))
+    return _like_input(real, _seeded_ema(values, period - 1, values[:period].mean(), 2.0 / (period + 1)))
+
+
+def RSI(real, timeperiod: int = 14):
+    """ Wilder's RSI; first value at index timeperiod. """
+    values = _as_float(real); period = int(timeperiod); n = len(values)
+    if n <= period: return _like_input(real, np.full(n, np.nan))
+    change = np.r_[np.nan, np.diff(values)]
+    gains = np.where(change > 0, change, 0.0); losses = np.where(change < 0, -change, 0.0)
+    avg_gain = _seeded_ema(gains, period, gains[1:period + 1].mean(), 1.0 / period)
+    avg_loss = _seeded_ema(losses, period, losses[1:period + 1].mean(), 1.0 / period)
+    total = avg_gain + avg_loss
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rsi = np.where(total != 0, 100.0 * avg_gain / total, 0.0)
+    rsi[:period] = np.nan
+    return _like_input(real, rsi)
+
+
+def MACD(real, fastperiod: int = 12, slowperiod: int = 26, signalperiod: int = 9):
+    """
+    MACD line, signal line and histogram. As in TA-Lib, both EMAs start at index slowperiod - 1
+    (the fast EMA is seeded with the SMA of the fastperiod values ending there) and all three
+    outputs start at index slowperiod + signalperiod - 2.
+
+    Returns:
+        tuple: (macd, macdsignal, macdhist)
+    """
+    values = _as_float(real); fast, slow, signal = int(fastperiod), int(slowperiod), int(signalperiod); n = len(values)
+    if slow < fast: fast, slow = slow, fast
+    start = slow - 1; signal_start = start + signal - 1
+    if n <= signal_start: empty = np.full(n, np.nan); return _like_input(real, empty, empty.copy(), empty.copy())
+    slow_ema = _seeded_ema(values, start, values[:slow].mean(), 2.0 / (slow + 1))
+    fast_ema = _seeded_ema(values, start, values[slow - fast:slow].mean(), 2.0 / (fast + 1))
+    macd = fast_ema - slow_ema
+    macd_signal = _seeded_ema(macd, signal_start, macd[start:signal_start + 1].mean(), 2.0 / (signal + 1))
+    macd[:signal_start] = np.nan
+    return _like_input(real, macd, macd_signal, macd - macd_signal)
+
+
+def BBANDS(real, timeperiod: int = 5, nbdevup: float = 2.0, nbdevdn: float = 2.0, matype: int = 0):
+    """
+    Bollinger Bands around an SMA (matype=0) or EMA (matype=1), using the population standard
+    deviation over timeperiod bars.
+
+    Returns:
+        tuple: (upperband, middleband, lowerband)
+
+    Raises:
+        ValueError: For TA-Lib moving average types other than SMA and EMA.
+    """
+    if int(matype) not in MA_TYPES: raise ValueError(f"matype {matype} is not supported (0 = SMA, 1 = EMA)")
+    values = _as_float(real); period = int(timeperiod)
+    middle = _as_float(SMA(values, period) if int(matype) == 0 else EMA(values, period))
+    deviation = pd.Series(values).rolling(period).std(ddof=0).to_numpy()
+    return _like_input(real, middle + float(nbdevup) * deviation, middle, middle - float(nbdevdn) * deviation)
+
+
+def ATR(high, low, close, timeperiod: int = 14):
+    """ Wilder's average true range; first value at index timeperiod. """
+    tr = _true_range(_as_float(high), _as_float(low), _as_float(close)); period = int(timeperiod); n = len(tr)
+    if period == 1: return _like_input(close, tr)
+    if n <= period: return _like_input(close, np.full(n, np.nan))
+    return _like_input(close, _seeded_ema(tr, period, tr[1:period + 1].mean(), 1.0 / period))
+
+
+def ADX(high, low, close, timeperiod: int = 14):
+    """ Wilder's average directional index; first value at index 2 * timeperiod - 1. """
+    high_values, low_values, close_values = _as_float(high), _as_float(low), _as_float(close)
+    period = int(timeperiod); n = len(close_values)
+    if n <= 2 * period - 1 or period < 2: return _like_input(close, np.full(n, np.nan))
+    up = np.r_[np.nan, np.diff(high_values)]; down = np.r_[np.nan, -np.diff(low_values)]
+    plus_dm = np.where((up > 0) & (up > down), up, 0.0); minus_dm = np.where((down > 0) & (down > up), down, 0.0)
+    tr = _true_range(high_values, low_values, close_values)
+    # Wilder sums S[t] = S[t-1] * (1 - 1/p) + x[t], seeded with the sum of bars 1..p-1; S / p is an EMA with alpha 1/p
+    smoothed = [_seeded_ema(x, period - 1, x[1:period].sum() / period, 1.0 / period) for x in (plus_dm, minus_dm, tr)]
+    smoothed_plus, smoothed_minus, smoothed_tr = smoothed
+    with np.errstate(invalid="ignore", divide="ignore"):
+        plus_di = np.where(smoothed_tr != 0, 100.0 * smoothed_plus / smoothed_tr, np.nan)
+        minus_di = np.where(smoothed_tr != 0, 100.0 * smoothed_minus / smoothed_tr, np.nan)
+        di_sum = plus_di + minus_di
+        dx = np.where(di_sum != 0, 100.0 * np.abs(minus_di - plus_di) / di_sum, np.nan)
+    dx[:period] = np.nan
+    first = 2 * period - 1
+    adx = _seeded_ema(dx, first, np.nansum(dx[period:first + 1]) / period, 1.0 / period, ignore_na=True)
+    return _like_input(close, adx)
+
+
+# --- Accuracy / speed check against TA-Lib (python -m trading.ta_numpy) ---
+if __name__ == "__main__":
+    import time
+    try: import talib
+    except ImportError: raise SystemExit("TA-Lib is not installed; nothing to compare against.")
+    rng = np.random.default_rng(11); n = 5000
+    close_prices = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n)))
+    high_prices = close_prices * (1 + np.abs(rng.normal(0, 0.01, n))); low_prices = close_prices * (1 - np.abs(rng.normal(0, 0.01, n)))
+    cases = [("SMA", (close_prices,), {"timeperiod": 20}), ("EMA", (close_prices,), {"timeperiod": 20}),
+             ("RSI", (close_prices,), {"timeperiod": 14}), ("MACD", (close_prices,), {"fastperiod": 12, "slowperiod": 26, "signalperiod": 9}),
+             ("BBANDS", (close_prices,), {"timeperiod": 20, "nbdevup": 2.0, "nbdevdn": 2.0, "matype": 0}),
+             ("ATR", (high_prices, low_prices, close_prices), {"timeperiod": 14}), ("ADX", (high_prices, low_prices, close_prices), {"timeperiod": 14})]
+    all_close = True
+    for name, args, kwargs in cases:
+        expected = getattr(talib, name)(*args, **kwargs); actual = globals()[name](*args, **kwargs)
+        expected = expected if isinstance(expected, tuple) else (expected,); actual = actual if isinstance(actual, tuple) else (actual,)
+        same_nans = all(np.array_equal(np.isnan(e), np.isnan(a)) for e, a in zip(expected, actual))
+        max_error = max(float(np.nanmax(np.abs(e - a) / np.maximum(np.abs(e), 1.0))) for e, a in zip(expected, actual))
+        ok = same_nans and max_error < 1e-9; all_close &= ok
+        runs = 50
+        t0 = time.perf_counter(); [getattr(talib, name)(*args, **kwargs) for _ in range(runs)]; talib_time = (time.perf_counter() - t0) / runs
+        t0 = time.perf_counter(); [globals()[name](*args, **kwargs) for _ in range(runs)]; numpy_time = (time.perf_counter() - t0) / runs
+        print(f"{name:<7} {'OK' if ok else 'DIFF':<5} max rel. error {max_error:.1e}  NaN layout {'same' if same_nans else 'DIFFERENT'}  "
+              f"talib {talib_time * 1e6:7.0f} us  numpy {numpy_time * 1e6:7.0f} us")
+    print("All indicators match TA-Lib." if all_close else "Some indicators differ from TA-Lib.")
@@ -0,0 +1,145 @@
+# trading/tournament.py
+# Strategy tournament ("Run All"): backtests every STRATEGY_LOADERS entry on the same data on a process
+# pool and ranks them in a leaderboard that is reported run by run as results come in
+# Cancellation (threading.Event) is checked while waiting on the pool, so a GUI Cancel stops it within a quarter second
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+import pandas as pd
+
+from config import DEFAULT_CASH, DEFAULT_COMMISSION
+from trading.backtester import BacktestCancelled
+from trading.optimizer import rank_results, ENGINES
+from trading.strategy_registry import STRATEGY_LOADERS, strategy_class_name
+from trading import vector_backtester
+
+LEADERBOARD_METRICS = ["Return [%]", "Sharpe Ratio", "Max. Drawdown [%]", "# Trades"]
+DEFAULT_METRIC = "Sharpe Ratio"  # All LEADERBOARD_METRICS but "# Trades" rank "larger is better"
+
+
+def _uses_vector(strategy_name: str, engine: str) -> bool:
+    return engine != "backtesting" and vector_backtester.supports(strategy_class_name(strategy_name))
+
+
+# --- Worker process side ---
+_worker_state = {}
+
+
+def _init_worker(data: pd.DataFrame, cash, commission, quiet: bool, use_store: bool, symbol, interval):
+    """ Runs once per worker process: keeps the data so tasks only carry a strategy name and parameters. """
+    if quiet: sys.stdout = open(os.devnull, "w")  # Per-run logging would flood the console
+    _worker_state.update(data=data, cash=cash, commission=commission, use_store=use_store, symbol=symbol, interval=interval)
+
+
+def _run_entry(strategy_name: str, params: dict, engine: str) -> dict:
+    """ Backtests one strategy in a worker process and returns its leaderboard row. """
+    return evaluate_strategy(strategy_name, _worker_state["data"], params, cash=_worker_state["cash"],
+                             commission=_worker_state["commission"], engine=engine, use_store=_worker_state["use_store"],
+                             symbol=_worker_state["symbol"], interval=_worker_state["interval"])
+
+
+def evaluate_strategy(strategy_name: str, data: pd.DataFrame, params: dict | None = None, cash=DEFAULT_CASH,
+                      commission=DEFAULT_COMMISSION, engine: str = "auto", use_store: bool = True,
+                      symbol: str | None = None, interval: str | None = None) -> dict:
+    """
+    Runs one strategy and flattens it into a leaderboard row (strategy, LEADERBOARD_METRICS, engine,
+    seconds, stored, error). Parameters missing from params use their PARAM_CONFIG default;
+    trade_size_percent is given in percent, as in the GUI. Failed runs get NaN metrics and an 'error'.
+    """
+    from trading.runner import run_strategy  # Shares parameter defaults, engine choice and the results store with the CLI
+    from trading.results_store import default_results_store
+    row = {"strategy": strategy_name}
+    started = time.perf_counter()
+    try:
+        stats, used_engine = run_strategy(strategy_name, data, params or {}, cash=cash, commission=commission, engine=engine,
+                                          store=default_results_store() if use_store else None, symbol=symbol, interval=interval)
+        error = None
+    except Exception as e:
+        stats, used_engine, error = None, None, f"{type(e).__name__}: {e}"
+    for metric in LEADERBOARD_METRICS:
+        value = stats.get(metric, np.nan) if stats is not None else np.nan
+        row[metric] = float(value) if isinstance(value, (int, float, np.number)) else np.nan
+    row.update(engine=used_engine, seconds=time.perf_counter() - started,
+               stored=stats is not None and stats.get("_stored_at") is not None, error=error)
+    return row
+
+
+# --- Main side ---
+def run_tournament(data: pd.DataFrame, strategy_names=None, overrides: dict | None = None, metric: str = DEFAULT_METRIC,
+                   cash=DEFAULT_CASH, commission=DEFAULT_COMMISSION, max_workers: int | None = None, engine: str = "auto",
+                   cancel_event=None, result_callback=None, quiet: bool = True, use_store: bool = True,
+                   symbol: str | None = None, interval: str | None = None) -> pd.DataFrame:
+    """
+    Backtests every strategy on a process pool and ranks them.
+
+    Strategies that need backtesting.py are submitted first: they take far longer than those on the
+    vector engine, so with enough workers the whole tournament takes about as long as its slowest run.
+
+    Args:
+        data (pd.DataFrame): OHLCV data with lowercase columns (sent to each worker once).
+        strategy_names (list | None): STRATEGY_LOADERS keys (default: all of them).
+        overrides (dict | None): Strategy name -> parameters used instead of its PARAM_CONFIG defaults.
+        metric (str): Leaderboard ranking (descending).
+        max_workers (int | None): Worker processes (default: CPU count, capped by the number of strategies).
+        engine (str): One of ENGINES, applied to every strategy.
+        cancel_event (threading.Event | None): Stops the tournament when set (BacktestCancelled is raised).
+        result_callback (callable | None): Called with (row, leaderboard so far, total) after each run.
+        quiet (bool): Silence per-run console output in the workers.
+        use_store (bool): Reuse / record results in the results store.
+        symbol (str | None), interval (str | None): Recorded with stored results for history queries.
+
+    Returns:
+        pd.DataFrame: One row per strategy (strategy, LEADERBOARD_METRICS, engine, seconds, stored, error),
+                      best first, with a 'rank' column starting at 1.
+
+    Raises:
+        ValueError: If a strategy name or the engine is unknown.
+    """
+    strategy_names = list(strategy_names or STRATEGY_LOADERS)
+    unknown = [name for name in strategy_names if name not in STRATEGY_LOADERS]
+    if unknown: raise ValueError(f"Unknown strategies: {', '.join(unknown)}")
+    if engine not in ENGINES: raise ValueError(f"Unknown engine '{engine}' (expected one of {ENGINES})")
+    overrides = overrides or {}
+    if engine == "vector": strategy_names = [name for name in strategy_names if _uses_vector(name, engine)]
+    strategy_names.sort(key=lambda name: _uses_vector(name, engine))  # Slow (backtesting.py) runs first
+    total = len(strategy_names)
+    workers = max(1, min(max_workers or os.cpu_count() or 1, total))
+    print(f"Tournament: {total} strategies on {workers} worker process(es)")
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(data, cash, commission, quiet, use_store, symbol, interval)) as executor:
+        pending = {executor.submit(_run_entry, name, overrides.get(name, {}), engine) for name in strategy_names}
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+                if cancel_event is not None and cancel_event.is_set():
+                    raise BacktestCancelled(f"Tournament cancelled after {len(rows)}/{total} strategies")
+                for future in done:
+                    rows.append(future.result())
+                    if result_callback is not None: result_callback(rows[-1], rank_results(pd.DataFrame(rows), metric), total)
+        except BaseException:
+            for future in pending: future.cancel()
+            raise
+    return rank_results(pd.DataFrame(rows), metric)
+
+
+def format_result(row: dict, leaderboard: pd.DataFrame, total: int) -> str:
+    """ One console line for a finished run: its metrics and its place in the leaderboard so far. """
+    if row["error"]: return f"[{len(leaderboard)}/{total}] {row['strategy']}: failed - {row['error']}"
+    place = int(leaderboard.loc[leaderboard["strategy"] == row["strategy"], "rank"].iloc[0])
+    source = "stored" if row["stored"] else f"{row['seconds']:.2f}s"
+    return (f"[{len(leaderboard)}/{total}] {row['strategy']}: Return {row['Return [%]']:.2f}%, Sharpe {row['Sharpe Ratio']:.2f}, "
+            f"Max DD {row['Max. Drawdown [%]']:.2f}%, {row['# Trades']:.0f} trades ({source}) -> #{place}")
+
+
+def format_leaderboard(leaderboard: pd.DataFrame) -> str:
+    """ Leaderboard table (rank, strategy, LEADERBOARD_METRICS, seconds) for the console. """
+    table = leaderboard[["rank", "strategy"] + LEADERBOARD_METRICS + ["seconds"]].copy()
+    table["# Trades"] = table["# Trades"].astype("Int64")
+    with pd.option_context("display.width", 1000):
+        return table.to_string(index=False, float_format=lambda v: f"{v:.2f}")
@@ -0,0 +1,535 @@
+# trading/vector_backtester.py
+# Vectorized backtest engine for strategies whose decisions depend only on precomputable arrays
+# (crossovers, thresholds, calendar rules). Reproduces backtesting.py's broker rules for these
+# long-only strategies: market orders fill at the next bar's open, fractional sizes use the
+# available cash, and commission is charged on entry and exit.
+# Used for fast parameter sweeps; run_backtest remains the reference engine.
+# Indicators come from the shared indicator cache, so sweeps over thresholds reuse them.
+# backtesting.py is imported only for full stats, so fast runs start without it.
+
+import bisect
+import math
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from trading.calendar_features import calendar_features
+from trading.indicator_cache import cached
+from trading.indicators import rolling_mean, rolling_max, rolling_min
+from trading.strategy_registry import get_talib
+
+# Stats produced by the fast path (same definitions as backtesting.py's compute_stats)
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+FAST_METRICS = ["Equity Final [$]", "Return [%]", "Max. Drawdown [%]", "Sharpe Ratio", "# Trades", "Win Rate [%]",
+                "SQN", "Exposure Time [%]"]
+
+
+def _talib():
+    return get_talib()
+
+
+def _shift_prev(values: np.ndarray) -> np.ndarray:
+    """ values[i - 1] at position i (NaN at 0), i.e. the strategy's self.x[-2]. """
+    prev = np.empty_like(values, dtype=float); prev[0] = np.nan; prev[1:] = values[:-1]
+    return prev
+
+
+def _crossover(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """ Vectorized backtesting.lib.crossover(a, b) evaluated at every bar. """
+    with np.errstate(invalid="ignore"):
+        return (_shift_prev(a) < _shift_prev(b)) & (a > b)
+
+
+# --- Signal builders ---
+# Each returns (entry, exit, indicators): boolean arrays where entry[i] / exit[i] mean the strategy's
+# next() on bar i would buy (when flat) / close (when long), and the indicator arrays the strategy
+# registers with self.I (they decide the warm-up period exactly as in backtesting.py).
+
+def _sma_cross_signals(bars, params):
+    sma1 = cached(rolling_mean)(bars["close"], int(params["n1"])); sma2 = cached(rolling_mean)(bars["close"], int(params["n2"]))
+    return _crossover(sma1, sma2), _crossover(sma2, sma1), [sma1, sma2]
+
+
+def _donchian_signals(bars, params):
+    donchian_high = cached(rolling_max)(bars["high"], int(params["n_high"]), shift=1)
+    donchian_low = cached(rolling_min)(bars["low"], int(params["n_low"]), shift=1)
+    ready = ~np.isnan(donchian_high) & ~np.isnan(donchian_low)
+    with np.errstate(invalid="ignore"):
+        return ready & (bars["close"] > donchian_high), ready & (bars["close"] < donchian_low), [donchian_high, donchian_low]
+
+
+def _rsi_signals(bars, params):
+    rsi = cached(_talib().RSI)(bars["close"], timeperiod=int(params["rsi_period"]))
+    prev = _shift_prev(rsi); ready = ~np.isnan(rsi) & ~np.isnan(prev)
+    lower, upper = params["lower_bound"], params["upper_bound"]
+    with np.errstate(invalid="ignore"):
+        return ready & (rsi < lower) & (prev >= lower), ready & (rsi > upper) & (prev <= upper), [rsi]
+
+
+def _macd_signals(bars, params):
+    macd, signal, hist = cached(_talib().MACD)(
+        bars["close"], fastperiod=int(params["fast_period"]), slowperiod=int(params["slow_period"]), signalperiod=int(params["signal_period"]))
+    ready = ~np.isnan(macd) & ~np.isnan(signal) & ~np.isnan(_shift_prev(macd)) & ~np.isnan(_shift_prev(signal))
+    return ready & _crossover(macd, signal), ready & _crossover(signal, macd), [np.vstack([macd, signal, hist])]
+
+
+def _bollinger_signals(bars, params):
+    std_dev = float(params["bb_std_dev"])
+    upper, middle, lower = cached(_talib().BBANDS)(
+        bars["close"], timeperiod=int(params["bb_period"]), nbdevup=std_dev, nbdevdn=std_dev, matype=0)
+    ready = ~np.isnan(lower) & ~np.isnan(upper)
+    with np.errstate(invalid="ignore"):
+        return ready & (bars["close"] <= lower), ready & (bars["close"] >= upper), [np.vstack([upper, middle, lower])]
+
+
+def _volatility_breakout_signals(bars, params):
+    talib = _talib()
+    atr = cached(talib.ATR)(bars["high"], bars["low"], bars["close"], timeperiod=int(params["atr_period"]))
+    ma = cached(talib.SMA)(bars["close"], timeperiod=int(params["ma_period"]))
+    ready = ~np.isnan(ma) & ~np.isnan(atr)
+    with np.errstate(invalid="ignore"):
+        return ready & (bars["close"] > ma + atr * float(params["atr_multiplier"])), ready & (bars["close"] < ma), [atr, ma]
+
+
+def _day_of_week_signals(bars, params):
+    features = calendar_features(bars["index"])
+    if features is None:
+        none = np.zeros(len(bars["index"]), dtype=bool); return none, none, []
+    day = features["day_of_week"]
+    return day == int(params["buy_day"]), day == int(params["sell_day"]), []
+
+
+def _fake_moon_signals(bars, params):
+    features = calendar_features(bars["index"])
+    if features is None:
+        none = np.zeros(len(bars["index"]), dtype=bool); return none, none, []
+    day = features["day_of_month"]
+    entry = (int(params["buy_day_start"]) <= day) & (day <= int(params["buy_day_end"]))
+    exit = (int(params["sell_day_start"]) <= day) & (day <= int(params["sell_day_end"]))
+    return entry, exit, []
+
+
+# Strategy class name -> (signal builder, parameter names)
+SIGNAL_BUILDERS = {
+    "SmaCross": (_sma_cross_signals, ["n1", "n2"]),
+    "DonchianChannelStrategy": (_donchian_signals, ["n_high", "n_low"]),
+    "RsiOscillator": (_rsi_signals, ["rsi_period", "upper_bound", "lower_bound"]),
+    "MacdStrategy": (_macd_signals, ["fast_period", "slow_period", "signal_period"]),
+    "BollingerBandsStrategy": (_bollinger_signals, ["bb_period", "bb_std_dev"]),
+    "VolatilityBreakout": (_volatility_breakout_signals, ["atr_period", "ma_period", "atr_multiplier"]),
+    "DayOfWeekStrategy": (_day_of_week_signals, ["buy_day", "sell_day"]),
+    "FakeMoonStrategy": (_fake_moon_signals, ["buy_day_start", "buy_day_end", "sell_day_start", "sell_day_end"]),
+}
+
+
+def supports(strategy_class) -> bool:
+    """ True if the vector engine can run strategy_class (a class or class name). """
+    name = strategy_class if isinstance(strategy_class, str) else getattr(strategy_class, "__name__", "")
+    return name in SIGNAL_BUILDERS
+
+
+def warmup_bars(indicators) -> int:
+    """ Same as backtesting.py: the largest index of the first non-NaN value over all indicators. """
+    return max((int(np.isnan(np.asarray(ind, dtype=float)).argmin(axis=-1).max()) for ind in indicators), default=0)
+
+
+def simulate(bars, entry, exit, start, cash, commission, size_fraction, state: dict | None = None, offset: int = 0):
+    """
+    Turns entry/exit signals into trades and a per-bar equity curve.
+    Only the trade loop is Python (one iteration per trade, bisecting the signal bars); the
+    per-bar cash/position arrays are then filled in one pass from the trade boundaries.
+
+    Args:
+        start (int): First bar whose signals may trade.
+        state (dict | None): State returned by an earlier call on a prefix of the series (same signals
+                             there, past the warm-up): the loop continues where it stopped, and only the
+                             bars after that prefix are simulated. The state has the same size however
+                             many bars and trades came before.
+        offset (int): Position of bars[0] in the series, when bars (and the signals) are only its tail;
+                      bar numbers in start, trades and state count from the start of the series.
+
+    Returns:
+        tuple: (equity of the bars simulated, closed trade dicts (only the new ones when resuming),
+                open trade dict or None, state to resume from)
+    """
+    close = bars["close"]; n = offset + len(close); opens = bars["open"].tolist()
+    fixed_fee, relative_fee = (commission if isinstance(commission, tuple) else (0, commission))
+    entry = entry.copy(); exit = exit & ~entry  # next() checks the buy condition first (if/elif)
+    entry[:max(0, start - offset)] = False; exit[:max(0, start - offset)] = False
+    entry_bars = (np.flatnonzero(entry) + offset).tolist(); exit_bars = (np.flatnonzero(exit) + offset).tolist()
+
+    # Segment k covers bars [boundaries[k - 1], boundaries[k]) with constant cash / position / entry price
+    if state is None:
+        boundaries = [0]; segment_cash = [float(cash)]; segment_size = [0]; segment_price = [0.0]
+        open_trade = None; current_cash = float(cash); bar = start; done_bars = 0
+    else:
+        done_bars = state["bars"]; boundaries = [done_bars]
+        segment_cash, segment_size, segment_price = ([value] for value in state["segment"])
+        open_trade = state["open_trade"]; current_cash = state["cash"]; bar = state["bar"]
+    trades = []
+    while True:
+        if open_trade is None:
+            k = bisect.bisect_left(entry_bars, bar)
+            if k == len(entry_bars): break
+            fill = entry_bars[k] + 1
+            if fill >= n: break  # Order placed on the last bar is never filled
+            price = opens[fill - offset]
+            if -1 < size_fraction < 1:
+                price_plus_fee = price + (fixed_fee + abs(size_fraction) * price * relative_fee) / abs(size_fraction)
+                size = int((current_cash * abs(size_fraction)) // price_plus_fee)
+            else:
+                size = int(size_fraction); price_plus_fee = price + (fixed_fee + abs(size) * price * relative_fee) / abs(size)
+                if abs(size) * price_plus_fee > current_cash: size = 0
+            if not size: bar = fill; continue  # Broker cancels the order; the strategy is still flat next bar
+            entry_fee = fixed_fee + abs(size) * price * relative_fee
+            boundaries.append(fill); segment_cash.append(current_cash - entry_fee); segment_size.append(size); segment_price.append(price)
+            open_trade = {"size": size, "entry_bar": fill, "entry_price": price, "entry_fee": entry_fee}
+        size, fill, price, entry_fee = open_trade["size"], open_trade["entry_bar"], open_trade["entry_price"], open_trade["entry_fee"]
+        k = bisect.bisect_left(exit_bars, fill)
+        exit_fill = exit_bars[k] + 1 if k < len(exit_bars) else n
+        if exit_fill >= n: break  # Still open at the last bar
+        exit_price = opens[exit_fill - offset]
+        exit_fee = fixed_fee + abs(size) * exit_price * relative_fee
+        current_cash = current_cash - entry_fee + size * (exit_price - price) - exit_fee
+        boundaries.append(exit_fill); segment_cash.append(current_cash); segment_size.append(0); segment_price.append(0.0)
+        trades.append({"size": size, "entry_bar": fill, "exit_bar": exit_fill, "entry_price": price, "exit_price": exit_price,
+                       "commissions": exit_fee + entry_fee})
+        open_trade = None; bar = exit_fill
+
+    bar_range = np.arange(done_bars, n)
+    segment = np.searchsorted(np.array(boundaries), bar_range, side="right") - 1
+    position = np.array(segment_size, dtype=float)[segment]
+    equity = np.array(segment_cash)[segment] + (close[done_bars - offset:] * position - position * np.array(segment_price)[segment])
+    if state is None:
+        if start < n: equity[:start] = equity[start]  # backtesting.py back-fills the warm-up bars
+        else: equity[:] = float(cash)
+    new_state = {"bars": n, "cash": current_cash, "bar": bar, "open_trade": open_trade,
+                 "segment": (segment_cash[-1], segment_size[-1], segment_price[-1])}
+    return equity, trades, open_trade, new_state
+
+
+def return_periods(index) -> tuple:
+    """
+    Works out, once per dataset, how compute_stats samples equity for Sharpe: the resampling
+    frequency, the bars that close each period (daily case) and the annualization factor.
+    """
+    if not isinstance(index, pd.DatetimeIndex) or len(index) < 2: return None, None, np.nan
+    freq_days = pd.Series(index[-100:]).diff().dropna().median().days
+    have_weekends = index.dayofweek.to_series().between(5, 6).mean() > 2 / 7 * .6
+    freq, annual_trading_days = _period_rule(freq_days, have_weekends)
+    if freq != 'D': return freq, None, annual_trading_days
+    day_keys = index.normalize().asi8
+    return freq, np.flatnonzero(np.r_[day_keys[1:] != day_keys[:-1], True]), annual_trading_days
+
+
+def _period_rule(freq_days: int, have_weekends: bool) -> tuple:
+    """ compute_stats' resampling frequency and annualization factor for bars freq_days apart. """
+    annual_trading_days = 52 if freq_days == 7 else 12 if freq_days == 31 else 1 if freq_days == 365 else (365 if have_weekends else 252)
+    return {7: 'W', 31: 'ME', 365: 'YE'}.get(freq_days, 'D'), annual_trading_days
+
+
+def period_keys(index: pd.DatetimeIndex, freq: str) -> np.ndarray:
+    """ An id per bar of the period (day, week, month, year) it falls in, as the Sharpe ratio samples equity. """
+    if freq == 'D': return index.normalize().as_unit('ns').asi8
+    wall_clock = index.tz_localize(None) if index.tz is not None else index
+    return wall_clock.to_period({'W': 'W', 'ME': 'M', 'YE': 'Y'}[freq]).asi8
+
+
+def index_bars(index) -> dict:
+    """ The fields fast_metrics needs besides the equity, for an equity curve on index without OHLCV bars. """
+    freq, period_ends, annual_days = return_periods(index)
+    return {"index": index, "freq": freq, "period_ends": period_ends, "annual_days": annual_days}
+
+
+def _period_returns(equity: np.ndarray, bars: dict) -> np.ndarray:
+    """ Equity returns per period (day/week/month/year) as used for the Sharpe ratio. """
+    freq, period_ends = bars["freq"], bars["period_ends"]
+    if freq is None: return np.array([])
+    if period_ends is None:
+        return pd.Series(equity, index=bars["index"]).resample(freq).last().dropna().pct_change().dropna().to_numpy()
+    period_equity = equity[period_ends]; period_equity = period_equity[~np.isnan(period_equity)]
+    returns = period_equity[1:] / period_equity[:-1] - 1
+    return returns[~np.isnan(returns)]
+
+
+def prepare_bars(data: pd.DataFrame, metrics: bool = True) -> dict:
+    """
+    Converts OHLCV data (lowercase columns) into the arrays the engine works on.
+    Sweeps should prepare the data once and pass the result to vector_backtest for every run.
+    With metrics=False only the signal builders and simulate can use the result (no Sharpe sampling).
+    """
+    bars = {col: data[col].to_numpy(dtype=float) for col in ("open", "high", "low", "close")}
+    bars.update(index_bars(data.index) if metrics else {"index": data.index}); bars["data"] = data
+    return bars
+
+
+def _sharpe_ratio(gmean: float, variance: float, annual_days: float) -> float:
+    """ compute_stats' Sharpe ratio from the geometric mean and variance of the period returns. """
+    annual_return = (1 + gmean) ** annual_days - 1
+    volatility = np.sqrt((variance + (1 + gmean) ** 2) ** annual_days - (1 + gmean) ** (2 * annual_days))
+    return (annual_return * 100) / ((volatility * 100) or np.nan)
+
+
+def fast_metrics(equity: np.ndarray, bars: dict, trades: list) -> dict:
+    """ Computes FAST_METRICS from the simulated equity and closed trades without building full stats. """
+    pl = np.array([t["pnl"] for t in trades], dtype=float)
+    metrics = {"Equity Final [$]": float(equity[-1]), "Return [%]": (equity[-1] - equity[0]) / equity[0] * 100}
+    dd = 1 - equity / np.maximum.accumulate(equity)
+    metrics["Max. Drawdown [%]"] = -np.nan_to_num(dd.max()) * 100
+    returns, annual_days = _period_returns(equity, bars), bars["annual_days"]
+    if len(returns):
+        growth = returns + 1
+        gmean = 0 if np.any(growth <= 0) else np.exp(np.log(growth).sum() / len(growth)) - 1
+        metrics["Sharpe Ratio"] = _sharpe_ratio(gmean, returns.var(ddof=1) if len(returns) > 1 else np.nan, annual_days)
+    else:
+        metrics["Sharpe Ratio"] = np.nan
+    metrics["# Trades"] = len(trades)
+    metrics["Win Rate [%]"] = (pl > 0).mean() * 100 if len(pl) else np.nan
+    std = pl.std(ddof=1) if len(pl) > 1 else np.nan
+    metrics["SQN"] = np.sqrt(len(pl)) * pl.mean() / (std or np.nan) if len(pl) else np.nan
+    exposure = np.zeros(len(equity), dtype=bool)
+    for t in trades: exposure[t["entry_bar"]:t["exit_bar"] + 1] = True
+    metrics["Exposure Time [%]"] = exposure.mean() * 100
+    return metrics
+
+
+# --- Running totals: FAST_METRICS of a growing run without keeping its equity curve or trades ---
+def _add_moments(moments: tuple, values: np.ndarray) -> tuple:
+    """ (count, mean, sum of squared deviations) of the values seen so far, with values added (Chan et al.). """
+    count, mean, m2 = moments
+    if not len(values): return moments
+    batch_mean = float(values.mean()); total = count + len(values); delta = batch_mean - mean
+    return total, mean + delta * len(values) / total, m2 + float(((values - batch_mean) ** 2).sum()) + delta * delta * count * len(values) / total
+
+
+def update_metric_totals(totals: dict | None, equity: np.ndarray, trades: list, index) -> dict:
+    """
+    Adds bars to running totals from which metrics_from_totals gives FAST_METRICS; the totals stay the same
+    size however long the run gets. Equity values, trades and drawdowns are exact; the Sharpe ratio and SQN
+    come from running sums, so they match fast_metrics to floating-point rounding.
+
+    Args:
+        totals (dict | None): Totals of the bars before these (None for the first bars of a run).
+        equity (np.ndarray): Equity of the new bars.
+        trades (list): Trades closed on the new bars (with pnl, see trade_returns).
+        index: Index of the new bars.
+
+    Raises:
+        ValueError: If the new bars change the bar spacing the Sharpe ratio is sampled at (rerun instead).
+    """
+    if totals is None:
+        totals = {"bars": 0, "weekend_bars": 0, "recent": np.array([], dtype=np.int64), "freq": None, "freq_days": None,
+                  "first_equity": np.nan, "last_equity": np.nan, "peak": -np.inf, "max_drawdown": -np.inf,
+                  "period_key": None, "period_end_equity": None, "returns": (0, 0.0, 0.0), "log_growth": 0.0, "nonpositive_growth": False,
+                  "pnl": (0, 0.0, 0.0), "wins": 0, "exposure_bars": 0}
+    totals = dict(totals); equity = np.asarray(equity, dtype=float)
+    if len(equity):
+        dated = isinstance(index, pd.DatetimeIndex)
+        if dated:
+            totals["recent"] = np.concatenate([totals["recent"], index.as_unit("ns").asi8])[-100:]  # return_periods looks at the last 100 bars
+            totals["weekend_bars"] += int((index.dayofweek >= 5).sum())
+        if totals["bars"] == 0: totals["first_equity"] = float(equity[0])
+        freq = freq_days = None
+        if dated and totals["bars"] + len(equity) >= 2:
+            freq_days = int(np.median(np.diff(totals["recent"])) // 86_400_000_000_000)  # Whole days, as Timedelta.days
+            freq = _period_rule(freq_days, False)[0]
+        if totals["bars"] and freq != totals["freq"]: raise ValueError("The bar spacing changed, so the Sharpe ratio samples different periods")
+        totals["freq"], totals["freq_days"] = freq, freq_days
+        peaks = np.maximum.accumulate(np.concatenate([[totals["peak"]], equity]))[1:]
+        totals["peak"] = float(peaks[-1]); totals["max_drawdown"] = float(np.max([totals["max_drawdown"], (1 - equity / peaks).max()]))
+        if freq is not None:
+            # A period ends on the bar before one from the next period; the last bar's period is still open
+            keys = period_keys(index, freq)
+            closed = keys != np.concatenate([[keys[0] if totals["period_key"] is None else totals["period_key"]], keys[:-1]])
+            ends = np.concatenate([[totals["last_equity"]], equity[:-1]])[closed]
+            chain = ends if totals["period_end_equity"] is None else np.concatenate([[totals["period_end_equity"]], ends])
+            returns = chain[1:] / chain[:-1] - 1; returns = returns[~np.isnan(returns)]
+            totals["returns"] = _add_moments(totals["returns"], returns)
+            if np.any(returns + 1 <= 0): totals["nonpositive_growth"] = True
+            else: totals["log_growth"] += float(np.log(returns + 1).sum())
+            if len(ends): totals["period_end_equity"] = float(ends[-1])
+            totals["period_key"] = int(keys[-1])
+        totals["last_equity"] = float(equity[-1]); totals["bars"] += len(equity)
+    if trades:
+        pnl = np.array([t["pnl"] for t in trades], dtype=float)
+        totals["pnl"] = _add_moments(totals["pnl"], pnl); totals["wins"] += int((pnl > 0).sum())
+        totals["exposure_bars"] += sum(t["exit_bar"] - t["entry_bar"] + 1 for t in trades)  # Trades never share a bar
+    return totals
+
+
+def metrics_from_totals(totals: dict) -> dict:
+    """ FAST_METRICS of the run update_metric_totals has seen so far. """
+    first, last = totals["first_equity"], totals["last_equity"]
+    metrics = {"Equity Final [$]": last, "Return [%]": (last - first) / first * 100,
+               "Max. Drawdown [%]": -np.nan_to_num(totals["max_drawdown"]) * 100}
+    returns, log_growth, nonpositive = totals["returns"], totals["log_growth"], totals["nonpositive_growth"]
+    if totals["period_end_equity"] is not None:  # The open period ends on the last bar
+        pending = np.array([last / totals["period_end_equity"] - 1]); pending = pending[~np.isnan(pending)]
+        returns = _add_moments(returns, pending)
+        if np.any(pending + 1 <= 0): nonpositive = True
+        elif len(pending): log_growth += float(np.log(pending[0] + 1))
+    count, _, m2 = returns
+    if count:
+        annual_days = _period_rule(totals["freq_days"], totals["weekend_bars"] / totals["bars"] > 2 / 7 * .6)[1]
+        gmean = 0 if nonpositive else np.exp(log_growth / count) - 1
+        metrics["Sharpe Ratio"] = _sharpe_ratio(gmean, m2 / (count - 1) if count > 1 else np.nan, annual_days)
+    else:
+        metrics["Sharpe Ratio"] = np.nan
+    trade_count, pnl_mean, pnl_m2 = totals["pnl"]
+    metrics["# Trades"] = trade_count
+    metrics["Win Rate [%]"] = totals["wins"] / trade_count * 100 if trade_count else np.nan
+    std = np.sqrt(pnl_m2 / (trade_count - 1)) if trade_count > 1 else np.nan
+    metrics["SQN"] = np.sqrt(trade_count) * pnl_mean / (std or np.nan) if trade_count else np.nan
+    metrics["Exposure Time [%]"] = totals["exposure_bars"] / totals["bars"] * 100
+    return metrics
+
+
+def vector_backtest(strategy_class, data, cash: int = 10000, commission: float = 0.001,
+                    full_stats: bool = False, with_trades: bool = False, trade_start: int = 0, **strategy_params) -> dict | pd.Series | None:
+    """
+    Vectorized equivalent of run_backtest for the strategies in SIGNAL_BUILDERS.
+
+    Args:
+        strategy_class: Strategy class (or its class name) supported by this engine.
+        data (pd.DataFrame | dict): OHLCV data with lowercase columns, or the result of prepare_bars(data).
+        cash (int): Initial cash.
+        commission (float): Commission rate per trade side (or (fixed, relative) tuple).
+        full_stats (bool): If True, return backtesting.py's full stats Series (including
+                           '_equity_curve' and '_trades'); otherwise a dict of FAST_METRICS.
+        with_trades (bool): Add '_trades' and '_equity_curve' DataFrames to the FAST_METRICS dict
+                            (without importing backtesting.py).
+        trade_start (int): First bar whose signals may trade; earlier bars only warm up the indicators
+                           (used for out-of-sample windows that keep their preceding history).
+        **strategy_params: Strategy parameters; missing ones use the class defaults
+                           (all are required when strategy_class is a class name).
+                           trade_size_percent is a fraction, as in run_backtest.
+
+    Returns:
+        dict | pd.Series | None: Stats, or None if the data is unusable.
+
+    Raises:
+        ValueError: If the strategy is not supported by the vector engine or a parameter is missing.
+    """
+    name = strategy_class if isinstance(strategy_class, str) else strategy_class.__name__
+    if name not in SIGNAL_BUILDERS: raise ValueError(f"{name} is not supported by the vector engine")
+    if not isinstance(data, dict):
+        if data is None or data.empty or not all(col in data.columns for col in OHLCV_COLUMNS):
+            print("Error: Cannot run vector backtest without OHLCV data."); return None
+        data = prepare_bars(data)
+    bars = data
+    builder, param_names = SIGNAL_BUILDERS[name]
+    params = {p: strategy_params.get(p, getattr(strategy_class, p, None)) for p in param_names + ["trade_size_percent"]}
+    if params["trade_size_percent"] is None: params["trade_size_percent"] = 0.95
+    missing = [p for p in param_names if params[p] is None]
+    if missing: raise ValueError(f"Missing parameter(s) for {name}: {', '.join(missing)}")
+
+    entry, exit, indicators = builder(bars, params)
+    warmup = warmup_bars(indicators); start = max(1 + warmup, trade_start)
+    equity, trades, open_trade, _ = simulate(bars, entry, exit, start, cash, commission, params["trade_size_percent"])
+    trade_returns(trades)
+    if not full_stats: return fast_stats(equity, bars, trades, with_trades)
+    return _full_stats(name, params, bars["data"], equity, trades, warmup)
+
+
+def trade_returns(trades: list):
+    """ Adds pnl and return_pct to closed trade dicts (as backtesting.py's Trade.pl / pl_pct). """
+    for t in trades:
+        t["pnl"] = (t["size"] * (t["exit_price"] - t["entry_price"])) - t["commissions"]
+        t["return_pct"] = math.copysign(1, t["size"]) * (t["exit_price"] / t["entry_price"] - 1) - t["commissions"] / (abs(t["size"]) * t["entry_price"])
+
+
+def fast_stats(equity: np.ndarray, bars: dict, trades: list, with_trades: bool) -> dict:
+    """ FAST_METRICS, plus '_trades' and '_equity_curve' DataFrames if with_trades. """
+    metrics = fast_metrics(equity, bars, trades)
+    if with_trades:
+        metrics["_trades"] = trades_frame(trades, bars["index"])
+        metrics["_equity_curve"] = pd.DataFrame({"Equity": equity, "DrawdownPct": 1 - equity / np.maximum.accumulate(equity)}, index=bars["index"])
+    return metrics
+
+
+def trades_frame(trades: list, index) -> pd.DataFrame:
+    """ Closed trades as a DataFrame with backtesting.py's _trades column names (no SL/TP/Tag columns). """
+    columns = ["Size", "EntryBar", "ExitBar", "EntryPrice", "ExitPrice", "PnL", "Commission", "ReturnPct", "EntryTime", "ExitTime", "Duration"]
+    if not trades: return pd.DataFrame(columns=columns)
+    frame = pd.DataFrame({"Size": [t["size"] for t in trades], "EntryBar": [t["entry_bar"] for t in trades],
+                          "ExitBar": [t["exit_bar"] for t in trades], "EntryPrice": [t["entry_price"] for t in trades],
+                          "ExitPrice": [t["exit_price"] for t in trades], "PnL": [t["pnl"] for t in trades],
+                          "Commission": [t["commissions"] for t in trades], "ReturnPct": [t["return_pct"] for t in trades]})
+    frame["EntryTime"] = index[frame["EntryBar"].to_numpy()]; frame["ExitTime"] = index[frame["ExitBar"].to_numpy()]
+    frame["Duration"] = frame["ExitTime"] - frame["EntryTime"]
+    return frame[columns]
+
+
+def _full_stats(name, params, data, equity, trades, warmup) -> pd.Series:
+    """ Builds the complete stats Series with backtesting.py's own compute_stats. """
+    from backtesting._stats import compute_stats
+    from trading.backtester import COLUMN_MAPPING
+    index = data.index
+    closed = [SimpleNamespace(size=t["size"], entry_bar=t["entry_bar"], exit_bar=t["exit_bar"], entry_price=t["entry_price"],
+                              exit_price=t["exit_price"], sl=None, tp=None, pl=t["pnl"], _commissions=t["commissions"],
+                              pl_pct=t["return_pct"], entry_time=index[t["entry_bar"]], exit_time=index[t["exit_bar"]], tag=None)
+              for t in trades]
+    ohlc = data.rename(columns={v: k for k, v in COLUMN_MAPPING.items()})
+    stats = compute_stats(trades=closed, equity=equity, ohlc_data=ohlc, strategy_instance=None, risk_free_rate=0.0)
+    # compute_stats measures Buy & Hold (and so Alpha) from the first bar after warm-up, which it
+    # would read from a strategy instance; apply the same start here
+    close = ohlc["Close"].to_numpy()
+    stats['Buy & Hold Return [%]'] = (close[-1] - close[warmup]) / close[warmup] * 100
+    stats['Alpha [%]'] = stats['Return [%]'] - stats['Beta'] * stats['Buy & Hold Return [%]']
+    stats['_strategy'] = f"{name}({','.join(f'{k}={v}' for k, v in params.items())})"
+    return stats
+
+
+def compare_with_backtesting(strategy_class, data: pd.DataFrame, cash: int = 10000, commission: float = 0.001,
+                             **strategy_params) -> pd.DataFrame:
+    """
+    Parity check: runs the same backtest through run_backtest and vector_backtest and
+    lists every numeric/time stat side by side with a 'match' flag.
+    """
+    from trading.backtester import run_backtest
+    reference, _ = run_backtest(strategy_class, data, cash=cash, commission=commission, **strategy_params)
+    vector = vector_backtest(strategy_class, data, cash=cash, commission=commission, full_stats=True, **strategy_params)
+    rows = []
+    for key in reference.index:
+        if key.startswith('_'): continue
+        expected, actual = reference[key], vector.get(key, np.nan)
+        if isinstance(expected, (int, float, np.number)) and isinstance(actual, (int, float, np.number)):
+            match = (pd.isna(expected) and pd.isna(actual)) or bool(np.isclose(float(expected), float(actual), rtol=1e-9, atol=1e-9))
+        else:
+            match = (pd.isna(expected) and pd.isna(actual)) if not isinstance(expected, pd.Timestamp) and pd.isna(expected) else expected == actual
+        rows.append({"stat": key, "backtesting": expected, "vector": actual, "match": bool(match)})
+    ref_trades = reference['_trades'][['EntryBar', 'ExitBar', 'Size', 'EntryPrice', 'ExitPrice', 'PnL']].to_numpy(dtype=float)
+    vec_trades = vector['_trades'][['EntryBar', 'ExitBar', 'Size', 'EntryPrice', 'ExitPrice', 'PnL']].to_numpy(dtype=float)
+    same_trades = ref_trades.shape == vec_trades.shape and np.allclose(ref_trades, vec_trades, rtol=1e-9, atol=1e-9)
+    rows.append({"stat": "_trades", "backtesting": len(ref_trades), "vector": len(vec_trades), "match": bool(same_trades)})
+    same_equity = np.allclose(reference['_equity_curve']['Equity'].to_numpy(), vector['_equity_curve']['Equity'].to_numpy(), rtol=1e-9)
+    rows.append({"stat": "_equity_curve", "backtesting": len(reference['_equity_curve']), "vector": len(vector['_equity_curve']), "match": bool(same_equity)})
+    return pd.DataFrame(rows)
+
+
+# --- Parity check (python -m trading.vector_backtester) ---
+if __name__ == "__main__":
+    import contextlib, io, time, warnings
+    from trading.backtester import run_backtest
+    from trading.strategy_registry import STRATEGY_LOADERS, PARAM_CONFIG, get_strategy_class
+    warnings.simplefilter("ignore")
+    rng = np.random.default_rng(7); n = 2000; index = pd.bdate_range("2015-01-01", periods=n)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n))); open_ = close * (1 + rng.normal(0, 0.003, n))
+    sample = pd.DataFrame({"open": open_, "high": np.maximum(open_, close) * (1 + abs(rng.normal(0, 0.005, n))),
+                           "low": np.minimum(open_, close) * (1 - abs(rng.normal(0, 0.005, n))), "close": close,
+                           "volume": rng.integers(100_000, 1_000_000, n).astype(float)}, index=index)
+    prepared = prepare_bars(sample); all_match = True
+    for strategy_name in STRATEGY_LOADERS:
+        try: strategy = get_strategy_class(strategy_name)
+        except ImportError as e: print(f"{strategy_name}: skipped ({e})"); continue
+        if not supports(strategy): continue
+        params = {name: value for name, value in PARAM_CONFIG[strategy_name]}; params["trade_size_percent"] /= 100.0
+        with contextlib.redirect_stdout(io.StringIO()):
+            comparison = compare_with_backtesting(strategy, sample, **params)
+            t0 = time.perf_counter(); run_backtest(strategy, sample, **params); reference_time = time.perf_counter() - t0
+        t0 = time.perf_counter(); vector_backtest(strategy, prepared, **params); vector_time = time.perf_counter() - t0
+        mismatches = comparison.loc[~comparison["match"], "stat"].tolist(); all_match &= not mismatches
+        print(f"{strategy_name:<26} {'OK' if not mismatches else 'MISMATCH ' + ', '.join(mismatches):<12} "
+              f"backtesting {reference_time * 1000:7.1f} ms  vector {vector_time * 1000:6.2f} ms")
+    print("All supported strategies match." if all_match else "Parity check FAILED.")
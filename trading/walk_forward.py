@@ -0,0 +1,318 @@
+# trading/walk_forward.py
+# Walk-forward optimization: splits the history into consecutive train/test windows (rolling or anchored),
+# grid-searches PARAM_CONFIG parameters on each train window and scores the winner on the test window after it
+# Folds run concurrently on a process pool (each fold's grid runs serially inside its worker); the result is
+# the out-of-sample equity curve stitched across folds plus a per-fold table and parameter stability summary
+# Test windows keep the preceding train window as indicator history but only trade from their first bar
+# Folds run in worker processes that receive the OHLCV data once, through the pool initializer
+# Usage: python -m trading.walk_forward STRATEGY (--symbol SYM | --data FILE) [-r n1=5-50:5 ...] [--anchored]
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+import pandas as pd
+
+from config import (DEFAULT_DATA_PERIOD, DEFAULT_DATA_INTERVAL, DEFAULT_CASH, DEFAULT_COMMISSION,
+                    WALK_FORWARD_FOLDS, WALK_FORWARD_TRAIN_FRACTION, WALK_FORWARD_ANCHORED)
+from trading.backtester import run_backtest, BacktestCancelled
+from trading.optimizer import (RESULT_METRICS, DEFAULT_METRIC, ENGINES, param_grid, evaluate_params, rank_results,
+                               parse_param_range, varied_params, _vector_sweep)
+from trading.strategy_registry import STRATEGY_LOADERS, get_strategy_class, strategy_class_name, trade_size_fraction
+from trading.tournament import _uses_vector
+from trading import vector_backtester
+
+FOLD_METRICS = ["Return [%]", "Sharpe Ratio", "Max. Drawdown [%]", "# Trades"]  # Out-of-sample columns of the fold table
+
+
+def walk_forward_folds(n_bars: int, folds: int = WALK_FORWARD_FOLDS, train_fraction: float = WALK_FORWARD_TRAIN_FRACTION,
+                       anchored: bool = WALK_FORWARD_ANCHORED) -> list[tuple[int, int, int, int]]:
+    """
+    Splits n_bars into consecutive windows.
+
+    The first train window holds train_fraction of the bars; the rest is cut into folds equal test windows
+    (the last one takes the remainder). Each train window ends where its test window starts and is either
+    fixed-length and rolling, or anchored at bar 0 and growing.
+
+    Returns:
+        list[tuple]: (train_start, train_end, test_start, test_end) bar positions per fold, ends exclusive.
+
+    Raises:
+        ValueError: If there are not enough bars for the requested split.
+    """
+    if folds < 1: raise ValueError("need at least one fold")
+    if not 0 < train_fraction < 1: raise ValueError("train_fraction must be between 0 and 1")
+    train_bars = int(n_bars * train_fraction); test_bars = (n_bars - train_bars) // folds
+    if train_bars < 2 or test_bars < 2:
+        raise ValueError(f"{n_bars} bars are too few for {folds} folds with a {train_fraction:.0%} train window")
+    windows = []
+    for fold in range(folds):
+        test_start = train_bars + fold * test_bars
+        test_end = n_bars if fold == folds - 1 else test_start + test_bars
+        windows.append((0 if anchored else test_start - train_bars, test_start, test_start, test_end))
+    return windows
+
+
+def gated_strategy(strategy_class, trade_start: int):
+    """
+    Returns a subclass of strategy_class (same name) whose next() does nothing before bar trade_start, so
+    the bars before it only warm up the indicators - the backtesting.py side of vector_backtest(trade_start=...).
+    """
+    original_next = strategy_class.next
+
+    def next(self):
+        if len(self.data) > trade_start: original_next(self)
+
+    return type(strategy_class.__name__, (strategy_class,), {"next": next, "__module__": strategy_class.__module__})
+
+
+def optimize_window(strategy_name: str, data: pd.DataFrame, grid: list[dict], metric: str = DEFAULT_METRIC,
+                    cash=DEFAULT_CASH, commission=DEFAULT_COMMISSION, engine: str = "auto") -> pd.DataFrame:
+    """ Runs every combination of grid on data in this process and ranks them (see optimizer.grid_search). """
+    strategy_class = get_strategy_class(strategy_name)
+    if _uses_vector(strategy_name, engine): results = _vector_sweep(strategy_class, data, grid, cash, commission, None, None)
+    else: results = pd.DataFrame([evaluate_params(strategy_class, data, params, cash=cash, commission=commission) for params in grid])
+    return rank_results(results, metric)
+
+
+def out_of_sample(strategy_name: str, data: pd.DataFrame, params: dict, trade_start: int, cash=DEFAULT_CASH,
+                  commission=DEFAULT_COMMISSION, engine: str = "auto") -> tuple[pd.Series, pd.DataFrame]:
+    """
+    Backtests params on data, trading from bar trade_start only.
+
+    Returns:
+        tuple: (equity from trade_start on, trades entered from trade_start on)
+
+    Raises:
+        ValueError: If the backtest fails.
+    """
+    run_params = dict(params)
+    if "trade_size_percent" in run_params: run_params["trade_size_percent"] = trade_size_fraction(run_params["trade_size_percent"])
+    if _uses_vector(strategy_name, engine):
+        stats = vector_backtester.vector_backtest(strategy_class_name(strategy_name), data, cash=cash, commission=commission,
+                                                  with_trades=True, trade_start=trade_start, **run_params)
+    else:
+        stats, _ = run_backtest(gated_strategy(get_strategy_class(strategy_name), trade_start), data, cash=cash, commission=commission, **run_params)
+    if stats is None: raise ValueError("Out-of-sample backtest failed (see messages above)")
+    equity = stats["_equity_curve"]["Equity"].iloc[trade_start:]
+    trades = stats["_trades"]
+    return equity, trades if trades.empty else trades[trades["EntryTime"] >= equity.index[0]]
+
+
+def window_metrics(equity: pd.Series, trades: pd.DataFrame, data: pd.DataFrame) -> dict:
+    """ FAST_METRICS of an equity curve (indexed like data) and its trades, as the vector engine computes them. """
+    bars = vector_backtester.prepare_bars(data)
+    closed = [{"pnl": pnl, "entry_bar": entry, "exit_bar": exit}
+              for pnl, entry, exit in zip(trades["PnL"], data.index.get_indexer(trades["EntryTime"]), data.index.get_indexer(trades["ExitTime"]))]
+    return vector_backtester.fast_metrics(equity.to_numpy(dtype=float), bars, closed)
+
+
+# --- Worker process side ---
+_worker_state = {}
+
+
+def _init_worker(data: pd.DataFrame, strategy_name: str, grid: list, metric: str, cash, commission, engine: str, quiet: bool):
+    """ Runs once per worker process: keeps the data and grid so tasks only carry fold boundaries. """
+    if quiet: sys.stdout = open(os.devnull, "w")  # Per-run logging would flood the console
+    _worker_state.update(data=data, strategy_name=strategy_name, grid=grid, metric=metric, cash=cash, commission=commission, engine=engine)
+
+
+def _run_fold(fold: int, train_start: int, train_end: int, test_start: int, test_end: int) -> dict:
+    """ Optimizes one train window and scores the best parameters on its test window. """
+    state = _worker_state; data, metric = state["data"], state["metric"]
+    result = {"fold": fold, "bounds": (train_start, train_end, test_start, test_end), "params": None, "in_sample": np.nan,
+              "equity": None, "trades": None, "error": None}
+    try:
+        ranked = optimize_window(state["strategy_name"], data.iloc[train_start:train_end], state["grid"], metric,
+                                 state["cash"], state["commission"], state["engine"])
+        best = ranked.iloc[0]
+        if pd.isna(best[metric]): raise ValueError(f"no combination produced a {metric} on the train window")
+        result.update(params={name: best[name].item() if hasattr(best[name], "item") else best[name] for name in state["grid"][0]},
+                      in_sample=float(best[metric]))
+        equity, trades = out_of_sample(state["strategy_name"], data.iloc[train_start:test_end], result["params"], test_start - train_start,
+                                       state["cash"], state["commission"], state["engine"])
+        result.update(equity=equity, trades=trades)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+# --- Main side ---
+def walk_forward(strategy_name: str, data: pd.DataFrame, param_ranges: dict, constraint=None, metric: str = DEFAULT_METRIC,
+                 folds: int = WALK_FORWARD_FOLDS, train_fraction: float = WALK_FORWARD_TRAIN_FRACTION,
+                 anchored: bool = WALK_FORWARD_ANCHORED, cash=DEFAULT_CASH, commission=DEFAULT_COMMISSION,
+                 max_workers: int | None = None, engine: str = "auto", cancel_event=None, progress_callback=None,
+                 quiet: bool = True) -> pd.Series:
+    """
+    Walk-forward optimization of one strategy over the folds of walk_forward_folds().
+
+    Each fold starts out of sample with the equity the previous fold ended with; positions still open at the
+    end of a test window are valued at its last close. A failed fold stays in cash for its test window.
+
+    Args:
+        strategy_name (str): Key into STRATEGY_LOADERS / PARAM_CONFIG.
+        data (pd.DataFrame): OHLCV data with lowercase columns (sent to each worker once).
+        param_ranges (dict): Parameter name -> value or list of values, as for optimizer.grid_search.
+        constraint (callable | str | None): Filter on combinations, e.g. "n1 < n2".
+        metric (str): RESULT_METRICS entry that picks the best combination on each train window.
+        folds (int), train_fraction (float), anchored (bool): The split (see walk_forward_folds).
+        max_workers (int | None): Worker processes (default: CPU count, capped by the number of folds).
+        engine (str): One of ENGINES, for both the optimization and the out-of-sample runs.
+        cancel_event (threading.Event | None): Stops the folds when set (BacktestCancelled is raised).
+        progress_callback (callable | None): Called with (fold row, completed, total) after each fold.
+        quiet (bool): Silence per-run console output in the workers.
+
+    Returns:
+        pd.Series: Out-of-sample stats (Start, End, Folds, Mode, FAST_METRICS of the stitched curve,
+                   Profitable Folds [%]) plus '_equity_curve' (Equity, DrawdownPct, Fold), '_trades' (with a
+                   Fold column), '_folds' (per fold: windows, chosen parameters, in-sample metric,
+                   out-of-sample FOLD_METRICS, error) and '_param_stability' (see parameter_stability; only
+                   the parameters that vary across the grid).
+
+    Raises:
+        ValueError: If the strategy, metric or engine is unknown, the split does not fit the data, or no
+                    combination satisfies the constraint.
+    """
+    if strategy_name not in STRATEGY_LOADERS: raise ValueError(f"Unknown strategy '{strategy_name}'")
+    if metric not in RESULT_METRICS: raise ValueError(f"Unknown metric '{metric}' (expected one of {RESULT_METRICS})")
+    if engine not in ENGINES: raise ValueError(f"Unknown engine '{engine}' (expected one of {ENGINES})")
+    if engine == "vector" and not _uses_vector(strategy_name, engine): raise ValueError(f"{strategy_name} is not supported by the vector engine")
+    if data is None or data.empty: raise ValueError("No data to run a walk-forward optimization on.")
+    windows = walk_forward_folds(len(data), folds, train_fraction, anchored)
+    grid = param_grid(strategy_name, param_ranges, constraint)
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(windows)))
+    mode = "anchored" if anchored else "rolling"
+    print(f"Walk-forward: {strategy_name}, {len(windows)} {mode} folds x {len(grid)} combinations on {workers} worker process(es)")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(data, strategy_name, grid, metric, cash, commission, engine, quiet)) as executor:
+        pending = {executor.submit(_run_fold, fold, *window) for fold, window in enumerate(windows, start=1)}
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+                if cancel_event is not None and cancel_event.is_set():
+                    raise BacktestCancelled(f"Walk-forward cancelled after {len(results)}/{len(windows)} folds")
+                for future in done:
+                    results.append(future.result())
+                    if progress_callback is not None: progress_callback(_fold_row(results[-1], data, metric, list(grid[0])), len(results), len(windows))
+        except BaseException:
+            for future in pending: future.cancel()
+            raise
+    results.sort(key=lambda result: result["fold"])
+    return _stitch(results, data, list(grid[0]), metric, mode, cash, varied_params(pd.DataFrame(grid), list(grid[0])))
+
+
+def _fold_row(result: dict, data: pd.DataFrame, metric: str, param_names: list) -> dict:
+    """ One row of the fold table: windows, chosen parameters, in-sample metric and out-of-sample metrics. """
+    train_start, train_end, test_start, test_end = result["bounds"]; index = data.index
+    row = {"fold": result["fold"], "train_start": index[train_start], "train_end": index[train_end - 1],
+           "test_start": index[test_start], "test_end": index[test_end - 1], **{name: (result["params"] or {}).get(name, np.nan) for name in param_names}, f"IS {metric}": result["in_sample"]}
+    oos = window_metrics(result["equity"], result["trades"], data.iloc[test_start:test_end]) if result["error"] is None else {}
+    for name in FOLD_METRICS: row[f"OOS {name}"] = oos.get(name, np.nan)
+    row["error"] = result["error"]
+    return row
+
+
+def _stitch(results: list, data: pd.DataFrame, param_names: list, metric: str, mode: str, cash, varied: list) -> pd.Series:
+    """ Chains the folds' out-of-sample equity (each rescaled to the capital the previous fold ended with). """
+    capital = float(cash); pieces, labels, trade_pieces = [], [], []
+    for result in results:
+        _, _, test_start, test_end = result["bounds"]
+        if result["error"] is None:
+            scale = capital / float(result["equity"].iloc[0]); equity = result["equity"] * scale
+            trades = result["trades"].copy(); trades["PnL"] *= scale; trades.insert(0, "Fold", result["fold"]); trade_pieces.append(trades)
+        else:
+            equity = pd.Series(capital, index=data.index[test_start:test_end])
+        pieces.append(equity); labels.append(np.full(len(equity), result["fold"])); capital = float(equity.iloc[-1])
+    equity = pd.concat(pieces)
+    trades = pd.concat(trade_pieces, ignore_index=True) if trade_pieces else vector_backtester.trades_frame([], data.index).assign(Fold=[])
+    oos_data = data.iloc[results[0]["bounds"][2]:]
+    fold_table = pd.DataFrame([_fold_row(result, data, metric, param_names) for result in results])
+    stats = {"Start": equity.index[0], "End": equity.index[-1], "Folds": len(results), "Mode": mode, "Optimized For": metric}
+    stats.update(window_metrics(equity, trades, oos_data))
+    stats["Profitable Folds [%]"] = (fold_table["OOS Return [%]"] > 0).mean() * 100
+    stats["_equity_curve"] = pd.DataFrame({"Equity": equity.to_numpy(), "DrawdownPct": 1 - equity.to_numpy() / np.maximum.accumulate(equity.to_numpy()),
+                                           "Fold": np.concatenate(labels)}, index=equity.index)
+    stats["_trades"] = trades; stats["_folds"] = fold_table
+    stats["_param_stability"] = parameter_stability(fold_table, varied)
+    return pd.Series(stats, dtype=object)
+
+
+def parameter_stability(fold_table: pd.DataFrame, param_names) -> pd.DataFrame:
+    """
+    How much the chosen parameters move between folds: per parameter the mean, standard deviation,
+    coefficient of variation (std / |mean|), range, number of distinct values, and the most frequent
+    value with the share of folds that chose it. Failed folds are left out. param_names should be the
+    parameters that vary across the search grid (see optimizer.varied_params): fixed ones are trivially "stable".
+    """
+    chosen = fold_table[fold_table["error"].isna()]
+    rows = []
+    for name in param_names:
+        if name not in chosen.columns or chosen.empty: continue
+        values = chosen[name].astype(float); mode = values.mode().iloc[0]
+        rows.append({"param": name, "mean": values.mean(), "std": values.std(ddof=0),
+                     "cv": values.std(ddof=0) / abs(values.mean()) if values.mean() else np.nan, "min": values.min(),
+                     "max": values.max(), "distinct": values.nunique(), "mode": mode, "mode share [%]": (values == mode).mean() * 100})
+    return pd.DataFrame(rows, columns=["param", "mean", "std", "cv", "min", "max", "distinct", "mode", "mode share [%]"])
+
+
+def format_walk_forward(stats: pd.Series) -> str:
+    """ Console report: out-of-sample summary, the fold table and the parameter stability table. """
+    summary = stats.drop([key for key in stats.index if key.startswith("_")])
+    with pd.option_context("display.width", 1000):
+        return "\n".join(["--- Walk-Forward (out of sample) ---", summary.to_string(),
+                          "--- Folds ---", stats["_folds"].to_string(index=False, float_format=lambda v: f"{v:.2f}"),
+                          "--- Parameter Stability ---", stats["_param_stability"].to_string(index=False, float_format=lambda v: f"{v:.2f}")])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m trading.walk_forward", description="Walk-forward optimization of one strategy.")
+    parser.add_argument("strategy", help="Strategy display name or class name")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--symbol", help="Ticker to load through DataFetcher")
+    source.add_argument("--data", metavar="FILE", help="Local OHLCV file (.csv, .parquet or .pkl)")
+    parser.add_argument("--period", default=DEFAULT_DATA_PERIOD, help=f"History period for --symbol (default {DEFAULT_DATA_PERIOD})")
+    parser.add_argument("--interval", default=DEFAULT_DATA_INTERVAL, help=f"Bar interval for --symbol (default {DEFAULT_DATA_INTERVAL})")
+    parser.add_argument("-r", "--range", dest="ranges", action="append", default=[], metavar="NAME=RANGE",
+                        help="Parameter range to optimize, e.g. n1=5-50:5 or n2=100,150,200 (repeatable; others keep their default)")
+    parser.add_argument("--constraint", help='Combination filter, e.g. "n1 < n2"')
+    parser.add_argument("--metric", choices=RESULT_METRICS, default=DEFAULT_METRIC, help=f"Train-window ranking (default {DEFAULT_METRIC})".replace("%", "%%"))
+    parser.add_argument("--folds", type=int, default=WALK_FORWARD_FOLDS, help=f"Number of test windows (default {WALK_FORWARD_FOLDS})")
+    parser.add_argument("--train-fraction", type=float, default=WALK_FORWARD_TRAIN_FRACTION,
+                        help=f"Share of the history in the first train window (default {WALK_FORWARD_TRAIN_FRACTION})")
+    parser.add_argument("--anchored", action="store_true", default=WALK_FORWARD_ANCHORED, help="Grow the train window from the first bar instead of rolling it")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--engine", choices=ENGINES, default="auto", help="Backtest engine (default auto)")
+    parser.add_argument("--equity", help="Write the stitched out-of-sample equity curve (.parquet, .csv or .json)")
+    parser.add_argument("--folds-out", help="Write the fold table (.parquet, .csv or .json)")
+    args = parser.parse_args(argv)
+    from trading.cli import write_table
+    from trading.runner import resolve_strategy_name, load_data_file, load_symbol
+    try: strategy_name = resolve_strategy_name(args.strategy)
+    except KeyError: parser.error(f"unknown strategy '{args.strategy}' (choose from: {', '.join(STRATEGY_LOADERS)})")
+    param_ranges = {}
+    for text in args.ranges:
+        name, sep, spec = text.partition("=")
+        if not sep or not name.strip(): parser.error(f"range '{text}' is not in NAME=RANGE form")
+        try: param_ranges[name.strip()] = parse_param_range(spec)
+        except ValueError as e: parser.error(f"invalid range '{text}': {e}")
+
+    data = load_data_file(args.data) if args.data else load_symbol(args.symbol, args.period, args.interval)
+    try:
+        stats = walk_forward(strategy_name, data, param_ranges, constraint=args.constraint, metric=args.metric, folds=args.folds,
+                             train_fraction=args.train_fraction, anchored=args.anchored, max_workers=args.workers, engine=args.engine,
+                             progress_callback=lambda row, completed, total: print(f"[{completed}/{total}] fold {row['fold']}"
+                                                                                 + (f": failed - {row['error']}" if row["error"] else f": OOS return {row['OOS Return [%]']:.2f}%")))
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr); return 1
+    print(format_walk_forward(stats))
+    if args.equity: write_table(stats["_equity_curve"], args.equity)
+    if args.folds_out: write_table(stats["_folds"], args.folds_out)
+    return 1 if stats["_folds"]["error"].notna().any() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())